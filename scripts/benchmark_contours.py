@@ -0,0 +1,78 @@
+"""
+Contour Benchmark: latency against area size, inline vs chunked in a process pool
+
+Contours a synthetic 1 m terrain (rolling hills in MGA zone 56) held in memory,
+so the numbers cover tracing, stitching and GeoJSON assembly but not S3 reads:
+- Inline: the whole grid traced in the calling thread
+- Chunked: CONTOUR_CHUNK_SIZE chunks traced by --workers processes and stitched
+
+Usage:
+    python scripts/benchmark_contours.py [--sizes-m 500 1000 2000 3000] [--workers 4] [--chunk-size 1024]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+from pyproj import CRS, Transformer
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.contour_service import ContourService
+from src.services.raster_export_service import GridSpec, InMemoryDataset, RasterGrid
+
+ORIGIN_X, ORIGIN_Y = 500000.0, 6960000.0
+TO_UTM = Transformer.from_crs("EPSG:4326", "EPSG:32756", always_xy=True)
+
+
+def terrain(size: int) -> InMemoryDataset:
+    rows, cols = np.mgrid[0:size, 0:size].astype(np.float32)
+    data = 50 + 20 * np.sin(rows / 97.0) * np.cos(cols / 131.0) + 5 * np.sin((rows + cols) / 23.0)
+    spec = GridSpec(CRS("EPSG:32756").to_wkt(), (1.0, 0.0, ORIGIN_X, 0.0, -1.0, ORIGIN_Y), size, size)
+    return InMemoryDataset(RasterGrid(spec, data.astype(np.float32)))
+
+
+def square(size: int):
+    corners = [(ORIGIN_X + 1, ORIGIN_Y - 1), (ORIGIN_X + size - 1, ORIGIN_Y - 1),
+               (ORIGIN_X + size - 1, ORIGIN_Y - size + 1), (ORIGIN_X + 1, ORIGIN_Y - size + 1)]
+    lons, lats = TO_UTM.transform(*zip(*corners), direction="INVERSE")
+    return list(zip(lats, lons))
+
+
+def run(service: ContourService, dataset: InMemoryDataset, polygon) -> Tuple[float, Dict]:
+    start = time.perf_counter()
+    geojson, statistics, error = service.trace_contours(dataset, TO_UTM, polygon, dataset.width * dataset.height,
+                                                        1.0, 5.0, 0.0)
+    assert error is None, error
+    return (time.perf_counter() - start) * 1000, statistics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-m", type=int, nargs="+", default=[500, 1000, 2000, 3000])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    inline = ContourService(dataset_manager=None, chunk_size=1 << 30)
+    chunked = ContourService(dataset_manager=None, chunk_size=args.chunk_size, workers=args.workers)
+    try:
+        # Start the pool before timing
+        run(chunked, terrain(2 * args.chunk_size), square(2 * args.chunk_size))
+
+        print(f"{'area km2':>9} {'cells':>11} {'lines':>7} {'inline ms':>10} {'chunks':>7} {'chunked ms':>11} {'speedup':>8}")
+        for size in args.sizes_m:
+            dataset, polygon = terrain(size), square(size)
+            inline_ms, statistics = run(inline, dataset, polygon)
+            chunked_ms, chunked_statistics = run(chunked, dataset, polygon)
+            print(f"{size * size / 1e6:>9.2f} {size * size:>11,} {statistics['contour_count']:>7} {inline_ms:>10.0f} "
+                  f"{chunked_statistics['chunks']:>7} {chunked_ms:>11.0f} {inline_ms / chunked_ms:>7.1f}x")
+    finally:
+        chunked.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Serialization Benchmark: JSON vs packed columnar format for batch endpoints
+
+Measures the per-request CPU spent outside the elevation lookup itself:
+- JSON: PointsRequest validation, a DEMPoint per result, FastAPI-style encoding
+- Columnar: numpy decode of packed coordinates and packed result encoding
+
+With --responses, measures response rendering alone for a /contour-data
+sized payload instead:
+- Model: a DEMPoint per point, response model validation, jsonable_encoder
+  and json.dumps (what FastAPI does for a returned model)
+- Fast: plain rows rendered by FastJSONResponse
+
+Usage:
+    python scripts/benchmark_serialization.py [--points 100 1000 10000] [--repeat 20]
+    python scripts/benchmark_serialization.py --responses [--points 50000]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+
+from src.models import DEMPoint, FrontendContourDataResponse, PointsRequest, StandardResponse
+from src.utils.binary_format import decode_points, decode_results, encode_points, encode_results
+from src.utils.fast_json import FastJSONResponse, row_template
+
+
+def _time_ms(func: Callable[[], object], repeat: int) -> float:
+    """Median wall time in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def benchmark(num_points: int, repeat: int) -> Dict[str, float]:
+    rng = np.random.default_rng(42)
+    lats = rng.uniform(-28.0, -27.0, num_points)
+    lons = rng.uniform(153.0, 154.0, num_points)
+    elevations = rng.uniform(0.0, 300.0, num_points)
+    source = "Brisbane2009LGA"
+
+    json_request = json.dumps({"points": [{"lat": a, "lon": b} for a, b in zip(lats, lons)]}).encode()
+    packed_request = encode_points(lats, lons)
+
+    def json_round_trip():
+        request = PointsRequest.model_validate_json(json_request)
+        results = [DEMPoint(lat=p.lat, lon=p.lon, elevation=e, data_source=source)
+                   for p, e in zip(request.points, elevations)]
+        response = StandardResponse(results=results, metadata={"total_points": len(results)})
+        return json.dumps(jsonable_encoder(response)).encode()
+
+    def columnar_round_trip():
+        req_lats, req_lons = decode_points(packed_request)
+        return encode_results(req_lats, req_lons, elevations.tolist(), [source] * num_points)
+
+    json_payload = json_round_trip()
+    columnar_payload = columnar_round_trip()
+    assert len(decode_results(columnar_payload).elevations) == num_points
+
+    json_ms = _time_ms(json_round_trip, repeat)
+    columnar_ms = _time_ms(columnar_round_trip, repeat)
+    return {
+        "points": num_points,
+        "json_ms": round(json_ms, 3),
+        "columnar_ms": round(columnar_ms, 3),
+        "speedup": round(json_ms / columnar_ms, 1) if columnar_ms else float("inf"),
+        "json_request_bytes": len(json_request),
+        "columnar_request_bytes": len(packed_request),
+        "json_response_bytes": len(json_payload),
+        "columnar_response_bytes": len(columnar_payload),
+    }
+
+
+def benchmark_responses(num_points: int, repeat: int) -> Dict[str, float]:
+    rng = np.random.default_rng(42)
+    points = [
+        {"latitude": float(a), "longitude": float(b), "elevation_m": float(e)}
+        for a, b, e in zip(rng.uniform(-28.0, -27.0, num_points), rng.uniform(153.0, 154.0, num_points),
+                           rng.uniform(0.0, 300.0, num_points))
+    ]
+    source = "Brisbane2009LGA"
+    envelope = {"status": "OK", "dem_source_used": source, "grid_info": {}, "crs": "EPSG:4326", "message": "ok"}
+    template = row_template(DEMPoint)
+
+    def model_render():
+        dem_points = [DEMPoint(lat=p["latitude"], lon=p["longitude"], elevation=p["elevation_m"], data_source=source)
+                      for p in points]
+        response = FrontendContourDataResponse(dem_points=dem_points, total_points=len(dem_points), **envelope)
+        # FastAPI re-validates a returned model against response_model before encoding it
+        response = FrontendContourDataResponse.model_validate(response.model_dump())
+        return json.dumps(jsonable_encoder(response)).encode()
+
+    def fast_render():
+        rows = [dict(template, lat=p["latitude"], lon=p["longitude"], elevation=p["elevation_m"], data_source=source)
+                for p in points]
+        return FastJSONResponse(dict(envelope, dem_points=rows, total_points=len(rows))).body
+
+    assert json.loads(model_render()) == json.loads(fast_render())
+    model_ms = _time_ms(model_render, repeat)
+    fast_ms = _time_ms(fast_render, repeat)
+    return {
+        "points": num_points,
+        "model_ms": round(model_ms, 3),
+        "fast_ms": round(fast_ms, 3),
+        "speedup": round(model_ms / fast_ms, 1) if fast_ms else float("inf"),
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--responses", action="store_true", help="benchmark JSON response rendering paths")
+    args = parser.parse_args(argv)
+
+    if args.responses:
+        print(f"{'points':>8} {'model ms':>10} {'fast ms':>10} {'speedup':>8}")
+        for num_points in args.points:
+            r = benchmark_responses(num_points, args.repeat)
+            print(f"{r['points']:>8} {r['model_ms']:>10} {r['fast_ms']:>10} {r['speedup']:>7}x")
+        return
+
+    print(f"{'points':>8} {'json ms':>10} {'columnar ms':>12} {'speedup':>8} {'json resp B':>12} {'columnar resp B':>16}")
+    for num_points in args.points:
+        r = benchmark(num_points, args.repeat)
+        print(f"{r['points']:>8} {r['json_ms']:>10} {r['columnar_ms']:>12} {r['speedup']:>7}x "
+              f"{r['json_response_bytes']:>12} {r['columnar_response_bytes']:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
+import asyncio
 import logging
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import StreamingResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from typing import Dict, Any, List, Optional
@@ -10,11 +12,36 @@ from ...middleware.simple_rate_limiter import get_rate_limiter
 from ...config import Settings
 from ...dem_service import DEMService
 from ...dem_exceptions import DEMCoordinateError, DEMServiceError
-from ...dependencies import get_dem_service, get_contour_service, get_dataset_manager, get_elevation_service
+from ...dependencies import (
+    get_dem_service, get_contour_service, get_dataset_manager, get_elevation_service,
+    get_bulk_elevation_service, get_cross_section_service, get_raster_export_service,
+    get_contour_tile_service, get_terrain_service, get_earthworks_service, get_sight_distance_service
+)
+from ...services.bulk_elevation_service import BulkElevationService
+from ...services.cross_section_service import CrossSectionService, section_offsets
+from ...services.sight_distance_service import SightDistanceService
+from ...services.contour_tile_service import ContourTileService
+from ...services.contour_tile_service import check_tile as check_contour_tile
+from ...services.terrain_service import TerrainOptions, TerrainService, check_product
+from ...services.terrain_service import check_tile as check_terrain_tile
+from ...services.earthworks_service import (
+    DesignSurface, EarthworksService, FlatDesign, GridDesign, TINDesign,
+)
+from ...services.raster_export_service import (
+    GEOTIFF_MEDIA_TYPE, NPY_MEDIA_TYPE, RasterExportService, RasterGrid
+)
 from ...dataset_manager import DatasetManager
 from ...contour_service import ContourService
 from ...unified_elevation_service import UnifiedElevationService
 from ...auth import get_current_user
+from ...utils.http_cache import build_cache_validators
+from ...utils.fast_json import FastJSONResponse, dumps, row_template
+from ...utils.mvt import MVT_MEDIA_TYPE
+from ...utils.png import PNG_MEDIA_TYPE
+from ...utils.binary_format import (
+    columnar_openapi_extra, columnar_response, decode_points, is_columnar_request,
+    parse_json_body, wants_columnar
+)
 from ...models import (
     PointRequest, LineRequest, PathRequest, ContourDataRequest,
     PointResponse, LineResponse, PathResponse, ContourDataResponse,
@@ -25,10 +52,14 @@ from ...models import (
     # Frontend-specific models
     FrontendContourDataRequest, FrontendContourDataResponse,
     # New standardized models
-    StandardCoordinate, PointsRequest, LineRequest_Standard, PathRequest_Standard,
+    StandardCoordinate, PointsRequest, BulkPointsRequest, LineRequest_Standard, PathRequest_Standard,
     StandardElevationResult, StandardMetadata, StandardResponse, StandardErrorResponse,
     StandardErrorDetail
 )
+from ...models.cross_section_models import CrossSectionRequest, CrossSectionResponse
+from ...models.sight_distance_models import SightDistanceRequest, SightDistanceResponse
+from ...models.raster_models import ClipRequest, GridRequest, TerrainRequest
+from ...models.earthworks_models import EarthworksRequest, EarthworksResponse
 # Import campaigns models - FileInfo fix  
 from ...models.api_campaign_models import CampaignSummary, CampaignDetails, CampaignsResult
 
@@ -39,10 +70,16 @@ limiter = Limiter(key_func=get_remote_address)
 
 router = APIRouter(prefix="/v1/elevation", tags=["elevation"])
 
+# Point arrays are rendered as plain dicts shaped like these models (see utils.fast_json)
+_ENHANCED_POINT_ROW = row_template(EnhancedPointResponse)
+_POINT_ROW = row_template(PointResponse)
+_DEM_POINT_ROW = row_template(DEMPoint)
+
 @router.get("", summary="Get elevation for a single point via query parameters")
 @limiter.limit("60/minute")  # Generous for S3, restrictive for API abuse  
 async def get_elevation_simple(
     request: Request,
+    response: Response,
     lat: float,
     lon: float, 
     source_id: Optional[str] = None,
@@ -52,8 +89,18 @@ async def get_elevation_simple(
     
     This is a simplified GET endpoint for basic elevation queries.
     For more advanced features, use the POST /point endpoint.
+    Supports conditional GET (If-None-Match / If-Modified-Since) keyed on the
+    loaded index version.
     """
     try:
+        validators = None
+        if service.settings.HTTP_CACHE_ENABLED:
+            validators = build_cache_validators(
+                request, service.elevation_service, service.settings.HTTP_CACHE_ELEVATION_MAX_AGE
+            )
+            if validators.is_not_modified(request):
+                return validators.not_modified_response()
+        
         # Check for API fallback abuse (same logic as POST endpoint)
         if is_api_fallback_coordinate(lat, lon):
             # Apply stricter rate limiting for expensive API coordinates using Redis
@@ -101,6 +148,10 @@ async def get_elevation_simple(
             response_data["data_type"] = "LiDAR"
             response_data["accuracy"] = "±0.1m"
         
+        # Only successful lookups are cacheable; a miss may be a transient outage
+        if validators and result.elevation_m is not None:
+            validators.apply(response)
+        
         return response_data
         
     except DEMCoordinateError as e:
@@ -179,12 +230,22 @@ def raise_standard_http_exception(status_code: int, message: str, details: Optio
 
 @router.get("/sources", summary="List available DEM sources")
 async def list_dem_sources(
+    request: Request,
+    response: Response,
     service: DEMService = Depends(get_dem_service)
 ) -> Dict[str, Any]:
     """List all configured DEM sources with their basic information."""
     try:
         # Use the same Settings instance from ServiceContainer that other services use
         settings = service.settings
+        
+        if settings.HTTP_CACHE_ENABLED:
+            validators = build_cache_validators(
+                request, service.elevation_service, settings.HTTP_CACHE_METADATA_MAX_AGE
+            )
+            if validators.is_not_modified(request):
+                return validators.not_modified_response()
+            validators.apply(response)
         sources_info = {}
         
         for source_id, source_config in settings.DEM_SOURCES.items():
@@ -340,9 +401,18 @@ async def get_elevation_point(
 @router.post("/line", response_model=EnhancedLineResponse)
 async def get_elevation_line(
     request: LineRequest,
+    http_request: Request,
     service: DEMService = Depends(get_dem_service)
 ) -> EnhancedLineResponse:
-    """Get elevations for points along a line segment using unified elevation service."""
+    """
+    Get elevations for points along a line segment using unified elevation service.
+    
+    Lines covered by the unified index are sampled at native raster resolution and
+    resampled to `num_points` (set `native_resolution` to get every sample); each
+    point carries its chainage and source file.
+    
+    Send `Accept: application/vnd.dem.columnar` for a packed columnar response.
+    """
     try:
         # Use the new unified service for line elevation
         points, dem_source_used, message = await service.get_elevations_for_line_unified(
@@ -351,25 +421,37 @@ async def get_elevation_line(
             request.end_point.latitude,
             request.end_point.longitude,
             request.num_points,
-            request.dem_source_id
+            request.dem_source_id,
+            native_resolution=request.native_resolution
         )
         
-        # Convert to response model - match EnhancedLineResponse structure
-        line_points = []
-        for point in points:
-            line_points.append(EnhancedPointResponse(
+        if wants_columnar(http_request):
+            return columnar_response(
+                [point["latitude"] for point in points],
+                [point["longitude"] for point in points],
+                [point["elevation_m"] for point in points],
+                [point.get("source", dem_source_used) if point["elevation_m"] is not None else None for point in points]
+            )
+        
+        # Rows match EnhancedPointResponse; rendered directly, schema stays EnhancedLineResponse
+        line_points = [
+            dict(
+                _ENHANCED_POINT_ROW,
                 elevation=point["elevation_m"],
                 latitude=point["latitude"],
                 longitude=point["longitude"],
-                dem_source_used=dem_source_used,
-                message=point["message"]
-            ))
+                dem_source_used=point.get("source", dem_source_used),
+                message=point["message"],
+                chainage_m=point.get("chainage_m")
+            )
+            for point in points
+        ]
         
-        return EnhancedLineResponse(
-            points=line_points,
-            total_points=len(line_points),
-            message=message
-        )
+        return FastJSONResponse({
+            "points": line_points,
+            "total_points": len(line_points),
+            "message": message
+        })
         
     except DEMCoordinateError as e:
         logger.warning(f"Invalid coordinates in line elevation: {e}")
@@ -384,53 +466,78 @@ async def get_elevation_line(
         logger.error(f"Unexpected error in line elevation: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.post("/path", response_model=PathResponse)
+@router.post("/path", response_model=PathResponse, openapi_extra=columnar_openapi_extra(PathRequest))
 @limiter.limit("20/minute")  # More restrictive for batch operations
 async def get_elevation_path(
     request: Request,
-    path_request: PathRequest,
     service: DEMService = Depends(get_dem_service)
 ) -> PathResponse:
-    """Get elevations for a list of discrete points using unified elevation service."""
+    """
+    Get elevations for a list of discrete points using unified elevation service.
+    
+    Accepts JSON or packed coordinates (`Content-Type: application/vnd.dem.columnar`,
+    with `dem_source_id` as a query parameter); `Accept: application/vnd.dem.columnar`
+    returns a packed columnar response.
+    """
+    if is_columnar_request(request):
+        try:
+            lats, lons = decode_points(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        points_data = [
+            {"latitude": lat, "longitude": lon, "id": i}
+            for i, (lat, lon) in enumerate(zip(lats.tolist(), lons.tolist()))
+        ]
+        dem_source_id = request.query_params.get("dem_source_id")
+    else:
+        path_request = await parse_json_body(request, PathRequest)
+        # Convert request points to dict format for service
+        points_data = [
+            {"latitude": point.latitude, "longitude": point.longitude, "id": point.id}
+            for point in path_request.points
+        ]
+        dem_source_id = path_request.dem_source_id
+    
     try:
-        if not path_request.points:
+        if not points_data:
             raise HTTPException(status_code=400, detail="Points list cannot be empty")
         
         # Emergency protection: Limit path size to prevent API quota abuse  
-        if len(path_request.points) > 100:
+        if len(points_data) > 100:
             raise HTTPException(status_code=400, detail="Maximum 100 points per path request to prevent API quota abuse")
         
-        # Convert request points to dict format for service
-        points_data = []
-        for point in path_request.points:
-            points_data.append({
-                "latitude": point.latitude,
-                "longitude": point.longitude,
-                "id": point.id
-            })
-        
         # Use the new unified service for batch elevation
         elevations, dem_source_used, message = await service.get_elevations_for_path_unified(
             points_data,
-            path_request.dem_source_id
+            dem_source_id
         )
         
-        # Convert to response model - match PathResponse structure
-        points = []
-        for elev in elevations:
-            points.append(PointResponse(
+        if wants_columnar(request):
+            return columnar_response(
+                [elev["input_latitude"] for elev in elevations],
+                [elev["input_longitude"] for elev in elevations],
+                [elev["elevation_m"] for elev in elevations],
+                [elev.get("dem_source") if elev["elevation_m"] is not None else None for elev in elevations]
+            )
+        
+        # Rows match PointResponse; rendered directly, schema stays PathResponse
+        points = [
+            dict(
+                _POINT_ROW,
                 elevation=elev["elevation_m"],
                 latitude=elev["input_latitude"],
                 longitude=elev["input_longitude"],
                 dem_source_used=dem_source_used,
                 message=elev["message"]
-            ))
+            )
+            for elev in elevations
+        ]
         
-        return PathResponse(
-            points=points,
-            total_points=len(points),
-            message=message
-        )
+        return FastJSONResponse({
+            "points": points,
+            "total_points": len(points),
+            "message": message
+        })
         
     except DEMCoordinateError as e:
         logger.warning(f"Invalid coordinates in path elevation: {e}")
@@ -475,7 +582,9 @@ async def generate_contour_data(
         
         # Use DEMService delegation method (which calls ContourService internally)
         logger.info("Calling service.get_dem_points_in_polygon...")
-        dem_points, dem_source_used, error_message = service.get_dem_points_in_polygon(
+        # Windowed read and masking are blocking; keep them off the event loop
+        dem_points, dem_source_used, error_message = await asyncio.to_thread(
+            service.get_dem_points_in_polygon,
             polygon_coords,
             request.source or "auto",
             50000  # max_points
@@ -495,22 +604,19 @@ async def generate_contour_data(
             logger.error("No elevation points generated")
             raise HTTPException(status_code=400, detail="No elevation points could be generated for the specified area")
         
-        # Convert to response model format with enhanced error handling
+        # Rows match DEMPoint; up to 50,000 of them, so no model per point
         response_points = []
         for i, point in enumerate(dem_points):
             try:
-                logger.debug(f"Processing point {i}: {point}")
-                
                 # Flexible point data handling
-                point_data = _process_elevation_point(point)
-                lat, lon, elevation = point_data
+                lat, lon, elevation = _process_elevation_point(point)
                 
-                response_points.append(DEMPoint(
-                    latitude=lat,
-                    longitude=lon,
-                    elevation_m=elevation,
-                    x_crs=point.get("x_crs", lon),
-                    y_crs=point.get("y_crs", lat)
+                response_points.append(dict(
+                    _DEM_POINT_ROW,
+                    lat=float(lat),
+                    lon=float(lon),
+                    elevation=None if elevation is None else float(elevation),
+                    data_source=dem_source_used
                 ))
                 
             except Exception as e:
@@ -520,15 +626,15 @@ async def generate_contour_data(
         
         logger.info(f"Successfully processed {len(response_points)} points")
         
-        return FrontendContourDataResponse(
-            status="OK",
-            dem_points=response_points,
-            total_points=len(response_points),
-            dem_source_used=dem_source_used,
-            grid_info={},  # Empty grid info for backward compatibility
-            crs="EPSG:4326",
-            message="Contour data generated successfully."
-        )
+        return FastJSONResponse({
+            "status": "OK",
+            "dem_points": response_points,
+            "total_points": len(response_points),
+            "dem_source_used": dem_source_used,
+            "grid_info": {},  # Empty grid info for backward compatibility
+            "crs": "EPSG:4326",
+            "message": "Contour data generated successfully."
+        })
         
     except HTTPException:
         raise
@@ -546,16 +652,23 @@ async def generate_contour_data(
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.post("/contour-data/geojson", response_model=ContourDataResponse)
+@router.post("/contour-data/geojson", response_class=StreamingResponse,
+             responses={200: {"model": ContourDataResponse}})
 async def generate_geojson_contour_data(
     request: ContourDataRequest,
     contour_service: ContourService = Depends(get_contour_service)
-) -> ContourDataResponse:
+) -> StreamingResponse:
     """
     Generate GeoJSON contour lines from DEM data within a polygon area using ContourService.
     
     This endpoint generates server-side contour lines as GeoJSON features that can be
     directly displayed on the frontend map, eliminating browser memory issues.
+    
+    The body is the ContourDataResponse shape ({"success", "contours",
+    "statistics", "area_bounds", "dem_source_used", "crs", "message"}) streamed
+    with chunked transfer encoding: features are written one contour level at a
+    time as they are traced, and statistics follow the FeatureCollection, so
+    multi-MB contour sets are never held in memory as a whole.
     """
     try:
         if not request.area_bounds.polygon_coordinates:
@@ -567,8 +680,10 @@ async def generate_geojson_contour_data(
         # Convert coordinates to the format expected by the service
         polygon_coords = [(coord.latitude, coord.longitude) for coord in request.area_bounds.polygon_coordinates]
         
-        # Use ContourService directly for contour generation
-        geojson_contours, statistics, dem_source_used, error_message = contour_service.generate_geojson_contours(
+        # Read and check the DEM off the event loop; levels are traced while the body streams
+        # (large grids fan out further to the contour process pool)
+        levels, statistics, dem_source_used, error_message = await asyncio.to_thread(
+            contour_service.stream_geojson_contours,
             polygon_coords=polygon_coords,
             dem_source_id=request.dem_source_id or "auto",
             max_points=request.max_points,
@@ -580,22 +695,26 @@ async def generate_geojson_contour_data(
         if error_message:
             raise HTTPException(status_code=400, detail=error_message)
         
-        if not geojson_contours or not statistics:
+        if not statistics:
             raise HTTPException(status_code=400, detail="No contours could be generated for the specified area")
         
-        # Convert to response model format
-        contours = GeoJSONFeatureCollection(**geojson_contours)
-        stats = ContourStatistics(**statistics)
+        area_bounds = dumps(request.area_bounds.model_dump())
         
-        return ContourDataResponse(
-            success=True,
-            contours=contours,
-            statistics=stats,
-            area_bounds=request.area_bounds,
-            dem_source_used=dem_source_used,
-            crs="EPSG:4326",
-            message=f"Successfully generated {stats.contour_count} contour lines from {stats.total_points} elevation points"
-        )
+        def body():
+            # Starlette iterates sync generators in its threadpool
+            yield b'{"success":true,"contours":{"type":"FeatureCollection","features":['
+            written = False
+            for chunk in levels:
+                if chunk:
+                    yield b"," + chunk if written else chunk
+                    written = True
+            message = (f"Successfully generated {statistics['contour_count']} contour lines "
+                       f"from {statistics['total_points']} elevation points")
+            yield (b']},"statistics":' + dumps(statistics) + b',"area_bounds":' + area_bounds
+                   + b',"dem_source_used":' + dumps(dem_source_used) + b',"crs":"EPSG:4326","message":'
+                   + dumps(message) + b"}")
+        
+        return StreamingResponse(body(), media_type="application/json")
         
     except HTTPException:
         raise
@@ -628,7 +747,8 @@ async def generate_legacy_contour_data(
         polygon_coords = [(coord.latitude, coord.longitude) for coord in request.area_bounds.polygon_coordinates]
         
         # Use DEMService delegation method (which calls ContourService internally)
-        dem_points, dem_source_used, error_message = service.get_dem_points_in_polygon(
+        dem_points, dem_source_used, error_message = await asyncio.to_thread(
+            service.get_dem_points_in_polygon,
             polygon_coords,
             request.dem_source_id or "auto",
             request.max_points
@@ -724,37 +844,60 @@ async def get_coverage_summary(
 # NEW STANDARDIZED API ENDPOINTS
 # =============================================================================
 
-@router.post("/points", response_model=StandardResponse, summary="Get elevations for multiple discrete coordinates")
+@router.post("/points", response_model=StandardResponse, summary="Get elevations for multiple discrete coordinates",
+             openapi_extra=columnar_openapi_extra(PointsRequest))
 @limiter.limit("10/minute")  # Most restrictive for bulk operations
 async def get_elevation_points(
     request: Request,
-    points_request: PointsRequest,
     service: DEMService = Depends(get_dem_service)
 ) -> StandardResponse:
-    """Get elevations for multiple discrete coordinates (batch endpoint)."""
+    """
+    Get elevations for multiple discrete coordinates (batch endpoint).
+    
+    Accepts JSON or packed coordinates (`Content-Type: application/vnd.dem.columnar`,
+    with `source` as a query parameter); `Accept: application/vnd.dem.columnar`
+    returns a packed columnar response instead of building a DEMPoint per result.
+    """
+    if is_columnar_request(request):
+        try:
+            lats, lons = decode_points(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        coordinates = list(zip(lats.tolist(), lons.tolist()))
+        source = request.query_params.get("source")
+    else:
+        points_request = await parse_json_body(request, PointsRequest)
+        coordinates = [(point.lat, point.lon) for point in points_request.points]
+        source = points_request.source
+    
     try:
-        if not points_request.points:
+        if not coordinates:
             raise HTTPException(status_code=400, detail="Points list cannot be empty")
         
         # Emergency protection: Limit batch size to prevent API quota abuse
-        if len(points_request.points) > 50:
+        if len(coordinates) > 50:
             raise HTTPException(status_code=400, detail="Maximum 50 points per batch request to prevent API quota abuse")
         
         # Convert to format expected by existing service
-        points_data = []
-        for i, point in enumerate(points_request.points):
-            points_data.append({
-                "latitude": point.lat,
-                "longitude": point.lon,
-                "id": i
-            })
+        points_data = [
+            {"latitude": lat, "longitude": lon, "id": i}
+            for i, (lat, lon) in enumerate(coordinates)
+        ]
         
         # Use unified elevation service for batch processing
         elevations, dem_source_used, message = await service.get_elevations_for_path_unified(
             points_data,
-            points_request.source
+            source
         )
         
+        if wants_columnar(request):
+            return columnar_response(
+                [elev["input_latitude"] for elev in elevations],
+                [elev["input_longitude"] for elev in elevations],
+                [elev["elevation_m"] for elev in elevations],
+                [dem_source_used if elev["elevation_m"] is not None else None for elev in elevations]
+            )
+        
         # Convert to StandardResponse format - match DEMPoint model
         results = []
         successful_points = 0
@@ -764,7 +907,8 @@ async def get_elevation_points(
             if elevation_value is not None:
                 successful_points += 1
             
-            results.append(DEMPoint(
+            results.append(dict(
+                _DEM_POINT_ROW,
                 lat=elev["input_latitude"],
                 lon=elev["input_longitude"],
                 elevation=elevation_value,
@@ -778,10 +922,10 @@ async def get_elevation_points(
             "units": "meters"
         }
         
-        return StandardResponse(
-            results=results,
-            metadata=metadata
-        )
+        return FastJSONResponse({
+            "results": results,
+            "metadata": metadata
+        })
         
     except DEMCoordinateError as e:
         logger.warning(f"Invalid coordinates in points elevation: {e}")
@@ -797,6 +941,459 @@ async def get_elevation_points(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.post("/bulk", summary="Stream elevations for large coordinate arrays as NDJSON")
+@limiter.limit("5/minute")
+async def get_elevation_bulk(
+    request: Request,
+    bulk_request: BulkPointsRequest,
+    service: BulkElevationService = Depends(get_bulk_elevation_service),
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    Bulk elevation sampling for 10k-100k points per request.
+    
+    Reads are planned by covering file and tile, and results stream back as
+    application/x-ndjson in input order, one object per point
+    ({"index", "lat", "lon", "elevation", "source", "error"}), followed by a
+    final {"summary": {...}} line. Points are charged against a daily cost
+    quota (S3 reads cost less than external API fallbacks) rather than capped.
+    """
+    try:
+        num_points = len(bulk_request.points)
+        if num_points > service.max_points:
+            raise HTTPException(status_code=400, detail=f"Maximum {service.max_points} points per bulk request")
+        
+        client_id = (current_user or {}).get("user_id") or (current_user or {}).get("sub") or get_remote_address(request)
+        remaining = await asyncio.to_thread(service.quota.remaining, client_id)
+        if remaining < service.estimate_cost(num_points):
+            raise HTTPException(
+                status_code=429,
+                detail=f"Bulk quota exceeded: request needs {service.estimate_cost(num_points)} units, {remaining} remaining today"
+            )
+        
+        points = [(point.lat, point.lon) for point in bulk_request.points]
+        return StreamingResponse(
+            service.stream_ndjson(points, client_id),
+            media_type="application/x-ndjson",
+            headers={"X-Total-Points": str(num_points), "X-Quota-Remaining": str(remaining)}
+        )
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.warning(f"ValueError in bulk elevation: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in bulk elevation: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/cross-sections", response_model=CrossSectionResponse,
+             summary="Sample cross-sections at regular chainage along an alignment")
+@limiter.limit("20/minute")
+async def get_cross_sections(
+    request: Request,
+    section_request: CrossSectionRequest,
+    service: CrossSectionService = Depends(get_cross_section_service)
+) -> CrossSectionResponse:
+    """
+    Cross-sections every `interval_m` along a polyline alignment.
+
+    Section points are placed perpendicular to the alignment at `offsets_m`
+    (or every `spacing_m` across `width_m`) in the local UTM zone and sampled
+    in one batched read plan. Each section returns an elevation array aligned
+    with the response `offsets_m`. Larger alignments can be submitted as a
+    `cross_sections` job.
+    """
+    try:
+        offsets = section_offsets(section_request.width_m, section_request.spacing_m, section_request.offsets_m)
+        sections = await service.get_cross_sections(
+            [(c.lat, c.lon) for c in section_request.alignment],
+            section_request.interval_m,
+            offsets,
+            start_chainage_m=section_request.start_chainage_m,
+        )
+        if sections is None:
+            raise HTTPException(status_code=503, detail="Cross-sections need the unified spatial index, which is not loaded")
+        
+        result = sections.to_dict()
+        return CrossSectionResponse(
+            total_sections=len(result["sections"]),
+            total_points=sections.num_points,
+            missing_points=int((sections.source_index < 0).sum()),
+            **result
+        )
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.warning(f"ValueError in cross-sections: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in cross-sections: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/sight-distance", response_model=SightDistanceResponse,
+             summary="Available sight distance per station along an alignment's vertical profile")
+@limiter.limit("20/minute")
+async def get_sight_distance(
+    request: Request,
+    sight_request: SightDistanceRequest,
+    service: SightDistanceService = Depends(get_sight_distance_service)
+) -> SightDistanceResponse:
+    """
+    Line-of-sight sight distance every `station_interval_m` along a polyline.
+    
+    The ground is sampled once at native resolution along the alignment. From
+    each station, an eye `eye_height_m` above the ground looks along the
+    profile for an object `object_height_m` above it (Austroads: 1.1 m and
+    0.2 m for stopping sight distance); the available distance ends at the
+    first sample where terrain hides the object, at `max_distance_m`, or at the
+    end of the alignment. Both directions are reported. Horizontal curves and
+    roadside obstructions are not considered.
+    """
+    try:
+        analysis = await service.analyse(
+            [(c.lat, c.lon) for c in sight_request.alignment],
+            sight_request.station_interval_m,
+            eye_height_m=sight_request.eye_height_m,
+            object_height_m=sight_request.object_height_m,
+            max_distance_m=sight_request.max_distance_m,
+        )
+        if analysis is None:
+            raise HTTPException(status_code=503, detail="Sight distance needs the unified spatial index, which is not loaded")
+        
+        required = sight_request.required_sight_distance_m
+        stations = analysis.stations(required)
+        return SightDistanceResponse(
+            length_m=round(analysis.length_m, 3),
+            profile_samples=len(analysis.chainage_m),
+            missing_samples=analysis.missing_samples,
+            eye_height_m=sight_request.eye_height_m,
+            object_height_m=sight_request.object_height_m,
+            max_distance_m=sight_request.max_distance_m,
+            required_sight_distance_m=required,
+            deficient_stations=None if required is None else sum(not s["meets_requirement"] for s in stations),
+            files_used=analysis.files_used,
+            stations=stations,
+        )
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.warning(f"ValueError in sight distance: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in sight distance: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+_RASTER_CHUNK_BYTES = 1024 * 1024
+
+
+async def _raster_response(grid: RasterGrid, output_format: str, name: str) -> StreamingResponse:
+    """Encode a grid off the event loop and stream it in 1 MiB chunks."""
+    if output_format == "npy":
+        payload, media_type, extension = await asyncio.to_thread(grid.to_npy), NPY_MEDIA_TYPE, "npy"
+    else:
+        payload, media_type, extension = await asyncio.to_thread(grid.to_geotiff), GEOTIFF_MEDIA_TYPE, "tif"
+    
+    def chunks():
+        for start in range(0, len(payload), _RASTER_CHUNK_BYTES):
+            yield payload[start:start + _RASTER_CHUNK_BYTES]
+    
+    headers = dict(grid.headers())
+    headers["Content-Length"] = str(len(payload))
+    headers["Content-Disposition"] = f'attachment; filename="{name}.{extension}"'
+    return StreamingResponse(chunks(), media_type=media_type, headers=headers)
+
+
+@router.post("/clip", summary="Export the DEM clipped to a polygon as GeoTIFF or .npy")
+@limiter.limit("10/minute")
+async def clip_raster(
+    request: Request,
+    clip_request: ClipRequest,
+    service: RasterExportService = Depends(get_raster_export_service)
+) -> StreamingResponse:
+    """
+    The DEM window covering a polygon as one binary raster.
+    
+    Covering campaign files are mosaicked in priority order onto the
+    highest-priority file's native grid, and pixels outside the polygon are
+    masked (NaN). Returns a Cloud-Optimized GeoTIFF, or a float32 `.npy` with
+    its geotransform (GDAL order), CRS and size in `X-Geotransform`,
+    `X-Raster-CRS`, `X-Raster-Width` and `X-Raster-Height` headers.
+    """
+    try:
+        grid = await service.clip([(c.lat, c.lon) for c in clip_request.polygon_coordinates])
+        if grid is None:
+            raise HTTPException(status_code=503, detail="Raster export needs the unified spatial index, which is not loaded")
+        return await _raster_response(grid, clip_request.format, "dem_clip")
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.warning(f"ValueError in raster clip: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in raster clip: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/grid", summary="Resample the DEM onto a regular grid in a projected CRS")
+@limiter.limit("10/minute")
+async def get_regular_grid(
+    request: Request,
+    grid_request: GridRequest,
+    service: RasterExportService = Depends(get_raster_export_service)
+) -> StreamingResponse:
+    """
+    Elevation on a regular grid at `resolution_m` in `target_crs` (MGA, NZTM, ...).
+    
+    Cells are aligned to whole multiples of the resolution. Each covering
+    campaign file is warped onto the grid with the chosen resampling and
+    mosaicked in priority order. The area is a WGS84 polygon or bounds in
+    the target CRS. Returned as a Cloud-Optimized GeoTIFF or float32 `.npy`
+    with the same headers as `/clip`.
+    """
+    try:
+        bounds = grid_request.bounds
+        grid = await service.grid(
+            grid_request.target_crs,
+            grid_request.resolution_m,
+            grid_request.resampling,
+            polygon_coords=[(c.lat, c.lon) for c in grid_request.polygon_coordinates or []],
+            bounds=(bounds.min_x, bounds.min_y, bounds.max_x, bounds.max_y) if bounds else None,
+            mask_to_polygon=grid_request.mask_to_polygon,
+        )
+        if grid is None:
+            raise HTTPException(status_code=503, detail="Grid resampling needs the unified spatial index, which is not loaded")
+        return await _raster_response(grid, grid_request.format, "dem_grid")
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.warning(f"ValueError in grid resampling: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in grid resampling: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/terrain", summary="Slope, aspect or hillshade on a regular grid as GeoTIFF or .npy")
+@limiter.limit("10/minute")
+async def get_terrain_grid(
+    request: Request,
+    terrain_request: TerrainRequest,
+    service: TerrainService = Depends(get_terrain_service)
+) -> StreamingResponse:
+    """
+    A terrain derivative of the DEM on the grid `/grid` would return.
+    
+    `slope` (degrees or percent), `aspect` (degrees clockwise from north the
+    slope faces; no data on flat cells) or `hillshade` (0-255 from the given
+    sun position) are computed with Horn's 3x3 finite differences on the
+    mosaicked grid, read with a one-cell margin so edge cells are complete.
+    Returned as a Cloud-Optimized GeoTIFF or float32 `.npy` with the same
+    headers as `/clip`.
+    """
+    try:
+        bounds = terrain_request.bounds
+        grid = await service.derive(
+            terrain_request.product,
+            terrain_request.target_crs,
+            terrain_request.resolution_m,
+            terrain_request.resampling,
+            polygon_coords=[(c.lat, c.lon) for c in terrain_request.polygon_coordinates or []],
+            bounds=(bounds.min_x, bounds.min_y, bounds.max_x, bounds.max_y) if bounds else None,
+            mask_to_polygon=terrain_request.mask_to_polygon,
+            options=TerrainOptions(
+                slope_units=terrain_request.slope_units,
+                azimuth_deg=terrain_request.azimuth_deg,
+                altitude_deg=terrain_request.altitude_deg,
+                z_factor=terrain_request.z_factor,
+            ),
+        )
+        if grid is None:
+            raise HTTPException(status_code=503, detail="Terrain derivatives need the unified spatial index, which is not loaded")
+        return await _raster_response(grid, terrain_request.format, f"dem_{terrain_request.product}")
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.warning(f"ValueError in terrain derivative: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in terrain derivative: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/terrain/{product}/{z}/{x}/{y}.png", summary="Slope, aspect or hillshade as a PNG map tile")
+@limiter.limit("300/minute")
+async def get_terrain_tile(
+    request: Request,
+    product: str,
+    z: int,
+    x: int,
+    y: int,
+    service: TerrainService = Depends(get_terrain_service)
+) -> Response:
+    """
+    One web-mercator (XYZ) terrain tile, zoom 10 to 18.
+    
+    `hillshade` is greyscale (sun at 315°, 45°); `slope` is coloured green to
+    dark red over 0-45 degrees; `aspect` runs round a colour wheel from north.
+    Pixels without data are transparent. Derived windows are cached per
+    unified index version, and conditional GETs are honoured. Tiles missing a
+    file that could not be read are sent with `Cache-Control: no-store`.
+    """
+    try:
+        check_product(product, TerrainOptions())
+        check_terrain_tile(z, x, y)
+        settings = service.elevation_service.settings
+        validators = None
+        if settings.HTTP_CACHE_ENABLED:
+            validators = build_cache_validators(
+                request, service.elevation_service, settings.HTTP_CACHE_ELEVATION_MAX_AGE
+            )
+            if validators.is_not_modified(request):
+                return validators.not_modified_response()
+        
+        result = await service.get_tile(product, z, x, y)
+        if result is None:
+            raise HTTPException(status_code=503, detail="Terrain tiles need the unified spatial index, which is not loaded")
+        tile, complete = result
+        
+        response = Response(content=tile, media_type=PNG_MEDIA_TYPE)
+        if not complete:
+            response.headers["Cache-Control"] = "no-store"
+        elif validators is not None:
+            validators.apply(response)
+        return response
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.warning(f"ValueError in terrain tile {product}/{z}/{x}/{y}: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in terrain tile {product}/{z}/{x}/{y}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+def _design_surface(earthworks_request: EarthworksRequest) -> DesignSurface:
+    if earthworks_request.design_tin is not None:
+        tin = earthworks_request.design_tin
+        return TINDesign([(v.lat, v.lon, v.elevation_m) for v in tin.vertices], tin.triangles)
+    if earthworks_request.design_grid is not None:
+        grid = earthworks_request.design_grid
+        return GridDesign(grid.crs, grid.geotransform, grid.levels)
+    return FlatDesign(earthworks_request.design_level_m)
+
+
+@router.post("/earthworks", response_model=EarthworksResponse,
+             summary="Cut, fill and net volumes of a design surface against the DEM")
+@limiter.limit("10/minute")
+async def get_earthworks(
+    request: Request,
+    earthworks_request: EarthworksRequest,
+    service: EarthworksService = Depends(get_earthworks_service)
+):
+    """
+    Cut/fill volumes within a polygon on the native DEM grid.
+    
+    The design is a flat level, a TIN (vertices with design levels, optionally
+    with explicit triangles) or a grid of design levels, in the DEM's vertical
+    datum. Every DEM cell inside the polygon is compared with the design level
+    at its centre, tile by tile; cells without DEM data or outside the design
+    are counted and excluded. With `format` geotiff or npy the design minus
+    DEM raster (positive = fill) is returned instead, with the totals in
+    `X-Cut-Volume-M3`, `X-Fill-Volume-M3`, `X-Net-Volume-M3` and
+    `X-Compared-Area-M2` headers alongside the `/clip` raster headers.
+    
+    When a covering file cannot be read (e.g. an S3 timeout) the volumes
+    leave its cells out: `complete` is false and `failed_files` lists it
+    (`X-Volumes-Complete: false` and `X-Raster-Failed-Files` for rasters).
+    """
+    try:
+        result = await service.compute(
+            [(c.lat, c.lon) for c in earthworks_request.polygon_coordinates],
+            _design_surface(earthworks_request),
+            difference_raster=earthworks_request.format != "json",
+        )
+        if result is None:
+            raise HTTPException(status_code=503, detail="Earthworks need the unified spatial index, which is not loaded")
+        if result.difference is None:
+            return EarthworksResponse(**result.totals)
+        
+        response = await _raster_response(result.difference, earthworks_request.format, "cut_fill_difference")
+        response.headers.update(result.headers())
+        return response
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.warning(f"ValueError in earthworks: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in earthworks: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/contours/{z}/{x}/{y}.mvt", summary="Contour lines as a Mapbox Vector Tile")
+@limiter.limit("300/minute")
+async def get_contour_tile(
+    request: Request,
+    z: int,
+    x: int,
+    y: int,
+    service: ContourTileService = Depends(get_contour_tile_service)
+) -> Response:
+    """
+    Contours for one web-mercator (XYZ) tile, zoom 10 to 18.
+    
+    The interval follows the zoom (50 m minor / 250 m major at z10 down to
+    0.5 m / 2.5 m at z17+). Lines are traced over the tile plus a 64-unit
+    buffer so they join seamlessly across tile edges. The single `contours`
+    layer carries `elevation`, `type` (minor/major) and `interval`; tiles
+    without contours have an empty body. Tiles are cached in memory and on
+    disk per index version, and conditional GETs are honoured. Tiles missing
+    a file that could not be read are sent with `Cache-Control: no-store`.
+    """
+    try:
+        check_contour_tile(z, x, y)
+        settings = service.elevation_service.settings
+        validators = None
+        if settings.HTTP_CACHE_ENABLED:
+            validators = build_cache_validators(
+                request, service.elevation_service, settings.HTTP_CACHE_ELEVATION_MAX_AGE
+            )
+            if validators.is_not_modified(request):
+                return validators.not_modified_response()
+        
+        result = await service.get_tile(z, x, y)
+        if result is None:
+            raise HTTPException(status_code=503, detail="Contour tiles need the unified spatial index, which is not loaded")
+        tile, status = result
+        
+        response = Response(content=tile, media_type=MVT_MEDIA_TYPE)
+        if status == "partial":
+            response.headers["Cache-Control"] = "no-store"
+        elif validators is not None:
+            validators.apply(response)
+        return response
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.warning(f"ValueError in contour tile {z}/{x}/{y}: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in contour tile {z}/{x}/{y}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 # Campaigns endpoints for unified spatial index
 @router.get("/test-campaigns", summary="Test campaigns data access")
 async def test_campaigns_access(
@@ -849,6 +1446,8 @@ async def test_campaigns_access(
 
 @router.get("/campaigns", summary="List available elevation data campaigns/collections")
 async def list_campaigns(
+    request: Request,
+    response: Response,
     elevation_service: UnifiedElevationService = Depends(get_elevation_service)
 ):
     """
@@ -889,6 +1488,15 @@ async def list_campaigns(
         
         if not unified_s3_source:
             raise HTTPException(status_code=503, detail="Unified S3 source not found")
+        
+        settings = elevation_service.settings
+        if settings.HTTP_CACHE_ENABLED:
+            validators = build_cache_validators(
+                request, elevation_service, settings.HTTP_CACHE_METADATA_MAX_AGE
+            )
+            if validators.is_not_modified(request):
+                return validators.not_modified_response()
+            validators.apply(response)
             
         collections = unified_s3_source.unified_index.data_collections
         
@@ -972,6 +1580,8 @@ async def list_campaigns(
 
 @router.get("/campaigns/{campaign_id}", response_model=CampaignDetails, summary="Get detailed campaign information")
 async def get_campaign_details(
+    request: Request,
+    response: Response,
     campaign_id: str,
     file_page: int = 1,
     file_limit: int = 10,
@@ -1033,6 +1643,15 @@ async def get_campaign_details(
         if not collection:
             raise HTTPException(status_code=404, detail=f"Campaign {campaign_id} not found")
         
+        settings = elevation_service.settings
+        if settings.HTTP_CACHE_ENABLED:
+            validators = build_cache_validators(
+                request, elevation_service, settings.HTTP_CACHE_METADATA_MAX_AGE
+            )
+            if validators.is_not_modified(request):
+                return validators.not_modified_response()
+            validators.apply(response)
+        
         files = collection.files
         
         # Paginate files
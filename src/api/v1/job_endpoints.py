@@ -0,0 +1,149 @@
+"""Asynchronous job endpoints for corridor and area requests too large for a synchronous call."""
+
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
+from fastapi.responses import FileResponse
+from slowapi.util import get_remote_address
+
+from ...auth import get_current_user
+from ...dependencies import get_job_service
+from ...models.job_models import JobSubmitRequest, JobStatus, JobListResponse
+from ...services.job_service import JobLimitError, JobService
+from .endpoints import limiter
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/v1/elevation/jobs", tags=["jobs"])
+
+
+def _client_id(request: Request, current_user: Optional[Dict[str, Any]]) -> str:
+    return (current_user or {}).get("user_id") or (current_user or {}).get("sub") or get_remote_address(request)
+
+
+def _job_params(job_request: Any) -> Dict[str, Any]:
+    """Handler parameters for a validated submission (coordinates as (lat, lon) tuples)."""
+    if job_request.kind == "contours":
+        return {
+            "polygon_coords": [(c.lat, c.lon) for c in job_request.polygon_coordinates],
+            "dem_source_id": job_request.dem_source_id,
+            "max_points": job_request.max_points,
+            "minor_contour_interval_m": job_request.minor_contour_interval_m,
+            "major_contour_interval_m": job_request.major_contour_interval_m,
+            "simplify_tolerance": job_request.simplify_tolerance,
+        }
+    if job_request.kind == "alignment_profile":
+        return {
+            "coordinates": [(c.lat, c.lon) for c in job_request.coordinates],
+            "interval_m": job_request.interval_m,
+        }
+    if job_request.kind == "cross_sections":
+        return {
+            "coordinates": [(c.lat, c.lon) for c in job_request.alignment],
+            "interval_m": job_request.interval_m,
+            "start_chainage_m": job_request.start_chainage_m,
+            "width_m": job_request.width_m,
+            "spacing_m": job_request.spacing_m,
+            "offsets_m": job_request.offsets_m,
+        }
+    return {"points": [(p.lat, p.lon) for p in job_request.points]}
+
+
+@router.post("", response_model=JobStatus, status_code=202)
+@limiter.limit("10/minute")
+async def submit_job(
+    request: Request,
+    job_request: JobSubmitRequest = Body(...),
+    service: JobService = Depends(get_job_service),
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user)
+):
+    """
+    Submit a long-running contour, alignment profile, cross-section or bulk points job.
+
+    Returns immediately with a job id; the job runs on a background worker in
+    priority order. Poll GET /jobs/{job_id} for progress and download the
+    result from GET /jobs/{job_id}/result once it has completed.
+    """
+    try:
+        job = service.submit(
+            job_request.kind,
+            _job_params(job_request),
+            client_id=_client_id(request, current_user),
+            priority=job_request.priority,
+            description=job_request.description,
+        )
+        return JobStatus(**job.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error submitting job: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("", response_model=JobListResponse)
+async def list_jobs(
+    request: Request,
+    service: JobService = Depends(get_job_service),
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user)
+):
+    """List the calling client's jobs, most recent first."""
+    records = service.list(_client_id(request, current_user))
+    return JobListResponse(total_jobs=len(records), jobs=[JobStatus(**record) for record in records])
+
+
+def _owned_job(job_id: str, request: Request, current_user: Optional[Dict[str, Any]],
+               service: JobService) -> Dict[str, Any]:
+    """The caller's job record; 404 for unknown jobs and for other clients' jobs alike."""
+    record = service.get(job_id)
+    if record is None or record.get("client_id") != _client_id(request, current_user):
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return record
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+async def get_job_status(
+    job_id: str,
+    request: Request,
+    service: JobService = Depends(get_job_service),
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user)
+):
+    """State, progress and result summary for one of the calling client's jobs."""
+    return JobStatus(**_owned_job(job_id, request, current_user, service))
+
+
+@router.get("/{job_id}/result")
+async def download_job_result(
+    job_id: str,
+    request: Request,
+    service: JobService = Depends(get_job_service),
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user)
+):
+    """Download a completed job's result file."""
+    record = _owned_job(job_id, request, current_user, service)
+    result = service.result_file(job_id)
+    if result is None:
+        if record.get("state") != "completed":
+            raise HTTPException(status_code=409, detail=f"Job {job_id} is {record.get('state')}, no result available")
+        # Completed on another host that does not share this one's result directory
+        raise HTTPException(status_code=404, detail=f"Result for job {job_id} is held on host {record.get('host')}")
+    path, media_type = result
+    return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+
+
+@router.delete("/{job_id}", response_model=JobStatus)
+async def cancel_job(
+    job_id: str,
+    request: Request,
+    service: JobService = Depends(get_job_service),
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user)
+):
+    """Cancel one of the calling client's queued or running jobs."""
+    _owned_job(job_id, request, current_user, service)
+    record = service.cancel(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return JobStatus(**record)
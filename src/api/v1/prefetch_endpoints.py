@@ -0,0 +1,106 @@
+"""Project-area prefetch endpoints for warming raster tiles ahead of use."""
+
+import logging
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Request
+from slowapi.util import get_remote_address
+
+from ...auth import get_current_user
+from ...dependencies import get_prefetch_service
+from ...models.prefetch_models import PrefetchRequest, PrefetchStatus, PrefetchListResponse
+from ...services.coverage_service import build_geometry
+from ...services.prefetch_service import ProjectPrefetchService
+from .endpoints import limiter
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/v1/elevation/prefetch", tags=["prefetch"])
+
+
+def _client_id(request: Request, current_user: Optional[Dict[str, Any]]) -> str:
+    return (current_user or {}).get("user_id") or (current_user or {}).get("sub") or get_remote_address(request)
+
+
+def _owned_project(project_id: str, request: Request, current_user: Optional[Dict[str, Any]],
+                   service: ProjectPrefetchService) -> Dict[str, Any]:
+    """The caller's project record; 404 for unknown projects and for other clients' projects alike."""
+    record = service.get(project_id)
+    if record is None or record.get("client_id") != _client_id(request, current_user):
+        raise HTTPException(status_code=404, detail=f"Prefetch project {project_id} not found")
+    return record
+
+
+@router.post("", response_model=PrefetchStatus, status_code=202)
+@limiter.limit("5/minute")
+async def register_prefetch_project(
+    request: Request,
+    prefetch_request: PrefetchRequest,
+    service: ProjectPrefetchService = Depends(get_prefetch_service),
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user)
+):
+    """
+    Register a project polygon or polyline and pre-warm its tiles.
+
+    Covering files are resolved through the unified index and their headers
+    and intersecting tiles are fetched into the local tile cache in the
+    background. Poll GET /prefetch/{project_id} for progress.
+    """
+    try:
+        geometry = build_geometry(
+            [(c.lat, c.lon) for c in prefetch_request.coordinates],
+            prefetch_request.geometry_type,
+            prefetch_request.buffer_m,
+        )
+        job = service.register(geometry, name=prefetch_request.name, client_id=_client_id(request, current_user))
+        return PrefetchStatus(**job.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error registering prefetch project: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("", response_model=PrefetchListResponse)
+@limiter.limit("60/minute")
+async def list_prefetch_projects(
+    request: Request,
+    service: ProjectPrefetchService = Depends(get_prefetch_service),
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user)
+):
+    """List the calling client's prefetch projects, most recent first."""
+    records = service.list(_client_id(request, current_user))
+    return PrefetchListResponse(
+        total_projects=len(records),
+        projects=[PrefetchStatus(**record) for record in records]
+    )
+
+
+@router.get("/{project_id}", response_model=PrefetchStatus)
+@limiter.limit("60/minute")
+async def get_prefetch_status(
+    project_id: str,
+    request: Request,
+    service: ProjectPrefetchService = Depends(get_prefetch_service),
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user)
+):
+    """Warm-up status and bytes fetched for one of the calling client's projects."""
+    return PrefetchStatus(**_owned_project(project_id, request, current_user, service))
+
+
+@router.delete("/{project_id}", response_model=PrefetchStatus)
+@limiter.limit("20/minute")
+async def cancel_prefetch_project(
+    project_id: str,
+    request: Request,
+    service: ProjectPrefetchService = Depends(get_prefetch_service),
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user)
+):
+    """Stop warming one of the calling client's projects; tiles already cached are kept."""
+    _owned_project(project_id, request, current_user, service)
+    record = service.cancel(project_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Prefetch project {project_id} not found")
+    return PrefetchStatus(**record)
@@ -385,6 +385,16 @@ class Settings(BaseSettings):
     DATASET_CACHE_SIZE: int = Field(default=10, description="Maximum number of datasets to keep in memory cache")
     MAX_WORKER_THREADS: int = Field(default=10, description="Maximum number of worker threads for async operations")
     
+    # Process-wide memory governor across in-process caches
+    MEMORY_BUDGET_MB: Optional[int] = Field(default=None, description="Process memory budget in MB (default: 75% of container/physical memory)")
+    MEMORY_HIGH_WATERMARK: float = Field(default=0.90, gt=0, le=1, description="Fraction of budget at which caches are evicted")
+    MEMORY_LOW_WATERMARK: float = Field(default=0.75, gt=0, le=1, description="Fraction of budget eviction frees down to")
+    
+    # HTTP caching for read-only GET endpoints (ETag / Last-Modified derived from index version)
+    HTTP_CACHE_ENABLED: bool = Field(default=True, description="Emit ETag/Last-Modified/Cache-Control and honour conditional GETs")
+    HTTP_CACHE_ELEVATION_MAX_AGE: int = Field(default=3600, ge=0, description="Cache-Control max-age (seconds) for GET elevation responses")
+    HTTP_CACHE_METADATA_MAX_AGE: int = Field(default=300, ge=0, description="Cache-Control max-age (seconds) for source and campaign listings")
+    
     # GDAL Error Handling (Phase 3B.2: Enhanced with Literal types)
     SUPPRESS_GDAL_ERRORS: bool = Field(default=True, description="Suppress non-critical GDAL errors from log output")
     GDAL_LOG_LEVEL: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = Field(
@@ -434,6 +444,65 @@ class Settings(BaseSettings):
     # Google Elevation API Configuration
     GOOGLE_ELEVATION_API_KEY: Optional[str] = None
     
+    # Persistent host-local cache of GPXZ/Google responses (shared by workers, survives restarts)
+    API_RESPONSE_CACHE_ENABLED: bool = Field(default=True, description="Check a local SQLite cache before any external elevation API call")
+    API_RESPONSE_CACHE_PATH: str = Field(default="./data/api_elevation_cache.sqlite3", description="SQLite file for cached API elevations")
+    API_RESPONSE_CACHE_PRECISION: int = Field(default=5, ge=3, le=7, description="Decimal places used to quantize cache keys (5 = ~1.1m)")
+    API_RESPONSE_CACHE_TTL_DAYS: Optional[int] = Field(default=365, description="Days before a cached API elevation is refetched (None = never)")
+    API_RESPONSE_CACHE_MAX_ENTRIES: int = Field(default=1_000_000, gt=0, description="Row cap enforced by compaction (least recently hit removed first)")
+    API_RESPONSE_CACHE_COMPACTION_INTERVAL_SECONDS: int = Field(default=3600, gt=0, description="Interval of the background compaction job")
+    
+    # Host-local disk cache of native-resolution raster tiles (warmed by project prefetch)
+    TILE_CACHE_ENABLED: bool = Field(default=True, description="Serve point lookups from cached raster tiles before reading S3")
+    TILE_CACHE_DIR: str = Field(default="./data/tile_cache", description="Directory holding cached tile arrays and headers")
+    TILE_CACHE_TILE_SIZE: int = Field(default=256, ge=64, le=2048, description="Tile edge length in native pixels")
+    TILE_CACHE_MAX_MB: int = Field(default=2048, gt=0, description="Disk budget for cached tiles (oldest pruned first)")
+    TILE_CACHE_READ_THROUGH: bool = Field(default=True, description="Point lookups fetch the covering tile into the cache instead of a one-off GDAL read")
+    TILE_FETCH_SINGLE_FLIGHT: bool = Field(default=True, description="Claim a Redis lease per (file, tile) so only one worker fetches a cold tile")
+    TILE_FETCH_LEASE_MS: int = Field(default=15000, gt=0, description="Lease lifetime; bounds the delay if the lease holder dies mid-fetch")
+    TILE_FETCH_WAIT_SECONDS: float = Field(default=5.0, ge=0, description="How long other workers wait for the lease holder's tile before fetching it themselves")
+    TILE_CACHE_REDIS_SHARE: bool = Field(default=False, description="Also publish fetched tiles to Redis for workers on other hosts")
+    TILE_CACHE_REDIS_SHARE_TTL_SECONDS: int = Field(default=600, gt=0, description="TTL of tiles published to Redis")
+    # In-process cache of polygon contour results (GeoJSON contours and contour point sets)
+    CONTOUR_CACHE_ENABLED: bool = Field(default=True, description="Reuse contour results for a repeated polygon, parameters and index version")
+    CONTOUR_CACHE_MAX_MB: int = Field(default=256, gt=0, description="Compressed bytes of contour results kept per process (least recently used evicted)")
+    CONTOUR_CACHE_PRECISION: int = Field(default=6, ge=3, le=8, description="Decimal places polygon vertices are quantized to for cache keys (6 = ~0.1m)")
+    CONTOUR_CACHE_REDIS_SHARE: bool = Field(default=False, description="Also publish contour results to Redis for workers on other hosts")
+    CONTOUR_CACHE_REDIS_TTL_SECONDS: int = Field(default=3600, gt=0, description="TTL of contour results published to Redis")
+    # Bulk NDJSON elevation endpoint: per-point cost accounting replaces the /points and /path caps
+    BULK_MAX_POINTS: int = Field(default=100_000, gt=0, description="Maximum coordinates accepted by one bulk request")
+    BULK_CHUNK_SIZE: int = Field(default=2000, gt=0, description="Points planned and streamed per chunk (bounds memory)")
+    BULK_DAILY_QUOTA_UNITS: int = Field(default=2_000_000, gt=0, description="Daily cost units per client for bulk requests")
+    BULK_S3_POINT_COST: int = Field(default=1, ge=0, description="Cost units for a point served from S3 tiles")
+    BULK_API_POINT_COST: int = Field(default=50, ge=0, description="Cost units for a point served by an external elevation API")
+    BULK_MAX_FALLBACK_POINTS: int = Field(default=200, ge=0, description="Per-request cap on points sent through the per-point fallback pipeline")
+    PREFETCH_MAX_CONCURRENCY: int = Field(default=2, ge=1, le=16, description="Low-priority worker threads used for project prefetch")
+    PREFETCH_MAX_TILES: int = Field(default=20000, gt=0, description="Tile cap per registered prefetch project")
+    PATH_GLOBAL_CONCURRENCY: int = Field(default=8, ge=1, le=64, description="Process-wide cap on concurrent /path work units (file groups or single points)")
+    PATH_REQUEST_CONCURRENCY: int = Field(default=4, ge=1, le=64, description="Per-request cap on concurrent /path work units")
+    PATH_GROUP_MAX_POINTS: int = Field(default=256, ge=1, description="Largest file group read as one /path work unit")
+    PROFILE_MAX_SAMPLES: int = Field(default=20000, ge=2, description="Cap on native-resolution samples taken along one /line request")
+    CROSS_SECTION_MAX_POINTS: int = Field(default=100_000, gt=0, description="Section points (sections x offsets) allowed per synchronous /cross-sections request")
+    CROSS_SECTION_JOB_MAX_POINTS: int = Field(default=2_000_000, gt=0, description="Section points allowed per cross_sections job")
+    RASTER_EXPORT_MAX_PIXELS: int = Field(default=25_000_000, gt=0, description="Largest raster (width x height) returned by /clip or /grid")
+    CONTOUR_CHUNK_SIZE: int = Field(default=1024, ge=16, description="Grid cells per side of each contour chunk traced independently")
+    CONTOUR_PROCESS_WORKERS: int = Field(default=2, ge=0, le=32, description="Processes tracing contour chunks of large grids (0 traces inline)")
+    CONTOUR_TILE_CACHE_DIR: str = Field(default="./data/contour_tiles", description="Directory holding rendered contour vector tiles")
+    CONTOUR_TILE_MEMORY_TILES: int = Field(default=1024, ge=0, description="Encoded contour tiles kept in the in-memory LRU")
+    CONTOUR_TILE_MAX_CELLS: int = Field(default=512 * 512, gt=0, description="DEM cells contoured per vector tile (finer mosaics are coarsened)")
+    TERRAIN_CACHE_MAX_MB: int = Field(default=128, ge=0, description="Memory budget for cached slope/aspect/hillshade windows")
+    TERRAIN_TILE_SIZE: int = Field(default=256, ge=64, le=1024, description="Pixels per side of terrain PNG tiles")
+    EARTHWORKS_TILE_SIZE: int = Field(default=1024, ge=64, description="DEM cells per side of each tile compared in a cut/fill computation")
+    EARTHWORKS_MAX_CELLS: int = Field(default=200_000_000, gt=0, description="Largest polygon window (DEM cells) accepted by /earthworks")
+    SIGHT_DISTANCE_MAX_LENGTH_M: float = Field(default=50_000, gt=0, description="Longest alignment accepted by /sight-distance")
+    # Asynchronous job API for corridor and area requests that outlive an HTTP timeout
+    JOB_WORKERS: int = Field(default=2, ge=1, le=16, description="Background workers running submitted jobs")
+    JOB_MAX_QUEUED: int = Field(default=100, ge=1, description="Jobs allowed to wait in the queue on one worker")
+    JOB_MAX_ACTIVE_PER_CLIENT: int = Field(default=4, ge=1, description="Queued plus running jobs allowed per client")
+    JOB_TIMEOUT_SECONDS: int = Field(default=1800, gt=0, description="Run-time limit per job")
+    JOB_RESULT_DIR: str = Field(default="./data/job_results", description="Directory holding downloadable job results")
+    JOB_RESULT_TTL_SECONDS: int = Field(default=86400, gt=0, description="How long job records and result files are kept")
+    
     # Source selection settings
     AUTO_SELECT_BEST_SOURCE: bool = Field(default=True, description="Automatically select the best available source for each location")
     
@@ -472,6 +541,15 @@ class Settings(BaseSettings):
         description="Port for the Uvicorn server. Injected by Railway's $PORT in production."
     )
     
+    @field_validator('MEMORY_LOW_WATERMARK')
+    @classmethod
+    def validate_memory_watermarks(cls, v, info):
+        """Eviction frees down to the low watermark, so it must sit below the high one"""
+        high = info.data.get('MEMORY_HIGH_WATERMARK') if info.data else None
+        if high is not None and v >= high:
+            raise ValueError(f"MEMORY_LOW_WATERMARK ({v}) must be below MEMORY_HIGH_WATERMARK ({high})")
+        return v
+    
     @field_validator('HOST')
     @classmethod
     def validate_host_binding(cls, v, info):
@@ -510,7 +588,10 @@ class Settings(BaseSettings):
     )
     
     @field_validator('USE_SQLITE_INDEX', 'USE_S3_SOURCES', 'USE_API_SOURCES', 
-                     'ENABLE_NZ_SOURCES', 'USE_UNIFIED_SPATIAL_INDEX', mode='before')
+                     'ENABLE_NZ_SOURCES', 'USE_UNIFIED_SPATIAL_INDEX', 'HTTP_CACHE_ENABLED',
+                     'API_RESPONSE_CACHE_ENABLED', 'TILE_CACHE_ENABLED', 'TILE_CACHE_READ_THROUGH',
+                     'TILE_FETCH_SINGLE_FLIGHT', 'TILE_CACHE_REDIS_SHARE', 'CONTOUR_CACHE_ENABLED',
+                     'CONTOUR_CACHE_REDIS_SHARE', mode='before')
     @classmethod
     def parse_boolean(cls, v):
         """Handle string boolean values from environment variables.
@@ -3,21 +3,104 @@ ContourService: Handles complex contour generation and terrain analysis.
 
 This class extracts the sophisticated contour generation logic from DEMService,
 following the Single Responsibility Principle and improving testability.
+
+Requests for a configured DEM source read that dataset. Automatic requests
+("auto", or a source the DatasetManager does not know) are served from the
+unified index instead when it is loaded: every campaign file covering the
+polygon is mosaicked in priority order into one in-memory raster, which is
+then read as a single window like any other dataset.
+
+Results are cached by polygon fingerprint, parameters, source and index
+version when a ContourResultCache is configured.
+
+Large grids are traced in overlapping chunks, in a process pool when one is
+configured (marching squares holds the GIL, so threads would not overlap),
+and lines crossing chunk seams are joined again by their shared seam points.
 """
 
 import logging
+import multiprocessing
+import time
 import numpy as np
-from typing import Dict, List, Tuple, Optional, Any
-from shapely.geometry import Polygon, Point, LineString
-from shapely.ops import unary_union
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Iterator, List, Tuple, Optional, Any, Set
+from pyproj import Geod, Transformer
+from rasterio.enums import Resampling
+from shapely import contains_xy
+from shapely.geometry import Polygon, LineString
 from skimage.measure import find_contours
-from scipy.interpolate import griddata
 
 from .dataset_manager import DatasetManager
 from .dem_exceptions import DEMProcessingError, DEMCoordinateError
+from .services.contour_cache import ContourResultCache
+from .services.coverage_service import find_unified_index
+from .services.raster_export_service import InMemoryDataset, RasterExportService
+from .utils.fast_json import dumps
+from .utils.http_cache import get_index_version
 
 logger = logging.getLogger(__name__)
 
+_GEOD = Geod(ellps="WGS84")
+
+# Contour levels traced per pass over a multi-chunk grid (bounds the paths held at once)
+_LEVELS_PER_BATCH = 8
+
+
+def _trace_chunk(grid: np.ndarray, valid: np.ndarray, levels: np.ndarray,
+                 row_offset: int, col_offset: int) -> List[Tuple[int, np.ndarray]]:
+    """(level index, path) for every level on one chunk, paths in whole-grid (row, col) indices."""
+    traced = []
+    for index, level in enumerate(levels):
+        for path in find_contours(grid, level, fully_connected='low', mask=valid):
+            path[:, 0] += row_offset
+            path[:, 1] += col_offset
+            traced.append((index, path))
+    return traced
+
+
+def _stitch_paths(paths: List[np.ndarray], seam_rows: Set[float], seam_cols: Set[float]) -> List[np.ndarray]:
+    """
+    Join one level's paths that end on the same chunk-seam point.
+    
+    Both chunks next to a seam interpolate the crossing from the same pair of
+    pixels, so matching ends agree to rounding; ends off the seams (polygon or
+    no-data edges) are never joined.
+    """
+    def seam_key(point):
+        row, col = point
+        if row in seam_rows or col in seam_cols:
+            return round(float(row), 6), round(float(col), 6)
+        return None
+    
+    ends: Dict[Tuple[float, float], List[Tuple[int, int]]] = {}
+    for i, path in enumerate(paths):
+        for end, point in ((0, path[0]), (1, path[-1])):
+            key = seam_key(point)
+            if key is not None:
+                ends.setdefault(key, []).append((i, end))
+    
+    used = [False] * len(paths)
+    joined = []
+    for i in range(len(paths)):
+        if used[i]:
+            continue
+        used[i] = True
+        chain = [paths[i]]
+        for forward in (True, False):
+            while True:
+                key = seam_key(chain[-1][-1] if forward else chain[0][0])
+                match = next(((j, end) for j, end in ends.get(key, ()) if not used[j]), None)
+                if match is None:
+                    break
+                j, end = match
+                used[j] = True
+                if forward:
+                    chain.append((paths[j] if end == 0 else paths[j][::-1])[1:])
+                else:
+                    chain.insert(0, (paths[j] if end == 1 else paths[j][::-1])[:-1])
+        joined.append(np.concatenate(chain))
+    return joined
+
 
 class ContourService:
     """
@@ -27,9 +110,154 @@ class ContourService:
     interface for terrain visualization while maintaining separation of concerns.
     """
     
-    def __init__(self, dataset_manager: DatasetManager):
+    # Polygon windows above this many pixels are decimated by the read itself
+    # rather than read in full and strided in memory
+    FULL_READ_MAX_PIXELS = 16_000_000
+    
+    def __init__(self, dataset_manager: DatasetManager,
+                 raster_export_service: Optional[RasterExportService] = None,
+                 chunk_size: int = 1024, workers: int = 0, executor: Optional[Executor] = None,
+                 result_cache: Optional[ContourResultCache] = None):
+        """
+        Args:
+            chunk_size: Grid cells per side of each independently traced chunk
+            workers: Processes tracing chunks of large grids (0 traces inline)
+            executor: Executor for chunks instead of a pool created from workers
+            result_cache: Cache of polygon results (None disables caching)
+        """
         self.dataset_manager = dataset_manager
-        logger.info("ContourService initialized")
+        self.raster_export_service = raster_export_service
+        self.result_cache = result_cache
+        self.chunk_size = max(2, chunk_size)
+        self.workers = workers
+        self._executor = executor
+        self._owns_executor = False
+        logger.info(f"ContourService initialized (chunk size {self.chunk_size}, {workers} trace processes)")
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        """Chunk executor, started on first use; spawned so workers never inherit server threads."""
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            self._owns_executor = True
+        return self._executor
+
+    def _cache_key(self, kind: str, polygon_coords: List[Tuple[float, float]], dem_source_id: str,
+                   **params: Any) -> Optional[str]:
+        """Result cache key for this request against the loaded index, or None without a cache."""
+        if self.result_cache is None:
+            return None
+        elevation_service = getattr(self.raster_export_service, "elevation_service", None)
+        version, _ = get_index_version(find_unified_index(elevation_service))
+        return self.result_cache.key(kind, polygon_coords, dem_source_id, version, **params)
+
+    def close(self):
+        """Shut down the chunk process pool if this service started one."""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._owns_executor = False
+
+    def _open_source(self, dem_source_id: str, polygon_coords: List[Tuple[float, float]],
+                     max_pixels: int) -> Tuple[Any, Any, str]:
+        """
+        (dataset, WGS84 -> dataset CRS transformer, source used) for a request.
+        
+        Automatic requests get a priority mosaic of the unified index's covering
+        files, coarsened to at most max_pixels (ValueError when none cover the
+        polygon); configured sources, and every request when no unified index
+        is loaded, use the DatasetManager.
+        """
+        if self.raster_export_service is not None and (
+            not dem_source_id or dem_source_id == "auto" or dem_source_id not in self.dataset_manager.dem_sources
+        ):
+            grid = self.raster_export_service.polygon_grid(polygon_coords, max_pixels)
+            if grid is not None:
+                logger.info(f"Contour mosaic {grid.spec.width}x{grid.spec.height} from {len(grid.sources)} files")
+                transformer = Transformer.from_crs("EPSG:4326", grid.spec.crs_wkt, always_xy=True)
+                return InMemoryDataset(grid), transformer, ",".join(grid.sources) or "unified"
+        
+        dataset = self.dataset_manager.get_dataset(dem_source_id)
+        transformer = self.dataset_manager.get_transformer(dem_source_id)
+        return dataset, transformer, dem_source_id
+
+    @staticmethod
+    def _fully_read(dataset: Any) -> bool:
+        """False for a mosaic with a covering file that could not be read (not safe to cache)."""
+        grid = getattr(dataset, "grid", None)
+        return grid is None or grid.complete
+
+    @staticmethod
+    def _polygon_in_dataset_crs(polygon_coords: List[Tuple[float, float]], transformer) -> Polygon:
+        """The (lat, lon) polygon in the dataset CRS, transformed in one call and made valid."""
+        lats = np.array([coord[0] for coord in polygon_coords], dtype=np.float64)
+        lons = np.array([coord[1] for coord in polygon_coords], dtype=np.float64)
+        xs, ys = transformer.transform(lons, lats)  # Note: lon, lat order for transform
+        xs, ys = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+        if not (np.all(np.isfinite(xs)) and np.all(np.isfinite(ys))):
+            raise DEMCoordinateError("Polygon has coordinates outside the DEM source's CRS")
+        
+        try:
+            polygon = Polygon(np.column_stack([xs, ys]))
+            if not polygon.is_valid:
+                polygon = polygon.buffer(0)  # Fix self-intersections
+        except Exception as e:
+            raise DEMProcessingError(f"Failed to create valid polygon: {str(e)}")
+        
+        logger.info(f"Polygon bounds in dataset CRS: {polygon.bounds}")
+        return polygon
+
+    @staticmethod
+    def _pixel_window(dataset, bounds: Tuple[float, float, float, float]) -> Optional[Tuple[int, int, int, int]]:
+        """(row_start, row_end, col_start, col_end) of the pixels covering bounds, or None if off the raster."""
+        a, _, c, _, e, f = tuple(dataset.transform)[:6]
+        min_x, min_y, max_x, max_y = bounds
+        col_edges = sorted(((min_x - c) / a, (max_x - c) / a))
+        row_edges = sorted(((max_y - f) / e, (min_y - f) / e))
+        col_start, col_end = max(0, int(np.floor(col_edges[0]))), min(dataset.width, int(np.ceil(col_edges[1])))
+        row_start, row_end = max(0, int(np.floor(row_edges[0]))), min(dataset.height, int(np.ceil(row_edges[1])))
+        if col_end <= col_start or row_end <= row_start:
+            return None
+        return row_start, row_end, col_start, col_end
+
+    def _read_window(self, dataset, window: Tuple[int, int, int, int],
+                     stride: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        One read of every stride-th pixel in the window.
+        
+        Returns the float64 array (nodata as NaN) and, per array row and
+        column, the fractional source pixel index of the sampled pixel's centre.
+        """
+        row_start, row_end, col_start, col_end = window
+        height, width = row_end - row_start, col_end - col_start
+        read_window = ((row_start, row_end), (col_start, col_end))
+        logger.info(f"Reading {width}x{height} window at stride {stride}")
+        
+        if height * width <= self.FULL_READ_MAX_PIXELS:
+            data = dataset.read(1, window=read_window)[::stride, ::stride]
+            rows = row_start + np.arange(0, height, stride) + 0.5
+            cols = col_start + np.arange(0, width, stride) + 0.5
+        else:
+            # Nearest-neighbour decimation in the read (uses overviews when present);
+            # each value comes from the source pixel under its output cell's centre
+            out_shape = (-(-height // stride), -(-width // stride))
+            data = dataset.read(1, window=read_window, out_shape=out_shape, resampling=Resampling.nearest)
+            rows = row_start + np.floor((np.arange(out_shape[0]) + 0.5) * (height / out_shape[0])) + 0.5
+            cols = col_start + np.floor((np.arange(out_shape[1]) + 0.5) * (width / out_shape[1])) + 0.5
+        
+        data = np.array(data, dtype=np.float64)
+        if dataset.nodata is not None:
+            data[data == dataset.nodata] = np.nan
+        data[~np.isfinite(data)] = np.nan
+        return data, rows, cols
+
+    @staticmethod
+    def _pixel_to_crs(dataset, rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Dataset CRS coordinates of (fractional) source pixel indices through the affine transform."""
+        a, b, c, d, e, f = tuple(dataset.transform)[:6]
+        return c + a * cols + b * rows, f + d * cols + e * rows
 
     def get_dem_points_in_polygon(self, polygon_coords: List[Tuple[float, float]], 
                                  dem_source_id: str, max_points: int = 1000) -> Tuple[List[Dict[str, Any]], str, Optional[str]]:
@@ -52,33 +280,19 @@ class ContourService:
             if len(polygon_coords) < 3:
                 raise DEMCoordinateError("Polygon must have at least 3 coordinates")
             
-            # Get dataset and transformer
-            dataset = self.dataset_manager.get_dataset(dem_source_id)
-            transformer = self.dataset_manager.get_transformer(dem_source_id)
+            cache_key = self._cache_key("points", polygon_coords, dem_source_id, max_points=max_points)
+            cached = self.result_cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                dem_points, dem_source_used = cached
+                return dem_points, dem_source_used, None
             
-            logger.info(f"Extracting DEM points from polygon with {len(polygon_coords)} vertices")
+            # Get dataset and transformer; a mosaic needs at most 2x resolution for max_points
+            dataset, transformer, dem_source_used = self._open_source(dem_source_id, polygon_coords, max_points * 4)
             
-            # Transform polygon coordinates to dataset CRS
-            transformed_coords = []
-            for lat, lon in polygon_coords:
-                try:
-                    x, y = transformer.transform(lon, lat)  # Note: lon, lat order for transform
-                    transformed_coords.append((x, y))
-                except Exception as e:
-                    logger.error(f"Failed to transform coordinate ({lat}, {lon}): {e}")
-                    raise DEMCoordinateError(f"Invalid coordinate ({lat}, {lon}): {str(e)}")
+            logger.info(f"Extracting DEM points from polygon with {len(polygon_coords)} vertices")
             
-            # Create shapely polygon for spatial operations
-            try:
-                polygon_shapely = Polygon(transformed_coords)
-                if not polygon_shapely.is_valid:
-                    polygon_shapely = polygon_shapely.buffer(0)  # Fix self-intersections
-                    
-                bounds = polygon_shapely.bounds
-                logger.info(f"Polygon bounds in dataset CRS: {bounds}")
-                
-            except Exception as e:
-                raise DEMProcessingError(f"Failed to create valid polygon: {str(e)}")
+            polygon_shapely = self._polygon_in_dataset_crs(polygon_coords, transformer)
+            bounds = polygon_shapely.bounds
             
             # Calculate sampling grid based on max_points
             bbox_width = bounds[2] - bounds[0]
@@ -97,68 +311,52 @@ class ContourService:
                 min_spacing = dataset.res[0] * 2  # At least 2x dataset resolution
                 grid_spacing = max(grid_spacing, min_spacing)
             
-            logger.info(f"Using grid spacing: {grid_spacing:.2f} units")
-            
-            # Generate sampling grid
-            x_coords = np.arange(bounds[0], bounds[2], grid_spacing)
-            y_coords = np.arange(bounds[1], bounds[3], grid_spacing)
-            
-            dem_points = []
-            points_processed = 0
-            points_inside = 0
-            
-            for x in x_coords:
-                for y in y_coords:
-                    points_processed += 1
-                    
-                    # Check if point is inside polygon
-                    point = Point(x, y)
-                    if polygon_shapely.contains(point):
-                        points_inside += 1
-                        
-                        try:
-                            # Sample elevation at this point
-                            row, col = dataset.index(x, y)
-                            
-                            # Check bounds
-                            if (0 <= row < dataset.height and 0 <= col < dataset.width):
-                                elevation = dataset.read(1, window=((row, row+1), (col, col+1)))[0, 0]
-                                
-                                # Skip nodata values
-                                if dataset.nodata is not None and elevation == dataset.nodata:
-                                    continue
-                                if np.isnan(elevation) or np.isinf(elevation):
-                                    continue
-                                
-                                # Transform back to WGS84 for output
-                                lon_wgs84, lat_wgs84 = transformer.transform(x, y, direction='INVERSE')
-                                
-                                dem_points.append({
-                                    "latitude": lat_wgs84,
-                                    "longitude": lon_wgs84,
-                                    "elevation_m": float(elevation),
-                                    "x_crs": x,
-                                    "y_crs": y
-                                })
-                                
-                                # Limit total points
-                                if len(dem_points) >= max_points:
-                                    logger.info(f"Reached max_points limit ({max_points})")
-                                    break
-                                    
-                        except Exception as e:
-                            # Skip points that can't be sampled
-                            continue
-                
-                if len(dem_points) >= max_points:
-                    break
+            window = self._pixel_window(dataset, bounds)
+            if window is None:
+                return [], dem_source_used, "No valid elevation points found within polygon"
+            
+            # One windowed read at a stride of grid_spacing, as pixel-centre coordinates
+            stride = max(1, int(np.ceil(grid_spacing / abs(tuple(dataset.transform)[0]))))
+            data, rows, cols = self._read_window(dataset, window, stride)
+            col_grid, row_grid = np.meshgrid(cols, rows)
+            x_values, y_values = self._pixel_to_crs(dataset, row_grid.ravel(), col_grid.ravel())
+            elevations = data.ravel()
+            points_processed = elevations.size
+            
+            # Vectorized polygon mask plus nodata filtering
+            inside = contains_xy(polygon_shapely, x_values, y_values)
+            points_inside = int(inside.sum())
+            keep = inside & ~np.isnan(elevations)
+            x_values, y_values, elevations = x_values[keep], y_values[keep], elevations[keep]
+            
+            # The stride targets max_points over the bounding box; thin evenly if still over
+            if elevations.size > max_points:
+                logger.info(f"Reached max_points limit ({max_points})")
+                take = np.linspace(0, elevations.size - 1, max_points).round().astype(np.intp)
+                x_values, y_values, elevations = x_values[take], y_values[take], elevations[take]
+            
+            # Transform back to WGS84 for output in one call
+            if elevations.size:
+                out_lons, out_lats = transformer.transform(x_values, y_values, direction='INVERSE')
+            else:
+                out_lons, out_lats = np.empty(0), np.empty(0)
+            
+            dem_points = [
+                {"latitude": lat, "longitude": lon, "elevation_m": elevation, "x_crs": x, "y_crs": y}
+                for lat, lon, elevation, x, y in zip(
+                    np.asarray(out_lats).tolist(), np.asarray(out_lons).tolist(),
+                    elevations.tolist(), x_values.tolist(), y_values.tolist()
+                )
+            ]
             
-            logger.info(f"Processed {points_processed} grid points, {points_inside} inside polygon, extracted {len(dem_points)} elevation points")
+            logger.info(f"Sampled {points_processed} grid points, {points_inside} inside polygon, extracted {len(dem_points)} elevation points")
             
             if len(dem_points) == 0:
-                return [], dem_source_id, "No valid elevation points found within polygon"
+                return [], dem_source_used, "No valid elevation points found within polygon"
             
-            return dem_points, dem_source_id, None
+            if cache_key and self._fully_read(dataset):
+                self.result_cache.put(cache_key, [dem_points, dem_source_used])
+            return dem_points, dem_source_used, None
             
         except (DEMCoordinateError, DEMProcessingError):
             raise
@@ -174,189 +372,322 @@ class ContourService:
         """
         Generate GeoJSON contour lines from DEM data within a polygon area.
         
+        Contours are traced directly on the DEM window covering the polygon
+        (pixels outside the polygon or without data are masked), at native
+        resolution or at the smallest integer decimation that keeps the grid
+        within max_points cells. Vertices keep their sub-pixel positions.
+        
         Args:
             polygon_coords: List of (latitude, longitude) tuples defining the polygon
             dem_source_id: ID of the DEM source to use
-            max_points: Maximum number of points to use for contour generation
+            max_points: Maximum number of DEM grid cells to trace contours on
             minor_contour_interval_m: Interval for minor contour lines in meters
             major_contour_interval_m: Interval for major contour lines in meters
             simplify_tolerance: Tolerance for line simplification
-            
+        
         Returns:
             Tuple of (geojson_contours, statistics, dem_source_used, error_message)
         """
         try:
-            # Extract elevation points within polygon
-            dem_points, dem_source_used, error_msg = self.get_dem_points_in_polygon(
-                polygon_coords, dem_source_id, max_points
-            )
-            
-            if error_msg or not dem_points:
-                return {}, {}, dem_source_used, error_msg or "No elevation points available"
-            
-            logger.info(f"Generating contours from {len(dem_points)} elevation points")
-            
-            # Extract coordinates and elevations
-            elevations = np.array([point["elevation_m"] for point in dem_points])
-            x_coords = np.array([point["x_crs"] for point in dem_points])  # Use CRS coordinates
-            y_coords = np.array([point["y_crs"] for point in dem_points])
-            
-            # Calculate elevation statistics
-            min_elevation = float(np.min(elevations))
-            max_elevation = float(np.max(elevations))
-            mean_elevation = float(np.mean(elevations))
-            
-            logger.info(f"Elevation range: {min_elevation:.2f}m to {max_elevation:.2f}m (mean: {mean_elevation:.2f}m)")
-            
-            # Generate contour intervals based on minor and major intervals
-            start_elevation = np.floor(min_elevation / minor_contour_interval_m) * minor_contour_interval_m
-            end_elevation = np.ceil(max_elevation / minor_contour_interval_m) * minor_contour_interval_m
-            
-            minor_levels = np.arange(start_elevation, end_elevation + minor_contour_interval_m, minor_contour_interval_m)
-            major_levels = np.arange(start_elevation, end_elevation + major_contour_interval_m, major_contour_interval_m)
-            
-            # Combine and sort contour levels
-            contour_levels = np.unique(np.concatenate((minor_levels, major_levels)))
-            
-            # Filter to actual elevation range
-            contour_levels = contour_levels[(contour_levels >= min_elevation) & (contour_levels <= max_elevation)]
-            
-            if len(contour_levels) == 0:
-                return {}, {}, dem_source_used, "No valid contour levels found for the elevation range"
-            
-            logger.info(f"Generating {len(contour_levels)} contour levels: {contour_levels.tolist()}")
+            if len(polygon_coords) < 3:
+                raise DEMCoordinateError("Polygon must have at least 3 coordinates")
             
-            # Create regular grid for interpolation
-            bbox_x = [np.min(x_coords), np.max(x_coords)]
-            bbox_y = [np.min(y_coords), np.max(y_coords)]
+            cache_key = self._geojson_cache_key(polygon_coords, dem_source_id, max_points, minor_contour_interval_m,
+                                                major_contour_interval_m, simplify_tolerance)
+            cached = self.result_cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                geojson_contours, statistics, dem_source_used = cached
+                return geojson_contours, statistics, dem_source_used, None
             
-            # Calculate grid resolution based on point density
-            grid_points = min(200, int(np.sqrt(len(dem_points)) * 4))  # Adaptive resolution
-            grid_x = np.linspace(bbox_x[0], bbox_x[1], grid_points)
-            grid_y = np.linspace(bbox_y[0], bbox_y[1], grid_points)
+            started = time.perf_counter()
+            dataset, transformer, dem_source_used = self._open_source(dem_source_id, polygon_coords, max_points)
+            geojson_contours, statistics, error_message = self.trace_contours(
+                dataset, transformer, polygon_coords, max_points,
+                minor_contour_interval_m, major_contour_interval_m, simplify_tolerance
+            )
             
-            # Create meshgrid
-            mesh_x, mesh_y = np.meshgrid(grid_x, grid_y)
+            if statistics:
+                self._record_latency(statistics, polygon_coords, started)
+            if cache_key and error_message is None and self._fully_read(dataset):
+                self.result_cache.put(cache_key, [geojson_contours, statistics, dem_source_used])
+            return geojson_contours, statistics, dem_source_used, error_message
             
-            logger.info(f"Creating {grid_points}x{grid_points} interpolation grid")
+        except (DEMCoordinateError, DEMProcessingError):
+            raise
+        except Exception as e:
+            logger.error(f"Error generating GeoJSON contours: {e}")
+            return {}, {}, dem_source_id, f"Contour generation failed: {str(e)}"
+
+    def stream_geojson_contours(self, polygon_coords: List[Tuple[float, float]],
+                                dem_source_id: str, max_points: int = 1000,
+                                minor_contour_interval_m: float = 1.0,
+                                major_contour_interval_m: float = 5.0,
+                                simplify_tolerance: float = 0.0001) -> Tuple[Iterator[bytes], Dict[str, Any], str, Optional[str]]:
+        """
+        generate_geojson_contours for responses written as they are traced.
+        
+        The DEM is read and checked up front, so errors are reported before
+        anything is sent. Returns (chunks, statistics, dem_source_used,
+        error_message): each chunk is the comma-separated JSON features of one
+        contour level, traced when the iterator reaches it. statistics is
+        complete once the iterator is exhausted; a fully consumed stream is
+        stored in the result cache.
+        """
+        try:
+            if len(polygon_coords) < 3:
+                raise DEMCoordinateError("Polygon must have at least 3 coordinates")
             
-            # Interpolate elevations to grid using linear interpolation
-            try:
-                grid_z = griddata(
-                    (x_coords, y_coords), elevations,
-                    (mesh_x, mesh_y), method='linear', fill_value=np.nan
-                )
-                
-                # Apply NaN-based boundary handling to prevent contour artifacts
-                input_polygon_shapely = Polygon([(dem_points[i]["x_crs"], dem_points[i]["y_crs"]) for i in range(0, len(dem_points), max(1, len(dem_points)//10))])
-                
-                # Mask grid points outside the input polygon
-                for i in range(grid_points):
-                    for j in range(grid_points):
-                        point = Point(mesh_x[i, j], mesh_y[i, j])
-                        if not input_polygon_shapely.contains(point):
-                            grid_z[i, j] = np.nan
-                
-                # Validate grid
-                valid_points = np.sum(~np.isnan(grid_z))
-                valid_percentage = (valid_points / (grid_points * grid_points)) * 100
-                
-                logger.info(f"Valid grid points for contour generation: {valid_points} ({valid_percentage:.1f}%)")
-                
-                if valid_points < 20:  # Need at least 20 valid points for contour generation
-                    return {}, {}, dem_source_used, f"Insufficient valid grid points ({valid_points}) for contour generation"
-                
-            except Exception as e:
-                logger.error(f"Grid interpolation failed: {e}")
-                return {}, {}, dem_source_used, f"Failed to create interpolation grid: {str(e)}"
+            cache_key = self._geojson_cache_key(polygon_coords, dem_source_id, max_points, minor_contour_interval_m,
+                                                major_contour_interval_m, simplify_tolerance)
+            cached = self.result_cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                geojson_contours, statistics, dem_source_used = cached
+                chunk = b",".join(dumps(feature) for feature in geojson_contours.get("features", []))
+                return iter([chunk]), statistics, dem_source_used, None
+            
+            started = time.perf_counter()
+            dataset, transformer, dem_source_used = self._open_source(dem_source_id, polygon_coords, max_points)
+            levels, statistics, error_message = self.iter_contour_levels(
+                dataset, transformer, polygon_coords, max_points,
+                minor_contour_interval_m, major_contour_interval_m, simplify_tolerance
+            )
+            if error_message:
+                return iter(()), {}, dem_source_used, error_message
             
-            # Generate contours using scikit-image
-            logger.info("Generating contour lines using scikit-image for precise boundary handling")
+            if not self._fully_read(dataset):
+                cache_key = None
+            chunks = self._encode_levels(levels, statistics, dem_source_used, polygon_coords, started, cache_key)
+            return chunks, statistics, dem_source_used, None
             
-            try:
-                # Get transformer for coordinate conversion
-                transformer = self.dataset_manager.get_transformer(dem_source_id)
-                
-                geojson_features = []
-                
-                # Iterate over each contour level and find contours
-                for level in contour_levels:
-                    # find_contours returns paths in pixel coordinates (indices)
-                    paths = find_contours(grid_z, level, fully_connected='low')
-                    
-                    for path in paths:
-                        if len(path) < 3:  # Skip very short contours
-                            continue
-                        
-                        # Convert pixel coordinates to CRS coordinates
-                        vertices = []
-                        for point in path:
-                            # Convert from grid indices to actual coordinates
-                            y_idx, x_idx = point  # Note: find_contours returns (row, col)
-                            
-                            # Interpolate to get actual coordinates
-                            if 0 <= y_idx < grid_points and 0 <= x_idx < grid_points:
-                                x_crs = grid_x[int(x_idx)]
-                                y_crs = grid_y[int(y_idx)]
-                                
-                                # Transform back to WGS84
-                                try:
-                                    lon, lat = transformer.transform(x_crs, y_crs, direction='INVERSE')
-                                    vertices.append([lon, lat])
-                                except Exception:
-                                    continue  # Skip invalid transformations
-                        
-                        if len(vertices) >= 3:  # Valid contour line
-                            # Create LineString and apply simplification if requested
-                            contour_line = LineString(vertices)
-                            
-                            if simplify_tolerance > 0:
-                                contour_line = contour_line.simplify(simplify_tolerance, preserve_topology=True)
-                            
-                            # Determine contour type
-                            is_major = level in major_levels
-                            contour_type = "major" if is_major else "minor"
-                            
-                            # Create GeoJSON feature
-                            feature = {
-                                "type": "Feature",
-                                "geometry": {
-                                    "type": "LineString",
-                                    "coordinates": list(contour_line.coords)
-                                },
-                                "properties": {
-                                    "elevation": float(level),
-                                    "type": contour_type,
-                                    "interval": major_contour_interval_m if is_major else minor_contour_interval_m
-                                }
-                            }
-                            geojson_features.append(feature)
+        except (DEMCoordinateError, DEMProcessingError):
+            raise
+        except Exception as e:
+            logger.error(f"Error preparing streamed GeoJSON contours: {e}")
+            return iter(()), {}, dem_source_id, f"Contour generation failed: {str(e)}"
+
+    def _encode_levels(self, levels: Iterator[List[Dict[str, Any]]], statistics: Dict[str, Any],
+                       dem_source_used: str, polygon_coords: List[Tuple[float, float]], started: float,
+                       cache_key: Optional[str]) -> Iterator[bytes]:
+        """Encode each level's features, mirroring them into a cache entry with the generate_geojson_contours layout."""
+        writer = self.result_cache.writer(cache_key) if cache_key else None
+        if writer is not None:
+            writer.write(b'[{"type":"FeatureCollection","features":[')
+        written = False
+        for features in levels:
+            chunk = b",".join(dumps(feature) for feature in features)
+            if writer is not None:
+                writer.write(b"," + chunk if written else chunk)
+            written = True
+            yield chunk
+        
+        self._record_latency(statistics, polygon_coords, started)
+        if writer is not None:
+            writer.write(b"]}," + dumps(statistics) + b"," + dumps(dem_source_used) + b"]")
+            writer.commit()
+
+    def _geojson_cache_key(self, polygon_coords: List[Tuple[float, float]], dem_source_id: str, max_points: int,
+                           minor_contour_interval_m: float, major_contour_interval_m: float,
+                           simplify_tolerance: float) -> Optional[str]:
+        return self._cache_key(
+            "geojson", polygon_coords, dem_source_id, max_points=max_points,
+            minor_contour_interval_m=minor_contour_interval_m,
+            major_contour_interval_m=major_contour_interval_m, simplify_tolerance=simplify_tolerance,
+        )
+
+    @staticmethod
+    def _record_latency(statistics: Dict[str, Any], polygon_coords: List[Tuple[float, float]], started: float):
+        """Latency against area, so large-polygon cost can be tracked."""
+        area_m2, _ = _GEOD.polygon_area_perimeter([lon for _, lon in polygon_coords],
+                                                  [lat for lat, _ in polygon_coords])
+        statistics["area_km2"] = abs(area_m2) / 1e6
+        statistics["processing_time_ms"] = (time.perf_counter() - started) * 1000
+        logger.info(
+            f"Contoured {statistics['area_km2']:.3f} km2 in {statistics['processing_time_ms']:.0f} ms "
+            f"({statistics['chunks']} chunks, {statistics['contour_count']} lines)"
+        )
+
+    def trace_contours(self, dataset, transformer, polygon_coords: List[Tuple[float, float]],
+                       max_points: int, minor_contour_interval_m: float, major_contour_interval_m: float,
+                       simplify_tolerance: float) -> Tuple[Dict[str, Any], Dict[str, Any], Optional[str]]:
+        """
+        Contour an open dataset (or InMemoryDataset) within a (lat, lon) polygon.
+        
+        Returns (geojson_contours, statistics, error_message); the error message
+        only reports that the polygon has no data or no contour levels to trace.
+        Read and transform failures propagate.
+        """
+        levels, statistics, error_message = self.iter_contour_levels(
+            dataset, transformer, polygon_coords, max_points,
+            minor_contour_interval_m, major_contour_interval_m, simplify_tolerance
+        )
+        if error_message:
+            return {}, {}, error_message
+        
+        geojson_contours = {
+            "type": "FeatureCollection",
+            "features": [feature for features in levels for feature in features]
+        }
+        logger.info(f"Generated {statistics['contour_count']} contour lines")
+        return geojson_contours, statistics, None
+
+    def iter_contour_levels(self, dataset, transformer, polygon_coords: List[Tuple[float, float]],
+                            max_points: int, minor_contour_interval_m: float, major_contour_interval_m: float,
+                            simplify_tolerance: float) -> Tuple[Iterator[List[Dict[str, Any]]], Dict[str, Any], Optional[str]]:
+        """
+        Read and mask the polygon's grid now; trace it one level at a time later.
+        
+        Returns (levels, statistics, error_message). levels yields the GeoJSON
+        features of each contour level in ascending order, and keeps
+        statistics["contour_count"] up to date as it goes.
+        """
+        polygon_shapely = self._polygon_in_dataset_crs(polygon_coords, transformer)
+        
+        window = self._pixel_window(dataset, polygon_shapely.bounds)
+        if window is None:
+            return iter(()), {}, "No valid elevation points found within polygon"
+        
+        # Native grid, or the coarsest integer decimation needed to stay within max_points
+        row_start, row_end, col_start, col_end = window
+        window_pixels = (row_end - row_start) * (col_end - col_start)
+        stride = max(1, int(np.ceil(np.sqrt(window_pixels / max_points))))
+        grid_z, rows, cols = self._read_window(dataset, window, stride)
+        
+        # Mask cells whose centres fall outside the polygon
+        col_grid, row_grid = np.meshgrid(cols, rows)
+        centre_x, centre_y = self._pixel_to_crs(dataset, row_grid, col_grid)
+        grid_z[~contains_xy(polygon_shapely, centre_x, centre_y)] = np.nan
+        valid = ~np.isnan(grid_z)
+        
+        valid_points = int(valid.sum())
+        logger.info(f"Valid grid points for contour generation: {valid_points} of {grid_z.size}")
+        if valid_points < 20:  # Need at least 20 valid points for contour generation
+            return iter(()), {}, f"Insufficient valid grid points ({valid_points}) for contour generation"
+        
+        elevations = grid_z[valid]
+        
+        # Calculate elevation statistics
+        min_elevation = float(np.min(elevations))
+        max_elevation = float(np.max(elevations))
+        mean_elevation = float(np.mean(elevations))
+        
+        logger.info(f"Elevation range: {min_elevation:.2f}m to {max_elevation:.2f}m (mean: {mean_elevation:.2f}m)")
+        
+        # Generate contour intervals based on minor and major intervals
+        start_elevation = np.floor(min_elevation / minor_contour_interval_m) * minor_contour_interval_m
+        end_elevation = np.ceil(max_elevation / minor_contour_interval_m) * minor_contour_interval_m
+        
+        minor_levels = np.arange(start_elevation, end_elevation + minor_contour_interval_m, minor_contour_interval_m)
+        # Major levels are multiples of the major interval, not offsets from the minimum
+        major_start = np.floor(min_elevation / major_contour_interval_m) * major_contour_interval_m
+        major_levels = np.arange(major_start, end_elevation + major_contour_interval_m, major_contour_interval_m)
+        
+        # Combine and sort contour levels
+        contour_levels = np.unique(np.concatenate((minor_levels, major_levels)))
+        
+        # Filter to actual elevation range
+        contour_levels = contour_levels[(contour_levels >= min_elevation) & (contour_levels <= max_elevation)]
+        
+        if len(contour_levels) == 0:
+            return iter(()), {}, "No valid contour levels found for the elevation range"
+        
+        chunks = self._chunk_windows(grid_z.shape)
+        
+        # Create statistics; contour_count grows as levels are traced
+        statistics = {
+            "min_elevation": min_elevation,
+            "max_elevation": max_elevation,
+            "mean_elevation": mean_elevation,
+            "contour_count": 0,
+            "elevation_intervals": [float(level) for level in contour_levels],
+            "total_points": valid_points,
+            "grid_resolution": float(abs(tuple(dataset.transform)[0]) * stride),
+            "chunks": len(chunks)
+        }
+        
+        def level_features():
+            for level, paths in self._traced_levels(grid_z, valid, contour_levels, chunks):
+                paths = [path for path in paths if len(path) >= 3]  # Skip very short contours
+                if not paths:
+                    continue
                 
-                # Create final GeoJSON structure
-                geojson_contours = {
-                    "type": "FeatureCollection",
-                    "features": geojson_features
-                }
+                # Array indices -> source pixel indices -> dataset CRS, then one transform to WGS84
+                indices = np.concatenate(paths)
+                src_rows = np.interp(indices[:, 0], np.arange(len(rows)), rows)
+                src_cols = np.interp(indices[:, 1], np.arange(len(cols)), cols)
+                x_crs, y_crs = self._pixel_to_crs(dataset, src_rows, src_cols)
+                lons, lats = transformer.transform(x_crs, y_crs, direction='INVERSE')
+                vertices = np.column_stack([lons, lats])
+                splits = np.cumsum([len(path) for path in paths])[:-1]
                 
-                # Create statistics
-                statistics = {
-                    "min_elevation": min_elevation,
-                    "max_elevation": max_elevation,
-                    "mean_elevation": mean_elevation,
-                    "contour_count": len(geojson_features),
-                    "elevation_intervals": [float(level) for level in contour_levels]
+                # Determine contour type
+                is_major = bool(np.isclose(major_levels, level).any())
+                properties = {
+                    "elevation": float(level),
+                    "type": "major" if is_major else "minor",
+                    "interval": major_contour_interval_m if is_major else minor_contour_interval_m
                 }
                 
-                logger.info(f"Generated {len(geojson_features)} contour lines")
-                
-                return geojson_contours, statistics, dem_source_used, None
-                
-            except Exception as e:
-                logger.error(f"Error generating contours with scikit-image: {e}")
-                return {}, {}, dem_source_used, f"Failed to generate contour lines: {str(e)}"
-            
-        except (DEMCoordinateError, DEMProcessingError):
-            raise
-        except Exception as e:
-            logger.error(f"Error generating GeoJSON contours: {e}")
-            return {}, {}, dem_source_id, f"Contour generation failed: {str(e)}"
\ No newline at end of file
+                features = []
+                for line_vertices in np.split(vertices, splits):
+                    # Create LineString and apply simplification if requested
+                    contour_line = LineString(line_vertices)
+                    if simplify_tolerance > 0:
+                        contour_line = contour_line.simplify(simplify_tolerance, preserve_topology=True)
+                    
+                    features.append({
+                        "type": "Feature",
+                        "geometry": {
+                            "type": "LineString",
+                            "coordinates": list(contour_line.coords)
+                        },
+                        "properties": dict(properties)
+                    })
+                statistics["contour_count"] += len(features)
+                yield features
+        
+        return level_features(), statistics, None
+
+    def _chunk_windows(self, shape: Tuple[int, int]) -> List[Tuple[int, int, int, int]]:
+        """(row_start, row_end, col_start, col_end) chunks of at most chunk_size cells a side, sharing one row/column."""
+        step = self.chunk_size - 1
+        row_starts = range(0, max(shape[0] - 1, 1), step)
+        col_starts = range(0, max(shape[1] - 1, 1), step)
+        return [(r0, min(r0 + self.chunk_size, shape[0]), c0, min(c0 + self.chunk_size, shape[1]))
+                for r0 in row_starts for c0 in col_starts]
+
+    def _traced_levels(self, grid_z: np.ndarray, valid: np.ndarray, levels: np.ndarray,
+                       chunks: List[Tuple[int, int, int, int]]) -> Iterator[Tuple[float, List[np.ndarray]]]:
+        """
+        (level, paths) in ascending level order, paths in whole-grid (row, col) indices.
+        
+        A single chunk with data is traced lazily, one level per step. Several
+        are traced together (on the executor) _LEVELS_PER_BATCH levels at a
+        time and their paths stitched at the seams, so only one batch of
+        levels' paths is held at once.
+        """
+        work = [(grid_z[r0:r1, c0:c1], valid[r0:r1, c0:c1], r0, c0)
+                for r0, r1, c0, c1 in chunks if valid[r0:r1, c0:c1].any()]
+        logger.info(f"Tracing {len(levels)} contour levels on a {grid_z.shape[1]}x{grid_z.shape[0]} grid "
+                    f"in {len(work)} chunks")
+        
+        if len(work) == 1:
+            grid, mask, row_offset, col_offset = work[0]
+            for index, level in enumerate(levels):
+                yield level, [path for _, path in _trace_chunk(grid, mask, levels[index:index + 1], row_offset, col_offset)]
+            return
+        
+        seam_rows = {float(r0) for r0, _, _, _ in chunks if r0}
+        seam_cols = {float(c0) for _, _, c0, _ in chunks if c0}
+        executor = self.executor
+        for start in range(0, len(levels), _LEVELS_PER_BATCH):
+            batch = levels[start:start + _LEVELS_PER_BATCH]
+            grids, masks, row_offsets, col_offsets = zip(*work)
+            args = (grids, masks, [batch] * len(work), row_offsets, col_offsets)
+            results = executor.map(_trace_chunk, *args) if executor is not None else map(_trace_chunk, *args)
+            
+            by_level: List[List[np.ndarray]] = [[] for _ in batch]
+            for traced in results:
+                for index, path in traced:
+                    by_level[index].append(path)
+            for level, paths in zip(batch, by_level):
+                yield level, _stitch_paths(paths, seam_rows, seam_cols)
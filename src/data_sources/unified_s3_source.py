@@ -15,6 +15,8 @@ from ..models.unified_wgs84_models import UnifiedWGS84SpatialIndex, UnifiedDataC
 from ..handlers import CollectionHandlerRegistry
 from ..s3_client_factory import S3ClientFactory
 from .base_source import BaseDataSource, ElevationResult
+from ..services.memory_governor import get_gdal_vsi_cache
+from ..services.tile_cache import get_raster_tile_cache
 
 logger = logging.getLogger(__name__)
 
@@ -206,11 +208,19 @@ class UnifiedS3Source(BaseDataSource):
                         
                         # ✅ CRITICAL: Run GDAL in thread pool to prevent event loop blocking
                         logger.debug(f"Attempting elevation extraction: {file_path} for ({lat}, {lon}) with CRS {target_crs}")
-                        elevation = await loop.run_in_executor(
-                            None,
-                            self._extract_elevation_sync,
-                            file_path, lat, lon, target_crs
-                        )
+                        elevation = None
+                        tile_cache = get_raster_tile_cache()
+                        if tile_cache is not None:
+                            # Cached (or single-flighted read-through) tiles avoid a per-point S3 read
+                            elevation = await loop.run_in_executor(
+                                None, tile_cache.sample, file_path, lat, lon
+                            )
+                        if elevation is None:
+                            elevation = await loop.run_in_executor(
+                                None,
+                                self._extract_elevation_sync,
+                                file_path, lat, lon, target_crs
+                            )
                         
                         if elevation is not None:
                             processing_time = (time.time() - start_time) * 1000
@@ -452,8 +462,8 @@ class UnifiedS3Source(BaseDataSource):
             
             # Configure GDAL for S3 access
             gdal.SetConfigOption('GDAL_HTTP_MERGE_CONSECUTIVE_RANGES', 'YES')
-            gdal.SetConfigOption('VSI_CACHE', 'YES')  
-            gdal.SetConfigOption('VSI_CACHE_SIZE', '67108864')  # 64MB cache
+            # VSI cache sized from the process memory budget (max 64MB)
+            get_gdal_vsi_cache().configure(gdal)
             gdal.SetConfigOption('GDAL_DISABLE_READDIR_ON_OPEN', 'YES')
             # REMOVED: AWS_S3_REQUEST_PAYER - causes 403 errors on public/standard buckets
             
@@ -18,9 +18,13 @@ import fiona
 
 from .config import Settings, DEMSource
 from .dem_exceptions import DEMFileError, DEMCacheError
+from .services.memory_governor import get_memory_governor
 
 logger = logging.getLogger(__name__)
 
+# Estimated resident cost of one open dataset (handle, overviews, block cache share)
+_DATASET_ESTIMATED_BYTES = 4 * 1024 * 1024
+
 
 class ClosingLRUCache(LRUCache):
     """
@@ -70,6 +74,10 @@ class DatasetManager:
         # Thread lock for thread-safe dataset access
         self._dataset_lock = threading.RLock()
         
+        # Process-wide memory budget: reopening over S3 is expensive, so weight accordingly
+        self._memory_governor = get_memory_governor()
+        self._memory_governor.register("dataset_cache", self, rebuild_cost=3.0)
+        
         logger.info(f"DatasetManager initialized with cache size: {settings.DATASET_CACHE_SIZE}")
 
     def get_dataset(self, dem_source_id: str, lat: float = None, lon: float = None) -> rasterio.DatasetReader:
@@ -94,6 +102,9 @@ class DatasetManager:
         source = self.dem_sources[dem_source_id]
         cache_key = f"{dem_source_id}_{lat}_{lon}" if lat is not None and lon is not None else dem_source_id
         
+        # Rebalance before lookup so the dataset handed back is never the one evicted
+        self._memory_governor.maybe_rebalance()
+        
         with self._dataset_lock:
             try:
                 if cache_key not in self._dataset_cache:
@@ -258,6 +269,20 @@ class DatasetManager:
             "transformer_cache_maxsize": self._transformer_cache.maxsize,
         }
 
+    def memory_usage_bytes(self) -> int:
+        """Estimated resident bytes held by open datasets (MemoryGovernor protocol)."""
+        return len(self._dataset_cache) * _DATASET_ESTIMATED_BYTES
+
+    def evict_bytes(self, target_bytes: int) -> int:
+        """Close least recently used datasets until roughly target_bytes are released."""
+        freed = 0
+        with self._dataset_lock:
+            # Keep the most recent dataset: it is likely in use by the current request
+            while freed < target_bytes and len(self._dataset_cache) > 1:
+                self._dataset_cache.popitem()
+                freed += _DATASET_ESTIMATED_BYTES
+        return freed
+
     def clear_caches(self):
         """Clear all caches and close open datasets."""
         with self._dataset_lock:
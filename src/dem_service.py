@@ -8,6 +8,8 @@ import os
 from .unified_elevation_service import UnifiedElevationService
 from .dataset_manager import DatasetManager
 from .contour_service import ContourService
+from .services.coverage_service import find_unified_source
+from .services.path_scheduler import PathScheduler, get_path_scheduler
 from .dem_exceptions import (
     DEMServiceError, DEMFileError, DEMCacheError, 
     DEMCoordinateError, DEMProcessingError
@@ -85,6 +87,8 @@ class DEMService:
         if hasattr(self.elevation_service, 'set_dataset_manager'):
             self.elevation_service.set_dataset_manager(self.dataset_manager)
         
+        # Native-resolution line profiles (injected by the service container)
+        self.profile_service = None
         
         # Configure GDAL environment to suppress certain errors
         self._configure_gdal_environment()
@@ -172,13 +176,29 @@ class DEMService:
 
     async def get_elevations_for_line_unified(self, start_lat: float, start_lon: float,
                                             end_lat: float, end_lon: float, num_points: int,
-                                            dem_source_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], str, Optional[str]]:
+                                            dem_source_id: Optional[str] = None,
+                                            native_resolution: bool = False) -> Tuple[List[Dict[str, Any]], str, Optional[str]]:
         """
         Get elevations for points along a line using the unified elevation service.
         
+        When the line is covered by the unified index (and no specific source is
+        requested) it is sampled at native pixel spacing through the covering
+        rasters and resampled to num_points, unless native_resolution is set.
+        Otherwise each point goes through the per-point pipeline.
+        
         Returns:
             Tuple of (point_list, dem_source_used, error_message)
         """
+        if self.profile_service is not None and dem_source_id is None:
+            try:
+                profile_points = await self._get_line_profile_points(
+                    start_lat, start_lon, end_lat, end_lon, None if native_resolution else num_points
+                )
+                if profile_points is not None:
+                    return profile_points
+            except Exception as e:
+                logger.warning(f"Native line profile failed, falling back to per-point sampling: {e}")
+        
         try:
             # Generate line points
             points = self.generate_line_points(start_lat, start_lon, end_lat, end_lon, num_points)
@@ -208,6 +228,23 @@ class DEMService:
             logger.error(f"Error getting elevations for line: {e}")
             return [], dem_source_id or "unknown", str(e)
 
+    async def _get_line_profile_points(self, start_lat: float, start_lon: float, end_lat: float, end_lon: float,
+                                       num_points: Optional[int]) -> Optional[Tuple[List[Dict[str, Any]], str, Optional[str]]]:
+        """Line result from the native profile sampler, or None when it has no coverage."""
+        profile = await self.profile_service.get_line_profile(start_lat, start_lon, end_lat, end_lon, num_points)
+        if profile is None or not profile.files_used:
+            return None
+        
+        result_points = []
+        for i, point in enumerate(profile.to_points()):
+            point["sequence"] = i
+            point["message"] = None if point["elevation_m"] is not None else "No elevation data at this location"
+            result_points.append(point)
+        
+        message = (f"Sampled at native resolution ({profile.native_samples} samples, "
+                   f"{profile.native_spacing_m:.2f} m spacing) from {', '.join(profile.files_used)}")
+        return result_points, profile.files_used[0], message
+
     async def get_elevations_for_path_unified(self, points: List[Dict[str, Any]], 
                                             dem_source_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], str, Optional[str]]:
         """
@@ -216,6 +253,10 @@ class DEMService:
         Returns:
             Tuple of (elevation_list, dem_source_used, error_message)
         """
+        scheduler = get_path_scheduler()
+        if scheduler is not None:
+            return await self._get_elevations_for_path_scheduled(scheduler, points, dem_source_id)
+        
         try:
             # Performance Enhancement Phase 2.3: Parallel batch processing
             import asyncio
@@ -240,8 +281,11 @@ class DEMService:
             
             # Process all points concurrently for maximum performance
             logger.info(f"Processing {len(points)} points concurrently (Performance Phase 2.3)")
-            tasks = [process_single_point(i, point) for i, point in enumerate(points)]
-            result_elevations = await asyncio.gather(*tasks, return_exceptions=False)
+            with self.elevation_service.deferred_api_fallback(enabled=dem_source_id is None) as deferred:
+                tasks = [process_single_point(i, point) for i, point in enumerate(points)]
+                result_elevations = await asyncio.gather(*tasks, return_exceptions=False)
+            if deferred:
+                await self._resolve_path_api_misses(result_elevations)
             
             # Extract primary source from first successful result
             primary_source = next(
@@ -259,6 +303,63 @@ class DEMService:
             return [], dem_source_id or "unknown", str(e)
 
 
+    async def _get_elevations_for_path_scheduled(self, scheduler: PathScheduler, points: List[Dict[str, Any]],
+                                                 dem_source_id: Optional[str]) -> Tuple[List[Dict[str, Any]], str, Optional[str]]:
+        """Path lookup grouped by covering file under the bounded path scheduler."""
+        try:
+            async def lookup(lat: float, lon: float):
+                return await self.get_elevation_unified(lat, lon, dem_source_id)
+            
+            unified_source = find_unified_source(self.elevation_service) if dem_source_id is None else None
+            with self.elevation_service.deferred_api_fallback(enabled=dem_source_id is None) as deferred:
+                results = await scheduler.run(
+                    [point["latitude"] for point in points],
+                    [point["longitude"] for point in points],
+                    lookup,
+                    unified_source
+                )
+            
+            result_elevations = [
+                {
+                    "input_latitude": point["latitude"],
+                    "input_longitude": point["longitude"],
+                    "input_id": point.get("id", i),
+                    "elevation_m": result.elevation_m,
+                    "sequence": i,
+                    "message": result.message,
+                    "dem_source": result.dem_source
+                }
+                for i, (point, result) in enumerate(zip(points, results))
+            ]
+            if deferred:
+                await self._resolve_path_api_misses(result_elevations)
+            primary_source = next(
+                (result["dem_source"] for result in result_elevations if result.get("elevation_m") is not None),
+                "unknown"
+            )
+            return result_elevations, primary_source or "unknown", None
+            
+        except DEMCoordinateError as e:
+            logger.warning(f"Invalid coordinates in path elevation: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Error getting elevations for path: {e}")
+            return [], dem_source_id or "unknown", str(e)
+
+    async def _resolve_path_api_misses(self, result_elevations: List[Dict[str, Any]]) -> None:
+        """Send every path point S3 could not answer to the APIs in batched calls."""
+        misses = [result for result in result_elevations if result["elevation_m"] is None]
+        if not misses:
+            return
+        api_results = await self.elevation_service.resolve_api_fallback_batch(
+            [(result["input_latitude"], result["input_longitude"]) for result in misses]
+        )
+        for result, api_result in zip(misses, api_results):
+            if api_result is not None:
+                result["elevation_m"] = api_result.elevation_m
+                result["dem_source"] = api_result.dem_source_used
+                result["message"] = api_result.message
+
     def generate_line_points(self, start_lat: float, start_lon: float, 
                            end_lat: float, end_lon: float, num_points: int) -> List[Tuple[float, float]]:
         """Generate equally spaced points along a great circle line."""
@@ -21,6 +21,17 @@ from .source_provider import SourceProvider
 from .services.crs_service import CRSTransformationService
 from .services.thread_pool_service import ThreadPoolService
 from .services.spatial_index_service import SpatialIndexService
+from .services.prefetch_service import ProjectPrefetchService
+from .services.bulk_elevation_service import BulkElevationService
+from .services.profile_service import LineProfileService
+from .services.cross_section_service import CrossSectionService
+from .services.raster_export_service import RasterExportService
+from .services.contour_cache import get_contour_result_cache
+from .services.contour_tile_service import ContourTileService
+from .services.terrain_service import TerrainService
+from .services.earthworks_service import EarthworksService
+from .services.sight_distance_service import SightDistanceService
+from .services.job_service import JobService
 from .campaign_dataset_selector import CampaignDatasetSelector
 
 logger = logging.getLogger(__name__)
@@ -69,6 +80,22 @@ class ServiceContainer:
         # Initialize SpatialIndexService for O(log N) spatial queries (Performance Fix Phase 3)
         self._spatial_index_service: Optional[SpatialIndexService] = None
         
+        # Project-area tile prefetch (warms the host-local raster tile cache)
+        self._prefetch_service: Optional[ProjectPrefetchService] = None
+        
+        # Bulk NDJSON elevation sampling with per-client cost quota
+        self._bulk_elevation_service: Optional[BulkElevationService] = None
+        self._profile_service: Optional[LineProfileService] = None
+        self._cross_section_service: Optional[CrossSectionService] = None
+        self._raster_export_service: Optional[RasterExportService] = None
+        self._contour_tile_service: Optional[ContourTileService] = None
+        self._terrain_service: Optional[TerrainService] = None
+        self._earthworks_service: Optional[EarthworksService] = None
+        self._sight_distance_service: Optional[SightDistanceService] = None
+        
+        # Asynchronous job queue for very large corridor and area requests
+        self._job_service: Optional[JobService] = None
+        
         logger.info(f"ServiceContainer initialized with Redis state management, SourceProvider: {source_provider is not None}, UnifiedProvider: {unified_provider is not None}")
     
     @property
@@ -95,8 +122,15 @@ class ServiceContainer:
     def contour_service(self) -> ContourService:
         """Get or create the ContourService instance with DatasetManager dependency."""
         if self._contour_service is None:
-            self._contour_service = ContourService(self.dataset_manager)
-            logger.info("ContourService created with DatasetManager dependency")
+            # Automatic requests contour a priority mosaic of the unified index's campaigns
+            self._contour_service = ContourService(
+                self.dataset_manager,
+                self.raster_export_service,
+                chunk_size=self.settings.CONTOUR_CHUNK_SIZE,
+                workers=self.settings.CONTOUR_PROCESS_WORKERS,
+                result_cache=get_contour_result_cache(),
+            )
+            logger.info("ContourService created with DatasetManager and unified mosaic dependencies")
         return self._contour_service
     
     @property
@@ -134,6 +168,7 @@ class ServiceContainer:
             self._dem_service.dataset_manager = self.dataset_manager
             self._dem_service.contour_service = self.contour_service
             self._dem_service.elevation_service = self.elevation_service
+            self._dem_service.profile_service = self.profile_service
             
             logger.info("DEMService created with injected dependencies")
         return self._dem_service
@@ -181,9 +216,144 @@ class ServiceContainer:
             logger.info("SpatialIndexService created for high-performance spatial queries")
         return self._spatial_index_service
     
+    @property
+    def prefetch_service(self) -> ProjectPrefetchService:
+        """Get ProjectPrefetchService singleton for project-area tile warm-up"""
+        if self._prefetch_service is None:
+            from .redis_state_manager import RedisJobRegistry
+            self._prefetch_service = ProjectPrefetchService(
+                self.elevation_service,
+                max_concurrency=self.settings.PREFETCH_MAX_CONCURRENCY,
+                max_tiles=self.settings.PREFETCH_MAX_TILES,
+                registry=RedisJobRegistry(self.redis_manager, namespace="prefetch", id_key="project_id"),
+            )
+            logger.info("ProjectPrefetchService created for background tile warm-up")
+        return self._prefetch_service
+    
+    @property
+    def bulk_elevation_service(self) -> BulkElevationService:
+        """Get BulkElevationService singleton for high-volume point sampling"""
+        if self._bulk_elevation_service is None:
+            from .redis_state_manager import RedisPointQuota
+            self._bulk_elevation_service = BulkElevationService(
+                self.elevation_service,
+                quota=RedisPointQuota(self.redis_manager, daily_units=self.settings.BULK_DAILY_QUOTA_UNITS),
+                max_points=self.settings.BULK_MAX_POINTS,
+                chunk_size=self.settings.BULK_CHUNK_SIZE,
+                s3_point_cost=self.settings.BULK_S3_POINT_COST,
+                api_point_cost=self.settings.BULK_API_POINT_COST,
+                max_fallback_points=self.settings.BULK_MAX_FALLBACK_POINTS,
+            )
+            logger.info("BulkElevationService created for chunked NDJSON sampling")
+        return self._bulk_elevation_service
+    
+    @property
+    def profile_service(self) -> LineProfileService:
+        """Get LineProfileService singleton for native-resolution line sampling"""
+        if self._profile_service is None:
+            self._profile_service = LineProfileService(
+                self.elevation_service,
+                max_samples=self.settings.PROFILE_MAX_SAMPLES,
+            )
+        return self._profile_service
+    
+    @property
+    def cross_section_service(self) -> CrossSectionService:
+        """Get CrossSectionService singleton for alignment cross-sections"""
+        if self._cross_section_service is None:
+            self._cross_section_service = CrossSectionService(
+                self.elevation_service,
+                max_points=self.settings.CROSS_SECTION_MAX_POINTS,
+            )
+        return self._cross_section_service
+    
+    @property
+    def raster_export_service(self) -> RasterExportService:
+        """Get RasterExportService singleton for binary raster clips"""
+        if self._raster_export_service is None:
+            self._raster_export_service = RasterExportService(
+                self.elevation_service,
+                max_pixels=self.settings.RASTER_EXPORT_MAX_PIXELS,
+            )
+        return self._raster_export_service
+    
+    @property
+    def contour_tile_service(self) -> ContourTileService:
+        """Get ContourTileService singleton for cached contour vector tiles"""
+        if self._contour_tile_service is None:
+            self._contour_tile_service = ContourTileService(
+                self.contour_service,
+                self.raster_export_service,
+                self.elevation_service,
+                cache_dir=self.settings.CONTOUR_TILE_CACHE_DIR,
+                memory_tiles=self.settings.CONTOUR_TILE_MEMORY_TILES,
+                max_cells=self.settings.CONTOUR_TILE_MAX_CELLS,
+            )
+        return self._contour_tile_service
+    
+    @property
+    def terrain_service(self) -> TerrainService:
+        """Get TerrainService singleton for slope, aspect and hillshade"""
+        if self._terrain_service is None:
+            self._terrain_service = TerrainService(
+                self.raster_export_service,
+                self.elevation_service,
+                cache_max_bytes=self.settings.TERRAIN_CACHE_MAX_MB * 1024 * 1024,
+                tile_size=self.settings.TERRAIN_TILE_SIZE,
+            )
+        return self._terrain_service
+    
+    @property
+    def earthworks_service(self) -> EarthworksService:
+        """Get EarthworksService singleton for cut/fill volumes"""
+        if self._earthworks_service is None:
+            self._earthworks_service = EarthworksService(
+                self.raster_export_service,
+                self.elevation_service,
+                tile_size=self.settings.EARTHWORKS_TILE_SIZE,
+                max_cells=self.settings.EARTHWORKS_MAX_CELLS,
+            )
+        return self._earthworks_service
+    
+    @property
+    def sight_distance_service(self) -> SightDistanceService:
+        """Get SightDistanceService singleton for line-of-sight checks along alignments"""
+        if self._sight_distance_service is None:
+            self._sight_distance_service = SightDistanceService(
+                self.profile_service,
+                max_length_m=self.settings.SIGHT_DISTANCE_MAX_LENGTH_M,
+            )
+        return self._sight_distance_service
+    
+    @property
+    def job_service(self) -> JobService:
+        """Get JobService singleton with the built-in job kinds registered"""
+        if self._job_service is None:
+            from .redis_state_manager import RedisJobRegistry
+            from .services.job_handlers import ElevationJobHandlers
+            self._job_service = JobService(
+                RedisJobRegistry(self.redis_manager, ttl_seconds=self.settings.JOB_RESULT_TTL_SECONDS),
+                result_dir=self.settings.JOB_RESULT_DIR,
+                workers=self.settings.JOB_WORKERS,
+                max_queued=self.settings.JOB_MAX_QUEUED,
+                max_active_per_client=self.settings.JOB_MAX_ACTIVE_PER_CLIENT,
+                timeout_seconds=self.settings.JOB_TIMEOUT_SECONDS,
+                result_ttl_seconds=self.settings.JOB_RESULT_TTL_SECONDS,
+            )
+            ElevationJobHandlers(
+                self.contour_service, self.profile_service, self.bulk_elevation_service,
+                cross_section_service=self.cross_section_service,
+                cross_section_max_points=self.settings.CROSS_SECTION_JOB_MAX_POINTS,
+            ).register(self._job_service)
+            logger.info(f"JobService created with kinds: {', '.join(self._job_service.kinds)}")
+        return self._job_service
+    
     async def close(self):
         """Close all managed services and clean up resources."""
         services_to_close = [
+            ("job_service", self._job_service),
+            ("prefetch_service", self._prefetch_service),
+            ("contour_service", self._contour_service),
             ("dem_service", self._dem_service),
             ("elevation_service", self._elevation_service),
             ("dataset_manager", self._dataset_manager),
@@ -305,4 +475,53 @@ def get_thread_pool_service() -> ThreadPoolService:
 
 def get_spatial_index_service() -> SpatialIndexService:
     """FastAPI dependency to get SpatialIndexService singleton."""
-    return get_service_container().spatial_index_service
\ No newline at end of file
+    return get_service_container().spatial_index_service
+
+def get_prefetch_service() -> ProjectPrefetchService:
+    """FastAPI dependency to get ProjectPrefetchService singleton."""
+    return get_service_container().prefetch_service
+
+
+def get_bulk_elevation_service() -> BulkElevationService:
+    """FastAPI dependency to get BulkElevationService singleton."""
+    return get_service_container().bulk_elevation_service
+
+
+def get_profile_service() -> LineProfileService:
+    """FastAPI dependency to get LineProfileService singleton."""
+    return get_service_container().profile_service
+
+
+def get_cross_section_service() -> CrossSectionService:
+    """FastAPI dependency to get CrossSectionService singleton."""
+    return get_service_container().cross_section_service
+
+
+def get_raster_export_service() -> RasterExportService:
+    """FastAPI dependency to get RasterExportService singleton."""
+    return get_service_container().raster_export_service
+
+
+def get_contour_tile_service() -> ContourTileService:
+    """FastAPI dependency to get ContourTileService singleton."""
+    return get_service_container().contour_tile_service
+
+
+def get_terrain_service() -> TerrainService:
+    """FastAPI dependency to get TerrainService singleton."""
+    return get_service_container().terrain_service
+
+
+def get_earthworks_service() -> EarthworksService:
+    """FastAPI dependency to get EarthworksService singleton."""
+    return get_service_container().earthworks_service
+
+
+def get_sight_distance_service() -> SightDistanceService:
+    """FastAPI dependency to get SightDistanceService singleton."""
+    return get_service_container().sight_distance_service
+
+
+def get_job_service() -> JobService:
+    """FastAPI dependency to get JobService singleton."""
+    return get_service_container().job_service
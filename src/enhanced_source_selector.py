@@ -3,7 +3,8 @@ import json
 import asyncio
 import logging
 import os
-from typing import Optional, List, Dict, Any
+from contextvars import ContextVar
+from typing import Optional, List, Dict, Any, Tuple
 from pathlib import Path
 from datetime import datetime
 
@@ -21,6 +22,10 @@ from .unified_index_loader import UnifiedIndexLoader
 
 logger = logging.getLogger(__name__)
 
+# Set by batch callers: per-point lookups stop after S3 so that the points S3
+# cannot answer can be sent to the APIs together (get_api_elevations_batch).
+api_fallback_deferred: ContextVar[bool] = ContextVar("api_fallback_deferred", default=False)
+
 class SpatialIndexLoader:
     """Loads and manages spatial index files for S3 DEM sources with smart dataset selection"""
     
@@ -435,6 +440,9 @@ class EnhancedSourceSelector:
             ("gpxz_api", self._try_gpxz_source),
             ("google_api", self._try_google_source)
         ]
+        if api_fallback_deferred.get():
+            # The batch caller resolves S3 misses through the batched API calls
+            source_attempts = source_attempts[:1]
         
         logger.info(f"Configured source attempts: {[name for name, func in source_attempts]}")
         logger.info(f"Source functions available:")
@@ -822,6 +830,52 @@ class EnhancedSourceSelector:
             else:
                 raise NonRetryableError(f"Google API client error: {e}", SourceType.API)
     
+    def supports_api_batch(self) -> bool:
+        """Whether any API client is available for batched fallback"""
+        return self.use_apis and (self.gpxz_client is not None or self.google_client is not None)
+    
+    async def get_api_elevations_batch(self, points: List[Tuple[float, float]]) -> List[Tuple[Optional[float], Optional[str]]]:
+        """
+        Resolve many points through the API fallback chain with batch calls.
+        
+        GPXZ's points endpoint is tried first for every point, then Google's
+        multi-location endpoint for whatever GPXZ could not answer. Each client
+        chunks to its request limit under the Redis rate limiter and charges
+        its daily quota per point. Returns (elevation, source) per point.
+        """
+        results: List[Tuple[Optional[float], Optional[str]]] = [(None, None)] * len(points)
+        pending = list(range(len(points)))
+        
+        for source_name, client in (("gpxz_api", self.gpxz_client), ("google_api", self.google_client)):
+            if not pending or not self.use_apis or client is None:
+                continue
+            breaker = self.circuit_breakers.get(source_name)
+            if breaker is not None and not breaker.is_available():
+                logger.warning(f"Circuit breaker open for {source_name}, skipping batch")
+                continue
+            try:
+                elevations = await client.get_elevation_batch([points[i] for i in pending])
+            except Exception as e:
+                logger.error(f"Batch {source_name} fallback failed: {e}")
+                if breaker is not None:
+                    breaker.record_failure()
+                continue
+            
+            answered = 0
+            still_pending = []
+            for i, elevation in zip(pending, elevations):
+                if elevation is None:
+                    still_pending.append(i)
+                else:
+                    results[i] = (elevation, source_name)
+                    answered += 1
+            if breaker is not None and answered:
+                breaker.record_success()
+            logger.info(f"Batch {source_name} fallback: {answered}/{len(pending)} points answered")
+            pending = still_pending
+        
+        return results
+    
     async def get_elevation_from_api(self, lat: float, lon: float, source_id: str) -> Optional[float]:
         """Get elevation from API sources"""
         if source_id.startswith("gpxz_") and self.gpxz_client:
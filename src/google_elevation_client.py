@@ -5,10 +5,12 @@ Not included in coverage maps as it's a transparent fallback
 import os
 import httpx
 import asyncio
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 import logging
 from datetime import datetime, timedelta
+from .error_handling import NonRetryableError
 from .redis_state_manager import RedisStateManager, RedisRateLimiter
+from .services.api_response_cache import PersistentAPIResponseCache, get_api_response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -19,12 +21,14 @@ class GoogleElevationClient:
     Features:
     - Simple, reliable global coverage
     - Rate limiting aware (2,500 requests/day free tier)
-    - Caching to minimize API calls
+    - Persistent host-local caching to minimize API calls
     - Not advertised in coverage maps
     """
     
-    def __init__(self, api_key: Optional[str] = None, redis_manager: Optional[RedisStateManager] = None):
+    def __init__(self, api_key: Optional[str] = None, redis_manager: Optional[RedisStateManager] = None,
+                 response_cache: Optional[PersistentAPIResponseCache] = None):
         self.api_key = api_key or os.getenv("GOOGLE_ELEVATION_API_KEY")
+        self.response_cache = response_cache if response_cache is not None else get_api_response_cache()
         self.base_url = "https://maps.googleapis.com/maps/api/elevation/json"
         self._client = None
         
@@ -59,6 +63,13 @@ class GoogleElevationClient:
         if not self.api_key:
             return None
         
+        # Persistent cache first: a hit costs no quota
+        if self.response_cache:
+            cached = await self.response_cache.get_async("google", lat, lon)
+            if cached is not None:
+                logger.debug(f"Google persistent cache hit for ({lat}, {lon}): {cached}m")
+                return cached
+        
         # Check rate limits with Redis
         await self.rate_limiter.wait_if_needed()
         
@@ -82,6 +93,8 @@ class GoogleElevationClient:
                     f"{elevation}m (daily requests: {stats['daily_requests_used']}/{stats['daily_limit']})"
                 )
                 
+                if self.response_cache and elevation is not None:
+                    await self.response_cache.put_async("google", lat, lon, elevation)
                 return elevation
             else:
                 logger.error(f"Google Elevation API error: {data.get('status')}")
@@ -91,6 +104,69 @@ class GoogleElevationClient:
             logger.error(f"Google Elevation API request failed: {e}")
             return None
     
+    # Google accepts up to 512 locations per request
+    MAX_BATCH_LOCATIONS = 512
+    
+    async def get_elevation_batch(self, points: List[Tuple[float, float]]) -> List[Optional[float]]:
+        """
+        Get elevations for many points with multi-location requests.
+        
+        Cached points cost nothing; the rest go out in chunks of up to
+        MAX_BATCH_LOCATIONS, each charged per location against the daily quota.
+        """
+        if not self.api_key or not points:
+            return [None] * len(points)
+        
+        if self.response_cache:
+            results = await self.response_cache.get_many_async("google", points)
+        else:
+            results = [None] * len(points)
+        missing = [i for i, elevation in enumerate(results) if elevation is None]
+        
+        start = 0
+        while start < len(missing):
+            remaining = self.rate_limiter.remaining()
+            if remaining <= 0:
+                logger.warning(f"Google daily quota exhausted, {len(missing) - start} batch points unanswered")
+                break
+            chunk = missing[start:start + min(self.MAX_BATCH_LOCATIONS, remaining)]
+            chunk_points = [points[i] for i in chunk]
+            try:
+                elevations = await self._fetch_locations(chunk_points)
+            except NonRetryableError as e:
+                logger.warning(f"Google batch stopped: {e}")
+                break
+            for i, elevation in zip(chunk, elevations):
+                results[i] = elevation
+            if self.response_cache:
+                await self.response_cache.put_many_async("google", chunk_points, elevations)
+            start += len(chunk)
+        return results
+    
+    async def _fetch_locations(self, points: List[Tuple[float, float]]) -> List[Optional[float]]:
+        """One multi-location request; results come back in request order"""
+        await self.rate_limiter.wait_if_needed(cost=len(points))
+        try:
+            params = {
+                "locations": "|".join(f"{lat:.6f},{lon:.6f}" for lat, lon in points),
+                "key": self.api_key
+            }
+            response = await self.client.get(self.base_url, params=params)
+            response.raise_for_status()
+            data = response.json()
+            
+            if data.get("status") != "OK":
+                logger.error(f"Google Elevation API batch error: {data.get('status')}")
+                return [None] * len(points)
+            
+            elevations = [result.get("elevation") for result in data.get("results", [])]
+            logger.info(f"Google Elevation batch request: {len(points)} locations")
+            return (elevations + [None] * len(points))[:len(points)]
+        
+        except Exception as e:
+            logger.error(f"Google Elevation API batch request failed: {e}")
+            return [None] * len(points)
+    
     def can_make_request(self) -> bool:
         """Check if we can make a request (within daily limits)"""
         if not self.api_key:
@@ -6,6 +6,7 @@ import logging
 from datetime import datetime, timedelta
 from .error_handling import RetryableError, NonRetryableError, SourceType
 from .redis_state_manager import RedisStateManager, RedisRateLimiter
+from .services.api_response_cache import PersistentAPIResponseCache, get_api_response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +17,7 @@ class GPXZConfig(BaseModel):
     timeout: int = 8
     daily_limit: int = 100  # Free tier limit
     rate_limit_per_second: int = 1  # Free tier limit
+    max_batch_points: int = 512  # Points endpoint limit per request
 
 class GPXZRateLimiter:
     """Rate limiter for GPXZ.io API calls"""
@@ -54,8 +56,11 @@ class GPXZRateLimiter:
 class GPXZClient:
     """Client for GPXZ.io elevation API with Redis-based rate limiting"""
     
-    def __init__(self, config: GPXZConfig, redis_manager: Optional[RedisStateManager] = None):
+    def __init__(self, config: GPXZConfig, redis_manager: Optional[RedisStateManager] = None,
+                 response_cache: Optional[PersistentAPIResponseCache] = None):
         self.config = config
+        # Persistent host-local cache checked before spending quota
+        self.response_cache = response_cache if response_cache is not None else get_api_response_cache()
         self.redis_manager = redis_manager if redis_manager else RedisStateManager()
         self.rate_limiter = RedisRateLimiter(
             self.redis_manager, 
@@ -74,6 +79,19 @@ class GPXZClient:
     
     async def get_elevation_point(self, lat: float, lon: float) -> Optional[float]:
         """Get elevation for a single point"""
+        if self.response_cache:
+            cached = await self.response_cache.get_async("gpxz", lat, lon)
+            if cached is not None:
+                logger.debug(f"GPXZ persistent cache hit for ({lat}, {lon}): {cached}m")
+                return cached
+        
+        elevation_m = await self._fetch_elevation_point(lat, lon)
+        if self.response_cache and elevation_m is not None:
+            await self.response_cache.put_async("gpxz", lat, lon, elevation_m)
+        return elevation_m
+    
+    async def _fetch_elevation_point(self, lat: float, lon: float) -> Optional[float]:
+        """Call the GPXZ point endpoint (no caching)"""
         try:
             await self.rate_limiter.wait_if_needed()
             
@@ -128,9 +146,48 @@ class GPXZClient:
     
     async def get_elevation_batch(self, points: List[Tuple[float, float]]) -> List[Optional[float]]:
         """Get elevations for multiple points (using points endpoint)"""
+        if not self.response_cache:
+            return await self._fetch_elevation_batch(points)
+        
+        # Only spend quota on points the persistent cache cannot answer
+        results = await self.response_cache.get_many_async("gpxz", points)
+        missing = [i for i, elevation in enumerate(results) if elevation is None]
+        if missing:
+            missing_points = [points[i] for i in missing]
+            fetched = await self._fetch_elevation_batch(missing_points)
+            for i, elevation in zip(missing, fetched):
+                results[i] = elevation
+            await self.response_cache.put_many_async("gpxz", missing_points, fetched)
+        return results
+    
+    async def _fetch_elevation_batch(self, points: List[Tuple[float, float]]) -> List[Optional[float]]:
+        """
+        Call the GPXZ points endpoint in maximal chunks (no caching).
+        
+        Each chunk is one rate-limited request charged per point; chunks are
+        trimmed to the remaining daily quota and stop once it is spent.
+        """
+        results: List[Optional[float]] = [None] * len(points)
+        start = 0
+        while start < len(points):
+            remaining = self.rate_limiter.remaining()
+            if remaining <= 0:
+                logger.warning(f"GPXZ daily quota exhausted, {len(points) - start} batch points unanswered")
+                break
+            chunk = points[start:start + min(self.config.max_batch_points, remaining)]
+            try:
+                elevations = await self._fetch_elevation_chunk(chunk)
+            except NonRetryableError as e:
+                logger.warning(f"GPXZ batch stopped: {e}")
+                break
+            results[start:start + len(chunk)] = elevations
+            start += len(chunk)
+        return results
+    
+    async def _fetch_elevation_chunk(self, points: List[Tuple[float, float]]) -> List[Optional[float]]:
+        """One points request; failures other than quota leave the chunk unanswered"""
+        await self.rate_limiter.wait_if_needed(cost=len(points))
         try:
-            await self.rate_limiter.wait_if_needed()
-            
             # Format points for API
             locations = [{"lat": lat, "lon": lon} for lat, lon in points]
             
@@ -151,6 +208,7 @@ class GPXZClient:
                     results.append(result["elevation"])
                 else:
                     results.append(None)
+            results = (results + [None] * len(points))[:len(points)]
             
             logger.info(f"GPXZ batch request: {len(points)} points, {sum(1 for r in results if r is not None)} successful")
             return results
@@ -13,6 +13,9 @@ import laspy
 from pyproj import Transformer
 import threading
 import os
+from collections import OrderedDict
+
+from .services.memory_governor import get_memory_governor
 
 logger = logging.getLogger(__name__)
 
@@ -20,9 +23,12 @@ class LiDARService:
     """Service for handling raw LiDAR point cloud data (.las/.laz files)."""
     
     def __init__(self):
-        self._point_cloud_cache: Dict[str, Dict] = {}
+        # LRU order so the memory governor can evict the coldest point clouds first
+        self._point_cloud_cache: "OrderedDict[str, Dict]" = OrderedDict()
         self._transformer_cache: Dict[str, Transformer] = {}
         self._cache_lock = threading.RLock()
+        self._memory_governor = get_memory_governor()
+        self._memory_governor.register("lidar_point_clouds", self, rebuild_cost=5.0)
     
     def _load_las_file(self, file_path: str) -> Dict[str, Any]:
         """Load LAS/LAZ file and return point cloud data with spatial index."""
@@ -59,7 +65,9 @@ class LiDARService:
                     'min_z': float(np.min(z)),
                     'max_z': float(np.max(z))
                 },
-                'point_count': len(x)
+                'point_count': len(x),
+                # Coordinate arrays plus KD-tree data copy and index array
+                'memory_bytes': int(x.nbytes + y.nbytes + z.nbytes + points_2d.nbytes * 2 + len(x) * 8)
             }
             
             logger.info(f"Loaded {len(x):,} points from {file_path}")
@@ -76,7 +84,25 @@ class LiDARService:
         with self._cache_lock:
             if source_id not in self._point_cloud_cache:
                 self._point_cloud_cache[source_id] = self._load_las_file(file_path)
-            return self._point_cloud_cache[source_id]
+            self._point_cloud_cache.move_to_end(source_id)
+            point_cloud = self._point_cloud_cache[source_id]
+        self._memory_governor.maybe_rebalance()
+        return point_cloud
+    
+    def memory_usage_bytes(self) -> int:
+        """Resident bytes of loaded point clouds (MemoryGovernor protocol)."""
+        with self._cache_lock:
+            return sum(pc.get('memory_bytes', 0) for pc in self._point_cloud_cache.values())
+    
+    def evict_bytes(self, target_bytes: int) -> int:
+        """Drop least recently used point clouds until target_bytes are released."""
+        freed = 0
+        with self._cache_lock:
+            while freed < target_bytes and self._point_cloud_cache:
+                source_id, point_cloud = self._point_cloud_cache.popitem(last=False)
+                freed += point_cloud.get('memory_bytes', 0)
+                logger.info(f"Evicted LiDAR point cloud '{source_id}' under memory pressure")
+        return freed
     
     def get_elevation_at_point(self, latitude: float, longitude: float, 
                               source_id: str, file_path: str,
@@ -14,10 +14,17 @@ from .config import get_settings, validate_environment_configuration
 from .api.v1.endpoints import router as elevation_router
 from .api.v1.dataset_endpoints import router as dataset_router
 from .api.v1.campaigns_endpoints import router as campaign_router
+from .api.v1.prefetch_endpoints import router as prefetch_router
+from .api.v1.job_endpoints import router as job_router
 from .dependencies import init_service_container, close_service_container, get_dem_service
 from .logging_config import setup_logging
 from .s3_client_factory import create_s3_client_factory
 from .source_provider import SourceProvider, SourceProviderConfig
+from .services.memory_governor import configure_memory_governor, get_memory_governor
+from .services.api_response_cache import configure_api_response_cache, get_api_response_cache
+from .services.contour_cache import configure_contour_result_cache, get_contour_result_cache
+from .services.tile_cache import configure_raster_tile_cache, get_raster_tile_cache
+from .services.path_scheduler import configure_path_scheduler, get_path_scheduler
 
 # Setup structured logging based on environment
 setup_logging(
@@ -154,6 +161,17 @@ async def lifespan(app: FastAPI):
         # Get static settings (no I/O operations)
         settings = get_settings()
         validate_environment_configuration(settings)
+        configure_memory_governor(settings)
+        
+        # Persistent API response cache must exist before API clients are created
+        api_response_cache = configure_api_response_cache(settings)
+        if api_response_cache:
+            app.state.api_cache_compaction_task = asyncio.create_task(
+                api_response_cache.run_compaction_loop(settings.API_RESPONSE_CACHE_COMPACTION_INTERVAL_SECONDS)
+            )
+        configure_raster_tile_cache(settings)
+        configure_contour_result_cache(settings)
+        configure_path_scheduler(settings)
         
         # Critical security validation - prevent startup with misconfigured auth
         if getattr(settings, 'REQUIRE_AUTH', False) and not getattr(settings, 'SUPABASE_JWT_SECRET', None):
@@ -445,6 +463,12 @@ async def lifespan(app: FastAPI):
         from .middleware.simple_rate_limiter import shutdown_rate_limiter
         await shutdown_rate_limiter()
         
+        # Stop persistent API cache compaction
+        compaction_task = getattr(app.state, 'api_cache_compaction_task', None)
+        if compaction_task:
+            compaction_task.cancel()
+            app.state.api_cache_compaction_task = None
+        
         # Clean up service container
         await close_service_container()
         
@@ -502,14 +526,17 @@ app.add_middleware(
         "X-Mx-ReqToken",
         "Keep-Alive",
         "X-Requested-With",
-        "If-Modified-Since"
+        "If-Modified-Since",
+        "If-None-Match"
     ],
-    expose_headers=["Content-Length", "Content-Type"],
+    expose_headers=["Content-Length", "Content-Type", "ETag", "Last-Modified", "Cache-Control"],
     max_age=86400  # 24 hours
 )
 
 # Include routers
 app.include_router(elevation_router, prefix="/api")
+app.include_router(prefetch_router, prefix="/api")
+app.include_router(job_router, prefix="/api")
 app.include_router(dataset_router, prefix="/api/v1/datasets")
 app.include_router(campaign_router, prefix="/api/v1")
 
@@ -641,6 +668,23 @@ async def root():
     }
 
 
+@app.get("/metrics", tags=["health"])
+async def metrics():
+    """Process memory budget, per-cache breakdown, persistent API cache, tile cache, contour cache and path scheduler stats."""
+    api_response_cache = get_api_response_cache()
+    tile_cache = get_raster_tile_cache()
+    contour_cache = get_contour_result_cache()
+    path_scheduler = get_path_scheduler()
+    return {
+        "timestamp": time.time(),
+        "memory": get_memory_governor().get_metrics(),
+        "api_response_cache": api_response_cache.get_stats() if api_response_cache else {"enabled": False},
+        "tile_cache": tile_cache.get_stats() if tile_cache else {"enabled": False},
+        "contour_cache": contour_cache.get_stats() if contour_cache else {"enabled": False},
+        "path_scheduler": path_scheduler.get_stats() if path_scheduler else {"enabled": False}
+    }
+
+
 @app.get("/api/v1/health", tags=["health"])
 async def health_check():
     """Health check endpoint with Railway deployment debugging."""
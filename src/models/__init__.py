@@ -19,6 +19,7 @@ class LineRequest(BaseModel):
     end_point: Coordinate
     num_points: int = Field(2, ge=2)
     dem_source_id: Optional[str] = None
+    native_resolution: bool = Field(False, description="Return every native-resolution sample instead of num_points")
 
 class PathPoint(BaseModel):
     latitude: float = Field(..., ge=-90, le=90)
@@ -68,6 +69,7 @@ class EnhancedPointResponse(BaseModel):
     data_type: Optional[str] = None
     accuracy: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
+    chainage_m: Optional[float] = None
 
 class EnhancedLineResponse(BaseModel):
     points: List[EnhancedPointResponse]
@@ -172,6 +174,10 @@ class PointsRequest(BaseModel):
     points: List[StandardCoordinate]
     source: Optional[str] = None
 
+class BulkPointsRequest(BaseModel):
+    """Request model for the bulk NDJSON endpoint (quota-accounted instead of capped)."""
+    points: List[StandardCoordinate] = Field(..., min_length=1)
+
 class LineRequest_Standard(BaseModel):
     """Request model for line sampling endpoint."""
     start: StandardCoordinate
@@ -0,0 +1,63 @@
+"""
+Cross Section Models for road alignment sampling
+Pydantic models for requesting cross-sections at regular chainage and returning them compactly
+"""
+from __future__ import annotations
+import math
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
+
+from . import StandardCoordinate
+
+MAX_SECTION_OFFSETS = 1001
+
+
+class CrossSectionLayout(BaseModel):
+    """Chainage interval and section offsets shared by /cross-sections and cross-section jobs"""
+    interval_m: float = Field(20.0, gt=0, le=1000, description="Chainage interval between sections in meters")
+    start_chainage_m: float = Field(0.0, ge=0, description="Chainage of the first section")
+    width_m: Optional[float] = Field(None, gt=0, le=2000, description="Total section width, centred on the alignment")
+    spacing_m: Optional[float] = Field(None, ge=0.1, le=500, description="Point spacing across the section (with width_m)")
+    offsets_m: Optional[List[float]] = Field(None, min_length=1, max_length=MAX_SECTION_OFFSETS,
+                                             description="Explicit offsets in meters (negative = left); overrides width_m")
+
+    @model_validator(mode="after")
+    def check_offsets(self):
+        if not self.offsets_m and not (self.width_m and self.spacing_m):
+            raise ValueError("Provide offsets_m, or width_m together with spacing_m")
+        if self.offsets_m and any(abs(o) > 1000 for o in self.offsets_m):
+            raise ValueError("Offsets must be within 1000 m of the alignment")
+        # Checked here so an oversized offset array is never built
+        if not self.offsets_m and math.ceil(self.width_m / self.spacing_m) + 1 > MAX_SECTION_OFFSETS:
+            raise ValueError(
+                f"width_m / spacing_m gives more than {MAX_SECTION_OFFSETS} offsets per section; widen the spacing"
+            )
+        return self
+
+
+class CrossSectionRequest(CrossSectionLayout):
+    """Cross-sections at regular chainage along a polyline alignment"""
+    alignment: List[StandardCoordinate] = Field(..., min_length=2, max_length=10000,
+                                                description="Alignment vertices in the direction of chainage")
+
+
+class CrossSection(BaseModel):
+    """One section: elevations aligned with the response offsets_m"""
+    chainage_m: float = Field(..., description="Chainage along the alignment")
+    lat: float = Field(..., description="Centreline latitude")
+    lon: float = Field(..., description="Centreline longitude")
+    bearing_deg: float = Field(..., description="Alignment grid bearing at this chainage")
+    elevations: List[Optional[float]] = Field(..., description="Elevation per offset (null where no data)")
+    source_index: List[int] = Field(..., description="Index into sources per offset (-1 where no data)")
+
+
+class CrossSectionResponse(BaseModel):
+    """Compact cross-section response"""
+    length_m: float = Field(..., description="Alignment length")
+    projected_crs: str = Field(..., description="Local projected CRS the sections were laid out in")
+    offsets_m: List[float] = Field(..., description="Offsets shared by every section (negative = left)")
+    sources: List[str] = Field(..., description="Files that supplied elevations")
+    total_sections: int = Field(..., description="Number of sections")
+    total_points: int = Field(..., description="Section points sampled")
+    missing_points: int = Field(..., description="Points with no elevation")
+    sections: List[CrossSection] = Field(..., description="Sections in chainage order")
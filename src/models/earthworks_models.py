@@ -0,0 +1,77 @@
+"""
+Earthworks Models for cut/fill volume computation
+Pydantic models for a design surface over a polygon and the resulting volume totals
+"""
+from __future__ import annotations
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional, Tuple
+
+from . import StandardCoordinate
+
+
+class DesignVertex(StandardCoordinate):
+    """TIN vertex with its design level"""
+    elevation_m: float = Field(..., description="Design level in the DEM's vertical datum")
+
+
+class DesignTIN(BaseModel):
+    """Triangulated design surface"""
+    vertices: List[DesignVertex] = Field(..., min_length=3, max_length=200000, description="TIN vertices")
+    triangles: Optional[List[Tuple[int, int, int]]] = Field(
+        None, min_length=1, description="Vertex index triples; the vertices are Delaunay-triangulated when omitted")
+
+
+class DesignGrid(BaseModel):
+    """Grid of design levels in a projected CRS"""
+    crs: str = Field(..., description="CRS of the grid, e.g. EPSG:7856")
+    geotransform: Tuple[float, float, float, float, float, float] = Field(
+        ..., description="GDAL order: origin_x, cell_width, 0, origin_y, 0, -cell_height")
+    levels: List[List[Optional[float]]] = Field(..., min_length=1, description="Rows north to south (null = no design)")
+
+    @model_validator(mode="after")
+    def check_grid(self):
+        _, cell_width, row_rotation, _, column_rotation, cell_height = self.geotransform
+        if row_rotation or column_rotation or cell_width <= 0 or cell_height >= 0:
+            raise ValueError("Design grids must be north-up with positive cell width and negative cell height")
+        if not self.levels[0] or any(len(row) != len(self.levels[0]) for row in self.levels):
+            raise ValueError("Design grid rows must all have the same, non-zero length")
+        return self
+
+
+class EarthworksRequest(BaseModel):
+    """Cut/fill of one design surface against the DEM within a polygon"""
+    polygon_coordinates: List[StandardCoordinate] = Field(..., min_length=3, max_length=10000,
+                                                          description="Polygon vertices")
+    design_level_m: Optional[float] = Field(None, description="Flat design level (platform)")
+    design_tin: Optional[DesignTIN] = Field(None, description="Triangulated design surface")
+    design_grid: Optional[DesignGrid] = Field(None, description="Grid of design levels")
+    format: Literal["json", "geotiff", "npy"] = Field(
+        "json", description="Totals as JSON, or the design minus DEM raster with totals in headers")
+
+    @model_validator(mode="after")
+    def check_design(self):
+        designs = [self.design_level_m is not None, self.design_tin is not None, self.design_grid is not None]
+        if sum(designs) != 1:
+            raise ValueError("Provide exactly one of design_level_m, design_tin or design_grid")
+        return self
+
+
+class EarthworksResponse(BaseModel):
+    """Volume totals on the native DEM grid"""
+    cut_volume_m3: float = Field(..., description="Volume of ground above the design")
+    fill_volume_m3: float = Field(..., description="Volume between the ground and a design above it")
+    net_volume_m3: float = Field(..., description="Fill minus cut (negative = surplus material)")
+    cut_area_m2: float = Field(..., description="Plan area in cut")
+    fill_area_m2: float = Field(..., description="Plan area in fill")
+    compared_area_m2: float = Field(..., description="Plan area with both a DEM and a design level")
+    max_cut_m: float = Field(..., description="Deepest cut")
+    max_fill_m: float = Field(..., description="Highest fill")
+    cells_compared: int = Field(..., description="DEM cells compared")
+    cells_without_dem: int = Field(..., description="Cells in the polygon with no DEM data")
+    cells_without_design: int = Field(..., description="Cells in the polygon outside the design surface")
+    cell_size_m: List[float] = Field(..., description="Native DEM cell width and height")
+    crs: str = Field(..., description="CRS of the native DEM grid")
+    sources: List[str] = Field(..., description="Files that supplied elevations")
+    tiles: int = Field(..., description="Tiles processed")
+    complete: bool = Field(True, description="False when a covering file could not be read, so volumes are understated")
+    failed_files: List[str] = Field(default_factory=list, description="Covering files that could not be read")
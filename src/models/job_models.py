@@ -0,0 +1,83 @@
+"""
+Job Models for the asynchronous job API
+Pydantic models for submitting long-running corridor and area jobs and polling their status
+"""
+from __future__ import annotations
+from pydantic import BaseModel, Field
+from typing import Annotated, Any, Dict, List, Optional, Literal, Union
+
+from . import StandardCoordinate
+from .cross_section_models import CrossSectionLayout
+
+JobPriority = Literal["high", "normal", "low"]
+
+
+class _JobRequestBase(BaseModel):
+    priority: JobPriority = Field("normal", description="Queue priority; high jobs start before normal and low")
+    description: Optional[str] = Field(None, max_length=200, description="Optional label shown in job listings")
+
+
+class ContourJobRequest(_JobRequestBase):
+    """GeoJSON contours for an area too large for /contour-data/geojson"""
+    kind: Literal["contours"]
+    polygon_coordinates: List[StandardCoordinate] = Field(..., min_length=3, max_length=10000,
+                                                          description="Polygon vertices")
+    dem_source_id: Optional[str] = Field(None, description="DEM source (automatic selection if omitted)")
+    max_points: int = Field(200_000, ge=100, le=2_000_000, description="Maximum DEM points sampled")
+    minor_contour_interval_m: float = Field(1.0, gt=0, le=100, description="Minor contour interval in meters")
+    major_contour_interval_m: float = Field(5.0, gt=0, le=500, description="Major contour interval in meters")
+    simplify_tolerance: float = Field(0.0001, ge=0, description="Line simplification tolerance in degrees")
+
+
+class AlignmentProfileJobRequest(_JobRequestBase):
+    """Native-resolution profile along a long multi-vertex alignment"""
+    kind: Literal["alignment_profile"]
+    coordinates: List[StandardCoordinate] = Field(..., min_length=2, max_length=10000,
+                                                  description="Alignment vertices in order")
+    interval_m: Optional[float] = Field(None, gt=0, le=1000,
+                                        description="Resample to this chainage spacing (native resolution if omitted)")
+
+
+class BulkPointsJobRequest(_JobRequestBase):
+    """NDJSON elevations for a point list, charged to the bulk quota"""
+    kind: Literal["bulk_points"]
+    points: List[StandardCoordinate] = Field(..., min_length=1, description="Points to sample")
+
+
+class CrossSectionJobRequest(_JobRequestBase, CrossSectionLayout):
+    """Cross-sections along an alignment too long for /cross-sections"""
+    kind: Literal["cross_sections"]
+    alignment: List[StandardCoordinate] = Field(..., min_length=2, max_length=50000,
+                                                description="Alignment vertices in the direction of chainage")
+
+
+JobSubmitRequest = Annotated[
+    Union[ContourJobRequest, AlignmentProfileJobRequest, BulkPointsJobRequest, CrossSectionJobRequest],
+    Field(discriminator="kind"),
+]
+
+
+class JobStatus(BaseModel):
+    """Status and progress of a submitted job"""
+    job_id: str = Field(..., description="Job identifier")
+    kind: str = Field(..., description="Job kind")
+    priority: JobPriority = Field(..., description="Queue priority")
+    description: Optional[str] = Field(None, description="Label given at submission")
+    state: Literal["queued", "running", "completed", "failed", "cancelled"] = Field(..., description="Job state")
+    progress_percent: float = Field(0.0, description="Work done as a percentage")
+    message: Optional[str] = Field(None, description="Latest progress message")
+    error: Optional[str] = Field(None, description="Failure reason")
+    result_available: bool = Field(False, description="Whether GET /jobs/{job_id}/result can be downloaded")
+    result_media_type: Optional[str] = Field(None, description="Media type of the result file")
+    result_bytes: int = Field(0, description="Size of the result file")
+    summary: Dict[str, Any] = Field(default_factory=dict, description="Kind-specific result summary")
+    host: Optional[str] = Field(None, description="Worker host holding the result file")
+    created_at: str = Field(..., description="Submission time (UTC, ISO 8601)")
+    started_at: Optional[str] = Field(None, description="Start time (UTC, ISO 8601)")
+    finished_at: Optional[str] = Field(None, description="End time (UTC, ISO 8601)")
+
+
+class JobListResponse(BaseModel):
+    """Response model for listing a client's jobs"""
+    total_jobs: int = Field(..., description="Number of jobs returned")
+    jobs: List[JobStatus] = Field(..., description="Jobs, most recent first")
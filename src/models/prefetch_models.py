@@ -0,0 +1,45 @@
+"""
+Prefetch Models for project-area warm-up endpoints
+Pydantic models for registering project geometries and reporting warm-up status
+"""
+from __future__ import annotations
+from pydantic import BaseModel, Field
+from typing import List, Optional, Literal
+from datetime import datetime
+
+from . import StandardCoordinate
+
+
+class PrefetchRequest(BaseModel):
+    """Register a project area whose raster tiles should be pre-warmed"""
+    geometry_type: Literal["polygon", "polyline"] = Field(..., description="Project geometry type")
+    coordinates: List[StandardCoordinate] = Field(..., min_length=2, max_length=10000,
+                                                  description="Vertices of the polygon or polyline")
+    buffer_m: float = Field(100.0, ge=0, le=5000, description="Buffer around the geometry in meters")
+    name: Optional[str] = Field(None, max_length=200, description="Optional project name")
+
+
+class PrefetchStatus(BaseModel):
+    """Warm-up progress for a registered project area"""
+    project_id: str = Field(..., description="Prefetch project identifier")
+    name: Optional[str] = Field(None, description="Project name")
+    state: Literal["pending", "running", "completed", "failed", "cancelled"] = Field(..., description="Warm-up state")
+    files_total: int = Field(0, description="Covering files resolved from the unified index")
+    files_done: int = Field(0, description="Files processed so far")
+    files_failed: int = Field(0, description="Files whose header or tiles could not be fetched")
+    tiles_total: int = Field(0, description="Tiles intersecting the buffered geometry")
+    tiles_fetched: int = Field(0, description="Tiles fetched from S3 by this job")
+    tiles_cached: int = Field(0, description="Tiles already present in the cache")
+    bytes_fetched: int = Field(0, description="Decoded bytes fetched from S3 by this job")
+    progress_percent: float = Field(0.0, description="Tiles processed as a percentage of tiles_total")
+    truncated: bool = Field(False, description="Whether the tile count hit PREFETCH_MAX_TILES")
+    errors: List[str] = Field(default_factory=list, description="Per-file errors (first few only)")
+    created_at: datetime = Field(..., description="Registration time (UTC)")
+    started_at: Optional[datetime] = Field(None, description="Warm-up start time (UTC)")
+    finished_at: Optional[datetime] = Field(None, description="Warm-up end time (UTC)")
+
+
+class PrefetchListResponse(BaseModel):
+    """Response model for listing prefetch projects"""
+    total_projects: int = Field(..., description="Number of registered projects")
+    projects: List[PrefetchStatus] = Field(..., description="Projects, most recent first")
@@ -0,0 +1,57 @@
+"""
+Raster Models for binary raster export endpoints
+Pydantic models for clipping DEM windows to a polygon and resampling regular grids
+"""
+from __future__ import annotations
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional
+
+from . import StandardCoordinate
+
+
+class ClipRequest(BaseModel):
+    """Clip the mosaicked DEM to a polygon"""
+    polygon_coordinates: List[StandardCoordinate] = Field(..., min_length=3, max_length=10000,
+                                                          description="Polygon vertices")
+    format: Literal["geotiff", "npy"] = Field("geotiff", description="Cloud-Optimized GeoTIFF or float32 .npy")
+
+
+class GridBounds(BaseModel):
+    """Grid extent in the target CRS"""
+    min_x: float
+    min_y: float
+    max_x: float
+    max_y: float
+
+    @model_validator(mode="after")
+    def check_order(self):
+        if self.max_x <= self.min_x or self.max_y <= self.min_y:
+            raise ValueError("Bounds need max_x > min_x and max_y > min_y")
+        return self
+
+
+class GridRequest(BaseModel):
+    """Resample the mosaicked DEM onto a regular grid in a projected CRS"""
+    target_crs: str = Field(..., description="Projected CRS in metres, e.g. EPSG:7856 (MGA2020 zone 56) or EPSG:2193 (NZTM)")
+    resolution_m: float = Field(..., ge=0.1, le=1000, description="Grid spacing in meters")
+    resampling: Literal["nearest", "bilinear", "cubic"] = Field("bilinear", description="Resampling applied by the warp")
+    polygon_coordinates: Optional[List[StandardCoordinate]] = Field(None, min_length=3, max_length=10000,
+                                                                   description="Area as WGS84 polygon vertices")
+    bounds: Optional[GridBounds] = Field(None, description="Area as bounds in the target CRS")
+    mask_to_polygon: bool = Field(False, description="Set cells outside the polygon to no data")
+    format: Literal["geotiff", "npy"] = Field("geotiff", description="Cloud-Optimized GeoTIFF or float32 .npy")
+
+    @model_validator(mode="after")
+    def check_area(self):
+        if (self.polygon_coordinates is None) == (self.bounds is None):
+            raise ValueError("Provide exactly one of polygon_coordinates or bounds")
+        return self
+
+
+class TerrainRequest(GridRequest):
+    """Slope, aspect or hillshade on the regular grid a GridRequest describes"""
+    product: Literal["slope", "aspect", "hillshade"] = Field(..., description="Terrain derivative to compute")
+    slope_units: Literal["degrees", "percent"] = Field("degrees", description="Units of slope values")
+    azimuth_deg: float = Field(315.0, ge=0, lt=360, description="Hillshade sun azimuth, clockwise from north")
+    altitude_deg: float = Field(45.0, gt=0, le=90, description="Hillshade sun altitude above the horizon")
+    z_factor: float = Field(1.0, gt=0, le=100, description="Vertical exaggeration applied before differencing")
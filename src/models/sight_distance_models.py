@@ -0,0 +1,49 @@
+"""
+Sight Distance Models for line-of-sight checks along road alignments
+Pydantic models for requesting available sight distance per station and returning it
+"""
+from __future__ import annotations
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+from . import StandardCoordinate
+
+LimitedBy = Literal["terrain", "max_distance", "end_of_alignment"]
+
+
+class SightDistanceRequest(BaseModel):
+    """Available sight distance at regular chainage along a polyline alignment"""
+    alignment: List[StandardCoordinate] = Field(..., min_length=2, max_length=10000,
+                                                description="Alignment vertices in the direction of chainage")
+    station_interval_m: float = Field(20.0, gt=0, le=1000, description="Chainage interval between stations in meters")
+    eye_height_m: float = Field(1.1, ge=0, le=10, description="Driver eye height above the ground")
+    object_height_m: float = Field(0.2, ge=0, le=10, description="Object height above the ground (0.2 m stopping, 1.25 m overtaking)")
+    max_distance_m: float = Field(500.0, gt=0, le=3000, description="Longest sight distance evaluated")
+    required_sight_distance_m: Optional[float] = Field(None, gt=0, description="Flag stations with less sight distance than this")
+
+
+class SightDistanceStation(BaseModel):
+    """Sight distance from one station in both directions"""
+    chainage_m: float = Field(..., description="Chainage of the station")
+    lat: float = Field(..., description="Station latitude")
+    lon: float = Field(..., description="Station longitude")
+    elevation_m: float = Field(..., description="Ground elevation at the station")
+    forward_m: float = Field(..., description="Available sight distance in the direction of chainage")
+    reverse_m: float = Field(..., description="Available sight distance against the direction of chainage")
+    forward_limited_by: LimitedBy = Field(..., description="What ended the forward sight line")
+    reverse_limited_by: LimitedBy = Field(..., description="What ended the reverse sight line")
+    meets_requirement: Optional[bool] = Field(None, description="Both directions reach required_sight_distance_m")
+
+
+class SightDistanceResponse(BaseModel):
+    """Sight distance per station along the alignment"""
+    length_m: float = Field(..., description="Alignment length")
+    profile_samples: int = Field(..., description="Native-resolution ground samples along the alignment")
+    missing_samples: int = Field(..., description="Ground samples without data (interpolated)")
+    eye_height_m: float = Field(..., description="Driver eye height used")
+    object_height_m: float = Field(..., description="Object height used")
+    max_distance_m: float = Field(..., description="Longest sight distance evaluated")
+    required_sight_distance_m: Optional[float] = Field(None, description="Requirement stations were checked against")
+    deficient_stations: Optional[int] = Field(None, description="Stations not meeting the requirement")
+    files_used: List[str] = Field(..., description="Files that supplied elevations")
+    stations: List[SightDistanceStation] = Field(..., description="Stations in chainage order")
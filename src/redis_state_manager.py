@@ -6,9 +6,14 @@ import logging
 import redis
 import json
 import os
+import threading
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
 import asyncio
+
+from .error_handling import NonRetryableError, SourceType
 from contextlib import asynccontextmanager
 
 logger = logging.getLogger(__name__)
@@ -25,6 +30,7 @@ class RedisStateManager:
         self.redis_url = redis_url or os.getenv('REDIS_URL') or os.getenv('REDIS_PRIVATE_URL') or 'redis://localhost:6379'
         self.app_env = app_env or os.getenv('APP_ENV', 'local')
         self._redis_client = None
+        self._binary_client = None
         self._connection_tested = False
         
     def _get_redis_client(self) -> redis.Redis:
@@ -66,6 +72,20 @@ class RedisStateManager:
                 
         return self._redis_client
     
+    def _get_binary_client(self) -> Optional[redis.Redis]:
+        """Client without response decoding, for raw byte payloads such as raster tiles"""
+        if self._get_redis_client() is None:
+            return None
+        if self._binary_client is None:
+            self._binary_client = redis.from_url(
+                self.redis_url,
+                decode_responses=False,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                retry_on_timeout=True
+            )
+        return self._binary_client
+    
     def _fallback_get(self, key: str) -> Optional[str]:
         """Fallback to in-memory storage when Redis unavailable"""
         if not hasattr(self, '_fallback_storage'):
@@ -303,8 +323,14 @@ class RedisRateLimiter:
         today = datetime.now().strftime("%Y-%m-%d")
         return f"{self.daily_key_prefix}:{today}"
     
-    async def wait_if_needed(self):
-        """Enforce rate limiting with Redis atomic operations"""
+    async def wait_if_needed(self, cost: int = 1):
+        """
+        Enforce rate limiting with Redis atomic operations.
+        
+        One call is one HTTP request against the per-second limit; cost is the
+        number of points it carries, charged against the daily quota (batch
+        endpoints bill per point, not per request).
+        """
         try:
             redis_client = self.redis_manager._get_redis_client()
             if redis_client is None:
@@ -316,8 +342,7 @@ class RedisRateLimiter:
             daily_key = self._get_daily_key()
             daily_count = int(redis_client.get(daily_key) or "0")
             
-            if daily_count >= self.daily_limit:
-                from ..error_handling import NonRetryableError, SourceType
+            if daily_count + cost > self.daily_limit:
                 raise NonRetryableError(f"{self.service_name} daily limit reached ({self.daily_limit} requests)", SourceType.API)
             
             # Rate limiting using sliding window
@@ -328,7 +353,7 @@ class RedisRateLimiter:
             with redis_client.pipeline() as pipe:
                 pipe.incr(rate_key_current)
                 pipe.expire(rate_key_current, 2)  # Keep for 2 seconds
-                pipe.incr(daily_key)
+                pipe.incrby(daily_key, cost)
                 pipe.expire(daily_key, 86400)  # Keep for 24 hours
                 results = pipe.execute()
             
@@ -340,11 +365,17 @@ class RedisRateLimiter:
                 logger.debug(f"Rate limiting {self.service_name}: sleeping {sleep_time}s")
                 await asyncio.sleep(sleep_time)
             
+        except NonRetryableError:
+            raise
         except Exception as e:
             logger.error(f"Error in rate limiting for {self.service_name}: {e}")
             # Fallback: basic sleep
             await asyncio.sleep(1.0 / self.requests_per_second)
     
+    def remaining(self) -> int:
+        """Points left in today's quota"""
+        return self.get_usage_stats()["requests_remaining"]
+    
     def get_usage_stats(self) -> Dict[str, int]:
         """Get current usage statistics"""
         try:
@@ -364,4 +395,382 @@ class RedisRateLimiter:
             
         except Exception as e:
             logger.error(f"Error getting rate limit stats for {self.service_name}: {e}")
-            return {"daily_requests_used": 0, "daily_limit": self.daily_limit, "requests_remaining": self.daily_limit}
\ No newline at end of file
+            return {"daily_requests_used": 0, "daily_limit": self.daily_limit, "requests_remaining": self.daily_limit}
+
+
+class RedisFetchLease:
+    """
+    Cross-worker single-flight leases for expensive fetches (SET NX PX).
+    
+    The first worker to claim a key performs the fetch and publishes the result;
+    the others wait for the shared copy. Leases expire on their own, so a worker
+    that dies mid-fetch only delays the others by lease_ms.
+    """
+    
+    # Delete only if we still own the lease (it may have expired and been re-claimed)
+    _RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+    
+    def __init__(self, redis_manager: RedisStateManager, namespace: str = "fetch_lease",
+                 lease_ms: int = 15000, retry_after_seconds: float = 30.0):
+        self.redis_manager = redis_manager
+        self.namespace = namespace
+        self.lease_ms = lease_ms
+        self.retry_after_seconds = retry_after_seconds
+        self._redis_down_until = 0.0
+        # In-process leases when Redis is unavailable (threads of this worker only)
+        self._local_leases: Dict[str, Tuple[str, float]] = {}
+        self._local_lock = threading.Lock()
+    
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+    
+    def _client(self) -> Optional[redis.Redis]:
+        """Redis client, or None while Redis is known to be unreachable"""
+        if time.monotonic() < self._redis_down_until:
+            return None
+        try:
+            redis_client = self.redis_manager._get_redis_client()
+        except Exception as e:
+            logger.warning(f"Fetch leases falling back to in-process locking: {e}")
+            redis_client = None
+        if redis_client is None:
+            # Unreachable or not configured: don't reconnect on every acquire/publish
+            self._redis_down_until = time.monotonic() + self.retry_after_seconds
+        return redis_client
+    
+    def _mark_down(self, error: Exception) -> None:
+        logger.warning(f"Redis fetch lease error, using in-process leases for {self.retry_after_seconds:.0f}s: {error}")
+        self._redis_down_until = time.monotonic() + self.retry_after_seconds
+    
+    def acquire(self, key: str) -> Optional[str]:
+        """Claim the lease for key. Returns an ownership token, or None if another worker holds it."""
+        token = uuid.uuid4().hex
+        redis_client = self._client()
+        if redis_client is not None:
+            try:
+                acquired = redis_client.set(self._key(key), token, nx=True, px=self.lease_ms)
+                return token if acquired else None
+            except Exception as e:
+                self._mark_down(e)
+        
+        now = time.monotonic()
+        with self._local_lock:
+            holder = self._local_leases.get(key)
+            if holder is not None and holder[1] > now:
+                return None
+            self._local_leases[key] = (token, now + self.lease_ms / 1000.0)
+        return token
+    
+    def release(self, key: str, token: str) -> None:
+        """Release a lease we own; a lease that expired and was re-claimed is left alone"""
+        with self._local_lock:
+            holder = self._local_leases.get(key)
+            if holder is not None and holder[0] == token:
+                del self._local_leases[key]
+                return
+        
+        redis_client = self._client()
+        if redis_client is None:
+            return
+        try:
+            redis_client.eval(self._RELEASE_SCRIPT, 1, self._key(key), token)
+        except Exception as e:
+            logger.debug(f"Error releasing fetch lease {key}: {e}")
+    
+    def publish(self, key: str, payload: bytes, ttl_seconds: int) -> bool:
+        """Share fetched bytes with workers on other hosts"""
+        if self._client() is None:
+            return False
+        try:
+            self.redis_manager._get_binary_client().set(f"{self.namespace}:data:{key}", payload, ex=ttl_seconds)
+            return True
+        except Exception as e:
+            logger.debug(f"Error publishing {key} to Redis: {e}")
+            return False
+    
+    def fetch_published(self, key: str) -> Optional[bytes]:
+        """Bytes published by another worker, if any"""
+        if self._client() is None:
+            return None
+        try:
+            return self.redis_manager._get_binary_client().get(f"{self.namespace}:data:{key}")
+        except Exception as e:
+            logger.debug(f"Error reading published {key} from Redis: {e}")
+            return None
+
+
+class RedisPointQuota:
+    """
+    Daily per-client cost accounting for bulk elevation requests.
+    
+    Each point is charged by how it was served (S3 tile read vs external API),
+    replacing fixed per-request point caps with a budget in cost units.
+    """
+    
+    def __init__(self, redis_manager: RedisStateManager, daily_units: int, namespace: str = "bulk_quota"):
+        self.redis_manager = redis_manager
+        self.daily_units = daily_units
+        self.namespace = namespace
+        self._fallback_usage: Dict[str, int] = {}
+        self._fallback_day: Optional[str] = None
+        self._fallback_lock = threading.Lock()
+    
+    def _get_daily_key(self, client_id: str) -> str:
+        today = datetime.now().strftime("%Y-%m-%d")
+        return f"{self.namespace}:{client_id}:{today}"
+    
+    def _client(self) -> Optional[redis.Redis]:
+        try:
+            return self.redis_manager._get_redis_client()
+        except Exception as e:
+            logger.warning(f"Redis unavailable for bulk quota, using in-process accounting: {e}")
+            return None
+    
+    def used(self, client_id: str) -> int:
+        """Units consumed today"""
+        key = self._get_daily_key(client_id)
+        redis_client = self._client()
+        if redis_client is not None:
+            try:
+                return int(redis_client.get(key) or "0")
+            except Exception as e:
+                logger.error(f"Error reading bulk quota for {client_id}: {e}")
+        with self._fallback_lock:
+            return self._fallback_usage.get(key, 0)
+    
+    def remaining(self, client_id: str) -> int:
+        return max(0, self.daily_units - self.used(client_id))
+    
+    def consume(self, client_id: str, units: int) -> bool:
+        """Atomically charge units; refused (and rolled back) if it would exceed the daily budget"""
+        if units <= 0:
+            return True
+        key = self._get_daily_key(client_id)
+        redis_client = self._client()
+        if redis_client is not None:
+            try:
+                with redis_client.pipeline() as pipe:
+                    pipe.incrby(key, units)
+                    pipe.expire(key, 86400)
+                    total = pipe.execute()[0]
+                if total > self.daily_units:
+                    redis_client.decrby(key, units)
+                    return False
+                return True
+            except Exception as e:
+                logger.error(f"Error charging bulk quota for {client_id}: {e}")
+        
+        with self._fallback_lock:
+            day = key.rsplit(":", 1)[1]
+            if day != self._fallback_day:
+                # Earlier days' windows have expired; keep only today's usage
+                self._fallback_usage = {k: v for k, v in self._fallback_usage.items() if k.endswith(f":{day}")}
+                self._fallback_day = day
+            total = self._fallback_usage.get(key, 0) + units
+            if total > self.daily_units:
+                return False
+            self._fallback_usage[key] = total
+            return True
+    
+    def refund(self, client_id: str, units: int) -> None:
+        """Return units charged by consume that ended up unused"""
+        if units <= 0:
+            return
+        key = self._get_daily_key(client_id)
+        redis_client = self._client()
+        if redis_client is not None:
+            try:
+                redis_client.decrby(key, units)
+                return
+            except Exception as e:
+                logger.error(f"Error refunding bulk quota for {client_id}: {e}")
+        
+        with self._fallback_lock:
+            if key in self._fallback_usage:
+                self._fallback_usage[key] = max(0, self._fallback_usage[key] - units)
+
+
+class RedisJobRegistry:
+    """
+    Shared registry of asynchronous job records.
+    
+    Records are JSON documents with a TTL so any worker can answer status
+    polls for a job running elsewhere; cancellation of a job owned by another
+    worker is requested through a flag the owner polls. Falls back to an
+    in-process registry (this worker only) when Redis is unavailable.
+    Records are keyed by record[id_key] ("project_id" for prefetch projects).
+    """
+    
+    ACTIVE_STATES = ("queued", "running")
+    
+    def __init__(self, redis_manager: RedisStateManager, ttl_seconds: int = 86400, namespace: str = "jobs",
+                 retry_after_seconds: float = 30.0, id_key: str = "job_id"):
+        self.redis_manager = redis_manager
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self.id_key = id_key
+        self.retry_after_seconds = retry_after_seconds
+        self._redis_down_until = 0.0
+        self._local_records: Dict[str, Dict[str, Any]] = {}
+        self._local_cancels: set = set()
+        self._local_queued: set = set()
+        self._local_active: Dict[str, set] = {}
+        self._local_lock = threading.Lock()
+    
+    def _client(self) -> Optional[redis.Redis]:
+        """Redis client, or None while Redis is known to be unreachable"""
+        if time.monotonic() < self._redis_down_until:
+            return None
+        try:
+            return self.redis_manager._get_redis_client()
+        except Exception as e:
+            self._mark_down(e)
+            return None
+    
+    def _mark_down(self, error: Exception) -> None:
+        logger.warning(f"Redis job registry error, using in-process registry for {self.retry_after_seconds:.0f}s: {error}")
+        self._redis_down_until = time.monotonic() + self.retry_after_seconds
+    
+    def save(self, record: Dict[str, Any]) -> None:
+        """Store a job record (keyed by record[id_key]) and index it under its client"""
+        job_id = record[self.id_key]
+        client_id = record.get("client_id")
+        state = record.get("state")
+        payload = json.dumps(record, default=str)
+        redis_client = self._client()
+        if redis_client is not None:
+            try:
+                client_key = f"{self.namespace}:client:{client_id}"
+                with redis_client.pipeline() as pipe:
+                    pipe.set(f"{self.namespace}:{job_id}", payload, ex=self.ttl_seconds)
+                    pipe.zadd(client_key, {job_id: time.time()})
+                    pipe.expire(client_key, self.ttl_seconds)
+                    # Jobs leave the limit counts as soon as they leave those states
+                    if state != "queued":
+                        pipe.srem(f"{self.namespace}:queued", job_id)
+                    if state not in self.ACTIVE_STATES:
+                        pipe.srem(f"{self.namespace}:active:{client_id}", job_id)
+                    pipe.execute()
+                return
+            except Exception as e:
+                self._mark_down(e)
+        with self._local_lock:
+            self._local_records[job_id] = json.loads(payload)
+            if state != "queued":
+                self._local_queued.discard(job_id)
+            if state not in self.ACTIVE_STATES:
+                self._local_active.get(client_id, set()).discard(job_id)
+    
+    def admit(self, job_id: str, client_id: str, max_queued: int, max_active_per_client: int) -> Optional[str]:
+        """
+        Count a new job against the queue and per-client limits shared by all workers.
+        
+        The job is added first and taken back out if that breaks a limit, so
+        concurrent submissions cannot all slip under it. Returns None when
+        admitted, or which limit ("queue" or "client") refused it.
+        """
+        queued_key = f"{self.namespace}:queued"
+        active_key = f"{self.namespace}:active:{client_id}"
+        redis_client = self._client()
+        if redis_client is not None:
+            try:
+                refused = self._admit_redis(redis_client, job_id, queued_key, active_key,
+                                            max_queued, max_active_per_client)
+                if refused is not None:
+                    # Drop members left behind by workers that died mid-job, then count again
+                    self._drop_stale(redis_client, queued_key, ("queued",))
+                    self._drop_stale(redis_client, active_key, self.ACTIVE_STATES)
+                    refused = self._admit_redis(redis_client, job_id, queued_key, active_key,
+                                                max_queued, max_active_per_client)
+                return refused
+            except Exception as e:
+                self._mark_down(e)
+        with self._local_lock:
+            active = self._local_active.setdefault(client_id, set())
+            if len(self._local_queued) >= max_queued:
+                return "queue"
+            if len(active) >= max_active_per_client:
+                return "client"
+            self._local_queued.add(job_id)
+            active.add(job_id)
+            return None
+    
+    def _admit_redis(self, redis_client: redis.Redis, job_id: str, queued_key: str, active_key: str,
+                     max_queued: int, max_active_per_client: int) -> Optional[str]:
+        with redis_client.pipeline() as pipe:
+            pipe.sadd(queued_key, job_id)
+            pipe.sadd(active_key, job_id)
+            pipe.scard(queued_key)
+            pipe.scard(active_key)
+            pipe.expire(queued_key, self.ttl_seconds)
+            pipe.expire(active_key, self.ttl_seconds)
+            queued, active = pipe.execute()[2:4]
+        refused = "queue" if queued > max_queued else "client" if active > max_active_per_client else None
+        if refused is not None:
+            with redis_client.pipeline() as pipe:
+                pipe.srem(queued_key, job_id)
+                pipe.srem(active_key, job_id)
+                pipe.execute()
+        return refused
+    
+    def _drop_stale(self, redis_client: redis.Redis, key: str, states: tuple) -> None:
+        for job_id in redis_client.smembers(key):
+            record = self.get(job_id)
+            if record is None or record.get("state") not in states:
+                redis_client.srem(key, job_id)
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        redis_client = self._client()
+        if redis_client is not None:
+            try:
+                payload = redis_client.get(f"{self.namespace}:{job_id}")
+                if payload is not None:
+                    return json.loads(payload)
+            except Exception as e:
+                self._mark_down(e)
+        with self._local_lock:
+            record = self._local_records.get(job_id)
+            return dict(record) if record is not None else None
+    
+    def list_for_client(self, client_id: str, limit: int = 50) -> list:
+        """Most recent job records submitted by a client"""
+        records = []
+        redis_client = self._client()
+        if redis_client is not None:
+            try:
+                job_ids = redis_client.zrevrange(f"{self.namespace}:client:{client_id}", 0, limit - 1)
+                for job_id in job_ids:
+                    record = self.get(job_id)
+                    if record is not None:
+                        records.append(record)
+                return records
+            except Exception as e:
+                self._mark_down(e)
+        with self._local_lock:
+            records = [dict(r) for r in self._local_records.values() if r.get("client_id") == client_id]
+        records.sort(key=lambda r: str(r.get("created_at")), reverse=True)
+        return records[:limit]
+    
+    def request_cancel(self, job_id: str) -> None:
+        redis_client = self._client()
+        if redis_client is not None:
+            try:
+                redis_client.set(f"{self.namespace}:cancel:{job_id}", "1", ex=self.ttl_seconds)
+                return
+            except Exception as e:
+                self._mark_down(e)
+        with self._local_lock:
+            self._local_cancels.add(job_id)
+    
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._local_lock:
+            if job_id in self._local_cancels:
+                return True
+        redis_client = self._client()
+        if redis_client is None:
+            return False
+        try:
+            return bool(redis_client.exists(f"{self.namespace}:cancel:{job_id}"))
+        except Exception as e:
+            self._mark_down(e)
+            return False
@@ -11,8 +11,13 @@ import os
 from botocore.exceptions import ClientError, NoCredentialsError
 from botocore.config import Config
 
+from .services.memory_governor import get_memory_governor
+
 logger = logging.getLogger(__name__)
 
+# Parsed JSON (dicts, lists, str/float objects) is several times its wire size
+_PARSED_JSON_OVERHEAD = 6
+
 class S3IndexLoader:
     """Loads spatial indexes from S3 for production deployment"""
     
@@ -28,6 +33,10 @@ class S3IndexLoader:
             os.getenv('S3_SPATIAL_INDEX_KEY', 'indexes/spatial_index.json')
         ]
         
+        # Estimated footprint of the index currently held by the load_index LRU
+        self._cached_index_bytes = 0
+        get_memory_governor().register("s3_index_cache", self, rebuild_cost=4.0)
+        
     def _get_s3_client(self):
         """Lazy load S3 client with enhanced credential handling and debugging"""
         if not self.s3_client:
@@ -125,7 +134,9 @@ class S3IndexLoader:
             response = s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
             
             # Parse JSON
-            index_data = json.loads(response['Body'].read().decode('utf-8'))
+            raw_body = response['Body'].read()
+            index_data = json.loads(raw_body.decode('utf-8'))
+            self._cached_index_bytes = len(raw_body) * _PARSED_JSON_OVERHEAD
             
             # Log success with size info
             if 'file_count' in index_data:
@@ -198,7 +209,21 @@ class S3IndexLoader:
     def clear_cache(self):
         """Clear the LRU index cache"""
         self.load_index.cache_clear()
+        self._cached_index_bytes = 0
         logger.info("Index cache cleared")
+    
+    def memory_usage_bytes(self) -> int:
+        """Estimated resident bytes of the cached index (MemoryGovernor protocol)"""
+        if self.load_index.cache_info().currsize == 0:
+            return 0
+        return self._cached_index_bytes
+    
+    def evict_bytes(self, target_bytes: int) -> int:
+        """Drop the cached index; it is reloaded from S3 on next use"""
+        freed = self.memory_usage_bytes()
+        if freed:
+            self.clear_cache()
+        return freed
         
     def health_check(self) -> Dict[str, Any]:
         """Lightweight S3 health check with granular error handling"""
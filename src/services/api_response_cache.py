@@ -0,0 +1,278 @@
+"""
+Persistent API Response Cache - SQLite store for GPXZ / Google elevation results.
+
+API fallback calls cost seconds and count against small daily quotas
+(GPXZ 100/day, Google 2,500/day), while the in-memory elevation cache is lost
+on every restart and is private to each worker. This cache keeps successful
+API results on local disk keyed by quantized coordinate so they survive
+restarts and are shared by all workers on the same host (SQLite WAL mode
+allows concurrent readers alongside a single writer).
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+PRAGMA auto_vacuum = INCREMENTAL;
+CREATE TABLE IF NOT EXISTS api_elevations (
+    provider   TEXT    NOT NULL,
+    qlat       INTEGER NOT NULL,
+    qlon       INTEGER NOT NULL,
+    elevation  REAL    NOT NULL,
+    fetched_at REAL    NOT NULL,
+    last_hit   REAL    NOT NULL,
+    hits       INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (provider, qlat, qlon)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_api_elevations_last_hit ON api_elevations (last_hit);
+"""
+
+
+class PersistentAPIResponseCache:
+    """
+    Host-local persistent cache of external elevation API results.
+
+    Keys are (provider, round(lat * 10^precision), round(lon * 10^precision)),
+    so precision=5 shares results within ~1.1 m. Only successful (non-None)
+    elevations are stored; failures must stay retryable.
+    """
+
+    def __init__(self, path: str, precision: int = 5, ttl_seconds: Optional[float] = None,
+                 max_entries: int = 1_000_000):
+        self.path = path
+        self.precision = precision
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._scale = 10 ** precision
+        self._local = threading.local()
+
+        # In-process counters; the row count is the cross-worker view
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._stats_lock = threading.Lock()
+        self._last_compaction: Optional[Dict[str, Any]] = None
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+        logger.info(f"Persistent API response cache at {path} (precision={precision}dp, max_entries={max_entries})")
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; sqlite3 connections are not thread-safe."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _quantize(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(round(lat * self._scale)), int(round(lon * self._scale))
+
+    def _count(self, provider: str, field: str, n: int = 1) -> None:
+        with self._stats_lock:
+            stats = self._stats.setdefault(provider, {"hits": 0, "misses": 0, "writes": 0})
+            stats[field] += n
+
+    def get_many(self, provider: str, points: Sequence[Tuple[float, float]]) -> List[Optional[float]]:
+        """Look up elevations for points; None marks a miss."""
+        if not points:
+            return []
+        now = time.time()
+        keys = [self._quantize(lat, lon) for lat, lon in points]
+        min_fetched = now - self.ttl_seconds if self.ttl_seconds else 0.0
+
+        found: Dict[Tuple[int, int], float] = {}
+        conn = self._connection()
+        try:
+            # Chunk to stay under SQLite's bound-parameter limit
+            unique_keys = list(dict.fromkeys(keys))
+            for start in range(0, len(unique_keys), 400):
+                chunk = unique_keys[start:start + 400]
+                clause = " OR ".join(["(qlat = ? AND qlon = ?)"] * len(chunk))
+                params: List[Any] = [provider, min_fetched]
+                for qlat, qlon in chunk:
+                    params.extend((qlat, qlon))
+                rows = conn.execute(
+                    f"SELECT qlat, qlon, elevation FROM api_elevations "
+                    f"WHERE provider = ? AND fetched_at >= ? AND ({clause})",
+                    params,
+                ).fetchall()
+                found.update({(qlat, qlon): elevation for qlat, qlon, elevation in rows})
+
+            if found:
+                conn.executemany(
+                    "UPDATE api_elevations SET hits = hits + 1, last_hit = ? "
+                    "WHERE provider = ? AND qlat = ? AND qlon = ?",
+                    [(now, provider, qlat, qlon) for qlat, qlon in found],
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent API cache read failed ({provider}): {e}")
+            found = {}
+
+        results = [found.get(key) for key in keys]
+        hits = sum(1 for r in results if r is not None)
+        self._count(provider, "hits", hits)
+        self._count(provider, "misses", len(results) - hits)
+        return results
+
+    def put_many(self, provider: str, points: Sequence[Tuple[float, float]],
+                 elevations: Sequence[Optional[float]]) -> int:
+        """Store successful elevations. Returns the number of rows written."""
+        now = time.time()
+        rows = [
+            (provider, *self._quantize(lat, lon), float(elevation), now, now)
+            for (lat, lon), elevation in zip(points, elevations)
+            if elevation is not None
+        ]
+        if not rows:
+            return 0
+        try:
+            self._connection().executemany(
+                "INSERT INTO api_elevations (provider, qlat, qlon, elevation, fetched_at, last_hit) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(provider, qlat, qlon) DO UPDATE SET "
+                "elevation = excluded.elevation, fetched_at = excluded.fetched_at",
+                rows,
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent API cache write failed ({provider}): {e}")
+            return 0
+        self._count(provider, "writes", len(rows))
+        return len(rows)
+
+    def get(self, provider: str, lat: float, lon: float) -> Optional[float]:
+        return self.get_many(provider, [(lat, lon)])[0]
+
+    def put(self, provider: str, lat: float, lon: float, elevation: Optional[float]) -> None:
+        self.put_many(provider, [(lat, lon)], [elevation])
+
+    async def get_async(self, provider: str, lat: float, lon: float) -> Optional[float]:
+        """Non-blocking lookup for use on the event loop."""
+        return await asyncio.to_thread(self.get, provider, lat, lon)
+
+    async def put_async(self, provider: str, lat: float, lon: float, elevation: Optional[float]) -> None:
+        await asyncio.to_thread(self.put, provider, lat, lon, elevation)
+
+    async def get_many_async(self, provider: str, points: Sequence[Tuple[float, float]]) -> List[Optional[float]]:
+        return await asyncio.to_thread(self.get_many, provider, points)
+
+    async def put_many_async(self, provider: str, points: Sequence[Tuple[float, float]],
+                             elevations: Sequence[Optional[float]]) -> int:
+        return await asyncio.to_thread(self.put_many, provider, points, elevations)
+
+    def compact(self) -> Dict[str, Any]:
+        """
+        Drop expired rows, trim to max_entries by least recent use, and
+        checkpoint the WAL so the database file does not grow unbounded.
+        """
+        started = time.time()
+        conn = self._connection()
+        expired = trimmed = 0
+        try:
+            if self.ttl_seconds:
+                expired = conn.execute(
+                    "DELETE FROM api_elevations WHERE fetched_at < ?", (started - self.ttl_seconds,)
+                ).rowcount
+            total = conn.execute("SELECT COUNT(*) FROM api_elevations").fetchone()[0]
+            overflow = total - self.max_entries
+            if overflow > 0:
+                trimmed = conn.execute(
+                    "DELETE FROM api_elevations WHERE (provider, qlat, qlon) IN ("
+                    "SELECT provider, qlat, qlon FROM api_elevations ORDER BY last_hit ASC LIMIT ?)",
+                    (overflow,),
+                ).rowcount
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            if expired or trimmed:
+                conn.execute("PRAGMA incremental_vacuum")
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent API cache compaction failed: {e}")
+
+        self._last_compaction = {
+            "completed_at": time.time(),
+            "duration_ms": round((time.time() - started) * 1000, 1),
+            "expired_removed": expired,
+            "trimmed_removed": trimmed,
+        }
+        logger.info(f"Persistent API cache compaction: {self._last_compaction}")
+        return self._last_compaction
+
+    async def run_compaction_loop(self, interval_seconds: float) -> None:
+        """Background compaction job; cancel the task to stop it."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(self.compact)
+            except Exception as e:
+                logger.warning(f"Persistent API cache compaction loop error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss metrics per provider plus on-disk footprint."""
+        with self._stats_lock:
+            providers = {}
+            for provider, stats in self._stats.items():
+                lookups = stats["hits"] + stats["misses"]
+                providers[provider] = {
+                    **stats,
+                    "hit_rate": f"{stats['hits'] / lookups:.2%}" if lookups else "0.00%",
+                }
+        try:
+            entries = self._connection().execute("SELECT COUNT(*) FROM api_elevations").fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        try:
+            size_bytes = os.path.getsize(self.path)
+        except OSError:
+            size_bytes = 0
+        return {
+            "path": self.path,
+            "precision_dp": self.precision,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "size_mb": round(size_bytes / (1024 * 1024), 2),
+            "providers": providers,
+            "last_compaction": self._last_compaction,
+        }
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# Global cache instance (None until configured at startup)
+_api_response_cache: Optional[PersistentAPIResponseCache] = None
+
+
+def configure_api_response_cache(settings: Any) -> Optional[PersistentAPIResponseCache]:
+    """Create the global persistent cache from settings (None when disabled)."""
+    global _api_response_cache
+    if not getattr(settings, 'API_RESPONSE_CACHE_ENABLED', False):
+        _api_response_cache = None
+        return None
+    try:
+        ttl_days = getattr(settings, 'API_RESPONSE_CACHE_TTL_DAYS', None)
+        _api_response_cache = PersistentAPIResponseCache(
+            path=settings.API_RESPONSE_CACHE_PATH,
+            precision=settings.API_RESPONSE_CACHE_PRECISION,
+            ttl_seconds=ttl_days * 86400 if ttl_days else None,
+            max_entries=settings.API_RESPONSE_CACHE_MAX_ENTRIES,
+        )
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Persistent API response cache unavailable, continuing without it: {e}")
+        _api_response_cache = None
+    return _api_response_cache
+
+
+def get_api_response_cache() -> Optional[PersistentAPIResponseCache]:
+    """Get the global persistent API response cache, if configured."""
+    return _api_response_cache
@@ -0,0 +1,269 @@
+"""
+Bulk Elevation Service - high-volume point sampling streamed as NDJSON.
+
+/points and /path run the full single-point pipeline per coordinate and are
+capped at 50/100 points. Design tools need 10k-100k points per alignment, so
+this service works on chunks of the input instead:
+- plan reads by file: one vectorized pass assigns every point in a chunk to
+  its highest-priority covering file (CoverageService.assign_points)
+- read by tile: each file is sampled once per chunk, grouped by tile, through
+  the shared raster tile cache (single-flighted cold fetches)
+- only uncovered/NODATA points fall back to the per-point pipeline, whose
+  API misses are then resolved with batched GPXZ/Google calls
+Chunks are emitted in input order with one chunk of lookahead, so memory is
+bounded by two chunks regardless of request size. Each point is charged
+against a daily per-client cost quota instead of a hard per-request cap.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .coverage_service import CoverageService, CoveringFile, find_unified_source
+from .tile_cache import get_raster_tile_cache, raster_env, to_vsi_path
+
+logger = logging.getLogger(__name__)
+
+_API_SOURCE_TAGS = ("gpxz", "google")
+
+
+def _is_api_source(source: Optional[str]) -> bool:
+    return bool(source) and any(tag in source.lower() for tag in _API_SOURCE_TAGS)
+
+
+def sample_file_direct(file_path: str, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Sample many points from one file with a single open (tile cache disabled)."""
+    import rasterio
+    from pyproj import Transformer
+
+    vsi_path = to_vsi_path(file_path)
+    with raster_env(vsi_path), rasterio.open(vsi_path) as dataset:
+        transformer = Transformer.from_crs("EPSG:4326", dataset.crs.to_wkt(), always_xy=True)
+        xs, ys = transformer.transform(lons, lats)
+        # Sort by row so consecutive samples hit the same internal blocks
+        rows = dataset.index(xs, ys)[0]
+        order = np.argsort(rows, kind="stable")
+        values = np.full(len(lats), np.nan, dtype=np.float64)
+        sampled = dataset.sample([(xs[i], ys[i]) for i in order], indexes=1, masked=True)
+        for position, value in zip(order, sampled):
+            if not np.ma.is_masked(value[0]):
+                values[position] = float(value[0])
+    return values
+
+
+@dataclass
+class BulkRunState:
+    """Accounting for one bulk request, shared across its chunks."""
+    client_id: str
+    started: float = field(default_factory=time.time)
+    total_points: int = 0
+    successful_points: int = 0
+    s3_points: int = 0
+    fallback_points: int = 0
+    quota_units_charged: int = 0
+    quota_exhausted: bool = False
+
+    def summary(self, quota_remaining: int) -> Dict[str, Any]:
+        return {
+            "total_points": self.total_points,
+            "successful_points": self.successful_points,
+            "s3_points": self.s3_points,
+            "fallback_points": self.fallback_points,
+            "quota_units_charged": self.quota_units_charged,
+            "quota_remaining": quota_remaining,
+            "quota_exhausted": self.quota_exhausted,
+            "duration_ms": round((time.time() - self.started) * 1000, 1),
+        }
+
+
+class BulkElevationService:
+    """Chunked, file-planned elevation sampling for large coordinate arrays."""
+
+    def __init__(self, elevation_service: Any, quota: Any, max_points: int = 100_000, chunk_size: int = 2000,
+                 s3_point_cost: int = 1, api_point_cost: int = 50, max_fallback_points: int = 200,
+                 file_concurrency: int = 4, fallback_concurrency: int = 8):
+        self.elevation_service = elevation_service
+        self.quota = quota
+        self.max_points = max_points
+        self.chunk_size = chunk_size
+        self.s3_point_cost = s3_point_cost
+        self.api_point_cost = api_point_cost
+        self.max_fallback_points = max_fallback_points
+        self.file_concurrency = file_concurrency
+        self.fallback_concurrency = fallback_concurrency
+
+    def estimate_cost(self, num_points: int) -> int:
+        """Minimum units a request will consume (every point served from S3)."""
+        return num_points * self.s3_point_cost
+
+    async def stream_ndjson(self, points: Sequence[Tuple[float, float]], client_id: str) -> AsyncIterator[bytes]:
+        """Yield NDJSON result lines in input order, then a summary line."""
+        state = BulkRunState(client_id=client_id, total_points=len(points))
+        starts = list(range(0, len(points), self.chunk_size))
+
+        pending: Optional[asyncio.Task] = None
+        try:
+            if starts:
+                pending = asyncio.create_task(self._process_chunk(points, starts[0], state))
+            for position, start in enumerate(starts):
+                results = await pending
+                # Keep one chunk of lookahead in flight while this one is sent
+                pending = None
+                if position + 1 < len(starts):
+                    pending = asyncio.create_task(self._process_chunk(points, starts[position + 1], state))
+                yield "".join(json.dumps(result) + "\n" for result in results).encode()
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+
+        remaining = await asyncio.to_thread(self.quota.remaining, client_id)
+        yield (json.dumps({"summary": state.summary(remaining)}) + "\n").encode()
+
+    async def _process_chunk(self, points: Sequence[Tuple[float, float]], start: int,
+                             state: BulkRunState) -> List[Dict[str, Any]]:
+        chunk = points[start:start + self.chunk_size]
+        lats = np.fromiter((p[0] for p in chunk), dtype=np.float64, count=len(chunk))
+        lons = np.fromiter((p[1] for p in chunk), dtype=np.float64, count=len(chunk))
+        elevations = np.full(len(chunk), np.nan, dtype=np.float64)
+        sources: List[Optional[str]] = [None] * len(chunk)
+        errors: List[Optional[str]] = [None] * len(chunk)
+
+        units = self.estimate_cost(len(chunk))
+        if state.quota_exhausted or not await asyncio.to_thread(self.quota.consume, state.client_id, units):
+            state.quota_exhausted = True
+            return self._render(start, lats, lons, elevations, sources, ["quota_exceeded"] * len(chunk))
+        state.quota_units_charged += units
+
+        await self._sample_from_files(lats, lons, elevations, sources)
+        state.s3_points += int((~np.isnan(elevations)).sum())
+        await self._fallback(lats, lons, elevations, sources, errors, state)
+
+        served = ~np.isnan(elevations)
+        state.successful_points += int(served.sum())
+        return self._render(start, lats, lons, elevations, sources, errors)
+
+    async def _sample_from_files(self, lats: np.ndarray, lons: np.ndarray, elevations: np.ndarray,
+                                 sources: List[Optional[str]]) -> None:
+        source = find_unified_source(self.elevation_service)
+        if source is None:
+            return
+        coverage = CoverageService(source)
+        assignment, files = await asyncio.to_thread(coverage.assign_points, lats, lons)
+
+        tile_cache = get_raster_tile_cache()
+        semaphore = asyncio.Semaphore(self.file_concurrency)
+
+        async def sample(file_number: int, covering: CoveringFile) -> None:
+            members = np.nonzero(assignment == file_number)[0]
+            async with semaphore:
+                try:
+                    if tile_cache is not None:
+                        values = await asyncio.to_thread(
+                            tile_cache.sample_many, covering.file_path, lats[members], lons[members]
+                        )
+                    else:
+                        values = await asyncio.to_thread(
+                            sample_file_direct, covering.file_path, lats[members], lons[members]
+                        )
+                except Exception as e:
+                    # Leave these points to the per-point fallback pipeline
+                    logger.warning(f"Bulk sampling failed for {covering.filename}: {e}")
+                    return
+            elevations[members] = values
+            for i in members[~np.isnan(values)]:
+                sources[i] = covering.filename
+
+        await asyncio.gather(*(sample(n, f) for n, f in enumerate(files)))
+
+    async def _fallback(self, lats: np.ndarray, lons: np.ndarray, elevations: np.ndarray,
+                        sources: List[Optional[str]], errors: List[Optional[str]], state: BulkRunState) -> None:
+        """Per-point pipeline (other collections) then batched APIs for points the files did not answer."""
+        missing = [int(i) for i in np.nonzero(np.isnan(elevations))[0]]
+        if not missing:
+            return
+
+        # Reserve fallback slots and worst-case API units before the first await,
+        # so concurrent chunks cannot all pass the cap and quota checks
+        slots = max(0, min(len(missing), self.max_fallback_points - state.fallback_points))
+        state.fallback_points += slots
+        for i in missing[slots:]:
+            errors[i] = "fallback_limit_reached"
+        missing = missing[:slots]
+
+        extra = max(0, self.api_point_cost - self.s3_point_cost)
+        reserved = await self._reserve_api_units(state, len(missing), extra)
+        for i in missing[reserved:]:
+            errors[i] = "quota_exceeded"
+        state.fallback_points -= len(missing) - reserved
+        missing = missing[:reserved]
+        if not missing:
+            return
+
+        semaphore = asyncio.Semaphore(self.fallback_concurrency)
+        results: Dict[int, Any] = {}
+
+        async def resolve(i: int) -> None:
+            async with semaphore:
+                try:
+                    results[i] = await self.elevation_service.get_elevation(float(lats[i]), float(lons[i]))
+                except Exception as e:
+                    errors[i] = str(e)
+
+        with self.elevation_service.deferred_api_fallback() as deferred:
+            await asyncio.gather(*(resolve(i) for i in missing))
+        if deferred:
+            misses = [i for i, result in results.items() if result.elevation_m is None]
+            batched = await self.elevation_service.resolve_api_fallback_batch(
+                [(float(lats[i]), float(lons[i])) for i in misses]
+            )
+            for i, result in zip(misses, batched):
+                if result is not None:
+                    results[i] = result
+
+        # Charge by what actually served the point; the S3 share was prepaid with the chunk
+        api_served = 0
+        for i, result in results.items():
+            if _is_api_source(result.dem_source_used):
+                api_served += 1
+            if result.elevation_m is None:
+                errors[i] = result.message or "No elevation found"
+                continue
+            elevations[i] = result.elevation_m
+            sources[i] = result.dem_source_used
+        state.quota_units_charged += api_served * extra
+        await asyncio.to_thread(self.quota.refund, state.client_id, (len(missing) - api_served) * extra)
+
+    async def _reserve_api_units(self, state: BulkRunState, points: int, extra: int) -> int:
+        """Charge worst-case API cost for up to `points` lookups; returns how many were covered."""
+        if points == 0 or extra <= 0:
+            return points
+        if await asyncio.to_thread(self.quota.consume, state.client_id, points * extra):
+            return points
+        # Not enough for all of them: take what is left, still through the atomic consume
+        affordable = min(points, await asyncio.to_thread(self.quota.remaining, state.client_id) // extra)
+        if affordable and await asyncio.to_thread(self.quota.consume, state.client_id, affordable * extra):
+            state.quota_exhausted = True
+            return affordable
+        state.quota_exhausted = True
+        return 0
+
+    @staticmethod
+    def _render(start: int, lats: np.ndarray, lons: np.ndarray, elevations: np.ndarray,
+                sources: List[Optional[str]], errors: List[Optional[str]]) -> List[Dict[str, Any]]:
+        results = []
+        for i in range(len(lats)):
+            value = elevations[i]
+            results.append({
+                "index": start + i,
+                "lat": float(lats[i]),
+                "lon": float(lons[i]),
+                "elevation": None if np.isnan(value) else round(float(value), 3),
+                "source": sources[i],
+                "error": errors[i],
+            })
+        return results
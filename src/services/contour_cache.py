@@ -0,0 +1,259 @@
+"""
+Contour Result Cache - compressed, byte-bounded cache of polygon contour results.
+
+Users regenerate contours for the same site polygon with the same intervals
+many times a day, and every request re-read and re-traced the DEM. Results of
+generate_geojson_contours and get_dem_points_in_polygon are cached by:
+- a polygon fingerprint: vertices quantized to `precision` decimal places,
+  duplicate and closing vertices dropped, wound counter-clockwise and rotated
+  to start at the smallest vertex, so the same site drawn from another corner
+  or in the other direction hits the same entry
+- the request parameters (intervals, max_points, simplification), the source
+  and the unified index version, so an index reload invalidates everything
+
+Entries are JSON compressed with zlib in an in-process LRU bounded by
+compressed bytes. With Redis sharing enabled they are also published to Redis
+so workers on other hosts can reuse them.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..utils.fast_json import dumps, loads
+from .memory_governor import get_memory_governor
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+
+def polygon_fingerprint(polygon_coords: Sequence[Tuple[float, float]], precision: int = 6) -> List[Tuple[int, int]]:
+    """Canonical ring of quantized (lat, lon) vertices, independent of start vertex and winding."""
+    scale = 10 ** precision
+    ring: List[Tuple[int, int]] = []
+    for lat, lon in polygon_coords:
+        vertex = (int(round(lat * scale)), int(round(lon * scale)))
+        if not ring or vertex != ring[-1]:
+            ring.append(vertex)
+    if len(ring) > 1 and ring[0] == ring[-1]:
+        ring.pop()
+    if not ring:
+        return ring
+
+    # Shoelace in (lon, lat): negative twice-area means clockwise
+    twice_area = sum(ring[i - 1][1] * v[0] - v[1] * ring[i - 1][0] for i, v in enumerate(ring))
+    if twice_area < 0:
+        ring.reverse()
+    start = ring.index(min(ring))
+    return ring[start:] + ring[:start]
+
+
+class ContourResultCache:
+    """Byte-bounded LRU of compressed contour results, optionally shared through Redis."""
+
+    def __init__(self, max_bytes: int = 256 * _MB, precision: int = 6, shared: Optional[Any] = None,
+                 share_ttl_seconds: Optional[int] = None, compression_level: int = 6):
+        """
+        Args:
+            max_bytes: Budget for compressed entries held in this process
+            precision: Decimal places polygon vertices are quantized to (6 = ~0.1 m)
+            shared: RedisFetchLease used to publish entries for other workers
+            share_ttl_seconds: TTL of published entries (None disables sharing)
+        """
+        self.max_bytes = max_bytes
+        self.precision = precision
+        self.shared = shared
+        self.share_ttl_seconds = share_ttl_seconds
+        self.compression_level = compression_level
+
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "shared_hits": 0, "stores": 0, "evictions": 0,
+                       "raw_bytes_stored": 0, "compressed_bytes_stored": 0}
+        get_memory_governor().register("contour_results", self, rebuild_cost=3.0)
+        logger.info(f"ContourResultCache (max={max_bytes / _MB:.0f}MB, precision={precision}dp, "
+                    f"shared={shared is not None and bool(share_ttl_seconds)})")
+
+    def key(self, kind: str, polygon_coords: Sequence[Tuple[float, float]], source: Optional[str],
+            index_version: str, **params: Any) -> str:
+        """Cache key for one request; params are the result-shaping arguments."""
+        identity = [kind, polygon_fingerprint(polygon_coords, self.precision), source or "auto",
+                    index_version, sorted(params.items())]
+        return hashlib.sha256(json.dumps(identity, default=repr).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """The cached result, or None; a Redis copy is adopted into the local LRU."""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+
+        if payload is None and self._sharing:
+            payload = self.shared.fetch_published(self._shared_key(key))
+            if payload is not None:
+                self._remember(key, payload)
+                self._count("shared_hits")
+
+        if payload is None:
+            self._count("misses")
+            return None
+        try:
+            return loads(zlib.decompress(payload))
+        except (zlib.error, ValueError) as e:
+            logger.warning(f"Dropping unreadable contour cache entry {key[:12]}: {e}")
+            self.invalidate(key)
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable result."""
+        writer = self.writer(key)
+        writer.write(dumps(value))
+        writer.commit()
+
+    def writer(self, key: str) -> "_EntryWriter":
+        """
+        Incremental store for a result whose JSON is produced in pieces (a
+        streamed response); only compressed bytes are held until commit().
+        """
+        return _EntryWriter(self, key)
+
+    def _store(self, key: str, payload: bytes, raw_size: int) -> None:
+        if len(payload) > self.max_bytes:
+            return
+        self._remember(key, payload)
+        with self._lock:
+            self._stats["stores"] += 1
+            self._stats["raw_bytes_stored"] += raw_size
+            self._stats["compressed_bytes_stored"] += len(payload)
+        if self._sharing:
+            self.shared.publish(self._shared_key(key), payload, self.share_ttl_seconds)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            payload = self._entries.pop(key, None)
+            if payload is not None:
+                self._bytes -= len(payload)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def _sharing(self) -> bool:
+        return self.shared is not None and bool(self.share_ttl_seconds)
+
+    @staticmethod
+    def _shared_key(key: str) -> str:
+        return f"result:{key}"
+
+    def _remember(self, key: str, payload: bytes) -> None:
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = payload
+            self._bytes += len(payload)
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._stats["evictions"] += 1
+
+    def memory_usage_bytes(self) -> int:
+        """Compressed bytes held (MemoryGovernor protocol)"""
+        return self._bytes
+
+    def evict_bytes(self, target_bytes: int) -> int:
+        """Drop least recently used entries until roughly target_bytes are released"""
+        freed = 0
+        with self._lock:
+            while freed < target_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                freed += len(evicted)
+                self._stats["evictions"] += 1
+        return freed
+
+    def cache_hit_rate(self) -> Optional[float]:
+        with self._lock:
+            hits = self._stats["hits"] + self._stats["shared_hits"]
+            lookups = hits + self._stats["misses"]
+        return hits / lookups if lookups else None
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["size_mb"] = round(self._bytes / _MB, 2)
+        lookups = stats["hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_rate"] = f"{(stats['hits'] + stats['shared_hits']) / lookups:.2%}" if lookups else "0.00%"
+        stats["compression_ratio"] = (
+            round(stats["raw_bytes_stored"] / stats["compressed_bytes_stored"], 1)
+            if stats["compressed_bytes_stored"] else None
+        )
+        stats["max_mb"] = round(self.max_bytes / _MB, 1)
+        return stats
+
+
+class _EntryWriter:
+    """Compresses JSON pieces of one cache entry as they are written."""
+
+    def __init__(self, cache: ContourResultCache, key: str):
+        self._cache = cache
+        self._key = key
+        self._compressor = zlib.compressobj(cache.compression_level)
+        self._parts: List[bytes] = []
+        self._raw_size = 0
+
+    def write(self, data: bytes) -> None:
+        self._raw_size += len(data)
+        compressed = self._compressor.compress(data)
+        if compressed:
+            self._parts.append(compressed)
+
+    def commit(self) -> None:
+        self._parts.append(self._compressor.flush())
+        self._cache._store(self._key, b"".join(self._parts), self._raw_size)
+        self._parts = []
+
+
+# Global contour cache instance (None until configured at startup)
+_contour_result_cache: Optional[ContourResultCache] = None
+
+
+def configure_contour_result_cache(settings: Any) -> Optional[ContourResultCache]:
+    """Create the global contour result cache from settings (None when disabled)."""
+    global _contour_result_cache
+    if not getattr(settings, 'CONTOUR_CACHE_ENABLED', False):
+        _contour_result_cache = None
+        return None
+    shared = None
+    if getattr(settings, 'CONTOUR_CACHE_REDIS_SHARE', False):
+        from ..redis_state_manager import RedisFetchLease, RedisStateManager
+        shared = RedisFetchLease(
+            RedisStateManager(app_env=getattr(settings, 'APP_ENV', None)),
+            namespace="contour_cache",
+        )
+    _contour_result_cache = ContourResultCache(
+        max_bytes=settings.CONTOUR_CACHE_MAX_MB * _MB,
+        precision=settings.CONTOUR_CACHE_PRECISION,
+        shared=shared,
+        share_ttl_seconds=settings.CONTOUR_CACHE_REDIS_TTL_SECONDS if shared is not None else None,
+    )
+    return _contour_result_cache
+
+
+def get_contour_result_cache() -> Optional[ContourResultCache]:
+    """Get the global contour result cache, if configured."""
+    return _contour_result_cache
@@ -0,0 +1,278 @@
+"""
+Contour Tile Service - contour lines as Mapbox Vector Tiles on the web-mercator grid.
+
+Frontends asked for GeoJSON contours per arbitrary polygon, so identical areas
+were recomputed on every pan. Tiles make map views cacheable:
+- each z/x/y tile is contoured from the unified-index campaign mosaic over the
+  tile plus a small buffer, so lines from neighbouring tiles meet at the edge
+- the contour interval is chosen by zoom (coarse at z10, 0.5 m at z17+)
+- lines are projected to tile coordinates, clipped to the buffered tile,
+  simplified to about a tile unit and encoded as one "contours" layer
+- encoded tiles are cached in memory (LRU) and on disk, keyed by the unified
+  index version, so an index reload invalidates every cached tile; tiles no
+  campaign covers are kept in memory only, and tiles from a mosaic with an
+  unreadable file are served but not cached
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pyproj import Transformer
+from shapely import clip_by_rect
+from shapely.geometry import LineString
+
+from ..utils.http_cache import get_index_version
+from ..utils.mvt import DEFAULT_EXTENT, encode_tile
+from .coverage_service import find_unified_index
+from .raster_export_service import InMemoryDataset, RasterExportService
+
+logger = logging.getLogger(__name__)
+
+MIN_ZOOM = 10
+MAX_ZOOM = 18
+
+# (minor, major) contour interval in metres per zoom
+ZOOM_INTERVALS: Dict[int, Tuple[float, float]] = {
+    10: (50.0, 250.0),
+    11: (25.0, 100.0),
+    12: (10.0, 50.0),
+    13: (5.0, 25.0),
+    14: (2.0, 10.0),
+    15: (1.0, 5.0),
+    16: (1.0, 5.0),
+    17: (0.5, 2.5),
+    18: (0.5, 2.5),
+}
+
+LAYER_NAME = "contours"
+_WORLD_HALF = 20037508.342789244  # EPSG:3857 half-width in metres
+_TO_WGS84 = Transformer.from_crs("EPSG:3857", "EPSG:4326", always_xy=True)
+_TO_MERCATOR = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
+
+
+def mercator_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(min_x, min_y, max_x, max_y) of an XYZ tile in EPSG:3857."""
+    size = 2 * _WORLD_HALF / (1 << z)
+    min_x = -_WORLD_HALF + x * size
+    max_y = _WORLD_HALF - y * size
+    return min_x, max_y - size, min_x + size, max_y
+
+
+def check_tile(z: int, x: int, y: int) -> None:
+    """ValueError unless z/x/y is a tile this service renders."""
+    if not MIN_ZOOM <= z <= MAX_ZOOM:
+        raise ValueError(f"Contour tiles are available from zoom {MIN_ZOOM} to {MAX_ZOOM}")
+    if not (0 <= x < (1 << z) and 0 <= y < (1 << z)):
+        raise ValueError(f"Tile {z}/{x}/{y} is outside the zoom {z} grid")
+
+
+class ContourTileService:
+    """Renders, caches and serves contour vector tiles."""
+
+    def __init__(self, contour_service: Any, raster_export_service: RasterExportService, elevation_service: Any,
+                 cache_dir: str, memory_tiles: int = 1024, max_cells: int = 512 * 512,
+                 extent: int = DEFAULT_EXTENT, buffer: int = 64):
+        """
+        Args:
+            max_cells: DEM cell budget per tile (the mosaic is coarsened beyond it)
+            extent: Tile coordinate extent
+            buffer: Tile units contoured and kept beyond each tile edge
+        """
+        self.contour_service = contour_service
+        self.raster_export_service = raster_export_service
+        self.elevation_service = elevation_service
+        self.cache_dir = cache_dir
+        self.memory_tiles = memory_tiles
+        self.max_cells = max_cells
+        self.extent = extent
+        self.buffer = buffer
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._disk_version: Optional[str] = None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "rendered": 0, "empty": 0, "uncovered": 0, "partial": 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------ cache
+    def index_version(self) -> Optional[str]:
+        """Short digest of the loaded unified index version, or None when no index is loaded."""
+        unified_index = find_unified_index(self.elevation_service)
+        if unified_index is None:
+            return None
+        token, _ = get_index_version(unified_index)
+        return hashlib.sha1(token.encode()).hexdigest()[:12]
+
+    def _tile_path(self, version: str, z: int, x: int, y: int) -> str:
+        return os.path.join(self.cache_dir, version, str(z), str(x), f"{y}.mvt")
+
+    def _remember(self, key: str, tile: bytes) -> None:
+        with self._lock:
+            self._memory[key] = tile
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_tiles:
+                self._memory.popitem(last=False)
+
+    def _read_disk(self, path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Could not read cached contour tile {path}: {e}")
+            return None
+
+    def _write_disk(self, version: str, path: str, tile: bytes) -> None:
+        """Atomic write; the first write for a new index version drops older versions' tiles."""
+        if self._disk_version != version:
+            self._disk_version = version
+            for entry in os.listdir(self.cache_dir):
+                if entry != version:
+                    shutil.rmtree(os.path.join(self.cache_dir, entry), ignore_errors=True)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(tile)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not cache contour tile {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, memory_tiles=len(self._memory))
+
+    # ----------------------------------------------------------------- serving
+    async def get_tile(self, z: int, x: int, y: int) -> Optional[Tuple[bytes, str]]:
+        """
+        (encoded tile, status), the tile b"" when it has no contours, or None
+        when no unified index is loaded. Status is "memory", "disk" or a
+        _render status; "partial" tiles must not be cached downstream.
+        Concurrent requests for one tile share a single render.
+        """
+        check_tile(z, x, y)
+        version = self.index_version()
+        if version is None:
+            return None
+        key = f"{version}/{z}/{x}/{y}"
+
+        with self._lock:
+            tile = self._memory.get(key)
+            if tile is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return tile, "memory"
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            tile, status = await asyncio.to_thread(self._load_or_render, version, z, x, y)
+            if status != "partial":
+                self._remember(key, tile)
+            future.set_result((tile, status))
+            return tile, status
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters re-raise it; the leader's own raise below is the one that matters
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _load_or_render(self, version: str, z: int, x: int, y: int) -> Tuple[bytes, str]:
+        """(tile, status) from disk or a fresh render; only complete renders of covered tiles are written."""
+        path = self._tile_path(version, z, x, y)
+        tile = self._read_disk(path)
+        if tile is not None:
+            self._count("disk_hits")
+            return tile, "disk"
+        tile, status = self._render(z, x, y)
+        self._count(status)
+        if status in ("rendered", "empty"):
+            self._write_disk(version, path, tile)
+        return tile, status
+
+    def render(self, z: int, x: int, y: int) -> bytes:
+        """Contour one tile from the campaign mosaic (b"" where nothing covers it)."""
+        return self._render(z, x, y)[0]
+
+    def _render(self, z: int, x: int, y: int) -> Tuple[bytes, str]:
+        """
+        (tile, status): "rendered", "empty" (covered, no contours), "uncovered"
+        or "partial" (a covering file could not be read).
+        """
+        min_x, min_y, max_x, max_y = mercator_bounds(z, x, y)
+        unit = (max_x - min_x) / self.extent
+        pad = self.buffer * unit
+        corners_x = [min_x - pad, max_x + pad, max_x + pad, min_x - pad]
+        corners_y = [max_y + pad, max_y + pad, min_y - pad, min_y - pad]
+        lons, lats = _TO_WGS84.transform(corners_x, corners_y)
+        polygon_coords = list(zip(lats, lons))
+
+        try:
+            grid = self.raster_export_service.polygon_grid(polygon_coords, self.max_cells)
+        except ValueError:
+            return b"", "uncovered"  # No campaign covers this tile
+        if grid is None:
+            return b"", "uncovered"
+        status = "rendered" if grid.complete else "partial"
+
+        minor, major = ZOOM_INTERVALS[z]
+        transformer = Transformer.from_crs("EPSG:4326", grid.spec.crs_wkt, always_xy=True)
+        geojson, _, error_message = self.contour_service.trace_contours(
+            InMemoryDataset(grid), transformer, polygon_coords, self.max_cells, minor, major, 0.0
+        )
+        if error_message or not geojson.get("features"):
+            return b"", "empty" if status == "rendered" else status
+
+        features = self._tile_features(geojson["features"], min_x, max_y, unit)
+        return encode_tile({LAYER_NAME: features}, self.extent), status
+
+    def _tile_features(self, features: List[Dict[str, Any]], min_x: float, max_y: float,
+                       unit: float) -> List[Dict[str, Any]]:
+        """GeoJSON lines (lon/lat) as integer tile coordinates, clipped to the buffered tile."""
+        coords = [np.asarray(f["geometry"]["coordinates"], dtype=np.float64) for f in features]
+        all_lons = np.concatenate([c[:, 0] for c in coords])
+        all_lats = np.concatenate([c[:, 1] for c in coords])
+        mx, my = _TO_MERCATOR.transform(all_lons, all_lats)
+        tile_x = (np.asarray(mx) - min_x) / unit
+        tile_y = (max_y - np.asarray(my)) / unit
+        splits = np.cumsum([len(c) for c in coords])[:-1]
+
+        low, high = -self.buffer, self.extent + self.buffer
+        tile_features = []
+        for feature, xs, ys in zip(features, np.split(tile_x, splits), np.split(tile_y, splits)):
+            clipped = clip_by_rect(LineString(np.column_stack([xs, ys])), low, low, high, high)
+            if clipped.is_empty:
+                continue
+            clipped = clipped.simplify(1.0)
+            parts = getattr(clipped, "geoms", [clipped])
+            lines = [[(int(round(px)), int(round(py))) for px, py in part.coords]
+                     for part in parts if part.geom_type == "LineString"]
+            if lines:
+                properties = feature["properties"]
+                tile_features.append({"lines": lines, "properties": {
+                    "elevation": float(properties["elevation"]),
+                    "type": properties["type"],
+                    "interval": float(properties["interval"]),
+                }})
+        return tile_features
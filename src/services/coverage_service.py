@@ -0,0 +1,203 @@
+"""
+Coverage Service - resolve geometries to covering files via the unified index.
+
+Point queries go through CollectionHandlerRegistry one coordinate at a time.
+Area features (prefetch, clips, grids, mosaics) need every file intersecting a
+polygon or buffered polyline instead, ranked by the same collection priority.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+from pyproj import Transformer
+from shapely.geometry import LineString, Polygon, box
+from shapely.geometry.base import BaseGeometry
+
+logger = logging.getLogger(__name__)
+
+
+def find_unified_index(elevation_service: Any) -> Optional[Any]:
+    """Locate the loaded UnifiedWGS84SpatialIndex behind an elevation service.
+
+    Handles both a direct unified S3 source and a FallbackDataSource chain.
+    """
+    source = find_unified_source(elevation_service)
+    return source.unified_index if source is not None else None
+
+
+def find_unified_source(elevation_service: Any) -> Optional[Any]:
+    """Locate the unified S3 source (the object holding unified_index)."""
+    provider = getattr(elevation_service, "unified_provider", None)
+    elevation_source = getattr(provider, "elevation_source", None) if provider else None
+    if elevation_source is None:
+        return None
+
+    if getattr(elevation_source, "unified_index", None):
+        return elevation_source
+
+    for source in getattr(elevation_source, "sources", None) or []:
+        if getattr(source, "unified_index", None):
+            return source
+    return None
+
+
+def reproject_geometry(geometry: BaseGeometry, src_crs: str, dst_crs: str) -> BaseGeometry:
+    """Reproject a shapely geometry with one vectorized pyproj call per coordinate array."""
+    transformer = Transformer.from_crs(src_crs, dst_crs, always_xy=True)
+
+    def _transform(coords: np.ndarray) -> np.ndarray:
+        x, y = transformer.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack([x, y])
+
+    return shapely.transform(geometry, _transform)
+
+
+def local_metric_crs(lon: float, lat: float) -> str:
+    """UTM zone EPSG code for a WGS84 location (metre units for buffering)."""
+    zone = int((lon + 180) // 6) + 1
+    return f"EPSG:{(32700 if lat < 0 else 32600) + zone}"
+
+
+def build_geometry(coordinates: Sequence[Tuple[float, float]], geometry_type: str,
+                   buffer_m: float = 0.0) -> BaseGeometry:
+    """
+    Build a WGS84 (lon/lat) shapely geometry, buffered in metres.
+
+    Args:
+        coordinates: (lat, lon) pairs
+        geometry_type: "polygon" or "polyline"
+        buffer_m: Buffer distance in metres (required > 0 for a polyline to have area)
+    """
+    lonlat = [(lon, lat) for lat, lon in coordinates]
+    if geometry_type == "polygon":
+        if len(lonlat) < 3:
+            raise ValueError("A polygon needs at least 3 coordinates")
+        geometry = Polygon(lonlat)
+        if not geometry.is_valid:
+            geometry = geometry.buffer(0)
+    elif geometry_type == "polyline":
+        if len(lonlat) < 2:
+            raise ValueError("A polyline needs at least 2 coordinates")
+        geometry = LineString(lonlat)
+    else:
+        raise ValueError(f"Unsupported geometry type: {geometry_type}")
+
+    if buffer_m > 0:
+        centroid = geometry.centroid
+        metric_crs = local_metric_crs(centroid.x, centroid.y)
+        buffered = reproject_geometry(geometry, "EPSG:4326", metric_crs).buffer(buffer_m)
+        geometry = reproject_geometry(buffered, metric_crs, "EPSG:4326")
+    elif geometry_type == "polyline":
+        raise ValueError("A polyline needs buffer_m > 0 to define an area")
+    return geometry
+
+
+def _bounds_box(bounds: Any) -> Optional[BaseGeometry]:
+    if bounds is None:
+        return None
+    if isinstance(bounds, dict):
+        if "min_lat" not in bounds:
+            return None
+        return box(bounds["min_lon"], bounds["min_lat"], bounds["max_lon"], bounds["max_lat"])
+    if hasattr(bounds, "min_lat"):
+        return box(bounds.min_lon, bounds.min_lat, bounds.max_lon, bounds.max_lat)
+    return None
+
+
+@dataclass
+class CoveringFile:
+    """A file intersecting a query geometry, with its collection context."""
+    collection_id: str
+    file_path: str
+    filename: str
+    priority: float
+    size_mb: float
+    coordinate_system: str
+    resolution_m: float
+    bounds: Tuple[float, float, float, float] = (-180.0, -90.0, 180.0, 90.0)  # min_lon, min_lat, max_lon, max_lat
+
+
+class CoverageService:
+    """Resolve WGS84 geometries to the unified-index files that cover them."""
+
+    def __init__(self, unified_source: Any):
+        self.unified_source = unified_source
+
+    @property
+    def unified_index(self):
+        return getattr(self.unified_source, "unified_index", None)
+
+    def find_files_for_geometry(self, geometry: BaseGeometry, max_files: Optional[int] = None) -> List[CoveringFile]:
+        """
+        All files intersecting geometry, highest collection priority first.
+
+        Priority comes from the collection handlers at the geometry centroid,
+        the same ranking point queries use.
+        """
+        index = self.unified_index
+        if index is None or not index.data_collections:
+            return []
+
+        centroid = geometry.centroid
+        registry = getattr(self.unified_source, "handler_registry", None)
+        results: List[CoveringFile] = []
+        for collection in index.data_collections:
+            coverage = _bounds_box(getattr(collection, "coverage_bounds_wgs84", None))
+            if coverage is None or not coverage.intersects(geometry):
+                continue
+
+            priority = 0.0
+            if registry is not None:
+                try:
+                    priority = registry.get_collection_priority(collection, centroid.y, centroid.x)
+                except Exception as e:
+                    logger.debug(f"Priority lookup failed for {collection.id}: {e}")
+
+            for file_entry in collection.files:
+                file_box = _bounds_box(file_entry.bounds)
+                if file_box is None or not file_box.intersects(geometry):
+                    continue
+                results.append(CoveringFile(
+                    collection_id=collection.id,
+                    file_path=file_entry.file,
+                    filename=file_entry.filename,
+                    priority=priority,
+                    size_mb=file_entry.size_mb,
+                    coordinate_system=file_entry.coordinate_system,
+                    resolution_m=getattr(collection, "resolution_m", 1.0),
+                    bounds=file_box.bounds,
+                ))
+
+        # Finest resolution breaks ties within equal collection priority
+        results.sort(key=lambda f: (-f.priority, f.resolution_m))
+        if max_files is not None:
+            results = results[:max_files]
+        return results
+
+    def assign_points(self, lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, List[CoveringFile]]:
+        """
+        Assign each point to the highest-priority file containing it.
+
+        Plans a batch of reads by file in one pass over the index instead of a
+        registry lookup per point. Returns (file index per point, -1 = uncovered; files).
+        """
+        assignment = np.full(len(lats), -1, dtype=np.int64)
+        if len(lats) == 0:
+            return assignment, []
+
+        pad = 1e-9
+        extent = box(float(lons.min()) - pad, float(lats.min()) - pad, float(lons.max()) + pad, float(lats.max()) + pad)
+        files: List[CoveringFile] = []
+        for covering in self.find_files_for_geometry(extent):
+            unassigned = assignment < 0
+            if not unassigned.any():
+                break
+            min_lon, min_lat, max_lon, max_lat = covering.bounds
+            inside = unassigned & (lats >= min_lat) & (lats <= max_lat) & (lons >= min_lon) & (lons <= max_lon)
+            if inside.any():
+                assignment[inside] = len(files)
+                files.append(covering)
+        return assignment, files
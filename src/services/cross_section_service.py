@@ -0,0 +1,228 @@
+"""
+Cross Section Service - elevation cross-sections at regular chainage along an alignment.
+
+Road design needs a section every few metres along an alignment, which
+clients used to emulate with hundreds of 100-point /path calls. Here the whole
+request is one batch:
+- the alignment is projected to the local UTM zone, chainages are stepped
+  along it and every section point (chainage x offset) is placed in one
+  vectorized pass, perpendicular to the alignment segment it falls on
+- the point grid is sampled through one read plan: covering files in
+  priority order, each sampled once for the points still missing inside its
+  bounds, grouped by tile (shared tile cache, or direct windowed reads)
+Results are a compact array per section aligned with the offsets.
+"""
+
+import asyncio
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pyproj import Transformer
+from shapely.geometry import box
+
+from .coverage_service import CoverageService, find_unified_source, local_metric_crs
+from .tile_cache import DirectTileReader, get_raster_tile_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CrossSections:
+    """Section points (sections x offsets) and their sampled elevations (NaN where no file answered)."""
+    chainage_m: np.ndarray
+    offsets_m: np.ndarray
+    centre_lats: np.ndarray
+    centre_lons: np.ndarray
+    bearings_deg: np.ndarray
+    lats: np.ndarray
+    lons: np.ndarray
+    length_m: float
+    projected_crs: str
+    elevations: Optional[np.ndarray] = None
+    source_index: Optional[np.ndarray] = None
+    sources: List[str] = field(default_factory=list)
+
+    @property
+    def num_points(self) -> int:
+        return int(self.lats.size)
+
+    def to_dict(self) -> Dict[str, Any]:
+        sections = []
+        for i in range(len(self.chainage_m)):
+            row = self.elevations[i]
+            sections.append({
+                "chainage_m": round(float(self.chainage_m[i]), 3),
+                "lat": float(self.centre_lats[i]),
+                "lon": float(self.centre_lons[i]),
+                "bearing_deg": round(float(self.bearings_deg[i]), 3),
+                "elevations": [None if np.isnan(v) else round(float(v), 3) for v in row],
+                "source_index": self.source_index[i].tolist(),
+            })
+        return {
+            "length_m": round(self.length_m, 3),
+            "projected_crs": self.projected_crs,
+            "offsets_m": [round(float(o), 3) for o in self.offsets_m],
+            "sources": list(self.sources),
+            "sections": sections,
+        }
+
+
+def section_offsets(width_m: Optional[float] = None, spacing_m: Optional[float] = None,
+                    offsets_m: Optional[Sequence[float]] = None) -> np.ndarray:
+    """
+    Sorted offsets across a section (negative = left of the direction of travel).
+
+    Explicit offsets win; otherwise width_m is split at spacing_m symmetrically
+    about the centreline, always including 0 and both edges.
+    """
+    if offsets_m:
+        return np.unique(np.asarray(offsets_m, dtype=np.float64))
+    if not width_m or not spacing_m:
+        raise ValueError("Provide offsets_m, or width_m with spacing_m")
+    half = width_m / 2.0
+    right = np.arange(0.0, half, spacing_m)
+    right = np.append(right, half) if half - right[-1] > 1e-9 else right
+    return np.concatenate([-right[:0:-1], right])
+
+
+def plan_cross_sections(coordinates: Sequence[Tuple[float, float]], interval_m: float,
+                        offsets_m: np.ndarray, start_chainage_m: float = 0.0,
+                        max_points: Optional[int] = None) -> CrossSections:
+    """
+    Place every section point along a (lat, lon) alignment.
+
+    Chainages run from start_chainage_m in interval_m steps, plus the end of
+    the alignment. Each section is perpendicular to the segment its chainage
+    falls on, in the local UTM zone. Raises ValueError before anything is
+    allocated when the grid would exceed max_points.
+    """
+    lats = np.array([c[0] for c in coordinates], dtype=np.float64)
+    lons = np.array([c[1] for c in coordinates], dtype=np.float64)
+    projected_crs = local_metric_crs(float(lons.mean()), float(lats.mean()))
+    to_metric = Transformer.from_crs("EPSG:4326", projected_crs, always_xy=True)
+    to_wgs84 = Transformer.from_crs(projected_crs, "EPSG:4326", always_xy=True)
+
+    xs, ys = to_metric.transform(lons, lats)
+    xs, ys = np.asarray(xs), np.asarray(ys)
+    dx, dy = np.diff(xs), np.diff(ys)
+    seg_length = np.hypot(dx, dy)
+    # Repeated vertices would give zero-length segments with no direction
+    keep = seg_length > 1e-6
+    if not keep.any():
+        raise ValueError("Alignment has zero length")
+    starts_x, starts_y = xs[:-1][keep], ys[:-1][keep]
+    dx, dy, seg_length = dx[keep], dy[keep], seg_length[keep]
+    cumulative = np.concatenate([[0.0], np.cumsum(seg_length)])
+    length_m = float(cumulative[-1])
+
+    if start_chainage_m >= length_m:
+        raise ValueError(f"start_chainage_m is beyond the alignment length ({length_m:.1f} m)")
+    # Sections stepped from start_chainage_m, plus the end of the alignment
+    num_sections = math.ceil((length_m - start_chainage_m) / interval_m) + 1
+    if max_points is not None and num_sections * len(offsets_m) > max_points:
+        raise ValueError(
+            f"{num_sections} sections x {len(offsets_m)} offsets = {num_sections * len(offsets_m)} points "
+            f"exceeds the limit of {max_points}; increase interval_m or reduce the offsets"
+        )
+    chainage = np.arange(start_chainage_m, length_m, interval_m)
+    if length_m - chainage[-1] > 1e-6:
+        chainage = np.append(chainage, length_m)
+
+    segment = np.clip(np.searchsorted(cumulative, chainage, side="right") - 1, 0, len(seg_length) - 1)
+    along = (chainage - cumulative[segment]) / seg_length[segment]
+    ux, uy = dx[segment] / seg_length[segment], dy[segment] / seg_length[segment]
+    centre_x = starts_x[segment] + along * dx[segment]
+    centre_y = starts_y[segment] + along * dy[segment]
+
+    # Right-hand normal is (uy, -ux); one (sections, offsets) grid in metres
+    point_x = centre_x[:, None] + offsets_m[None, :] * uy[:, None]
+    point_y = centre_y[:, None] - offsets_m[None, :] * ux[:, None]
+    point_lons, point_lats = to_wgs84.transform(point_x.ravel(), point_y.ravel())
+    centre_lons, centre_lats = to_wgs84.transform(centre_x, centre_y)
+
+    shape = point_x.shape
+    return CrossSections(
+        chainage_m=chainage, offsets_m=offsets_m,
+        centre_lats=np.asarray(centre_lats), centre_lons=np.asarray(centre_lons),
+        # Grid bearing in the projected CRS, clockwise from grid north
+        bearings_deg=np.degrees(np.arctan2(ux, uy)) % 360.0,
+        lats=np.asarray(point_lats).reshape(shape), lons=np.asarray(point_lons).reshape(shape),
+        length_m=length_m, projected_crs=projected_crs,
+    )
+
+
+class CrossSectionService:
+    """Plans and samples cross-sections along road alignments in one batch."""
+
+    def __init__(self, elevation_service: Any, max_points: int = 100_000):
+        self.elevation_service = elevation_service
+        self.max_points = max_points
+
+    async def get_cross_sections(self, coordinates: Sequence[Tuple[float, float]], interval_m: float,
+                                 offsets_m: np.ndarray, start_chainage_m: float = 0.0,
+                                 max_points: Optional[int] = None,
+                                 progress: Optional[Callable[[int, int], None]] = None) -> Optional[CrossSections]:
+        """
+        Sampled cross-sections, or None when no unified collection is loaded.
+
+        Raises ValueError when the section grid exceeds max_points (defaults to
+        the service limit).
+        """
+        source = find_unified_source(self.elevation_service)
+        if source is None:
+            return None
+        limit = max_points or self.max_points
+
+        def run() -> CrossSections:
+            sections = plan_cross_sections(coordinates, interval_m, offsets_m, start_chainage_m, limit)
+            return self.sample(CoverageService(source), sections, progress)
+
+        return await asyncio.to_thread(run)
+
+    def sample(self, coverage: CoverageService, sections: CrossSections,
+               progress: Optional[Callable[[int, int], None]] = None) -> CrossSections:
+        """Fill elevations from covering files in priority order, one tile-grouped pass per file."""
+        lats, lons = sections.lats.ravel(), sections.lons.ravel()
+        elevations = np.full(lats.size, np.nan, dtype=np.float64)
+        source_index = np.full(lats.size, -1, dtype=np.int16)
+        extent = box(float(lons.min()), float(lats.min()), float(lons.max()), float(lats.max()))
+        files = coverage.find_files_for_geometry(extent)
+
+        tile_cache = get_raster_tile_cache()
+        reader = tile_cache if tile_cache is not None else DirectTileReader()
+        sources: List[str] = []
+        try:
+            for number, covering in enumerate(files):
+                missing = np.isnan(elevations)
+                if not missing.any():
+                    break
+                if covering.bounds is not None:
+                    min_lon, min_lat, max_lon, max_lat = covering.bounds
+                    missing &= (lats >= min_lat) & (lats <= max_lat) & (lons >= min_lon) & (lons <= max_lon)
+                members = np.nonzero(missing)[0]
+                if len(members):
+                    try:
+                        values = reader.sample_many(covering.file_path, lats[members], lons[members])
+                    except Exception as e:
+                        logger.warning(f"Cross-section sampling failed for {covering.filename}: {e}")
+                        values = None
+                    if values is not None:
+                        answered = ~np.isnan(values)
+                        if answered.any():
+                            elevations[members[answered]] = values[answered]
+                            source_index[members[answered]] = len(sources)
+                            sources.append(covering.filename)
+                if progress is not None:
+                    progress(number + 1, len(files))
+        finally:
+            if reader is not tile_cache:
+                reader.close()
+
+        shape = sections.lats.shape
+        sections.elevations = elevations.reshape(shape)
+        sections.source_index = source_index.reshape(shape)
+        sections.sources = sources
+        return sections
@@ -4,8 +4,13 @@ from pyproj.exceptions import CRSError
 import logging
 from typing import Dict
 
+from .memory_governor import get_memory_governor
+
 logger = logging.getLogger(__name__)
 
+# Estimated resident cost of one PROJ transformer (context + pipeline)
+_TRANSFORMER_ESTIMATED_BYTES = 64 * 1024
+
 class CRSTransformationService:
     """Service for coordinate transformations with caching and error handling
     
@@ -22,6 +27,7 @@ class CRSTransformationService:
     
     def __init__(self):
         self._transformer_cache: Dict[str, Transformer] = {}
+        get_memory_governor().register("crs_transformers", self, rebuild_cost=0.5)
         logger.info("CRSTransformationService initialized")
     
     def get_transformer(self, target_epsg: str) -> Transformer:
@@ -79,6 +85,20 @@ class CRSTransformationService:
             logger.error(f"CRS transformation failed for EPSG:{target_epsg}: {e}")
             raise
     
+    def memory_usage_bytes(self) -> int:
+        """Estimated resident bytes of cached transformers (MemoryGovernor protocol)"""
+        return len(self._transformer_cache) * _TRANSFORMER_ESTIMATED_BYTES
+    
+    def evict_bytes(self, target_bytes: int) -> int:
+        """Drop oldest transformers until roughly target_bytes are released"""
+        freed = 0
+        for cache_key in list(self._transformer_cache.keys()):
+            if freed >= target_bytes:
+                break
+            self._transformer_cache.pop(cache_key, None)
+            freed += _TRANSFORMER_ESTIMATED_BYTES
+        return freed
+    
     def get_cache_stats(self) -> Dict[str, int]:
         """Get transformer cache statistics for monitoring"""
         return {
@@ -0,0 +1,313 @@
+"""
+Earthworks Service - cut, fill and net volumes of a design surface against the DEM.
+
+Earthworks estimates used to mean exporting tens of thousands of DEM points
+to another tool. Volumes are computed here on the native DEM grid:
+- the polygon's window is the top-priority campaign's pixel grid (as /clip),
+  processed in square tiles so memory stays bounded however large the site
+- each tile is mosaicked from the covering files in priority order and
+  masked to the polygon
+- the design surface (a flat level, a TIN or a grid of design levels) is
+  sampled at the centres of the cells inside the polygon
+- design minus DEM per cell times the cell's area gives fill (positive)
+  and cut (negative) volumes
+Cells without DEM data or outside the design surface are counted and left
+out; files that cannot be read are listed and the result marked incomplete. Design levels must share the DEM's vertical datum (AHD for Australian
+campaigns). Optionally the difference grid itself is returned as a raster.
+"""
+
+import asyncio
+import logging
+import math
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+from pyproj import CRS, Transformer
+from shapely.geometry.base import BaseGeometry
+
+from .coverage_service import CoverageService, CoveringFile, find_unified_source
+from .raster_export_service import (
+    GridSpec, RasterExportService, RasterGrid, grid_bounds, polygon_mask, wgs84_polygon,
+)
+
+logger = logging.getLogger(__name__)
+
+_EARTH_RADIUS_M = 6371008.8
+
+Sampler = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+class DesignSurface(ABC):
+    """Design levels, sampled at (x, y) points in a grid CRS."""
+
+    @abstractmethod
+    def sampler(self, crs_wkt: str) -> Sampler:
+        """Function of (xs, ys) in crs_wkt returning design levels (NaN where there is no design)."""
+
+
+@dataclass
+class FlatDesign(DesignSurface):
+    """A level platform at level_m."""
+    level_m: float
+
+    def sampler(self, crs_wkt: str) -> Sampler:
+        return lambda xs, ys: np.full(np.shape(xs), self.level_m, dtype=np.float64)
+
+
+@dataclass
+class TINDesign(DesignSurface):
+    """
+    Triangulated design surface from (lat, lon, elevation_m) vertices.
+
+    triangles are vertex index triples; without them the vertices are
+    Delaunay-triangulated in the grid CRS. Points outside every triangle
+    have no design level.
+    """
+    vertices: Sequence[Tuple[float, float, float]]
+    triangles: Optional[Sequence[Tuple[int, int, int]]] = None
+
+    def sampler(self, crs_wkt: str) -> Sampler:
+        from scipy.interpolate import LinearNDInterpolator
+        from scipy.spatial import Delaunay, QhullError
+
+        lats, lons, levels = np.asarray(self.vertices, dtype=np.float64).T
+        xs, ys = Transformer.from_crs("EPSG:4326", crs_wkt, always_xy=True).transform(lons, lats)
+        points = np.column_stack([xs, ys])
+        if self.triangles is None:
+            try:
+                interpolator = LinearNDInterpolator(Delaunay(points), levels, fill_value=np.nan)
+            except (ValueError, QhullError) as e:
+                raise ValueError(f"Invalid design TIN: {e}")
+            return lambda px, py: interpolator(np.asarray(px), np.asarray(py)).astype(np.float64)
+
+        triangles = np.asarray(self.triangles, dtype=np.int64).reshape(-1, 3)
+        if triangles.size and (triangles.min() < 0 or triangles.max() >= len(levels)):
+            raise ValueError("Design TIN triangles refer to vertices that do not exist")
+        return _triangle_sampler(points, levels, triangles)
+
+def _triangle_sampler(points: np.ndarray, levels: np.ndarray, triangles: np.ndarray) -> Sampler:
+    """Linear interpolation on given triangles: the containing triangle's barycentric weights."""
+    corners = points[triangles]
+    a, b, c = corners[:, 0], corners[:, 1], corners[:, 2]
+    denominator = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (c[:, 0] - a[:, 0]) * (b[:, 1] - a[:, 1])
+    # Degenerate triangles cover no area
+    usable = np.nonzero(np.abs(denominator) > 1e-12)[0]
+    tree = shapely.STRtree(shapely.polygons(corners[usable]))
+
+    def sample(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        px, py = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+        flat_x, flat_y = px.ravel(), py.ravel()
+        values = np.full(flat_x.shape, np.nan)
+        point_index, hit = tree.query(shapely.points(flat_x, flat_y), predicate="intersects")
+        tri = usable[hit]
+        ta, tb, tc = a[tri], b[tri], c[tri]
+        dx, dy = flat_x[point_index] - ta[:, 0], flat_y[point_index] - ta[:, 1]
+        wb = (dx * (tc[:, 1] - ta[:, 1]) - (tc[:, 0] - ta[:, 0]) * dy) / denominator[tri]
+        wc = ((tb[:, 0] - ta[:, 0]) * dy - dx * (tb[:, 1] - ta[:, 1])) / denominator[tri]
+        z = levels[triangles[tri]]
+        values[point_index] = (1 - wb - wc) * z[:, 0] + wb * z[:, 1] + wc * z[:, 2]
+        return values.reshape(px.shape)
+
+    return sample
+
+
+@dataclass
+class GridDesign(DesignSurface):
+    """
+    Grid of design levels (NaN = no design) in crs, north-up, with a GDAL
+    geotransform; sampled bilinearly between cell centres.
+    """
+    crs: str
+    geotransform: Tuple[float, float, float, float, float, float]
+    levels: np.ndarray
+
+    def __post_init__(self):
+        # Rows of floats with None for no design
+        self.levels = np.asarray(self.levels, dtype=np.float64)
+
+    def sampler(self, crs_wkt: str) -> Sampler:
+        from scipy.ndimage import map_coordinates
+
+        design_crs = CRS.from_user_input(self.crs)
+        to_design = None
+        if not design_crs.equals(CRS.from_wkt(crs_wkt)):
+            to_design = Transformer.from_crs(crs_wkt, design_crs, always_xy=True)
+        c, a, _, f, _, e = self.geotransform
+        height, width = self.levels.shape
+
+        def sample(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+            if to_design is not None:
+                xs, ys = to_design.transform(xs, ys)
+            cols = (np.asarray(xs) - c) / a - 0.5
+            rows = (np.asarray(ys) - f) / e - 0.5
+            # Nearest edge values fill the outer half cell; beyond the grid there is no design
+            values = map_coordinates(self.levels, [rows, cols], order=1, mode="nearest")
+            outside = (cols < -0.5) | (cols > width - 0.5) | (rows < -0.5) | (rows > height - 0.5)
+            values[outside] = np.nan
+            return values
+
+        return sample
+
+
+@dataclass
+class EarthworksResult:
+    """Volume totals and, when asked for, the design minus DEM grid."""
+    totals: Dict[str, Any]
+    difference: Optional[RasterGrid] = None
+
+    def headers(self) -> Dict[str, str]:
+        """Totals as response headers for raster responses."""
+        return {
+            "X-Cut-Volume-M3": repr(self.totals["cut_volume_m3"]),
+            "X-Fill-Volume-M3": repr(self.totals["fill_volume_m3"]),
+            "X-Net-Volume-M3": repr(self.totals["net_volume_m3"]),
+            "X-Compared-Area-M2": repr(self.totals["compared_area_m2"]),
+            "X-Volumes-Complete": "true" if self.totals.get("complete", True) else "false",
+        }
+
+
+def tile_windows(spec: GridSpec, tile_size: int) -> Iterator[Tuple[int, int, GridSpec]]:
+    """(row_offset, col_offset, tile spec) covering a grid in tile_size squares."""
+    a, b, c, d, e, f = spec.transform
+    for row in range(0, spec.height, tile_size):
+        for col in range(0, spec.width, tile_size):
+            yield row, col, GridSpec(
+                crs_wkt=spec.crs_wkt,
+                transform=(a, b, c + col * a, d, e, f + row * e),
+                width=min(tile_size, spec.width - col),
+                height=min(tile_size, spec.height - row),
+            )
+
+
+def files_for_window(files: List[CoveringFile], spec: GridSpec) -> List[CoveringFile]:
+    """The files whose WGS84 bounds intersect a grid window, so none is opened for a tile it cannot fill."""
+    to_wgs84 = Transformer.from_crs(spec.crs_wkt, "EPSG:4326", always_xy=True)
+    min_lon, min_lat, max_lon, max_lat = to_wgs84.transform_bounds(*grid_bounds(spec), densify_pts=21)
+    return [
+        covering for covering in files
+        if covering.bounds[0] <= max_lon and covering.bounds[2] >= min_lon
+        and covering.bounds[1] <= max_lat and covering.bounds[3] >= min_lat
+    ]
+
+
+def cell_areas(spec: GridSpec) -> np.ndarray:
+    """Area in m² of a cell in each row: constant on projected grids, by latitude on geographic ones."""
+    a, _, _, _, e, f = spec.transform
+    if not CRS.from_wkt(spec.crs_wkt).is_geographic:
+        return np.full(spec.height, abs(a * e))
+    edges = np.radians(f + np.arange(spec.height + 1) * e)
+    return _EARTH_RADIUS_M ** 2 * math.radians(abs(a)) * np.abs(np.diff(np.sin(edges)))
+
+
+class EarthworksService:
+    """Cut/fill volumes over a polygon, tile by tile on the native DEM grid."""
+
+    def __init__(self, raster_export_service: RasterExportService, elevation_service: Any,
+                 tile_size: int = 1024, max_cells: int = 200_000_000):
+        """
+        Args:
+            tile_size: Cells per side of each tile read and compared at once
+            max_cells: Largest polygon window (width x height) accepted
+        """
+        self.raster_export_service = raster_export_service
+        self.elevation_service = elevation_service
+        self.tile_size = tile_size
+        self.max_cells = max_cells
+
+    async def compute(self, polygon_coords: Sequence[Tuple[float, float]], design: DesignSurface,
+                      difference_raster: bool = False) -> Optional[EarthworksResult]:
+        """
+        Volumes of design against the DEM within a (lat, lon) polygon.
+
+        Returns None when no unified collection is loaded; raises ValueError
+        when nothing covers the polygon, the window is too large or the design
+        is invalid.
+        """
+        source = find_unified_source(self.elevation_service)
+        if source is None:
+            return None
+        return await asyncio.to_thread(
+            self.compute_polygon, CoverageService(source), wgs84_polygon(polygon_coords), design, difference_raster
+        )
+
+    def compute_polygon(self, coverage: CoverageService, polygon: BaseGeometry, design: DesignSurface,
+                        difference_raster: bool = False) -> EarthworksResult:
+        files, spec, native = self.raster_export_service.native_window(coverage, polygon)
+        if spec.pixels > self.max_cells:
+            raise ValueError(f"Polygon covers {spec.width} x {spec.height} DEM cells, over the limit of {self.max_cells}")
+        if difference_raster and spec.pixels > self.raster_export_service.max_pixels:
+            raise ValueError(
+                f"Difference raster would be {spec.width} x {spec.height} pixels, "
+                f"over the limit of {self.raster_export_service.max_pixels}"
+            )
+
+        sample = design.sampler(spec.crs_wkt)
+        row_areas = cell_areas(spec)
+        difference = np.full((spec.height, spec.width), np.nan, dtype=np.float32) if difference_raster else None
+        sums = dict.fromkeys(("cut_volume_m3", "fill_volume_m3", "cut_area_m2", "fill_area_m2", "compared_area_m2"), 0.0)
+        counts = dict.fromkeys(("cells_compared", "cells_without_dem", "cells_without_design"), 0)
+        max_cut = max_fill = 0.0
+        sources: List[str] = []
+        failed: List[str] = []
+        tiles = 0
+
+        for row, col, window in tile_windows(spec, self.tile_size):
+            inside = polygon_mask(native, window)
+            if not inside.any():
+                continue
+            tiles += 1
+            dem = self.raster_export_service.mosaic(files_for_window(files, window), window, "nearest", mask=inside)
+            sources.extend(s for s in dem.sources if s not in sources)
+            # Cells of an unreadable file would otherwise pass as cells without DEM data
+            failed.extend(s for s in dem.failed if s not in failed)
+
+            a, _, c, _, e, f = window.transform
+            tile_rows, tile_cols = np.nonzero(inside)
+            design_levels = sample(c + (tile_cols + 0.5) * a, f + (tile_rows + 0.5) * e)
+            dem_levels = dem.data[tile_rows, tile_cols].astype(np.float64)
+            has_dem = ~np.isnan(dem_levels)
+            compared = has_dem & ~np.isnan(design_levels)
+            counts["cells_without_dem"] += int((~has_dem).sum())
+            counts["cells_without_design"] += int((has_dem & ~compared).sum())
+            counts["cells_compared"] += int(compared.sum())
+            if not compared.any():
+                continue
+
+            # Fill where the design is above the ground, cut where it is below
+            delta = design_levels[compared] - dem_levels[compared]
+            areas = row_areas[row + tile_rows[compared]]
+            sums["fill_volume_m3"] += float(np.sum(np.clip(delta, 0, None) * areas))
+            sums["cut_volume_m3"] += float(np.sum(np.clip(-delta, 0, None) * areas))
+            sums["fill_area_m2"] += float(areas[delta > 0].sum())
+            sums["cut_area_m2"] += float(areas[delta < 0].sum())
+            sums["compared_area_m2"] += float(areas.sum())
+            max_fill = max(max_fill, float(delta.max()))
+            max_cut = max(max_cut, float(-delta.min()))
+            if difference is not None:
+                difference[row + tile_rows[compared], col + tile_cols[compared]] = delta
+
+        epsg = CRS.from_wkt(spec.crs_wkt).to_epsg()
+        totals = {key: round(value, 3) for key, value in sums.items()}
+        totals.update(counts)
+        totals.update(
+            net_volume_m3=round(sums["fill_volume_m3"] - sums["cut_volume_m3"], 3),
+            max_cut_m=round(max_cut, 3),
+            max_fill_m=round(max_fill, 3),
+            cell_size_m=[abs(spec.transform[0]), abs(spec.transform[4])],
+            crs=f"EPSG:{epsg}" if epsg else spec.crs_wkt,
+            sources=sources,
+            tiles=tiles,
+            complete=not failed,
+            failed_files=failed,
+        )
+        if failed:
+            logger.warning(f"Earthworks volumes are incomplete, {len(failed)} files could not be read: {failed}")
+        logger.info(
+            f"Earthworks over {counts['cells_compared']} cells in {tiles} tiles: "
+            f"cut {totals['cut_volume_m3']} m3, fill {totals['fill_volume_m3']} m3"
+        )
+        grid = RasterGrid(spec, difference, sources, failed) if difference is not None else None
+        return EarthworksResult(totals=totals, difference=grid)
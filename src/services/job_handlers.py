@@ -0,0 +1,172 @@
+"""
+Built-in job kinds for the asynchronous job API.
+
+Each handler receives a JobContext, reads its validated parameters from
+context.params, writes its result to context.result_path and returns a small
+summary dict stored on the job record:
+- contours: GeoJSON contours for a large polygon (ContourService)
+- alignment_profile: native-resolution profile along a multi-vertex alignment
+  (LineProfileService, one segment at a time), written as columnar JSON
+- bulk_points: NDJSON elevations for a large point list (BulkElevationService,
+  charged to the submitting client's bulk quota)
+- cross_sections: cross-sections along a long alignment (CrossSectionService),
+  in the same compact layout as /cross-sections
+"""
+
+import asyncio
+import json
+import logging
+import math
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+
+from ..utils.fast_json import dumps
+from .job_service import JobContext, JobService
+from .cross_section_service import section_offsets
+from .profile_service import geodesic_length_m
+
+logger = logging.getLogger(__name__)
+
+
+class ElevationJobHandlers:
+    """Job handlers backed by the existing elevation services."""
+
+    def __init__(self, contour_service: Any, profile_service: Any, bulk_service: Any,
+                 cross_section_service: Any = None, cross_section_max_points: Optional[int] = None):
+        self.contour_service = contour_service
+        self.profile_service = profile_service
+        self.bulk_service = bulk_service
+        self.cross_section_service = cross_section_service
+        self.cross_section_max_points = cross_section_max_points
+
+    def register(self, jobs: JobService) -> None:
+        jobs.register_kind("contours", self.contours, media_type="application/geo+json", extension="geojson")
+        jobs.register_kind("alignment_profile", self.alignment_profile)
+        jobs.register_kind("bulk_points", self.bulk_points, media_type="application/x-ndjson", extension="ndjson")
+        if self.cross_section_service is not None:
+            jobs.register_kind("cross_sections", self.cross_sections)
+
+    async def contours(self, context: JobContext) -> Dict[str, Any]:
+        params = context.params
+        context.report(0, 1, "Sampling DEM within polygon")
+        levels, statistics, dem_source_used, error_message = await asyncio.to_thread(
+            self.contour_service.stream_geojson_contours,
+            polygon_coords=params["polygon_coords"],
+            dem_source_id=params.get("dem_source_id") or "auto",
+            max_points=params["max_points"],
+            minor_contour_interval_m=params["minor_contour_interval_m"],
+            major_contour_interval_m=params["major_contour_interval_m"],
+            simplify_tolerance=params["simplify_tolerance"],
+        )
+        if error_message:
+            raise ValueError(error_message)
+        if not statistics:
+            raise ValueError("No contours could be generated for the specified area")
+
+        # Levels are traced as they are written, so the collection is never held whole
+        total_levels = len(statistics["elevation_intervals"])
+        context.report(0, total_levels, "Tracing contours")
+        await asyncio.to_thread(_write_contours, context, levels, statistics, dem_source_used, total_levels)
+        return {"dem_source_used": dem_source_used, "contour_count": statistics.get("contour_count")}
+
+    async def alignment_profile(self, context: JobContext) -> Dict[str, Any]:
+        """
+        Profile each alignment segment at native resolution and join them by chainage.
+
+        With interval_m each segment is resampled to that spacing instead.
+        """
+        vertices = context.params["coordinates"]
+        interval_m: Optional[float] = context.params.get("interval_m")
+        columns: Dict[str, list] = {"chainage_m": [], "lat": [], "lon": [], "elevation_m": [], "source": []}
+        files_used: list = []
+        offset = 0.0
+        segments = len(vertices) - 1
+
+        for number in range(segments):
+            context.check_cancelled()
+            (start_lat, start_lon), (end_lat, end_lon) = vertices[number], vertices[number + 1]
+            num_points = None
+            if interval_m:
+                length = geodesic_length_m(start_lat, start_lon, end_lat, end_lon)
+                num_points = max(2, int(math.ceil(length / interval_m)) + 1)
+            profile = await self.profile_service.get_line_profile(start_lat, start_lon, end_lat, end_lon, num_points)
+            if profile is None:
+                raise ValueError(f"Segment {number} is not covered by the unified index")
+
+            # Shared vertices appear once
+            skip = 1 if number > 0 else 0
+            columns["chainage_m"].extend(np.round(profile.chainage_m[skip:] + offset, 3).tolist())
+            columns["lat"].extend(profile.lats[skip:].tolist())
+            columns["lon"].extend(profile.lons[skip:].tolist())
+            columns["elevation_m"].extend(
+                None if np.isnan(v) else float(v) for v in profile.elevations[skip:]
+            )
+            columns["source"].extend(profile.sources[skip:])
+            files_used.extend(f for f in profile.files_used if f not in files_used)
+            offset += profile.length_m
+            context.report(number + 1, segments, f"Profiled {number + 1}/{segments} segments")
+
+        document = dict(columns, length_m=round(offset, 3), files_used=files_used)
+        await asyncio.to_thread(_write_json, context.result_path, document)
+        missing = sum(1 for v in columns["elevation_m"] if v is None)
+        return {"length_m": round(offset, 3), "samples": len(columns["chainage_m"]), "missing_samples": missing}
+
+    async def bulk_points(self, context: JobContext) -> Dict[str, Any]:
+        points = context.params["points"]
+        total_chunks = max(1, math.ceil(len(points) / self.bulk_service.chunk_size))
+        summary: Dict[str, Any] = {}
+        written = 0
+
+        with open(context.result_path, "wb") as output:
+            async for block in self.bulk_service.stream_ndjson(points, context.job.client_id):
+                context.check_cancelled()
+                await asyncio.to_thread(output.write, block)
+                written += 1
+                if block.startswith(b'{"summary"'):
+                    summary = json.loads(block)["summary"]
+                else:
+                    sampled = min(written * self.bulk_service.chunk_size, len(points))
+                    context.report(written, total_chunks, f"Sampled {sampled}/{len(points)} points")
+        return summary
+
+    async def cross_sections(self, context: JobContext) -> Dict[str, Any]:
+        params = context.params
+        offsets = section_offsets(params.get("width_m"), params.get("spacing_m"), params.get("offsets_m"))
+        sections = await self.cross_section_service.get_cross_sections(
+            params["coordinates"], params["interval_m"], offsets,
+            start_chainage_m=params.get("start_chainage_m", 0.0),
+            max_points=self.cross_section_max_points,
+            progress=lambda done, total: context.report(done, total, f"Sampled {done}/{total} covering files"),
+        )
+        if sections is None:
+            raise ValueError("Cross-sections need the unified spatial index, which is not loaded")
+
+        context.check_cancelled()
+        await asyncio.to_thread(_write_json, context.result_path, sections.to_dict())
+        return {
+            "length_m": round(sections.length_m, 3),
+            "sections": len(sections.chainage_m),
+            "points": sections.num_points,
+            "missing_points": int((sections.source_index < 0).sum()),
+        }
+
+
+def _write_contours(context: JobContext, levels: Iterator[bytes], statistics: Dict[str, Any],
+                    dem_source_used: str, total_levels: int) -> None:
+    written = False
+    with open(context.result_path, "wb") as output:
+        output.write(b'{"type":"FeatureCollection","features":[')
+        for number, chunk in enumerate(levels, start=1):
+            context.check_cancelled()
+            if chunk:
+                output.write(b"," + chunk if written else chunk)
+                written = True
+            context.report(number, total_levels, f"Traced {number}/{total_levels} contour levels")
+        properties = {"statistics": statistics, "dem_source_used": dem_source_used}
+        output.write(b'],"properties":' + dumps(properties) + b"}")
+
+
+def _write_json(path: str, document: Dict[str, Any]) -> None:
+    with open(path, "w") as output:
+        json.dump(document, output)
@@ -0,0 +1,338 @@
+"""
+Job Service - asynchronous execution of very large corridor and area requests.
+
+A full-catchment contour or a 50 km alignment takes far longer than any
+sensible HTTP timeout, so such requests are submitted as jobs instead:
+- submit returns a job id immediately; the job waits in a priority queue
+  drained by a fixed pool of background workers
+- queue depth and active jobs per client are bounded across all workers
+  (counted in the registry), as is each job's run time
+- each job kind's handler reports progress and checks for cancellation
+  through a JobContext, and writes its result to a file under the result
+  directory, served for download until the record expires
+- job records live in a RedisJobRegistry so any worker can answer status
+  polls; the record holds the result path, so any worker that shares the
+  result directory (e.g. uvicorn workers on one host) can serve the download
+The synchronous endpoints remain for small interactive requests.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+ACTIVE_STATES = ("queued", "running")
+
+_PROGRESS_SAVE_INTERVAL_S = 1.0
+
+
+class JobLimitError(RuntimeError):
+    """A submission would exceed the queue or per-client limits."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled."""
+
+
+@dataclass
+class Job:
+    """State of one submitted job, mirrored to the registry."""
+    id: str
+    kind: str
+    client_id: str
+    priority: str
+    params: Dict[str, Any]
+    description: Optional[str] = None
+    state: str = "queued"
+    progress_percent: float = 0.0
+    message: Optional[str] = None
+    error: Optional[str] = None
+    result_path: Optional[str] = None
+    result_media_type: Optional[str] = None
+    result_bytes: int = 0
+    summary: Dict[str, Any] = field(default_factory=dict)
+    host: str = field(default_factory=socket.gethostname)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    cancel_requested: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "client_id": self.client_id,
+            "priority": self.priority,
+            "description": self.description,
+            "state": self.state,
+            "progress_percent": round(self.progress_percent, 1),
+            "message": self.message,
+            "error": self.error,
+            "result_available": self.state == "completed" and self.result_path is not None,
+            "result_path": self.result_path,
+            "result_media_type": self.result_media_type,
+            "result_bytes": self.result_bytes,
+            "summary": dict(self.summary),
+            "host": self.host,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class JobContext:
+    """Handed to a job handler: where to write the result, progress and cancellation."""
+
+    def __init__(self, service: "JobService", job: Job, result_path: str):
+        self._service = service
+        self.job = job
+        self.result_path = result_path
+        self._last_saved = 0.0
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self.job.params
+
+    def report(self, done: float, total: float, message: Optional[str] = None) -> None:
+        """Record progress; saved to the registry at most once a second."""
+        if total > 0:
+            self.job.progress_percent = min(100.0, 100.0 * done / total)
+        if message is not None:
+            self.job.message = message
+        now = time.monotonic()
+        if now - self._last_saved >= _PROGRESS_SAVE_INTERVAL_S:
+            self._last_saved = now
+            self._service._save(self.job)
+            if self._service.registry.cancel_requested(self.job.id):
+                self.job.cancel_requested = True
+
+    def check_cancelled(self) -> None:
+        if self.job.cancel_requested:
+            raise JobCancelled(self.job.id)
+
+
+JobHandler = Callable[[JobContext], Awaitable[Optional[Dict[str, Any]]]]
+
+
+@dataclass
+class JobKind:
+    handler: JobHandler
+    media_type: str
+    extension: str
+
+
+class JobService:
+    """Priority queue and worker pool for long-running elevation jobs."""
+
+    def __init__(self, registry: Any, result_dir: str, workers: int = 2, max_queued: int = 100,
+                 max_active_per_client: int = 4, timeout_seconds: float = 1800.0,
+                 result_ttl_seconds: int = 86400):
+        self.registry = registry
+        self.result_dir = result_dir
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_active_per_client = max_active_per_client
+        self.timeout_seconds = timeout_seconds
+        self.result_ttl_seconds = result_ttl_seconds
+        self._kinds: Dict[str, JobKind] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._completed = 0
+        self._failed = 0
+
+    # ------------------------------------------------------------------ kinds
+    def register_kind(self, kind: str, handler: JobHandler, media_type: str = "application/json",
+                      extension: str = "json") -> None:
+        self._kinds[kind] = JobKind(handler=handler, media_type=media_type, extension=extension)
+
+    @property
+    def kinds(self) -> List[str]:
+        return sorted(self._kinds)
+
+    # ---------------------------------------------------------------- registry
+    def submit(self, kind: str, params: Dict[str, Any], client_id: str, priority: str = "normal",
+               description: Optional[str] = None) -> Job:
+        """Queue a job; raises ValueError for unknown kinds and JobLimitError when limits are hit."""
+        if kind not in self._kinds:
+            raise ValueError(f"Unknown job kind '{kind}'. Available: {', '.join(self.kinds)}")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'. Use one of: {', '.join(PRIORITIES)}")
+
+        job = Job(id=uuid.uuid4().hex[:16], kind=kind, client_id=client_id, priority=priority,
+                  params=params, description=description)
+        # Counted in the shared registry, so the limits hold across all workers
+        refused = self.registry.admit(job.id, client_id, self.max_queued, self.max_active_per_client)
+        if refused == "queue":
+            raise JobLimitError(f"Job queue is full ({self.max_queued} queued jobs)")
+        if refused == "client":
+            raise JobLimitError(f"At most {self.max_active_per_client} active jobs per client")
+
+        self._jobs[job.id] = job
+        self._save(job)
+        self._ensure_workers()
+        self._queue.put_nowait((PRIORITIES[priority], next(self._sequence), job.id))
+        logger.info(f"Job {job.id} ({kind}, {priority}) queued for {client_id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job record from this worker, or from the shared registry for jobs owned elsewhere."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return self.registry.get(job_id)
+
+    def list(self, client_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        return self.registry.list_for_client(client_id, limit)
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued or running job; jobs owned by another worker are flagged for it."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            record = self.registry.get(job_id)
+            if record is not None and record.get("state") in ACTIVE_STATES:
+                self.registry.request_cancel(job_id)
+            return record
+        if job.state == "queued":
+            # Skipped when its queue entry comes up
+            job.state = "cancelled"
+            job.finished_at = datetime.now(timezone.utc)
+            self._save(job)
+        elif job.state == "running":
+            job.cancel_requested = True
+            task = self._running.get(job_id)
+            if task is not None:
+                task.cancel()
+        return job.to_dict()
+
+    def result_file(self, job_id: str) -> Optional[tuple]:
+        """(path, media_type) of a completed job's result, when the file is on this host's disk."""
+        record = self.get(job_id)
+        if record is None or record.get("state") != "completed":
+            return None
+        path = record.get("result_path")
+        if not path or not os.path.exists(path):
+            return None
+        return path, record.get("result_media_type")
+
+    def _save(self, job: Job) -> None:
+        try:
+            self.registry.save(job.to_dict())
+        except Exception as e:
+            logger.warning(f"Could not save job {job.id} to the registry: {e}")
+
+    # ------------------------------------------------------------------ runner
+    def _ensure_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        self._workers = [task for task in self._workers if not task.done()]
+        while len(self._workers) < self.workers:
+            self._workers.append(asyncio.create_task(self._worker(len(self._workers))))
+
+    async def _worker(self, number: int) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                job = self._jobs.get(job_id)
+                if job is None or job.state != "queued":
+                    continue
+                task = asyncio.create_task(self._run(job))
+                self._running[job_id] = task
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    # A cancelled job ends here; a cancelled worker (shutdown) stops
+                    if asyncio.current_task().cancelling():
+                        raise
+                finally:
+                    self._running.pop(job_id, None)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        kind = self._kinds[job.kind]
+        os.makedirs(self.result_dir, exist_ok=True)
+        result_path = os.path.join(self.result_dir, f"{job.id}.{kind.extension}")
+        context = JobContext(self, job, result_path)
+
+        job.state = "running"
+        job.started_at = datetime.now(timezone.utc)
+        self._save(job)
+        try:
+            summary = await asyncio.wait_for(kind.handler(context), timeout=self.timeout_seconds)
+            job.summary = summary or {}
+            job.result_path = result_path
+            job.result_media_type = kind.media_type
+            job.result_bytes = os.path.getsize(result_path) if os.path.exists(result_path) else 0
+            job.progress_percent = 100.0
+            job.state = "completed"
+            self._completed += 1
+        except JobCancelled:
+            job.state = "cancelled"
+        except asyncio.CancelledError:
+            job.state = "cancelled"
+            raise
+        except asyncio.TimeoutError:
+            job.state = "failed"
+            job.error = f"Job exceeded the {self.timeout_seconds:.0f}s time limit"
+            self._failed += 1
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {e}", exc_info=True)
+            job.state = "failed"
+            job.error = str(e)
+            self._failed += 1
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            # Parameters can hold a lot of coordinates; they are not needed once the job ends
+            job.params = {}
+            if job.state != "completed" and os.path.exists(result_path):
+                os.remove(result_path)
+            self._save(job)
+            self._prune()
+            logger.info(f"Job {job.id} ({job.kind}) {job.state} in "
+                        f"{(job.finished_at - job.started_at).total_seconds():.1f}s")
+
+    def _prune(self) -> None:
+        """Forget finished jobs and delete their result files once the record TTL has passed."""
+        cutoff = datetime.now(timezone.utc).timestamp() - self.result_ttl_seconds
+        for job_id, job in list(self._jobs.items()):
+            if job.state in ACTIVE_STATES or job.finished_at is None or job.finished_at.timestamp() > cutoff:
+                continue
+            if job.result_path and os.path.exists(job.result_path):
+                try:
+                    os.remove(job.result_path)
+                except OSError as e:
+                    logger.debug(f"Could not remove expired result {job.result_path}: {e}")
+            del self._jobs[job_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        states: Dict[str, int] = {}
+        for job in self._jobs.values():
+            states[job.state] = states.get(job.state, 0) + 1
+        return {
+            "workers": self.workers,
+            "kinds": self.kinds,
+            "queued": states.get("queued", 0),
+            "running": states.get("running", 0),
+            "completed": self._completed,
+            "failed": self._failed,
+            "jobs_held": len(self._jobs),
+        }
+
+    def close(self) -> None:
+        for task in list(self._running.values()):
+            task.cancel()
+        for task in self._workers:
+            task.cancel()
+        self._workers = []
@@ -0,0 +1,326 @@
+"""
+Memory Governor - process-wide memory budget across all in-process caches.
+
+The service keeps several independently sized caches (open rasterio datasets,
+elevation results, CRS transformers, LiDAR point clouds, parsed S3 indexes and
+GDAL's VSI block cache). Each is bounded by item count only, so on a 512 MB-1 GB
+instance they can jointly exhaust memory. Caches register here and the governor
+evicts across them, cheapest-to-lose first, when the process nears its budget.
+"""
+
+import logging
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+# Benefit assumed for caches that do not track their own hit rate
+_DEFAULT_HIT_RATE = 0.5
+
+
+@dataclass
+class _Registration:
+    """Book-keeping for one registered cache.
+
+    Owners implement ``memory_usage_bytes() -> int`` and
+    ``evict_bytes(target_bytes) -> int`` (bytes actually freed), and may
+    implement ``cache_hit_rate() -> Optional[float]``. Owners are held weakly
+    so registering never extends a service's lifetime.
+    """
+    name: str
+    owner_ref: Any
+    rebuild_cost: float
+    evictions: int = 0
+    bytes_evicted: int = 0
+    last_size_bytes: int = field(default=0)
+
+    @property
+    def owner(self) -> Optional[Any]:
+        return self.owner_ref()
+
+
+class MemoryGovernor:
+    """
+    Central memory budget manager for in-process caches.
+
+    Eviction policy:
+    - Rebalance when process RSS exceeds the high watermark, or when the
+      registered caches alone exceed their share of the budget
+    - Free down to the low watermark, starting with the cache holding the
+      least benefit per byte (hit rate x rebuild cost / resident bytes)
+    - Checks are throttled so cache insert paths can call maybe_rebalance()
+      on every write without measurable overhead
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None, high_watermark: float = 0.90,
+                 low_watermark: float = 0.75, cache_fraction: float = 0.60,
+                 check_interval_seconds: float = 1.0):
+        if not 0 < low_watermark < high_watermark <= 1:
+            raise ValueError(f"Memory watermarks need 0 < low ({low_watermark}) < high ({high_watermark}) <= 1")
+        self.budget_bytes = budget_bytes or self._detect_budget_bytes()
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.cache_fraction = cache_fraction
+        self.check_interval_seconds = check_interval_seconds
+
+        self._registrations: Dict[str, _Registration] = {}
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._rebalance_count = 0
+        self._process = psutil.Process(os.getpid())
+
+        logger.info(
+            f"MemoryGovernor configured: budget={self.budget_bytes / _MB:.0f}MB, "
+            f"high={high_watermark:.0%}, low={low_watermark:.0%}, caches<={cache_fraction:.0%}"
+        )
+
+    @staticmethod
+    def _detect_budget_bytes() -> int:
+        """Default budget: 75% of the container limit (cgroup v2/v1) or of physical RAM."""
+        limit = psutil.virtual_memory().total
+        for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+            try:
+                with open(path) as f:
+                    value = f.read().strip()
+                if value.isdigit():
+                    limit = min(limit, int(value))
+                    break
+            except OSError:
+                continue
+        return int(limit * 0.75)
+
+    def register(self, name: str, owner: Any, rebuild_cost: float = 1.0) -> str:
+        """
+        Register a cache owner with the governor.
+
+        Args:
+            name: Cache name used in metrics (suffixed if already taken)
+            owner: Object implementing memory_usage_bytes() and evict_bytes()
+            rebuild_cost: Relative cost of repopulating an entry (S3 read >> CRS lookup)
+
+        Returns:
+            Registered name
+        """
+        with self._lock:
+            self._prune_dead()
+            unique_name, n = name, 2
+            while unique_name in self._registrations:
+                unique_name, n = f"{name}#{n}", n + 1
+            self._registrations[unique_name] = _Registration(
+                name=unique_name, owner_ref=weakref.ref(owner), rebuild_cost=rebuild_cost
+            )
+        logger.debug(f"MemoryGovernor registered cache '{unique_name}' (rebuild_cost={rebuild_cost})")
+        return unique_name
+
+    def unregister(self, name: str) -> None:
+        """Remove a cache from governance (e.g. on service close)."""
+        with self._lock:
+            self._registrations.pop(name, None)
+
+    def _prune_dead(self) -> None:
+        for name in [n for n, reg in self._registrations.items() if reg.owner is None]:
+            del self._registrations[name]
+
+    def resident_bytes(self) -> int:
+        """Current process resident set size."""
+        try:
+            return self._process.memory_info().rss
+        except psutil.Error:
+            return 0
+
+    def _measure(self, reg: _Registration) -> int:
+        owner = reg.owner
+        if owner is None:
+            return 0
+        try:
+            reg.last_size_bytes = max(0, int(owner.memory_usage_bytes()))
+        except Exception as e:
+            logger.warning(f"MemoryGovernor could not size cache '{reg.name}': {e}")
+        return reg.last_size_bytes
+
+    @staticmethod
+    def _hit_rate(owner: Any) -> float:
+        rate = None
+        if hasattr(owner, "cache_hit_rate"):
+            try:
+                rate = owner.cache_hit_rate()
+            except Exception:
+                rate = None
+        return _DEFAULT_HIT_RATE if rate is None else float(rate)
+
+    def maybe_rebalance(self) -> int:
+        """Throttled, non-blocking rebalance for use on cache insert paths."""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval_seconds:
+            return 0
+        if not self._lock.acquire(blocking=False):
+            return 0  # Another thread is already rebalancing
+        try:
+            self._last_check = now
+            return self._rebalance_locked()
+        finally:
+            self._lock.release()
+
+    def rebalance(self) -> int:
+        """Evict across caches if over budget. Returns estimated bytes freed."""
+        with self._lock:
+            self._last_check = time.monotonic()
+            return self._rebalance_locked()
+
+    def _rebalance_locked(self) -> int:
+        self._prune_dead()
+        sizes = {name: self._measure(reg) for name, reg in self._registrations.items()}
+        tracked = sum(sizes.values())
+        rss = self.resident_bytes()
+
+        cache_budget = self.budget_bytes * self.cache_fraction
+        over_rss = rss > self.budget_bytes * self.high_watermark
+        over_caches = tracked > cache_budget
+        if not (over_rss or over_caches):
+            return 0
+
+        target = 0
+        if over_rss:
+            target = rss - int(self.budget_bytes * self.low_watermark)
+        if over_caches:
+            target = max(target, tracked - int(cache_budget * self.low_watermark / self.high_watermark))
+
+        # Lowest benefit per resident byte goes first
+        candidates = []
+        for name, reg in self._registrations.items():
+            owner = reg.owner
+            if owner is None or sizes[name] <= 0:
+                continue
+            density = self._hit_rate(owner) * reg.rebuild_cost / sizes[name]
+            candidates.append((density, name, reg, owner))
+        candidates.sort(key=lambda c: c[0])
+
+        freed = 0
+        for _, name, reg, owner in candidates:
+            if freed >= target:
+                break
+            try:
+                released = int(owner.evict_bytes(min(target - freed, sizes[name])))
+            except Exception as e:
+                logger.warning(f"MemoryGovernor eviction failed for cache '{name}': {e}")
+                continue
+            if released > 0:
+                reg.evictions += 1
+                reg.bytes_evicted += released
+                freed += released
+
+        self._rebalance_count += 1
+        logger.info(
+            f"MemoryGovernor rebalance: rss={rss / _MB:.0f}MB tracked={tracked / _MB:.0f}MB "
+            f"budget={self.budget_bytes / _MB:.0f}MB freed~{freed / _MB:.1f}MB"
+        )
+        return freed
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-cache memory breakdown for the /metrics endpoint."""
+        with self._lock:
+            self._prune_dead()
+            caches = {}
+            for name, reg in self._registrations.items():
+                owner = reg.owner
+                size = self._measure(reg)
+                caches[name] = {
+                    "resident_mb": round(size / _MB, 3),
+                    "hit_rate": round(self._hit_rate(owner), 4) if owner is not None else None,
+                    "rebuild_cost": reg.rebuild_cost,
+                    "evictions": reg.evictions,
+                    "evicted_mb": round(reg.bytes_evicted / _MB, 3),
+                }
+            tracked = sum(reg.last_size_bytes for reg in self._registrations.values())
+        rss = self.resident_bytes()
+        return {
+            "budget_mb": round(self.budget_bytes / _MB, 1),
+            "resident_mb": round(rss / _MB, 1),
+            "tracked_cache_mb": round(tracked / _MB, 1),
+            "untracked_mb": round(max(0, rss - tracked) / _MB, 1),
+            "utilization": round(rss / self.budget_bytes, 4) if self.budget_bytes else None,
+            "high_watermark": self.high_watermark,
+            "low_watermark": self.low_watermark,
+            "rebalance_count": self._rebalance_count,
+            "caches": caches,
+        }
+
+
+class GDALVSICacheAdapter:
+    """
+    Governs GDAL's per-handle VSI block cache.
+
+    The cache lives inside GDAL, so its footprint is the configured size
+    per open /vsis3/ handle. Its size is derived from the budget instead of a
+    fixed 64MB, and eviction drops the cached /vsicurl/ data.
+    """
+
+    MAX_SIZE_BYTES = 64 * _MB
+
+    def __init__(self, governor: MemoryGovernor):
+        self.size_bytes = int(min(self.MAX_SIZE_BYTES, max(4 * _MB, governor.budget_bytes * 0.05)))
+        self.active_bytes = 0
+
+    def configure(self, gdal_module: Any) -> None:
+        """Apply the budgeted VSI cache size to a GDAL module."""
+        gdal_module.SetConfigOption('VSI_CACHE', 'YES')
+        gdal_module.SetConfigOption('VSI_CACHE_SIZE', str(self.size_bytes))
+        self.active_bytes = self.size_bytes
+        self._gdal = gdal_module
+
+    def memory_usage_bytes(self) -> int:
+        return self.active_bytes
+
+    def evict_bytes(self, target_bytes: int) -> int:
+        gdal_module = getattr(self, "_gdal", None)
+        if gdal_module is None or not hasattr(gdal_module, "VSICurlClearCache"):
+            return 0
+        gdal_module.VSICurlClearCache()
+        freed, self.active_bytes = self.active_bytes, 0
+        return freed
+
+    def cache_hit_rate(self) -> Optional[float]:
+        return None
+
+
+# Global memory governor instance
+_memory_governor: Optional[MemoryGovernor] = None
+_gdal_vsi_cache: Optional[GDALVSICacheAdapter] = None
+
+
+def configure_memory_governor(settings: Any) -> MemoryGovernor:
+    """(Re)configure the global governor from application settings."""
+    budget_mb = getattr(settings, 'MEMORY_BUDGET_MB', None)
+    governor = get_memory_governor()
+    if budget_mb:
+        governor.budget_bytes = int(budget_mb) * _MB
+    governor.high_watermark = getattr(settings, 'MEMORY_HIGH_WATERMARK', governor.high_watermark)
+    governor.low_watermark = getattr(settings, 'MEMORY_LOW_WATERMARK', governor.low_watermark)
+    logger.info(f"MemoryGovernor budget set to {governor.budget_bytes / _MB:.0f}MB")
+    return governor
+
+
+def get_memory_governor() -> MemoryGovernor:
+    """Get global memory governor instance"""
+    global _memory_governor
+    if _memory_governor is None:
+        _memory_governor = MemoryGovernor()
+    return _memory_governor
+
+
+def get_gdal_vsi_cache() -> GDALVSICacheAdapter:
+    """Get the governed GDAL VSI cache adapter (registered on first use)."""
+    global _gdal_vsi_cache
+    if _gdal_vsi_cache is None:
+        governor = get_memory_governor()
+        _gdal_vsi_cache = GDALVSICacheAdapter(governor)
+        governor.register("gdal_vsi_cache", _gdal_vsi_cache, rebuild_cost=4.0)
+    return _gdal_vsi_cache
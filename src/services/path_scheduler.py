@@ -0,0 +1,219 @@
+"""
+Path Scheduler - bounded, file-grouped execution for /elevation/path.
+
+Path requests used to gather one task per point with no limit, each opening
+GDAL datasets on the default executor, so a burst of path requests flooded
+the thread pool and S3. The scheduler instead:
+- groups points by their highest-priority covering file (one vectorized
+  CoverageService pass) and reads each group with one tile-grouped sample
+- runs the remaining points (uncovered, NODATA, or an explicit source) through
+  the per-point pipeline as single-point work units
+- bounds every work unit by a per-request and a process-wide slot limit
+Results are returned in input order. Time spent waiting for a slot (queue)
+and holding one (service) are recorded separately.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .bulk_elevation_service import sample_file_direct
+from .coverage_service import CoverageService
+from .tile_cache import get_raster_tile_cache
+
+logger = logging.getLogger(__name__)
+
+_FILE_RESULT_MESSAGE = "Success via unified architecture"
+
+# (lat, lon) -> (elevation_m, dem_source_used, message)
+PointLookup = Callable[[float, float], Awaitable[Tuple[Optional[float], Optional[str], Optional[str]]]]
+
+
+@dataclass
+class PointResult:
+    elevation_m: Optional[float] = None
+    dem_source: Optional[str] = None
+    message: Optional[str] = None
+
+
+class _TimingStats:
+    """Thread-safe running totals for one kind of work unit."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.units = 0
+        self.points = 0
+        self.queue_ms = 0.0
+        self.service_ms = 0.0
+        self.max_queue_ms = 0.0
+        self.max_service_ms = 0.0
+
+    def record(self, points: int, queue_ms: float, service_ms: float) -> None:
+        with self._lock:
+            self.units += 1
+            self.points += points
+            self.queue_ms += queue_ms
+            self.service_ms += service_ms
+            self.max_queue_ms = max(self.max_queue_ms, queue_ms)
+            self.max_service_ms = max(self.max_service_ms, service_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            units = self.units or 1
+            return {
+                "units": self.units,
+                "points": self.points,
+                "avg_queue_ms": round(self.queue_ms / units, 2),
+                "avg_service_ms": round(self.service_ms / units, 2),
+                "max_queue_ms": round(self.max_queue_ms, 2),
+                "max_service_ms": round(self.max_service_ms, 2),
+            }
+
+
+class PathScheduler:
+    """Runs batch point lookups as file groups under per-request and global concurrency limits."""
+
+    def __init__(self, global_concurrency: int = 8, per_request_concurrency: int = 4, max_group_points: int = 256):
+        self.global_concurrency = global_concurrency
+        self.per_request_concurrency = per_request_concurrency
+        self.max_group_points = max_group_points
+        self._global_slots = asyncio.Semaphore(global_concurrency)
+        self._in_flight = 0
+        self._queued = 0
+        self._requests = 0
+        self._file_stats = _TimingStats()
+        self._point_stats = _TimingStats()
+
+    async def run(self, lats: List[float], lons: List[float], point_lookup: PointLookup,
+                  unified_source: Any = None) -> List[PointResult]:
+        """
+        Elevations for every point, in input order.
+
+        Points are grouped by file only when a unified source is given (callers
+        pass None when a specific DEM source was requested); everything else
+        goes through point_lookup.
+        """
+        self._requests += 1
+        lat_array = np.asarray(lats, dtype=np.float64)
+        lon_array = np.asarray(lons, dtype=np.float64)
+        results = [PointResult() for _ in range(len(lat_array))]
+        request_slots = asyncio.Semaphore(self.per_request_concurrency)
+
+        remaining = np.arange(len(lat_array))
+        if unified_source is not None and len(lat_array):
+            groups = await self._plan_groups(unified_source, lat_array, lon_array)
+            await asyncio.gather(*(
+                self._run_file_group(request_slots, file_path, filename, members, lat_array, lon_array, results)
+                for file_path, filename, members in groups
+            ))
+            remaining = np.array([i for i, r in enumerate(results) if r.elevation_m is None], dtype=np.int64)
+
+        await asyncio.gather(*(
+            self._run_point(request_slots, int(i), lat_array, lon_array, point_lookup, results) for i in remaining
+        ))
+        return results
+
+    async def _plan_groups(self, unified_source: Any, lats: np.ndarray,
+                           lons: np.ndarray) -> List[Tuple[str, str, np.ndarray]]:
+        """(file_path, filename, point indices) per covering file, split at max_group_points."""
+        try:
+            assignment, files = await asyncio.to_thread(CoverageService(unified_source).assign_points, lats, lons)
+        except Exception as e:
+            logger.warning(f"Path grouping failed, using per-point lookups: {e}")
+            return []
+        groups = []
+        for number, covering in enumerate(files):
+            members = np.nonzero(assignment == number)[0]
+            for start in range(0, len(members), self.max_group_points):
+                groups.append((covering.file_path, covering.filename, members[start:start + self.max_group_points]))
+        return groups
+
+    async def _acquire(self, request_slots: asyncio.Semaphore) -> float:
+        """Wait for a per-request slot, then a global slot; returns queue time in ms."""
+        queued_at = time.perf_counter()
+        self._queued += 1
+        try:
+            await request_slots.acquire()
+            try:
+                await self._global_slots.acquire()
+            except BaseException:
+                request_slots.release()
+                raise
+        finally:
+            self._queued -= 1
+        self._in_flight += 1
+        return (time.perf_counter() - queued_at) * 1000
+
+    def _release(self, request_slots: asyncio.Semaphore) -> None:
+        self._in_flight -= 1
+        self._global_slots.release()
+        request_slots.release()
+
+    async def _run_file_group(self, request_slots: asyncio.Semaphore, file_path: str, filename: str,
+                              members: np.ndarray, lats: np.ndarray, lons: np.ndarray,
+                              results: List[PointResult]) -> None:
+        queue_ms = await self._acquire(request_slots)
+        started = time.perf_counter()
+        try:
+            tile_cache = get_raster_tile_cache()
+            sampler = tile_cache.sample_many if tile_cache is not None else sample_file_direct
+            values = await asyncio.to_thread(sampler, file_path, lats[members], lons[members])
+        except Exception as e:
+            # These points go through the per-point pipeline instead
+            logger.warning(f"Path group sampling failed for {filename}: {e}")
+            return
+        finally:
+            self._release(request_slots)
+            self._file_stats.record(len(members), queue_ms, (time.perf_counter() - started) * 1000)
+        for i, value in zip(members, values):
+            if not np.isnan(value):
+                results[i] = PointResult(float(value), filename, _FILE_RESULT_MESSAGE)
+
+    async def _run_point(self, request_slots: asyncio.Semaphore, i: int, lats: np.ndarray, lons: np.ndarray,
+                         point_lookup: PointLookup, results: List[PointResult]) -> None:
+        queue_ms = await self._acquire(request_slots)
+        started = time.perf_counter()
+        try:
+            results[i] = PointResult(*await point_lookup(float(lats[i]), float(lons[i])))
+        finally:
+            self._release(request_slots)
+            self._point_stats.record(1, queue_ms, (time.perf_counter() - started) * 1000)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "global_concurrency": self.global_concurrency,
+            "per_request_concurrency": self.per_request_concurrency,
+            "requests": self._requests,
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+            "file_groups": self._file_stats.to_dict(),
+            "single_points": self._point_stats.to_dict(),
+        }
+
+
+# Global scheduler instance (None until configured at startup)
+_path_scheduler: Optional[PathScheduler] = None
+
+
+def configure_path_scheduler(settings: Any) -> Optional[PathScheduler]:
+    """Create the process-wide path scheduler from settings (called once at startup)."""
+    global _path_scheduler
+    _path_scheduler = PathScheduler(
+        global_concurrency=settings.PATH_GLOBAL_CONCURRENCY,
+        per_request_concurrency=settings.PATH_REQUEST_CONCURRENCY,
+        max_group_points=settings.PATH_GROUP_MAX_POINTS,
+    )
+    logger.info(
+        f"Path scheduler configured: global={settings.PATH_GLOBAL_CONCURRENCY}, "
+        f"per_request={settings.PATH_REQUEST_CONCURRENCY}"
+    )
+    return _path_scheduler
+
+
+def get_path_scheduler() -> Optional[PathScheduler]:
+    return _path_scheduler
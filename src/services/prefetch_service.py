@@ -0,0 +1,316 @@
+"""
+Project Prefetch Service - pre-warm raster tiles for a registered project area.
+
+Engineers work on one corridor for weeks, but the first profile or contour on
+a new site pays for every cold COG header and block read. A project area
+(polygon, or polyline with a buffer) is resolved to its covering files via the
+unified index, and the tiles intersecting it are pulled into the host-local
+RasterTileCache by a small, low-priority thread pool so foreground requests
+keep the main executors. Project records are kept in a RedisJobRegistry, so
+any worker can answer status polls and pass on cancellations for a project
+warming on another worker.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from shapely.geometry import box
+from shapely.geometry.base import BaseGeometry
+
+from .coverage_service import CoverageService, CoveringFile, find_unified_source, reproject_geometry
+from .tile_cache import RasterTileCache, get_raster_tile_cache
+
+logger = logging.getLogger(__name__)
+
+_MAX_ERRORS_REPORTED = 10
+_PROGRESS_SAVE_INTERVAL_S = 1.0
+ACTIVE_STATES = ("pending", "running")
+
+
+def _lower_thread_priority() -> None:
+    """Executor initializer: nice the worker thread (per-thread on Linux)."""
+    if sys.platform.startswith("linux"):
+        try:
+            os.nice(10)
+        except OSError:
+            pass
+
+
+@dataclass
+class PrefetchJob:
+    """Warm-up state for one registered project area."""
+    id: str
+    name: Optional[str]
+    geometry: BaseGeometry
+    client_id: Optional[str] = None
+    state: str = "pending"
+    files_total: int = 0
+    files_done: int = 0
+    files_failed: int = 0
+    tiles_total: int = 0
+    tiles_fetched: int = 0
+    tiles_cached: int = 0
+    bytes_fetched: int = 0
+    truncated: bool = False
+    errors: List[str] = field(default_factory=list)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    cancel_requested: bool = False
+    host: str = field(default_factory=socket.gethostname)
+    # Tile counters are updated from several prefetch threads at once
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    _last_saved: float = field(default=0.0, repr=False, compare=False)
+
+    def reserve_tiles(self, wanted: int, max_tiles: int) -> int:
+        """Claim up to wanted tiles of the job's max_tiles budget; returns how many were granted."""
+        with self._lock:
+            granted = max(0, min(wanted, max_tiles - self.tiles_total))
+            if granted < wanted:
+                self.truncated = True
+            self.tiles_total += granted
+            return granted
+
+    def record_tile(self, nbytes: int) -> None:
+        """Count one warmed tile: fetched by this worker (nbytes > 0) or already cached."""
+        with self._lock:
+            if nbytes:
+                self.tiles_fetched += 1
+                self.bytes_fetched += nbytes
+            else:
+                self.tiles_cached += 1
+
+    @property
+    def progress_percent(self) -> float:
+        if not self.tiles_total:
+            return 100.0 if self.state == "completed" else 0.0
+        return round(100.0 * (self.tiles_fetched + self.tiles_cached) / self.tiles_total, 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "project_id": self.id,
+            "name": self.name,
+            "client_id": self.client_id,
+            "state": self.state,
+            "files_total": self.files_total,
+            "files_done": self.files_done,
+            "files_failed": self.files_failed,
+            "tiles_total": self.tiles_total,
+            "tiles_fetched": self.tiles_fetched,
+            "tiles_cached": self.tiles_cached,
+            "bytes_fetched": self.bytes_fetched,
+            "progress_percent": self.progress_percent,
+            "truncated": self.truncated,
+            "errors": list(self.errors),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "host": self.host,
+        }
+
+
+class ProjectPrefetchService:
+    """Registry and background runner for project-area tile warm-up jobs."""
+
+    def __init__(self, elevation_service: Any, tile_cache: Optional[RasterTileCache] = None,
+                 max_concurrency: int = 2, max_tiles: int = 20000, max_projects: int = 100,
+                 registry: Any = None):
+        """
+        Args:
+            registry: Shared RedisJobRegistry for project records; without one
+                projects are only visible on the worker that registered them
+        """
+        self.elevation_service = elevation_service
+        self.registry = registry
+        self._tile_cache = tile_cache
+        self.max_concurrency = max_concurrency
+        self.max_tiles = max_tiles
+        self.max_projects = max_projects
+        self._jobs: "OrderedDict[str, PrefetchJob]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="dem-prefetch",
+            initializer=_lower_thread_priority,
+        )
+
+    @property
+    def tile_cache(self) -> Optional[RasterTileCache]:
+        return self._tile_cache or get_raster_tile_cache()
+
+    # ---------------------------------------------------------------- registry
+    def register(self, geometry: BaseGeometry, name: Optional[str] = None,
+                 client_id: Optional[str] = None) -> PrefetchJob:
+        """Register a project area and start warming it in the background."""
+        if self.tile_cache is None:
+            raise RuntimeError("Raster tile cache is disabled (TILE_CACHE_ENABLED=false)")
+
+        job = PrefetchJob(id=uuid.uuid4().hex[:12], name=name, geometry=geometry, client_id=client_id)
+        self._jobs[job.id] = job
+        self._evict_old_jobs()
+        self._save(job)
+        self._tasks[job.id] = asyncio.create_task(self._run(job))
+        logger.info(f"Prefetch project {job.id} registered ({name or 'unnamed'}, bounds={geometry.bounds})")
+        return job
+
+    def get(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Project record from this worker, or from the shared registry for projects warming elsewhere."""
+        job = self._jobs.get(project_id)
+        if job is not None:
+            return job.to_dict()
+        return self.registry.get(project_id) if self.registry is not None else None
+
+    def list(self, client_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """A client's projects, most recent first."""
+        if self.registry is not None:
+            return self.registry.list_for_client(client_id, limit)
+        return [job.to_dict() for job in reversed(self._jobs.values()) if job.client_id == client_id][:limit]
+
+    def cancel(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Stop warming a project; projects warming on another worker are flagged for it."""
+        job = self._jobs.get(project_id)
+        if job is None:
+            record = self.registry.get(project_id) if self.registry is not None else None
+            if record is not None and record.get("state") in ACTIVE_STATES:
+                self.registry.request_cancel(project_id)
+            return record
+        if job.state in ACTIVE_STATES:
+            # Worker threads check the flag between tiles
+            job.cancel_requested = True
+            task = self._tasks.get(project_id)
+            if task is not None and job.state == "pending":
+                # Not started yet, so _run will not record the cancellation itself
+                task.cancel()
+                job.state = "cancelled"
+                job.finished_at = datetime.now(timezone.utc)
+            self._save(job)
+        return job.to_dict()
+
+    def _save(self, job: PrefetchJob, force: bool = True) -> None:
+        """Mirror a project to the registry (at most once a second unless forced) and pick up remote cancels."""
+        if self.registry is None:
+            return
+        now = time.monotonic()
+        if not force and now - job._last_saved < _PROGRESS_SAVE_INTERVAL_S:
+            return
+        job._last_saved = now
+        try:
+            self.registry.save(job.to_dict())
+            if job.state in ACTIVE_STATES and self.registry.cancel_requested(job.id):
+                job.cancel_requested = True
+        except Exception as e:
+            logger.warning(f"Could not save prefetch project {job.id} to the registry: {e}")
+
+    def _evict_old_jobs(self) -> None:
+        """Keep the registry bounded by forgetting the oldest finished projects."""
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_projects:
+                break
+            if self._jobs[job_id].state not in ACTIVE_STATES:
+                del self._jobs[job_id]
+                self._tasks.pop(job_id, None)
+
+    # ------------------------------------------------------------------ runner
+    def resolve_files(self, geometry: BaseGeometry) -> List[CoveringFile]:
+        """Covering files for a geometry via the unified index (empty if not loaded)."""
+        source = find_unified_source(self.elevation_service)
+        if source is None:
+            return []
+        return CoverageService(source).find_files_for_geometry(geometry)
+
+    async def _run(self, job: PrefetchJob) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            job.state = "running"
+            job.started_at = datetime.now(timezone.utc)
+            self._save(job)
+            files = await loop.run_in_executor(self._executor, self.resolve_files, job.geometry)
+            job.files_total = len(files)
+
+            # Files are independent, so keep every prefetch worker busy
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def warm(covering: CoveringFile) -> None:
+                async with semaphore:
+                    if job.cancel_requested:
+                        return
+                    try:
+                        await loop.run_in_executor(self._executor, self._warm_file, job, covering.file_path)
+                    except Exception as e:
+                        logger.warning(f"Prefetch {job.id}: {covering.filename} failed: {e}")
+                        job.files_failed += 1
+                        if len(job.errors) < _MAX_ERRORS_REPORTED:
+                            job.errors.append(f"{covering.filename}: {e}")
+                    job.files_done += 1
+                    self._save(job, force=False)
+
+            await asyncio.gather(*(warm(f) for f in files))
+            if job.tiles_fetched:
+                await loop.run_in_executor(self._executor, self.tile_cache.prune)
+            if job.cancel_requested:
+                job.state = "cancelled"
+            elif files and job.files_failed == len(files):
+                job.state = "failed"
+            else:
+                job.state = "completed"
+        except asyncio.CancelledError:
+            job.state = "cancelled"
+        except Exception as e:
+            logger.error(f"Prefetch {job.id} failed: {e}")
+            job.state = "failed"
+            job.errors.append(str(e))
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            self._tasks.pop(job.id, None)
+            self._save(job)
+            logger.info(
+                f"Prefetch {job.id} {job.state}: {job.files_done}/{job.files_total} files, "
+                f"{job.tiles_fetched} fetched, {job.tiles_cached} already cached, "
+                f"{job.bytes_fetched / (1024 * 1024):.1f}MB"
+            )
+
+    def select_tiles(self, header, geometry: BaseGeometry) -> List[tuple]:
+        """Tiles of one file intersecting a WGS84 geometry."""
+        cache = self.tile_cache
+        native = reproject_geometry(geometry, "EPSG:4326", header.crs_wkt)
+        candidates = cache.tiles_for_native_bounds(header, *native.bounds)
+        return [
+            (row, col) for row, col in candidates
+            if box(*cache.tile_bounds_native(header, row, col)).intersects(native)
+        ]
+
+    def _warm_file(self, job: PrefetchJob, file_path: str) -> None:
+        """Fetch the header and every missing intersecting tile of one file (sync)."""
+        cache = self.tile_cache
+        header = cache.get_header(file_path)
+        tiles = self.select_tiles(header, job.geometry)
+
+        tiles = tiles[:job.reserve_tiles(len(tiles), self.max_tiles)]
+        for row, col in tiles:
+            if job.cancel_requested:
+                return
+            if cache.has_tile(file_path, row, col):
+                job.record_tile(0)
+                continue
+            # nbytes is 0 when another worker held the lease and published the tile
+            _, nbytes = cache.ensure_tile(file_path, row, col)
+            job.record_tile(nbytes)
+            self._save(job, force=False)
+
+    def close(self) -> None:
+        for job in self._jobs.values():
+            job.cancel_requested = True
+        for task in list(self._tasks.values()):
+            task.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,405 @@
+"""
+Raster Export Service - DEM windows for a polygon as a compact binary raster.
+
+Frontend and desktop tools used to rebuild grids from up to 50,000 DEMPoint
+JSON objects returned by /contour-data. A clip instead returns the raster
+itself:
+- covering files come from the unified index, in priority order
+- the output grid is the highest-priority file's native pixel grid, snapped
+  around the polygon's bounds
+- each covering file is warped onto that grid (a WarpedVRT per file, read
+  once) and fills only the pixels still empty, so higher-priority campaigns
+  win and lower-priority ones fill their gaps
+- pixels outside the polygon are masked to NaN
+Regular grids use the same mosaic on a grid chosen by the caller instead: a
+projected target CRS (MGA, NZTM, ...) at a given spacing, aligned to whole
+multiples of it, with nearest/bilinear/cubic resampling applied by the warp.
+Contours use the clip mosaic unmasked, coarsened by a whole factor to a cell
+budget, and read it through InMemoryDataset as if it were one raster.
+Terrain derivatives read the regular grid with a one-cell margin (pad_cells)
+so kernels have every neighbour of the edge cells.
+The grid is encoded as a Cloud-Optimized GeoTIFF, or a float32 .npy with its
+geotransform and CRS in response headers.
+"""
+
+import asyncio
+import io
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from shapely.geometry import Polygon, box
+from shapely.geometry.base import BaseGeometry
+
+from .coverage_service import CoverageService, CoveringFile, find_unified_source, reproject_geometry
+from .tile_cache import DirectTileReader, get_raster_tile_cache, raster_env, to_vsi_path
+
+logger = logging.getLogger(__name__)
+
+GEOTIFF_MEDIA_TYPE = "image/tiff; application=geotiff; profile=cloud-optimized"
+NPY_MEDIA_TYPE = "application/x-npy"
+
+RESAMPLING_METHODS = ("nearest", "bilinear", "cubic")
+
+_SNAP_TOLERANCE = 1e-6  # pixels
+
+
+@dataclass
+class GridSpec:
+    """Output pixel grid: CRS, north-up affine transform (a, b, c, d, e, f) and size."""
+    crs_wkt: str
+    transform: Tuple[float, float, float, float, float, float]
+    width: int
+    height: int
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+    @property
+    def geotransform(self) -> Tuple[float, float, float, float, float, float]:
+        """GDAL ordering (c, a, b, f, d, e)."""
+        a, b, c, d, e, f = self.transform
+        return c, a, b, f, d, e
+
+
+@dataclass
+class RasterGrid:
+    """A mosaicked float32 grid (NaN = no data), the files that filled it and any that could not be read."""
+    spec: GridSpec
+    data: np.ndarray
+    sources: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        """Every covering file was read, so the grid is safe to cache."""
+        return not self.failed
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "X-Geotransform": ",".join(repr(float(v)) for v in self.spec.geotransform),
+            "X-Raster-Width": str(self.spec.width),
+            "X-Raster-Height": str(self.spec.height),
+            "X-Raster-CRS": _crs_label(self.spec.crs_wkt),
+            "X-Raster-Nodata": "nan",
+            "X-Raster-Sources": ",".join(self.sources),
+        }
+        if self.failed:
+            headers["X-Raster-Failed-Files"] = ",".join(self.failed)
+        return headers
+
+    def to_npy(self) -> bytes:
+        buffer = io.BytesIO()
+        np.save(buffer, self.data.astype(np.float32, copy=False))
+        return buffer.getvalue()
+
+    def to_geotiff(self) -> bytes:
+        """Cloud-Optimized GeoTIFF (deflate, float32, NaN nodata) built in memory."""
+        from affine import Affine
+        from rasterio.io import MemoryFile
+
+        with MemoryFile() as memory_file:
+            with memory_file.open(
+                driver="COG", width=self.spec.width, height=self.spec.height, count=1, dtype="float32",
+                crs=self.spec.crs_wkt, transform=Affine(*self.spec.transform), nodata=float("nan"),
+                compress="deflate", predictor=3,
+            ) as dataset:
+                dataset.write(self.data.astype(np.float32, copy=False), 1)
+            return memory_file.read()
+
+
+class InMemoryDataset:
+    """
+    A RasterGrid behind the part of the rasterio dataset API window readers use.
+
+    transform, width, height, res, nodata (None; gaps are NaN) and
+    read(1, window=((r0, r1), (c0, c1)), out_shape=...), where out_shape
+    decimates by nearest neighbour like GDAL: each output cell takes the pixel
+    under its centre.
+    """
+    nodata = None
+
+    def __init__(self, grid: RasterGrid):
+        self.grid = grid
+        self.crs_wkt = grid.spec.crs_wkt
+        self.transform = grid.spec.transform
+        self.width = grid.spec.width
+        self.height = grid.spec.height
+        self.res = (abs(self.transform[0]), abs(self.transform[4]))
+
+    def read(self, band: int = 1, window=None, out_shape=None, resampling=None) -> np.ndarray:
+        data = self.grid.data
+        if window is not None:
+            (row_start, row_end), (col_start, col_end) = window
+            data = data[row_start:row_end, col_start:col_end]
+        if out_shape is not None:
+            rows = np.floor((np.arange(out_shape[0]) + 0.5) * data.shape[0] / out_shape[0]).astype(np.intp)
+            cols = np.floor((np.arange(out_shape[1]) + 0.5) * data.shape[1] / out_shape[1]).astype(np.intp)
+            data = data[np.ix_(rows, cols)]
+        return data
+
+
+def _crs_label(crs_wkt: str) -> str:
+    """EPSG code when the CRS has one, otherwise the WKT."""
+    from pyproj import CRS
+    epsg = CRS.from_wkt(crs_wkt).to_epsg()
+    return f"EPSG:{epsg}" if epsg else crs_wkt
+
+
+def snap_grid(crs_wkt: str, transform: Sequence[float], native_bounds: Tuple[float, float, float, float]) -> GridSpec:
+    """Smallest window of a north-up pixel grid covering native_bounds."""
+    a, _, c, _, e, f = transform
+    min_x, min_y, max_x, max_y = native_bounds
+    # Bounds that land on a pixel edge after reprojection round-off stay on it
+    col_start = math.floor((min_x - c) / a + _SNAP_TOLERANCE)
+    col_end = math.ceil((max_x - c) / a - _SNAP_TOLERANCE)
+    row_start = math.floor((max_y - f) / e + _SNAP_TOLERANCE)
+    row_end = math.ceil((min_y - f) / e - _SNAP_TOLERANCE)
+    return GridSpec(
+        crs_wkt=crs_wkt,
+        transform=(a, 0.0, c + col_start * a, 0.0, e, f + row_start * e),
+        width=max(1, col_end - col_start),
+        height=max(1, row_end - row_start),
+    )
+
+
+def grid_bounds(spec: GridSpec) -> Tuple[float, float, float, float]:
+    """(min_x, min_y, max_x, max_y) of a north-up grid."""
+    a, _, c, _, e, f = spec.transform
+    return c, f + spec.height * e, c + spec.width * a, f
+
+
+def coarsen(spec: GridSpec, factor: int) -> GridSpec:
+    """The same grid origin with pixels factor times larger, still covering the original extent."""
+    if factor <= 1:
+        return spec
+    a, b, c, d, e, f = spec.transform
+    return GridSpec(
+        crs_wkt=spec.crs_wkt,
+        transform=(a * factor, b, c, d, e * factor, f),
+        width=-(-spec.width // factor),
+        height=-(-spec.height // factor),
+    )
+
+
+def pad_grid(spec: GridSpec, cells: int) -> GridSpec:
+    """The same grid extended by cells pixels on every side."""
+    if cells <= 0:
+        return spec
+    a, b, c, d, e, f = spec.transform
+    return GridSpec(
+        crs_wkt=spec.crs_wkt,
+        transform=(a, b, c - cells * a, d, e, f - cells * e),
+        width=spec.width + 2 * cells,
+        height=spec.height + 2 * cells,
+    )
+
+
+def wgs84_polygon(polygon_coords: Sequence[Tuple[float, float]]) -> BaseGeometry:
+    """A (lat, lon) ring as a valid lon/lat geometry."""
+    polygon = Polygon([(lon, lat) for lat, lon in polygon_coords])
+    return polygon if polygon.is_valid else polygon.buffer(0)
+
+
+def projected_crs_wkt(target_crs: str) -> str:
+    """WKT for a projected, metre-based CRS given as "EPSG:7856", WKT, etc.; ValueError otherwise."""
+    from pyproj import CRS
+    from pyproj.exceptions import CRSError
+
+    try:
+        crs = CRS.from_user_input(target_crs)
+    except CRSError as e:
+        raise ValueError(f"Unknown target CRS '{target_crs}': {e}")
+    if not crs.is_projected or crs.axis_info[0].unit_name not in ("metre", "meter"):
+        raise ValueError(f"Target CRS '{target_crs}' must be a projected CRS in metres")
+    return crs.to_wkt()
+
+
+def area_geometry(crs_wkt: str, polygon_coords: Optional[Sequence[Tuple[float, float]]] = None,
+                  bounds: Optional[Tuple[float, float, float, float]] = None) -> BaseGeometry:
+    """A grid request's area in crs_wkt: a (lat, lon) polygon, or (min_x, min_y, max_x, max_y) bounds in crs_wkt."""
+    if polygon_coords:
+        return reproject_geometry(wgs84_polygon(polygon_coords), "EPSG:4326", crs_wkt)
+    if bounds:
+        return box(*bounds)
+    raise ValueError("Provide polygon_coordinates or bounds")
+
+
+def warp_to_grid(file_path: str, spec: GridSpec, resampling: str = "nearest") -> np.ndarray:
+    """One file warped onto the output grid through a WarpedVRT (NaN where the file has no data)."""
+    import rasterio
+    from affine import Affine
+    from rasterio.enums import Resampling
+    from rasterio.vrt import WarpedVRT
+
+    vsi_path = to_vsi_path(file_path)
+    with raster_env(vsi_path), rasterio.open(vsi_path) as dataset:
+        with WarpedVRT(
+            dataset, crs=spec.crs_wkt, transform=Affine(*spec.transform), width=spec.width, height=spec.height,
+            resampling=Resampling[resampling], src_nodata=dataset.nodata, nodata=float("nan"), dtype="float32",
+        ) as vrt:
+            return vrt.read(1)
+
+
+def polygon_mask(geometry: BaseGeometry, spec: GridSpec) -> np.ndarray:
+    """True for pixels whose centre lies inside the (native CRS) geometry, rasterized without coordinate grids."""
+    from affine import Affine
+    from rasterio.features import geometry_mask
+
+    if geometry.is_empty:
+        return np.zeros((spec.height, spec.width), dtype=bool)
+    return geometry_mask([geometry], out_shape=(spec.height, spec.width), transform=Affine(*spec.transform),
+                         invert=True)
+
+
+class RasterExportService:
+    """Clips and regrids mosaicked DEM windows from the covering campaign files."""
+
+    def __init__(self, elevation_service: Any, max_pixels: int = 25_000_000,
+                 warp: Callable[[str, GridSpec, str], np.ndarray] = warp_to_grid):
+        self.elevation_service = elevation_service
+        self.max_pixels = max_pixels
+        self.warp = warp
+
+    async def clip(self, polygon_coords: Sequence[Tuple[float, float]]) -> Optional[RasterGrid]:
+        """
+        The DEM window covering a (lat, lon) polygon, masked to it.
+
+        Returns None when no unified collection is loaded; raises ValueError
+        when nothing covers the polygon or the window exceeds max_pixels.
+        """
+        source = find_unified_source(self.elevation_service)
+        if source is None:
+            return None
+        return await asyncio.to_thread(self.clip_polygon, CoverageService(source), wgs84_polygon(polygon_coords))
+
+    def clip_polygon(self, coverage: CoverageService, polygon: BaseGeometry) -> RasterGrid:
+        files, spec, native = self.native_window(coverage, polygon)
+        self._check_size(spec)
+        return self.mosaic(files, spec, "nearest", mask=polygon_mask(native, spec))
+
+    def polygon_grid(self, polygon_coords: Sequence[Tuple[float, float]], max_pixels: int) -> Optional[RasterGrid]:
+        """
+        Mosaic of every file covering a (lat, lon) polygon, for contouring.
+
+        Same grid as a clip, not masked, coarsened by the smallest whole factor
+        that keeps it within max_pixels. Returns None when no unified collection
+        is loaded; raises ValueError when nothing covers the polygon.
+        """
+        source = find_unified_source(self.elevation_service)
+        if source is None:
+            return None
+        return self.polygon_mosaic(CoverageService(source), wgs84_polygon(polygon_coords), max_pixels)
+
+    def native_window(self, coverage: CoverageService,
+                      polygon: BaseGeometry) -> Tuple[List[CoveringFile], GridSpec, BaseGeometry]:
+        """
+        Files covering a WGS84 polygon in priority order, the top-priority
+        file's pixel grid snapped around it, and the polygon in that grid's CRS.
+        Nothing is read; raises ValueError when nothing covers the polygon.
+        """
+        files = self._covering_files(coverage, polygon)
+        spec, native = self._native_grid(files, polygon)
+        return files, spec, native
+
+    def polygon_mosaic(self, coverage: CoverageService, polygon: BaseGeometry, max_pixels: int) -> RasterGrid:
+        files = self._covering_files(coverage, polygon)
+        spec, _ = self._native_grid(files, polygon)
+        factor = max(1, math.ceil(math.sqrt(spec.pixels / max_pixels)))
+        # Coarser cells are interpolated by the warp rather than taken from single pixels
+        return self.mosaic(files, coarsen(spec, factor), "nearest" if factor == 1 else "bilinear")
+
+    def _covering_files(self, coverage: CoverageService, polygon: BaseGeometry) -> List[CoveringFile]:
+        files = coverage.find_files_for_geometry(polygon)
+        if not files:
+            raise ValueError("No DEM files cover this polygon")
+        return files
+
+    def _native_grid(self, files: List[CoveringFile], polygon: BaseGeometry) -> Tuple[GridSpec, BaseGeometry]:
+        """The top-priority file's pixel grid snapped around the WGS84 polygon, and the polygon in its CRS."""
+        tile_cache = get_raster_tile_cache()
+        reader = tile_cache if tile_cache is not None else DirectTileReader()
+        try:
+            header = reader.get_header(files[0].file_path)
+        finally:
+            if reader is not tile_cache:
+                reader.close()
+
+        native = reproject_geometry(polygon, "EPSG:4326", header.crs_wkt)
+        return snap_grid(header.crs_wkt, header.transform, native.bounds), native
+
+    async def grid(self, target_crs: str, resolution_m: float, resampling: str = "bilinear",
+                   polygon_coords: Optional[Sequence[Tuple[float, float]]] = None,
+                   bounds: Optional[Tuple[float, float, float, float]] = None,
+                   mask_to_polygon: bool = False) -> Optional[RasterGrid]:
+        """
+        Elevation on a regular grid in target_crs at resolution_m spacing.
+
+        The area is a (lat, lon) polygon or (min_x, min_y, max_x, max_y) bounds
+        in the target CRS. Returns None when no unified collection is loaded.
+        """
+        if resampling not in RESAMPLING_METHODS:
+            raise ValueError(f"Resampling must be one of: {', '.join(RESAMPLING_METHODS)}")
+        source = find_unified_source(self.elevation_service)
+        if source is None:
+            return None
+        crs_wkt = projected_crs_wkt(target_crs)
+        area = area_geometry(crs_wkt, polygon_coords, bounds)
+        return await asyncio.to_thread(
+            self.grid_area, CoverageService(source), crs_wkt, resolution_m, resampling, area, mask_to_polygon
+        )
+
+    def grid_area(self, coverage: CoverageService, crs_wkt: str, resolution_m: float, resampling: str,
+                  area: BaseGeometry, mask_to_polygon: bool = False, pad_cells: int = 0) -> RasterGrid:
+        """
+        Mosaic the covering files onto a grid aligned to multiples of resolution_m (area in crs_wkt).
+
+        pad_cells extends the grid beyond the area on every side, for kernels
+        that need neighbours of the edge cells.
+        """
+        spec = pad_grid(snap_grid(crs_wkt, (resolution_m, 0.0, 0.0, 0.0, -resolution_m, 0.0), area.bounds), pad_cells)
+        self._check_size(spec)
+        # The padding ring may reach files the area itself does not touch
+        lookup = box(*grid_bounds(spec)) if pad_cells > 0 else area
+        files = coverage.find_files_for_geometry(reproject_geometry(lookup, crs_wkt, "EPSG:4326"))
+        if not files:
+            raise ValueError("No DEM files cover this area")
+        return self.mosaic(files, spec, resampling, mask=polygon_mask(area, spec) if mask_to_polygon else None)
+
+    def mosaic(self, files: List[CoveringFile], spec: GridSpec, resampling: str,
+               mask: Optional[np.ndarray] = None) -> RasterGrid:
+        """
+        Fill the grid from files in priority order; each only fills pixels still empty.
+
+        With a mask only its True pixels are filled (the rest stay NaN), so
+        lower-priority files are not read for pixels outside a clip polygon.
+        Files that fail to read (e.g. an S3 timeout) are skipped and listed in
+        the grid's failed, so callers can serve the partial grid without caching it.
+        """
+        data = np.full((spec.height, spec.width), np.nan, dtype=np.float32)
+        sources: List[str] = []
+        failed: List[str] = []
+        for covering in files:
+            empty = np.isnan(data) if mask is None else np.isnan(data) & mask
+            if not empty.any():
+                break
+            try:
+                values = self.warp(covering.file_path, spec, resampling)
+            except Exception as e:
+                logger.warning(f"Raster export could not read {covering.filename}: {e}")
+                failed.append(covering.filename)
+                continue
+            fill = empty & ~np.isnan(values)
+            if fill.any():
+                data[fill] = values[fill]
+                sources.append(covering.filename)
+        return RasterGrid(spec=spec, data=data, sources=sources, failed=failed)
+
+    def _check_size(self, spec: GridSpec) -> None:
+        if spec.pixels > self.max_pixels:
+            raise ValueError(
+                f"Requested raster is {spec.width} x {spec.height} pixels, over the limit of {self.max_pixels}"
+            )
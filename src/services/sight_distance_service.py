@@ -0,0 +1,204 @@
+"""
+Sight Distance Service - available sight distance along a road alignment's vertical profile.
+
+Stopping and overtaking sight distance checks needed repeated line-of-sight
+tests against the terrain, each re-sampling the ground. Here the alignment is
+sampled once at native resolution (LineProfileService, one segment at a
+time, joined by chainage) and every station is evaluated against that one
+profile:
+- the observer's eye is eye_height_m above the ground at the station, the
+  object object_height_m above the ground at each sample ahead
+- the object at a sample is visible when its sight-line slope from the eye is
+  at least the steepest terrain slope to any sample before it, so a running
+  maximum (np.maximum.accumulate) over the samples ahead decides every target
+  at once, for a block of stations at a time
+- available sight distance is the distance to the last visible sample before
+  the first hidden one, capped at max_distance_m
+Both directions are evaluated (reverse by flipping the profile). Only the
+vertical profile is considered; horizontal curves and roadside obstructions
+are not. Missing ground samples are interpolated along chainage.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .coverage_service import find_unified_source
+from .profile_service import LineProfileService, geodesic_length_m
+
+logger = logging.getLogger(__name__)
+
+# Station x sample cells evaluated per block (bounds memory)
+_BLOCK_CELLS = 2_000_000
+
+
+@dataclass
+class SightDistances:
+    """Available sight distance per station in one direction, and what limited it."""
+    distance_m: np.ndarray
+    limited_by: List[str]
+
+
+@dataclass
+class SightDistanceProfile:
+    """The joined native profile and per-station sight distances in both directions."""
+    chainage_m: np.ndarray
+    lats: np.ndarray
+    lons: np.ndarray
+    elevations: np.ndarray
+    station_index: np.ndarray
+    forward: SightDistances
+    reverse: SightDistances
+    missing_samples: int
+    files_used: List[str] = field(default_factory=list)
+
+    @property
+    def length_m(self) -> float:
+        return float(self.chainage_m[-1])
+
+    def stations(self, required_m: Optional[float] = None) -> List[Dict[str, Any]]:
+        rows = []
+        for number, index in enumerate(self.station_index):
+            forward = float(self.forward.distance_m[number])
+            reverse = float(self.reverse.distance_m[number])
+            rows.append({
+                "chainage_m": round(float(self.chainage_m[index]), 3),
+                "lat": float(self.lats[index]),
+                "lon": float(self.lons[index]),
+                "elevation_m": round(float(self.elevations[index]), 3),
+                "forward_m": round(forward, 3),
+                "reverse_m": round(reverse, 3),
+                "forward_limited_by": self.forward.limited_by[number],
+                "reverse_limited_by": self.reverse.limited_by[number],
+                "meets_requirement": None if required_m is None else bool(
+                    _meets(forward, self.forward.limited_by[number], required_m)
+                    and _meets(reverse, self.reverse.limited_by[number], required_m)
+                ),
+            })
+        return rows
+
+
+def _meets(distance_m: float, limited_by: str, required_m: float) -> bool:
+    # Running out of alignment is not a sight restriction
+    return distance_m >= required_m or limited_by == "end_of_alignment"
+
+
+def sight_distances(chainage_m: np.ndarray, elevations: np.ndarray, station_index: np.ndarray,
+                    eye_height_m: float, object_height_m: float, max_distance_m: float) -> SightDistances:
+    """
+    Forward (increasing chainage) sight distance from each station sample.
+
+    The object at sample j is visible from station i when
+    (z[j] + object - eye) / d[j] >= max over i < k < j of (z[k] - eye) / d[k],
+    with eye = z[i] + eye_height_m and d the distance from the station.
+    """
+    n = len(chainage_m)
+    reach = np.searchsorted(chainage_m, chainage_m[station_index] + max_distance_m, side="right") - 1
+    width = int(max(1, (reach - station_index).max(initial=0)))
+    offsets = np.arange(1, width + 1)
+    block = max(1, _BLOCK_CELLS // width)
+
+    distances = np.zeros(len(station_index))
+    limited_by: List[str] = []
+    for start in range(0, len(station_index), block):
+        stations = station_index[start:start + block]
+        ahead = stations[:, np.newaxis] + offsets
+        in_reach = ahead <= reach[start:start + block, np.newaxis]
+        ahead = np.minimum(ahead, n - 1)
+
+        eye = elevations[stations, np.newaxis] + eye_height_m
+        distance = chainage_m[ahead] - chainage_m[stations, np.newaxis]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            terrain = (elevations[ahead] - eye) / distance
+            target = (elevations[ahead] + object_height_m - eye) / distance
+        terrain[~in_reach] = -np.inf
+        # Steepest terrain sight line to any sample strictly before each target
+        blocking = np.maximum.accumulate(terrain, axis=1)
+        blocking = np.concatenate([np.full((len(stations), 1), -np.inf), blocking[:, :-1]], axis=1)
+        hidden = in_reach & (target < blocking)
+
+        has_hidden = hidden.any(axis=1)
+        last_visible = np.where(has_hidden, hidden.argmax(axis=1) - 1, in_reach.sum(axis=1) - 1)
+        visible_distance = np.take_along_axis(distance, np.maximum(last_visible, 0)[:, np.newaxis], axis=1)[:, 0]
+        distances[start:start + block] = np.where(last_visible >= 0, visible_distance, 0.0)
+        reaches_end = chainage_m[-1] - chainage_m[stations] < max_distance_m
+        limited_by.extend(np.where(has_hidden, "terrain",
+                                   np.where(reaches_end, "end_of_alignment", "max_distance")).tolist())
+    return SightDistances(distance_m=distances, limited_by=limited_by)
+
+
+class SightDistanceService:
+    """Available sight distance per station along a multi-vertex alignment."""
+
+    def __init__(self, profile_service: LineProfileService, max_length_m: float = 50_000):
+        self.profile_service = profile_service
+        self.max_length_m = max_length_m
+
+    async def analyse(self, vertices: Sequence[Tuple[float, float]], station_interval_m: float,
+                      eye_height_m: float = 1.1, object_height_m: float = 0.2,
+                      max_distance_m: float = 500.0) -> Optional[SightDistanceProfile]:
+        """
+        Sight distances at every station_interval_m along (lat, lon) vertices.
+
+        Returns None when no unified collection is loaded; raises ValueError
+        when the alignment is too long or a segment is not covered.
+        """
+        if find_unified_source(self.profile_service.elevation_service) is None:
+            return None
+        length_m = sum(geodesic_length_m(*vertices[i], *vertices[i + 1]) for i in range(len(vertices) - 1))
+        if length_m > self.max_length_m:
+            raise ValueError(f"Alignment is {length_m:.0f} m long, over the limit of {self.max_length_m:.0f} m")
+        chainage, lats, lons, elevations, files_used = await self._profile(vertices)
+        return await asyncio.to_thread(
+            self.evaluate, chainage, lats, lons, elevations, files_used, station_interval_m,
+            eye_height_m, object_height_m, max_distance_m
+        )
+
+    def evaluate(self, chainage: np.ndarray, lats: np.ndarray, lons: np.ndarray, elevations: np.ndarray,
+                 files_used: List[str], station_interval_m: float, eye_height_m: float,
+                 object_height_m: float, max_distance_m: float) -> SightDistanceProfile:
+        """Sight distances in both directions from stations on a joined profile."""
+        valid = ~np.isnan(elevations)
+        if valid.sum() < 2:
+            raise ValueError("The alignment has no elevation data")
+        missing = int((~valid).sum())
+        elevations = np.interp(chainage, chainage[valid], elevations[valid])
+
+        station_chainage = np.append(np.arange(0.0, chainage[-1], station_interval_m), chainage[-1])
+        station_index = np.unique(np.clip(np.searchsorted(chainage, station_chainage), 0, len(chainage) - 1))
+
+        forward = sight_distances(chainage, elevations, station_index, eye_height_m, object_height_m, max_distance_m)
+        # Reverse: the same walk over the flipped profile
+        flipped = len(chainage) - 1 - station_index[::-1]
+        backward = sight_distances(chainage[-1] - chainage[::-1], elevations[::-1], flipped,
+                                   eye_height_m, object_height_m, max_distance_m)
+        reverse = SightDistances(backward.distance_m[::-1], backward.limited_by[::-1])
+
+        logger.info(f"Sight distance for {len(station_index)} stations over {chainage[-1]:.0f} m "
+                    f"({len(chainage)} profile samples)")
+        return SightDistanceProfile(
+            chainage_m=chainage, lats=lats, lons=lons, elevations=elevations, station_index=station_index,
+            forward=forward, reverse=reverse, missing_samples=missing, files_used=files_used,
+        )
+
+    async def _profile(self, vertices: Sequence[Tuple[float, float]]):
+        """Native profiles of each segment joined by chainage (shared vertices once)."""
+        chainage, lats, lons, elevations, files_used = [], [], [], [], []
+        offset = 0.0
+        for number in range(len(vertices) - 1):
+            (start_lat, start_lon), (end_lat, end_lon) = vertices[number], vertices[number + 1]
+            profile = await self.profile_service.get_line_profile(start_lat, start_lon, end_lat, end_lon)
+            if profile is None:
+                raise ValueError(f"Segment {number} is not covered by the unified index")
+            skip = 1 if number > 0 else 0
+            chainage.append(profile.chainage_m[skip:] + offset)
+            lats.append(profile.lats[skip:])
+            lons.append(profile.lons[skip:])
+            elevations.append(profile.elevations[skip:])
+            files_used.extend(f for f in profile.files_used if f not in files_used)
+            offset += profile.length_m
+        return (np.concatenate(chainage), np.concatenate(lats), np.concatenate(lons),
+                np.concatenate(elevations).astype(np.float64), files_used)
@@ -0,0 +1,317 @@
+"""
+Terrain Service - slope, aspect and hillshade computed on the windowed DEM.
+
+Road engineers pulled raw points and computed grade and aspect client-side.
+Derivatives are now computed here with NumPy finite differences over the
+campaign mosaic, using Horn's 3x3 kernel (the one gdaldem uses):
+- binary grids reuse the /grid machinery: covering files warped onto a
+  regular projected grid, read with a one-cell halo so edge cells have all
+  their neighbours, then masked to the polygon when asked
+- PNG tiles are rendered on the web-mercator XYZ grid, with gradients scaled
+  by the mercator scale factor so slopes are in ground metres
+- derived windows are cached in a byte-bounded LRU keyed by product, options,
+  window and unified index version, registered with the memory governor;
+  windows missing a file that could not be read are served but not cached
+Cells next to no data are no data; aspect is no data on flat cells.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from pyproj import CRS, Transformer
+from shapely.geometry import box
+
+from ..utils.http_cache import get_index_version
+from ..utils.png import encode_png
+from .contour_tile_service import mercator_bounds
+from .coverage_service import CoverageService, find_unified_index, find_unified_source
+from .memory_governor import get_memory_governor
+from .raster_export_service import (
+    GridSpec, RasterExportService, RasterGrid, area_geometry, pad_grid, polygon_mask, projected_crs_wkt, snap_grid,
+)
+
+logger = logging.getLogger(__name__)
+
+TERRAIN_PRODUCTS = ("slope", "aspect", "hillshade")
+SLOPE_UNITS = ("degrees", "percent")
+
+MIN_ZOOM = 10
+MAX_ZOOM = 18
+
+_MB = 1024 * 1024
+_MERCATOR_WKT = CRS.from_epsg(3857).to_wkt()
+_TO_WGS84 = Transformer.from_crs("EPSG:3857", "EPSG:4326", always_xy=True)
+
+# Tile colour ramps: (stop values, RGB at each stop)
+_SLOPE_RAMP = (
+    [0.0, 2.0, 5.0, 10.0, 20.0, 45.0],
+    [(26, 150, 65), (166, 217, 106), (255, 255, 191), (253, 174, 97), (215, 25, 28), (120, 0, 0)],
+)
+_ASPECT_RAMP = (
+    [0.0, 90.0, 180.0, 270.0, 360.0],
+    [(230, 57, 70), (255, 209, 102), (6, 214, 160), (17, 138, 178), (230, 57, 70)],
+)
+
+
+@dataclass(frozen=True)
+class TerrainOptions:
+    """Product options; slope_units applies to slope, the sun position and z_factor to hillshade."""
+    slope_units: str = "degrees"
+    azimuth_deg: float = 315.0
+    altitude_deg: float = 45.0
+    z_factor: float = 1.0
+
+
+def check_product(product: str, options: TerrainOptions) -> None:
+    """ValueError for an unknown product or option."""
+    if product not in TERRAIN_PRODUCTS:
+        raise ValueError(f"Terrain product must be one of: {', '.join(TERRAIN_PRODUCTS)}")
+    if options.slope_units not in SLOPE_UNITS:
+        raise ValueError(f"Slope units must be one of: {', '.join(SLOPE_UNITS)}")
+
+
+def check_tile(z: int, x: int, y: int) -> None:
+    """ValueError unless z/x/y is a tile this service renders."""
+    if not MIN_ZOOM <= z <= MAX_ZOOM:
+        raise ValueError(f"Terrain tiles are available from zoom {MIN_ZOOM} to {MAX_ZOOM}")
+    if not (0 <= x < (1 << z) and 0 <= y < (1 << z)):
+        raise ValueError(f"Tile {z}/{x}/{y} is outside the zoom {z} grid")
+
+
+def horn_gradients(data: np.ndarray, x_res: float, y_res: float,
+                   z_factor: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    East and north elevation gradients of a north-up grid by Horn's method.
+
+    The result is one cell smaller on every side than data (the halo);
+    NaN anywhere in a cell's 3x3 neighbourhood makes it NaN.
+    """
+    a, b, c = data[:-2, :-2], data[:-2, 1:-1], data[:-2, 2:]
+    d, f = data[1:-1, :-2], data[1:-1, 2:]
+    g, h, i = data[2:, :-2], data[2:, 1:-1], data[2:, 2:]
+    dz_dx = ((c + 2 * f + i) - (a + 2 * d + g)) * (z_factor / (8 * x_res))
+    # Row 0 is the northern edge
+    dz_dy = ((a + 2 * b + c) - (g + 2 * h + i)) * (z_factor / (8 * y_res))
+    return dz_dx, dz_dy
+
+
+def slope(dz_dx: np.ndarray, dz_dy: np.ndarray, units: str = "degrees") -> np.ndarray:
+    gradient = np.hypot(dz_dx, dz_dy)
+    return gradient * 100.0 if units == "percent" else np.degrees(np.arctan(gradient))
+
+
+def aspect(dz_dx: np.ndarray, dz_dy: np.ndarray) -> np.ndarray:
+    """Compass bearing (degrees clockwise from north) the slope faces, i.e. downhill."""
+    bearing = np.degrees(np.arctan2(-dz_dx, -dz_dy)) % 360.0
+    bearing[(dz_dx == 0) & (dz_dy == 0)] = np.nan
+    return bearing
+
+
+def hillshade(dz_dx: np.ndarray, dz_dy: np.ndarray, azimuth_deg: float = 315.0,
+              altitude_deg: float = 45.0) -> np.ndarray:
+    """Illumination 0-255 from a sun at azimuth_deg (clockwise from north), altitude_deg above the horizon."""
+    zenith = math.radians(90.0 - altitude_deg)
+    slope_rad = np.arctan(np.hypot(dz_dx, dz_dy))
+    aspect_rad = np.arctan2(-dz_dx, -dz_dy)
+    shade = (math.cos(zenith) * np.cos(slope_rad)
+             + math.sin(zenith) * np.sin(slope_rad) * np.cos(math.radians(azimuth_deg) - aspect_rad))
+    return np.clip(shade, 0.0, 1.0) * 255.0
+
+
+def derive(product: str, data: np.ndarray, x_res: float, y_res: float,
+           options: TerrainOptions = TerrainOptions()) -> np.ndarray:
+    """float32 product of a grid with a one-cell halo, without the halo."""
+    dz_dx, dz_dy = horn_gradients(data.astype(np.float64, copy=False), x_res, y_res, options.z_factor)
+    if product == "slope":
+        values = slope(dz_dx, dz_dy, options.slope_units)
+    elif product == "aspect":
+        values = aspect(dz_dx, dz_dy)
+    else:
+        values = hillshade(dz_dx, dz_dy, options.azimuth_deg, options.altitude_deg)
+    return values.astype(np.float32)
+
+
+def colorize(product: str, values: np.ndarray) -> np.ndarray:
+    """uint8 tile pixels: grey + alpha for hillshade, RGBA ramps for slope (degrees) and aspect."""
+    valid = ~np.isnan(values)
+    alpha = np.where(valid, 255, 0).astype(np.uint8)
+    filled = np.where(valid, values, 0.0)
+    if product == "hillshade":
+        return np.dstack([np.round(filled).astype(np.uint8), alpha])
+    stops, colours = _SLOPE_RAMP if product == "slope" else _ASPECT_RAMP
+    channels = [np.round(np.interp(filled, stops, [colour[band] for colour in colours])).astype(np.uint8)
+                for band in range(3)]
+    return np.dstack(channels + [alpha])
+
+
+class TerrainService:
+    """Computes, caches and serves terrain derivative grids and tiles."""
+
+    def __init__(self, raster_export_service: RasterExportService, elevation_service: Any,
+                 cache_max_bytes: int = 128 * _MB, tile_size: int = 256):
+        """
+        Args:
+            cache_max_bytes: Budget for derived windows held in the LRU
+            tile_size: Pixels per side of PNG tiles
+        """
+        self.raster_export_service = raster_export_service
+        self.elevation_service = elevation_service
+        self.cache_max_bytes = cache_max_bytes
+        self.tile_size = tile_size
+
+        self._windows: "OrderedDict[str, RasterGrid]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "tiles_rendered": 0}
+        get_memory_governor().register("terrain_windows", self, rebuild_cost=2.0)
+
+    # ----------------------------------------------------------------- grids
+    async def derive(self, product: str, target_crs: str, resolution_m: float, resampling: str = "bilinear",
+                     polygon_coords: Optional[Sequence[Tuple[float, float]]] = None,
+                     bounds: Optional[Tuple[float, float, float, float]] = None,
+                     mask_to_polygon: bool = False,
+                     options: TerrainOptions = TerrainOptions()) -> Optional[RasterGrid]:
+        """
+        A terrain product on the regular grid /grid would return for the same request.
+
+        Returns None when no unified collection is loaded.
+        """
+        check_product(product, options)
+        source = find_unified_source(self.elevation_service)
+        if source is None:
+            return None
+        crs_wkt = projected_crs_wkt(target_crs)
+        area = area_geometry(crs_wkt, polygon_coords, bounds)
+        return await asyncio.to_thread(
+            self.derive_area, CoverageService(source), product, crs_wkt, resolution_m, resampling, area,
+            mask_to_polygon, options
+        )
+
+    def derive_area(self, coverage: CoverageService, product: str, crs_wkt: str, resolution_m: float,
+                    resampling: str, area, mask_to_polygon: bool = False,
+                    options: TerrainOptions = TerrainOptions()) -> RasterGrid:
+        spec = snap_grid(crs_wkt, (resolution_m, 0.0, 0.0, 0.0, -resolution_m, 0.0), area.bounds)
+        key = self._key(product, options, spec, resampling)
+        grid = self._cached(key)
+        if grid is None:
+            padded = self.raster_export_service.grid_area(coverage, crs_wkt, resolution_m, resampling, area,
+                                                          pad_cells=1)
+            grid = RasterGrid(spec, derive(product, padded.data, resolution_m, resolution_m, options),
+                              padded.sources, padded.failed)
+            # A window missing an unreadable file is served but not kept
+            if grid.complete:
+                self._remember(key, grid)
+        if not mask_to_polygon:
+            return grid
+        # Cached windows are shared, so mask a copy
+        data = grid.data.copy()
+        data[~polygon_mask(area, spec)] = np.nan
+        return RasterGrid(spec, data, list(grid.sources), list(grid.failed))
+
+    # ----------------------------------------------------------------- tiles
+    async def get_tile(self, product: str, z: int, x: int, y: int) -> Optional[Tuple[bytes, bool]]:
+        """
+        (PNG tile, complete), transparent where nothing covers it, or None when
+        no unified index is loaded. complete is False when a covering file
+        could not be read, so the tile must not be cached downstream.
+        """
+        check_product(product, TerrainOptions())
+        check_tile(z, x, y)
+        source = find_unified_source(self.elevation_service)
+        if source is None:
+            return None
+        return await asyncio.to_thread(self.render_tile, CoverageService(source), product, z, x, y)
+
+    def render_tile(self, coverage: CoverageService, product: str, z: int, x: int, y: int) -> Tuple[bytes, bool]:
+        min_x, min_y, max_x, max_y = mercator_bounds(z, x, y)
+        pixel = (max_x - min_x) / self.tile_size
+        spec = GridSpec(_MERCATOR_WKT, (pixel, 0.0, min_x, 0.0, -pixel, max_y), self.tile_size, self.tile_size)
+        options = TerrainOptions()
+        key = self._key(product, options, spec, "bilinear")
+        grid = self._cached(key)
+        if grid is None:
+            grid = self._derive_tile(coverage, product, spec, options)
+            if grid.complete:
+                self._remember(key, grid)
+        self._count("tiles_rendered")
+        return encode_png(colorize(product, grid.data)), grid.complete
+
+    def _derive_tile(self, coverage: CoverageService, product: str, spec: GridSpec,
+                     options: TerrainOptions) -> RasterGrid:
+        padded = pad_grid(spec, 1)
+        a, _, c, _, e, f = padded.transform
+        lons, lats = _TO_WGS84.transform([c, c + padded.width * a], [f + padded.height * e, f])
+        files = coverage.find_files_for_geometry(box(lons[0], lats[0], lons[1], lats[1]))
+        if not files:
+            return RasterGrid(spec, np.full((spec.height, spec.width), np.nan, dtype=np.float32))
+
+        mosaic = self.raster_export_service.mosaic(files, padded, "bilinear")
+        # Mercator metres are 1/cos(latitude) ground metres; the factor barely varies across a z10+ tile
+        ground = abs(a) * math.cos(math.radians((lats[0] + lats[1]) / 2))
+        return RasterGrid(spec, derive(product, mosaic.data, ground, ground, options), mosaic.sources, mosaic.failed)
+
+    # ----------------------------------------------------------------- cache
+    def _key(self, product: str, options: TerrainOptions, spec: GridSpec, resampling: str) -> str:
+        unified_index = find_unified_index(self.elevation_service)
+        version = get_index_version(unified_index)[0] if unified_index is not None else ""
+        identity = (version, product, options, resampling, spec.crs_wkt, spec.transform, spec.width, spec.height)
+        return hashlib.sha1(repr(identity).encode()).hexdigest()
+
+    def _cached(self, key: str) -> Optional[RasterGrid]:
+        with self._lock:
+            grid = self._windows.get(key)
+            if grid is None:
+                self._stats["misses"] += 1
+                return None
+            self._windows.move_to_end(key)
+            self._stats["hits"] += 1
+            return grid
+
+    def _remember(self, key: str, grid: RasterGrid) -> None:
+        if grid.data.nbytes > self.cache_max_bytes:
+            return
+        with self._lock:
+            previous = self._windows.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.data.nbytes
+            self._windows[key] = grid
+            self._bytes += grid.data.nbytes
+            while self._bytes > self.cache_max_bytes and self._windows:
+                _, evicted = self._windows.popitem(last=False)
+                self._bytes -= evicted.data.nbytes
+                self._stats["evictions"] += 1
+
+    def memory_usage_bytes(self) -> int:
+        """Bytes of derived windows held (MemoryGovernor protocol)"""
+        return self._bytes
+
+    def evict_bytes(self, target_bytes: int) -> int:
+        """Drop least recently used windows until roughly target_bytes are released"""
+        freed = 0
+        with self._lock:
+            while freed < target_bytes and self._windows:
+                _, evicted = self._windows.popitem(last=False)
+                self._bytes -= evicted.data.nbytes
+                freed += evicted.data.nbytes
+                self._stats["evictions"] += 1
+        return freed
+
+    def cache_hit_rate(self) -> Optional[float]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return self._stats["hits"] / lookups if lookups else None
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, windows=len(self._windows), size_mb=round(self._bytes / _MB, 2))
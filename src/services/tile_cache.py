@@ -0,0 +1,627 @@
+"""
+Raster Tile Cache - host-local disk cache of native-resolution raster tiles.
+
+Every cold elevation lookup opens a COG over /vsis3/ and issues ranged GETs
+for the header and the block holding the pixel. This cache stores decoded
+tiles (tile_size x tile_size windows on each file's native grid) plus a small
+header record per file on local disk, so:
+- project prefetch can warm a site before engineers start work on it
+- all workers on the host share one copy (atomic rename on write)
+- repeat lookups in a warmed area never touch S3
+
+Cold fetches are single-flighted across workers with Redis leases: the lease
+holder fetches and publishes the tile (to disk, and optionally to Redis for
+other hosts) while the rest wait briefly for that shared copy.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+
+def to_vsi_path(file_path: str) -> str:
+    """Normalize an index file reference (s3://bucket/key or bucket/key) to /vsis3/."""
+    if file_path.startswith("/vsis3/"):
+        return file_path
+    if file_path.startswith("s3://"):
+        return f"/vsis3/{file_path[5:]}"
+    return f"/vsis3/{file_path}"
+
+
+def raster_env(file_path: str):
+    """rasterio.Env configured for the bucket behind file_path (signed or unsigned)."""
+    import rasterio
+    from ..utils.bucket_detector import BucketDetector, BucketType
+
+    options = {
+        "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+        "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+        "AWS_REGION": os.environ.get("AWS_REGION", "ap-southeast-2"),
+    }
+    if BucketDetector.detect_bucket_type(file_path) == BucketType.PUBLIC_UNSIGNED:
+        options["AWS_NO_SIGN_REQUEST"] = "YES"
+    return rasterio.Env(**options)
+
+
+@lru_cache(maxsize=64)
+def _wgs84_transformer(crs_wkt: str):
+    from pyproj import Transformer
+    return Transformer.from_crs("EPSG:4326", crs_wkt, always_xy=True)
+
+
+@dataclass
+class RasterHeader:
+    """Georeferencing needed to locate tiles without reopening the file."""
+    crs_wkt: str
+    transform: Tuple[float, float, float, float, float, float]  # affine a, b, c, d, e, f
+    width: int
+    height: int
+    nodata: Optional[float]
+    dtype: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "crs_wkt": self.crs_wkt, "transform": list(self.transform), "width": self.width,
+            "height": self.height, "nodata": self.nodata, "dtype": self.dtype,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RasterHeader":
+        return cls(
+            crs_wkt=data["crs_wkt"], transform=tuple(data["transform"]), width=int(data["width"]),
+            height=int(data["height"]), nodata=data.get("nodata"), dtype=data["dtype"],
+        )
+
+    def world_to_pixel(self, x, y):
+        """Native CRS coordinates to fractional (col, row); works on scalars or arrays."""
+        a, b, c, d, e, f = self.transform
+        det = a * e - b * d
+        col = (e * (x - c) - b * (y - f)) / det
+        row = (-d * (x - c) + a * (y - f)) / det
+        return col, row
+
+
+class RasterTileCache:
+    """
+    Disk-backed cache of decoded raster tiles shared by all workers on a host.
+
+    Layout: <cache_dir>/<sha1(file)[:16]>/header.json and <row>_<col>.npy,
+    where (row, col) index tile_size blocks on the file's native pixel grid.
+    """
+
+    def __init__(self, cache_dir: str, tile_size: int = 256, max_bytes: int = 2048 * _MB,
+                 read_through: bool = False, lease: Optional[Any] = None, wait_seconds: float = 5.0,
+                 share_ttl_seconds: Optional[int] = None, prune_every_bytes: Optional[int] = None):
+        """
+        Args:
+            read_through: Point lookups fetch missing tiles instead of only reading cached ones
+            lease: RedisFetchLease used to single-flight cold tile fetches across workers
+            wait_seconds: How long a non-leader waits for the leader's tile before fetching itself
+            share_ttl_seconds: Also publish fetched tiles to Redis for other hosts (None = disk only)
+            prune_every_bytes: Prune to max_bytes after this many bytes of tiles are written
+                (default: a twentieth of max_bytes)
+        """
+        self.cache_dir = cache_dir
+        self.tile_size = tile_size
+        self.max_bytes = max_bytes
+        self.read_through = read_through
+        self.lease = lease
+        self.wait_seconds = wait_seconds
+        self.share_ttl_seconds = share_ttl_seconds
+        self.prune_every_bytes = prune_every_bytes if prune_every_bytes is not None else max(1, max_bytes // 20)
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._headers: Dict[str, RasterHeader] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._prune_lock = threading.Lock()
+        self._written_since_prune = 0
+        self._stats = {"tile_hits": 0, "tile_misses": 0, "tiles_fetched": 0, "bytes_fetched": 0,
+                       "header_fetches": 0, "single_flight_waits": 0, "single_flight_timeouts": 0,
+                       "shared_redis_hits": 0}
+        logger.info(f"RasterTileCache at {cache_dir} (tile={tile_size}px, max={max_bytes / _MB:.0f}MB)")
+
+    # ------------------------------------------------------------------ paths
+    def _file_dir(self, file_path: str) -> str:
+        digest = hashlib.sha1(to_vsi_path(file_path).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, digest)
+
+    def _tile_path(self, file_path: str, row: int, col: int) -> str:
+        return os.path.join(self._file_dir(file_path), f"{row}_{col}.npy")
+
+    def _tile_key(self, file_path: str, row: int, col: int) -> str:
+        return f"{os.path.basename(self._file_dir(file_path))}:{row}_{col}"
+
+    @staticmethod
+    def _atomic_write(path: str, writer) -> None:
+        """Write via temp file + rename so concurrent readers never see partial files."""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                writer(f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    # ---------------------------------------------------------------- headers
+    def get_header(self, file_path: str, fetch: bool = True) -> Optional[RasterHeader]:
+        """Header from memory, then disk, then (if fetch) the remote file, single-flighted."""
+        vsi_path = to_vsi_path(file_path)
+        header = self._headers.get(vsi_path)
+        if header is not None:
+            return header
+
+        header_path = os.path.join(self._file_dir(vsi_path), "header.json")
+        header = self._load_header(header_path)
+        if header is None and fetch:
+            header = self._single_flight(
+                f"{os.path.basename(self._file_dir(vsi_path))}:header",
+                lambda: self._load_header(header_path),
+                lambda: self._fetch_header(vsi_path, header_path),
+            )
+
+        if header is not None:
+            self._headers[vsi_path] = header
+        return header
+
+    @staticmethod
+    def _load_header(header_path: str) -> Optional[RasterHeader]:
+        if not os.path.exists(header_path):
+            return None
+        try:
+            with open(header_path) as f:
+                return RasterHeader.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Discarding corrupt tile cache header {header_path}: {e}")
+            return None
+
+    def _fetch_header(self, vsi_path: str, header_path: str) -> RasterHeader:
+        with self._remote(vsi_path) as dataset:
+            header = RasterHeader(
+                crs_wkt=dataset.crs.to_wkt(),
+                transform=tuple(dataset.transform)[:6],
+                width=dataset.width,
+                height=dataset.height,
+                nodata=dataset.nodata,
+                dtype=dataset.dtypes[0],
+            )
+        payload = json.dumps(header.to_dict()).encode()
+        self._atomic_write(header_path, lambda f: f.write(payload))
+        self._count("header_fetches")
+        return header
+
+    # ----------------------------------------------------------- remote files
+    @contextmanager
+    def _remote_scope(self):
+        """Keep each remote file opened in this block open, so a cold header and tile read share one open."""
+        if getattr(self._local, "datasets", None) is not None:
+            yield
+            return
+        with ExitStack() as stack:
+            self._local.stack, self._local.datasets = stack, {}
+            try:
+                yield
+            finally:
+                self._local.stack = self._local.datasets = None
+
+    @contextmanager
+    def _remote(self, vsi_path: str):
+        """Open dataset for vsi_path: the scope's shared one, or a one-off open."""
+        import rasterio
+
+        datasets = getattr(self._local, "datasets", None)
+        if datasets is None:
+            with raster_env(vsi_path), rasterio.open(vsi_path) as dataset:
+                yield dataset
+            return
+        if vsi_path not in datasets:
+            self._local.stack.enter_context(raster_env(vsi_path))
+            datasets[vsi_path] = self._local.stack.enter_context(rasterio.open(vsi_path))
+        yield datasets[vsi_path]
+
+    def _single_flight(self, key: str, load_shared, fetch):
+        """
+        fetch() under the lease for key; other workers wait up to wait_seconds for
+        load_shared() to see the holder's copy, then fetch themselves so a dead
+        holder cannot stall requests.
+        """
+        if self.lease is None:
+            return fetch()
+        token = self.lease.acquire(key)
+        if token is None:
+            self._count("single_flight_waits")
+            shared = self._wait_for(load_shared)
+            if shared is not None:
+                return shared
+            self._count("single_flight_timeouts")
+            logger.debug(f"Lease {key} not released within {self.wait_seconds}s, fetching directly")
+            return fetch()
+
+        try:
+            # The previous holder may have published between our miss and the claim
+            shared = load_shared()
+            return shared if shared is not None else fetch()
+        finally:
+            self.lease.release(key, token)
+
+    # ------------------------------------------------------------------ tiles
+    def tile_window(self, header: RasterHeader, row: int, col: int) -> Tuple[int, int, int, int]:
+        """(col_off, row_off, width, height) of a tile, clipped to the raster."""
+        col_off, row_off = col * self.tile_size, row * self.tile_size
+        return (col_off, row_off,
+                min(self.tile_size, header.width - col_off),
+                min(self.tile_size, header.height - row_off))
+
+    def tiles_for_native_bounds(self, header: RasterHeader, xmin: float, ymin: float,
+                                xmax: float, ymax: float) -> List[Tuple[int, int]]:
+        """Tiles overlapping a box in the file's native CRS."""
+        cols, rows = header.world_to_pixel(np.array([xmin, xmax, xmin, xmax]),
+                                           np.array([ymin, ymin, ymax, ymax]))
+        c0 = max(0, int(math.floor(cols.min())) // self.tile_size)
+        c1 = min((header.width - 1) // self.tile_size, int(math.floor(cols.max())) // self.tile_size)
+        r0 = max(0, int(math.floor(rows.min())) // self.tile_size)
+        r1 = min((header.height - 1) // self.tile_size, int(math.floor(rows.max())) // self.tile_size)
+        return [(r, c) for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)]
+
+    def tile_bounds_native(self, header: RasterHeader, row: int, col: int) -> Tuple[float, float, float, float]:
+        """Native-CRS bounds (xmin, ymin, xmax, ymax) of a tile (north-up rasters)."""
+        a, b, c, d, e, f = header.transform
+        col_off, row_off, w, h = self.tile_window(header, row, col)
+        xs = [c + a * col_off, c + a * (col_off + w)]
+        ys = [f + e * row_off, f + e * (row_off + h)]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def has_tile(self, file_path: str, row: int, col: int) -> bool:
+        return os.path.exists(self._tile_path(file_path, row, col))
+
+    def _load_tile(self, file_path: str, row: int, col: int) -> Optional[np.ndarray]:
+        try:
+            return np.load(self._tile_path(file_path, row, col), allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+
+    def read_tile(self, file_path: str, row: int, col: int) -> Optional[np.ndarray]:
+        """Cached tile or None; never touches S3."""
+        tile = self._load_tile(file_path, row, col)
+        self._count("tile_hits" if tile is not None else "tile_misses")
+        return tile
+
+    def fetch_tile(self, file_path: str, row: int, col: int) -> Tuple[np.ndarray, int]:
+        """Read one tile from the remote file and publish it. Returns (tile, bytes)."""
+        from rasterio.windows import Window
+
+        vsi_path = to_vsi_path(file_path)
+        header = self.get_header(vsi_path)
+        col_off, row_off, width, height = self.tile_window(header, row, col)
+        with self._remote(vsi_path) as dataset:
+            tile = dataset.read(1, window=Window(col_off, row_off, width, height))
+
+        self.store_tile(vsi_path, row, col, tile)
+        if self.lease is not None and self.share_ttl_seconds:
+            buffer = io.BytesIO()
+            np.save(buffer, tile, allow_pickle=False)
+            self.lease.publish(self._tile_key(vsi_path, row, col), buffer.getvalue(), self.share_ttl_seconds)
+        self._count("tiles_fetched")
+        self._count("bytes_fetched", int(tile.nbytes))
+        return tile, int(tile.nbytes)
+
+    def store_tile(self, file_path: str, row: int, col: int, tile: np.ndarray) -> None:
+        """Publish a tile for every worker on the host, pruning once enough has been written."""
+        self._atomic_write(self._tile_path(file_path, row, col), lambda f: np.save(f, tile, allow_pickle=False))
+        with self._lock:
+            self._written_since_prune += int(tile.nbytes)
+            due = self._written_since_prune >= self.prune_every_bytes
+            if due:
+                self._written_since_prune = 0
+        # One pruning thread at a time; writers never wait for it
+        if due and self._prune_lock.acquire(blocking=False):
+            try:
+                result = self.prune()
+                if result["removed_tiles"]:
+                    logger.info(f"Tile cache pruned {result['removed_tiles']} tiles ({result['disk_mb']}MB left)")
+            finally:
+                self._prune_lock.release()
+
+    def _read_shared(self, file_path: str, row: int, col: int) -> Optional[np.ndarray]:
+        """Tile published by another worker: host disk first, then Redis."""
+        tile = self._load_tile(file_path, row, col)
+        if tile is not None or self.lease is None or not self.share_ttl_seconds:
+            return tile
+        payload = self.lease.fetch_published(self._tile_key(file_path, row, col))
+        if payload is None:
+            return None
+        try:
+            tile = np.load(io.BytesIO(payload), allow_pickle=False)
+        except ValueError:
+            return None
+        self.store_tile(file_path, row, col, tile)
+        self._count("shared_redis_hits")
+        return tile
+
+    def _wait_for(self, load):
+        deadline = time.monotonic() + self.wait_seconds
+        delay = 0.02
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            value = load()
+            if value is not None:
+                return value
+            delay = min(delay * 2, 0.25)
+        return None
+
+    def ensure_tile(self, file_path: str, row: int, col: int) -> Tuple[np.ndarray, int]:
+        """
+        Read-through with cross-worker single-flight. Returns (tile, bytes this worker fetched).
+
+        Only the lease holder reads S3; the others wait for its shared copy.
+        """
+        tile = self.read_tile(file_path, row, col)
+        if tile is not None:
+            return tile, 0
+        fetched = []
+
+        def fetch():
+            fetched.append(self.fetch_tile(file_path, row, col))
+            return fetched[0][0]
+
+        tile = self._single_flight(self._tile_key(to_vsi_path(file_path), row, col),
+                                   lambda: self._read_shared(file_path, row, col), fetch)
+        return tile, fetched[0][1] if fetched else 0
+
+    def get_tile(self, file_path: str, row: int, col: int) -> np.ndarray:
+        """Read-through: cached tile if present, otherwise fetch and publish."""
+        return self.ensure_tile(file_path, row, col)[0]
+
+    # --------------------------------------------------------------- sampling
+    def sample(self, file_path: str, lat: float, lon: float) -> Optional[float]:
+        """
+        Elevation for a point in front of the per-point GDAL read (None = fall back).
+
+        Without read_through only cached headers and tiles are used, so a miss is
+        cheap. With read_through the covering tile is fetched (single-flighted),
+        which turns a burst of cold lookups on one site into one S3 read per tile.
+        """
+        if not self.read_through:
+            return self.sample_cached(file_path, lat, lon)
+        try:
+            with self._remote_scope():
+                return self._sample(file_path, lat, lon, fetch=True)
+        except Exception as e:
+            logger.debug(f"Tile read-through failed for {file_path}: {e}")
+            return None
+
+    def sample_cached(self, file_path: str, lat: float, lon: float) -> Optional[float]:
+        """Elevation from cached header + tile only (None on any miss or NODATA)."""
+        return self._sample(file_path, lat, lon, fetch=False)
+
+    def _sample(self, file_path: str, lat: float, lon: float, fetch: bool) -> Optional[float]:
+        header = self.get_header(file_path, fetch=fetch)
+        if header is None:
+            return None
+        try:
+            x, y = _wgs84_transformer(header.crs_wkt).transform(lon, lat)
+        except Exception as e:
+            logger.debug(f"Tile cache transform failed for {file_path}: {e}")
+            return None
+        col_f, row_f = header.world_to_pixel(x, y)
+        px, py = int(math.floor(col_f)), int(math.floor(row_f))
+        if not (0 <= px < header.width and 0 <= py < header.height):
+            return None
+
+        row, col = py // self.tile_size, px // self.tile_size
+        tile = self.ensure_tile(file_path, row, col)[0] if fetch else self.read_tile(file_path, row, col)
+        if tile is None:
+            return None
+        value = float(tile[py % self.tile_size, px % self.tile_size])
+        if header.nodata is not None and value == header.nodata:
+            return None
+        if math.isnan(value):
+            return None
+        return value
+
+    def sample_many(self, file_path: str, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """
+        Vectorized read-through sampling of many points in one file.
+
+        Points are grouped by tile so each tile is read (or fetched, single-flighted)
+        once. Returns float64 elevations with NaN for outside/NODATA points.
+        """
+        with self._remote_scope():
+            return self._sample_many(file_path, lats, lons)
+
+    def _sample_many(self, file_path: str, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        header = self.get_header(file_path)
+        xs, ys = _wgs84_transformer(header.crs_wkt).transform(np.asarray(lons), np.asarray(lats))
+        cols_f, rows_f = header.world_to_pixel(np.asarray(xs), np.asarray(ys))
+        px = np.floor(cols_f).astype(np.int64)
+        py = np.floor(rows_f).astype(np.int64)
+
+        values = np.full(len(px), np.nan, dtype=np.float64)
+        inside = (px >= 0) & (px < header.width) & (py >= 0) & (py < header.height)
+        if not inside.any():
+            return values
+
+        idx = np.nonzero(inside)[0]
+        tile_rows, tile_cols = py[idx] // self.tile_size, px[idx] // self.tile_size
+        tiles_per_row = (header.width + self.tile_size - 1) // self.tile_size
+        tile_ids = tile_rows * tiles_per_row + tile_cols
+        order = np.argsort(tile_ids, kind="stable")
+        boundaries = np.nonzero(np.diff(tile_ids[order]))[0] + 1
+        for group in np.split(order, boundaries):
+            members = idx[group]
+            row, col = int(tile_rows[group[0]]), int(tile_cols[group[0]])
+            tile = self.ensure_tile(file_path, row, col)[0]
+            values[members] = tile[py[members] % self.tile_size, px[members] % self.tile_size]
+
+        if header.nodata is not None:
+            values[values == header.nodata] = np.nan
+        return values
+
+    # ------------------------------------------------------------ maintenance
+    def _iter_tiles(self) -> Iterable[Tuple[str, os.stat_result]]:
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".npy"):
+                    path = os.path.join(root, name)
+                    try:
+                        yield path, os.stat(path)
+                    except OSError:
+                        continue
+
+    def disk_usage_bytes(self) -> int:
+        return sum(st.st_size for _, st in self._iter_tiles())
+
+    def prune(self) -> Dict[str, Any]:
+        """Delete least recently written tiles until under max_bytes."""
+        tiles = sorted(self._iter_tiles(), key=lambda item: item[1].st_mtime)
+        total = sum(st.st_size for _, st in tiles)
+        removed = 0
+        for path, st in tiles:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                total -= st.st_size
+                removed += 1
+            except OSError:
+                continue
+        return {"removed_tiles": removed, "disk_mb": round(total / _MB, 1)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["tile_hits"] + stats["tile_misses"]
+        stats["hit_rate"] = f"{stats['tile_hits'] / lookups:.2%}" if lookups else "0.00%"
+        stats["cache_dir"] = self.cache_dir
+        stats["tile_size"] = self.tile_size
+        stats["max_mb"] = round(self.max_bytes / _MB, 1)
+        stats["headers_in_memory"] = len(self._headers)
+        stats["read_through"] = self.read_through
+        stats["single_flight"] = self.lease is not None
+        return stats
+
+
+class DirectTileReader(RasterTileCache):
+    """
+    Uncached stand-in for RasterTileCache with the same tile addressing.
+
+    Used by area/profile samplers when the tile cache is disabled: each file is
+    opened once per reader and each tile is one windowed read. Use as a context
+    manager so datasets are closed.
+    """
+
+    def __init__(self, tile_size: int = 256):
+        self.tile_size = tile_size
+        self.read_through = True
+        self.lease = None
+        self._headers: Dict[str, RasterHeader] = {}
+        self._datasets: Dict[str, Any] = {}
+        # Envs and datasets unwind LIFO, so GDAL config options are restored in order
+        self._stack = ExitStack()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {"tile_hits": 0, "tile_misses": 0, "tiles_fetched": 0, "bytes_fetched": 0,
+                       "header_fetches": 0}
+
+    def _open(self, file_path: str):
+        import rasterio
+        vsi_path = to_vsi_path(file_path)
+        dataset = self._datasets.get(vsi_path)
+        if dataset is None:
+            self._stack.enter_context(raster_env(vsi_path))
+            dataset = self._datasets[vsi_path] = self._stack.enter_context(rasterio.open(vsi_path))
+        return dataset
+
+    def get_header(self, file_path: str, fetch: bool = True) -> Optional[RasterHeader]:
+        vsi_path = to_vsi_path(file_path)
+        header = self._headers.get(vsi_path)
+        if header is None and fetch:
+            dataset = self._open(vsi_path)
+            header = self._headers[vsi_path] = RasterHeader(
+                crs_wkt=dataset.crs.to_wkt(), transform=tuple(dataset.transform)[:6], width=dataset.width,
+                height=dataset.height, nodata=dataset.nodata, dtype=dataset.dtypes[0],
+            )
+            self._count("header_fetches")
+        return header
+
+    def ensure_tile(self, file_path: str, row: int, col: int) -> Tuple[np.ndarray, int]:
+        from rasterio.windows import Window
+        header = self.get_header(file_path)
+        col_off, row_off, width, height = self.tile_window(header, row, col)
+        tile = self._open(file_path).read(1, window=Window(col_off, row_off, width, height))
+        self._count("tiles_fetched")
+        self._count("bytes_fetched", int(tile.nbytes))
+        return tile, int(tile.nbytes)
+
+    def close(self) -> None:
+        self._datasets.clear()
+        self._stack.close()
+
+    def __enter__(self) -> "DirectTileReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Global tile cache instance (None until configured at startup)
+_raster_tile_cache: Optional[RasterTileCache] = None
+
+
+def configure_raster_tile_cache(settings: Any) -> Optional[RasterTileCache]:
+    """Create the global tile cache from settings (None when disabled)."""
+    global _raster_tile_cache
+    if not getattr(settings, 'TILE_CACHE_ENABLED', False):
+        _raster_tile_cache = None
+        return None
+    lease = None
+    if getattr(settings, 'TILE_FETCH_SINGLE_FLIGHT', False):
+        from ..redis_state_manager import RedisFetchLease, RedisStateManager
+        lease = RedisFetchLease(
+            RedisStateManager(app_env=getattr(settings, 'APP_ENV', None)),
+            namespace="tile_fetch",
+            lease_ms=settings.TILE_FETCH_LEASE_MS,
+        )
+    try:
+        _raster_tile_cache = RasterTileCache(
+            cache_dir=settings.TILE_CACHE_DIR,
+            tile_size=settings.TILE_CACHE_TILE_SIZE,
+            max_bytes=settings.TILE_CACHE_MAX_MB * _MB,
+            read_through=settings.TILE_CACHE_READ_THROUGH,
+            lease=lease,
+            wait_seconds=settings.TILE_FETCH_WAIT_SECONDS,
+            share_ttl_seconds=settings.TILE_CACHE_REDIS_SHARE_TTL_SECONDS if settings.TILE_CACHE_REDIS_SHARE else None,
+        )
+    except OSError as e:
+        logger.warning(f"Raster tile cache unavailable, continuing without it: {e}")
+        _raster_tile_cache = None
+    return _raster_tile_cache
+
+
+def get_raster_tile_cache() -> Optional[RasterTileCache]:
+    """Get the global raster tile cache, if configured."""
+    return _raster_tile_cache
@@ -6,10 +6,11 @@ import asyncio
 import logging
 import hashlib
 import time
+from contextlib import contextmanager
 from typing import Optional, Tuple, List, Dict, Any
 from dataclasses import dataclass
 
-from .enhanced_source_selector import EnhancedSourceSelector
+from .enhanced_source_selector import EnhancedSourceSelector, api_fallback_deferred
 from .source_selector import DEMSourceSelector
 from .index_driven_source_selector import IndexDrivenSourceSelector
 from .config import Settings
@@ -21,9 +22,13 @@ from .dem_exceptions import (
 from .gpxz_client import GPXZConfig
 from .redis_state_manager import RedisStateManager
 from .performance_monitor import get_performance_monitor, track_elevation_performance
+from .services.memory_governor import get_memory_governor
 
 logger = logging.getLogger(__name__)
 
+# Estimated resident cost of one cached ElevationResult (key, dataclass, metadata dict)
+_ELEVATION_ENTRY_ESTIMATED_BYTES = 1024
+
 @dataclass
 class ElevationResult:
     """Standardized elevation result across all sources"""
@@ -79,6 +84,10 @@ class UnifiedElevationService:
             self._cache_max_size = getattr(settings, 'ELEVATION_CACHE_SIZE', 10000)
             logger.info(f"Elevation cache initialized with OrderedDict LRU (max_size={self._cache_max_size})")
             
+            # Register with the process-wide memory budget (evicts below max_size under pressure)
+            self._memory_governor = get_memory_governor()
+            self._memory_governor.register("elevation_results", self, rebuild_cost=2.0)
+            
             # Phase 3B.5: Feature flag controlled architecture selection
             if unified_provider and settings.USE_UNIFIED_SPATIAL_INDEX:
                 logger.info("🚀 Using Phase 2 Unified Architecture (v2.0) with discriminated unions")
@@ -161,18 +170,23 @@ class UnifiedElevationService:
     
     def _cache_get(self, cache_key: str) -> Optional[ElevationResult]:
         """Get result from cache if available with LRU access pattern"""
-        if cache_key in self._cache:
-            cached_result, timestamp = self._cache[cache_key]
+        # .get()/.pop() tolerate concurrent eviction by the memory governor
+        entry = self._cache.get(cache_key)
+        if entry is not None:
+            cached_result, timestamp = entry
             
             # Optional: Add cache expiration (e.g., 1 hour)
             cache_max_age = getattr(self.settings, 'ELEVATION_CACHE_MAX_AGE_SECONDS', 3600)
             if time.time() - timestamp > cache_max_age:
-                del self._cache[cache_key]
+                self._cache.pop(cache_key, None)
                 self._cache_misses += 1
                 return None
             
             # Move to end (most recently accessed) - LRU pattern
-            self._cache.move_to_end(cache_key)
+            try:
+                self._cache.move_to_end(cache_key)
+            except KeyError:
+                pass
             self._cache_hits += 1
             logger.debug(f"Cache hit for {cache_key}")
             return cached_result
@@ -194,6 +208,27 @@ class UnifiedElevationService:
         # Add new item at end (most recent)
         self._cache[cache_key] = (result, time.time())
         logger.debug(f"Cache stored {cache_key}")
+        self._memory_governor.maybe_rebalance()
+    
+    def memory_usage_bytes(self) -> int:
+        """Estimated resident bytes of cached results (MemoryGovernor protocol)."""
+        return len(self._cache) * _ELEVATION_ENTRY_ESTIMATED_BYTES
+    
+    def evict_bytes(self, target_bytes: int) -> int:
+        """Drop least recently used results until roughly target_bytes are released."""
+        freed = 0
+        while freed < target_bytes and self._cache:
+            try:
+                self._cache.popitem(last=False)
+            except KeyError:
+                break
+            freed += _ELEVATION_ENTRY_ESTIMATED_BYTES
+        return freed
+    
+    def cache_hit_rate(self) -> Optional[float]:
+        """Observed hit rate, or None before any lookups."""
+        total_requests = self._cache_hits + self._cache_misses
+        return self._cache_hits / total_requests if total_requests > 0 else None
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache performance statistics"""
@@ -635,14 +670,24 @@ class UnifiedElevationService:
         if not points:
             return []
         
-        # Create tasks for parallel execution
-        tasks = [
-            self.get_elevation(lat, lon, dem_source_id) 
-            for lat, lon in points
-        ]
+        # Points S3 cannot answer are sent to the APIs together afterwards
+        with self.deferred_api_fallback(enabled=dem_source_id is None) as deferred:
+            # Create tasks for parallel execution
+            tasks = [
+                self.get_elevation(lat, lon, dem_source_id) 
+                for lat, lon in points
+            ]
+            
+            # Execute all tasks concurrently with proper exception handling
+            results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        # Execute all tasks concurrently with proper exception handling
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if deferred:
+            misses = [i for i, result in enumerate(results)
+                      if not isinstance(result, Exception) and result.elevation_m is None]
+            api_results = await self.resolve_api_fallback_batch([points[i] for i in misses])
+            for i, api_result in zip(misses, api_results):
+                if api_result is not None:
+                    results[i] = api_result
         
         # Process results and handle any exceptions
         processed_results = []
@@ -661,6 +706,54 @@ class UnifiedElevationService:
         
         return processed_results
     
+    def _api_batch_selector(self) -> Optional[EnhancedSourceSelector]:
+        """The enhanced selector that owns the API clients, when batching is possible"""
+        for selector in (getattr(self, '_enhanced_selector', None), getattr(self, 'source_selector', None)):
+            if isinstance(selector, EnhancedSourceSelector) and selector.supports_api_batch():
+                return selector
+        return None
+    
+    @contextmanager
+    def deferred_api_fallback(self, enabled: bool = True):
+        """
+        Within this block, per-point lookups stop after S3 (yields True) so the
+        caller can resolve the misses with resolve_api_fallback_batch. Yields
+        False, and changes nothing, when no API client can batch.
+        """
+        if not enabled or self._api_batch_selector() is None:
+            yield False
+            return
+        token = api_fallback_deferred.set(True)
+        try:
+            yield True
+        finally:
+            api_fallback_deferred.reset(token)
+    
+    async def resolve_api_fallback_batch(self, points: List[Tuple[float, float]]) -> List[Optional[ElevationResult]]:
+        """Batched GPXZ -> Google fallback; None where no API answered."""
+        selector = self._api_batch_selector()
+        if selector is None or not points:
+            return [None] * len(points)
+        
+        results: List[Optional[ElevationResult]] = []
+        for (lat, lon), (elevation, source) in zip(points, await selector.get_api_elevations_batch(points)):
+            if elevation is None:
+                results.append(None)
+                continue
+            result = ElevationResult(
+                elevation_m=elevation,
+                dem_source_used=source,
+                message=f"Batched API fallback: {source}",
+                metadata={'selection_method': 'batched_api_fallback'},
+                resolution=30.0,
+                grid_resolution_m=30.0,
+                data_type='SRTM' if source == 'gpxz_api' else 'Mixed',
+                accuracy='±16m' if source == 'gpxz_api' else '±10m'
+            )
+            self._cache_put(self._get_cache_key(lat, lon, None), result)
+            results.append(result)
+        return results
+    
     def get_available_sources(self) -> List[Dict[str, Any]]:
         """Get list of available DEM sources"""
         # Use the appropriate attribute based on selector type
@@ -0,0 +1,210 @@
+"""Packed columnar request/response format for batch elevation endpoints.
+
+For large batches, JSON decoding, a Pydantic model per result and JSON
+encoding cost more CPU than the elevation lookups. Clients can instead send
+and receive packed little-endian arrays, negotiated per request:
+
+- Request (``Content-Type: application/vnd.dem.columnar``): n x (float64 lat,
+  float64 lon), interleaved, no header. Non-coordinate options move to the
+  query string (``source`` / ``dem_source_id``).
+- Response (``Accept: application/vnd.dem.columnar``)::
+
+      header     <4sBBHI   magic b"DEMC", version, reserved, n_sources, n_points
+      sources    n_sources x (<H byte length, UTF-8 name)
+      padding    zero bytes up to an 8-byte boundary
+      lat        <f8[n]
+      lon        <f8[n]
+      elevation  <f4[n]    NaN = no elevation
+      source_id  <u2[n]    index into sources, 0xFFFF = none
+      flags      u1[n]     FLAG_* bits
+
+JSON stays the default whenever the client does not ask for this type.
+"""
+
+import struct
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+from fastapi import Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.dem.columnar"
+FORMAT_VERSION = 1
+
+FLAG_HAS_ELEVATION = 0x01
+FLAG_EXTERNAL_API = 0x02
+
+NO_SOURCE = 0xFFFF
+
+_HEADER = struct.Struct("<4sBBHI")
+_MAGIC = b"DEMC"
+_API_SOURCE_TAGS = ("gpxz", "google")
+
+
+def _media_types(header_value: str) -> Dict[str, float]:
+    """Parse a Content-Type/Accept header into {media type: q}."""
+    types: Dict[str, float] = {}
+    for part in header_value.split(","):
+        fields = [f.strip() for f in part.split(";")]
+        if not fields[0]:
+            continue
+        q = 1.0
+        for param in fields[1:]:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        types[fields[0].lower()] = q
+    return types
+
+
+def is_columnar_request(request: Request) -> bool:
+    """Whether the request body is packed coordinates."""
+    return COLUMNAR_MEDIA_TYPE in _media_types(request.headers.get("content-type", ""))
+
+
+def wants_columnar(request: Request) -> bool:
+    """Whether the client prefers a packed response over JSON."""
+    accepted = _media_types(request.headers.get("accept", ""))
+    q = accepted.get(COLUMNAR_MEDIA_TYPE, 0.0)
+    return q > 0 and q >= accepted.get("application/json", 0.0)
+
+
+def decode_points(body: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """Packed request body to (lats, lons) float64 arrays, range-checked."""
+    if len(body) % 16:
+        raise ValueError("Columnar body must be a whole number of (float64 lat, float64 lon) pairs")
+    coords = np.frombuffer(body, dtype="<f8").reshape(-1, 2)
+    lats, lons = coords[:, 0], coords[:, 1]
+    if not (np.all(np.abs(lats) <= 90) and np.all(np.abs(lons) <= 180)):
+        raise ValueError("Coordinates out of range (lat must be within ±90, lon within ±180)")
+    return lats, lons
+
+
+def encode_points(lats: Sequence[float], lons: Sequence[float]) -> bytes:
+    """Client-side helper: coordinates to a packed request body."""
+    return np.column_stack([np.asarray(lats, "<f8"), np.asarray(lons, "<f8")]).tobytes()
+
+
+@dataclass
+class ColumnarResult:
+    """Decoded packed response (client side and tests)."""
+    lats: np.ndarray
+    lons: np.ndarray
+    elevations: np.ndarray
+    source_ids: np.ndarray
+    flags: np.ndarray
+    sources: List[str]
+
+    def source_of(self, i: int) -> Optional[str]:
+        sid = int(self.source_ids[i])
+        return None if sid == NO_SOURCE else self.sources[sid]
+
+
+def encode_results(lats: Sequence[float], lons: Sequence[float], elevations: Sequence[Optional[float]],
+                   sources: Sequence[Optional[str]]) -> bytes:
+    """Pack per-point results; sources are interned into a table."""
+    n = len(lats)
+    table: Dict[str, int] = {}
+    source_ids = np.full(n, NO_SOURCE, dtype="<u2")
+    flags = np.zeros(n, dtype="u1")
+    for i, name in enumerate(sources):
+        if name is None:
+            continue
+        sid = table.setdefault(name, len(table))
+        source_ids[i] = sid
+        if any(tag in name.lower() for tag in _API_SOURCE_TAGS):
+            flags[i] |= FLAG_EXTERNAL_API
+    if len(table) >= NO_SOURCE:
+        raise ValueError("Too many distinct sources for the columnar format")
+
+    elevation_array = np.array([np.nan if e is None else e for e in elevations], dtype="<f4")
+    flags[~np.isnan(elevation_array)] |= FLAG_HAS_ELEVATION
+
+    parts = [_HEADER.pack(_MAGIC, FORMAT_VERSION, 0, len(table), n)]
+    for name in table:
+        encoded = name.encode("utf-8")
+        parts.append(struct.pack("<H", len(encoded)) + encoded)
+    size = sum(len(p) for p in parts)
+    parts.append(b"\0" * (-size % 8))
+    parts.extend([
+        np.asarray(lats, dtype="<f8").tobytes(),
+        np.asarray(lons, dtype="<f8").tobytes(),
+        elevation_array.tobytes(),
+        source_ids.tobytes(),
+        flags.tobytes(),
+    ])
+    return b"".join(parts)
+
+
+def decode_results(payload: bytes) -> ColumnarResult:
+    """Unpack a columnar response."""
+    magic, version, _, n_sources, n = _HEADER.unpack_from(payload, 0)
+    if magic != _MAGIC or version != FORMAT_VERSION:
+        raise ValueError("Not a DEM columnar payload")
+    offset = _HEADER.size
+    sources = []
+    for _ in range(n_sources):
+        (length,) = struct.unpack_from("<H", payload, offset)
+        offset += 2
+        sources.append(payload[offset:offset + length].decode("utf-8"))
+        offset += length
+    offset += -offset % 8
+
+    def column(dtype: str, itemsize: int) -> np.ndarray:
+        nonlocal offset
+        array = np.frombuffer(payload, dtype=dtype, count=n, offset=offset)
+        offset += n * itemsize
+        return array
+
+    return ColumnarResult(
+        lats=column("<f8", 8), lons=column("<f8", 8), elevations=column("<f4", 4),
+        source_ids=column("<u2", 2), flags=column("u1", 1), sources=sources,
+    )
+
+
+def columnar_response(lats, lons, elevations, sources, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(content=encode_results(lats, lons, elevations, sources),
+                    media_type=COLUMNAR_MEDIA_TYPE, headers=headers)
+
+
+async def parse_json_body(request: Request, model: Type[BaseModel]) -> BaseModel:
+    """Validate a JSON body manually, keeping FastAPI's 422 error shape."""
+    try:
+        return model.model_validate_json(await request.body())
+    except ValidationError as e:
+        # FastAPI reports body errors under a leading "body" location
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+
+
+def _inline_refs(schema: Any, defs: Dict[str, Any]) -> Any:
+    if isinstance(schema, dict):
+        ref = schema.get("$ref")
+        if ref and ref.startswith("#/$defs/"):
+            return _inline_refs(defs[ref.split("/")[-1]], defs)
+        return {k: _inline_refs(v, defs) for k, v in schema.items() if k != "$defs"}
+    if isinstance(schema, list):
+        return [_inline_refs(item, defs) for item in schema]
+    return schema
+
+
+def columnar_openapi_extra(model: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenAPI requestBody for endpoints that read JSON or packed coordinates manually."""
+    schema = model.model_json_schema()
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": _inline_refs(schema, schema.get("$defs", {}))},
+                COLUMNAR_MEDIA_TYPE: {
+                    "schema": {"type": "string", "format": "binary",
+                               "description": "Packed little-endian (float64 lat, float64 lon) pairs"}
+                },
+            },
+        }
+    }
@@ -0,0 +1,88 @@
+"""Fast JSON rendering for large point-array responses.
+
+Point endpoints used to build a Pydantic model per point, after which FastAPI
+validated the response model again, ran ``jsonable_encoder`` over the whole
+tree and encoded it with ``json.dumps``. For the 50,000-point /contour-data
+response that was seconds of CPU for data the service had already produced.
+
+The fast path builds plain dicts shaped like the documented models (all
+fields present, defaults filled from the model) and renders them to bytes in
+one call: orjson when it is installed, the standard library otherwise. Routes
+keep their ``response_model``, so the OpenAPI schema is unchanged; returning a
+``Response`` instance makes FastAPI skip its own validation and encoding.
+"""
+
+import json
+import math
+from typing import Any, Dict, Type
+
+import numpy as np
+from fastapi import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Standard-library fallback for the numpy values orjson encodes natively."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON; NaN and infinity render as null (as orjson does)."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    try:
+        text = json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default)
+    except ValueError:
+        text = json.dumps(_finite(content), ensure_ascii=False, separators=(",", ":"), default=_default)
+    return text.encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    """Parse JSON produced by :func:`dumps`."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _finite(value: Any) -> Any:
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(v) for v in value]
+    if isinstance(value, (np.ndarray, np.generic)):
+        return _finite(_default(value))
+    return value
+
+
+def row_template(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    The model's optional fields at their defaults.
+
+    Rows built as ``dict(template, field=value, ...)`` serialize with exactly
+    the keys the model would, without constructing it.
+    """
+    return {
+        name: field.get_default(call_default_factory=True)
+        for name, field in model.model_fields.items()
+        if not field.is_required()
+    }
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with :func:`dumps`; content is not validated."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
@@ -0,0 +1,118 @@
+"""HTTP caching helpers for read-only GET endpoints.
+
+Elevation and campaign metadata are a pure function of the request and the
+loaded unified spatial index, so validators are derived from the index
+version rather than from the rendered body. This lets a conditional request
+be answered with 304 Not Modified before any S3 read or API call happens.
+"""
+
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+from ..services.coverage_service import find_unified_index
+
+logger = logging.getLogger(__name__)
+
+# Fallback validator when no unified index is loaded (legacy/API-only mode):
+# responses are then only stable for the lifetime of this process.
+_PROCESS_STARTED_AT = datetime.now(timezone.utc).replace(microsecond=0)
+_PROCESS_TOKEN = f"process-{int(time.time())}"
+
+
+def get_index_version(unified_index: Optional[Any]) -> Tuple[str, datetime]:
+    """Return (version token, last modified) for the loaded unified index."""
+    if unified_index is None:
+        return _PROCESS_TOKEN, _PROCESS_STARTED_AT
+
+    metadata = getattr(unified_index, "schema_metadata", None)
+    generated_at = getattr(metadata, "generated_at", None) or getattr(unified_index, "generated_at", None)
+    last_modified = _coerce_datetime(generated_at) or _PROCESS_STARTED_AT
+
+    token = "|".join(str(part) for part in (
+        getattr(unified_index, "version", None),
+        last_modified.isoformat(),
+        getattr(metadata, "total_collections", None),
+        getattr(metadata, "total_files", None),
+    ))
+    return token, last_modified
+
+
+def _coerce_datetime(value: Any) -> Optional[datetime]:
+    """Parse an index timestamp into an aware UTC datetime with second precision."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            logger.debug(f"Unparseable index timestamp: {value}")
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+@dataclass
+class CacheValidators:
+    """Validators and freshness policy for a single cacheable GET response."""
+    etag: str
+    last_modified: datetime
+    max_age: int
+
+    def headers(self) -> Dict[str, str]:
+        """Caching headers to attach to 200 and 304 responses."""
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            "Cache-Control": f"public, max-age={self.max_age}",
+        }
+
+    def is_not_modified(self, request: Request) -> bool:
+        """Evaluate If-None-Match / If-Modified-Since per RFC 7232 precedence."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+            candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return self.etag.removeprefix("W/") in candidates
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return self.last_modified <= since
+        return False
+
+    def not_modified_response(self) -> Response:
+        """Empty 304 response carrying the current validators."""
+        return Response(status_code=304, headers=self.headers())
+
+    def apply(self, response: Response) -> None:
+        """Attach caching headers to the response FastAPI will render."""
+        for name, value in self.headers().items():
+            response.headers[name] = value
+
+
+def build_cache_validators(request: Request, elevation_service: Any, max_age: int) -> CacheValidators:
+    """Build validators for a GET request against the currently loaded index.
+
+    The ETag covers the path, the sorted query string and the index version,
+    so any index reload invalidates every previously issued tag.
+    """
+    version_token, last_modified = get_index_version(find_unified_index(elevation_service))
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha256(f"{version_token}#{request.url.path}?{query}".encode()).hexdigest()[:32]
+    return CacheValidators(etag=f'W/"{digest}"', last_modified=last_modified, max_age=max_age)
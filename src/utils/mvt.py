@@ -0,0 +1,244 @@
+"""Minimal Mapbox Vector Tile (MVT 2.1) encoding for line layers.
+
+Contour tiles only need LineString features with a few scalar properties, so
+the protobuf messages are written directly rather than through a generated
+protobuf module::
+
+    Tile    { repeated Layer layers = 3; }
+    Layer   { string name = 1; repeated Feature features = 2; repeated string keys = 3;
+              repeated Value values = 4; uint32 extent = 5; uint32 version = 15; }
+    Feature { uint64 id = 1; packed uint32 tags = 2; GeomType type = 3; packed uint32 geometry = 4; }
+    Value   { string string_value = 1; double double_value = 3; sint64 sint_value = 6; bool bool_value = 7; }
+
+Geometry is in integer tile coordinates (0..extent, y down); lines may run
+into the buffer beyond the tile edge. ``decode_tile`` reads back what
+``encode_tile`` writes, for tests and tooling.
+"""
+
+import struct
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+DEFAULT_EXTENT = 4096
+
+_GEOM_LINESTRING = 2
+_CMD_MOVE_TO = 1
+_CMD_LINE_TO = 2
+
+_WIRE_VARINT = 0
+_WIRE_64BIT = 1
+_WIRE_BYTES = 2
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+
+def _bytes_field(field: int, payload: bytes) -> bytes:
+    return _key(field, _WIRE_BYTES) + _varint(len(payload)) + payload
+
+
+def _packed(field: int, values: Iterable[int]) -> bytes:
+    return _bytes_field(field, b"".join(_varint(v) for v in values))
+
+
+def _encode_value(value: Any) -> bytes:
+    if isinstance(value, bool):
+        return _key(7, _WIRE_VARINT) + _varint(int(value))
+    if isinstance(value, int):
+        return _key(6, _WIRE_VARINT) + _varint(_zigzag(value) & 0xFFFFFFFFFFFFFFFF)
+    if isinstance(value, float):
+        return _key(3, _WIRE_64BIT) + struct.pack("<d", value)
+    return _bytes_field(1, str(value).encode("utf-8"))
+
+
+def line_geometry(coords: Sequence[Tuple[int, int]]) -> List[int]:
+    """Command stream for one line (consecutive duplicates dropped); empty if under 2 points remain."""
+    points: List[Tuple[int, int]] = []
+    for point in coords:
+        if not points or point != points[-1]:
+            points.append(point)
+    if len(points) < 2:
+        return []
+    commands = [_CMD_MOVE_TO | (1 << 3)]
+    x0, y0 = 0, 0
+    for i, (x, y) in enumerate(points):
+        if i == 1:
+            commands.append(_CMD_LINE_TO | ((len(points) - 1) << 3))
+        commands.extend((_zigzag(x - x0), _zigzag(y - y0)))
+        x0, y0 = x, y
+    return commands
+
+
+def encode_layer(name: str, features: Sequence[Dict[str, Any]], extent: int = DEFAULT_EXTENT) -> bytes:
+    """
+    One layer of line features.
+
+    Each feature is {"lines": [[(x, y), ...], ...], "properties": {...}}; every
+    line becomes its own MVT feature carrying the feature's properties.
+    """
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, Any], int] = {}
+    encoded_features = []
+    feature_id = 0
+    for feature in features:
+        tags: List[int] = []
+        for key, value in feature.get("properties", {}).items():
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault((type(value), value), len(values)))
+        for line in feature["lines"]:
+            geometry = line_geometry(line)
+            if not geometry:
+                continue
+            feature_id += 1
+            encoded_features.append(
+                _key(1, _WIRE_VARINT) + _varint(feature_id)
+                + _packed(2, tags)
+                + _key(3, _WIRE_VARINT) + _varint(_GEOM_LINESTRING)
+                + _packed(4, geometry)
+            )
+
+    layer = bytearray(_key(15, _WIRE_VARINT) + _varint(2))
+    layer += _bytes_field(1, name.encode("utf-8"))
+    for feature in encoded_features:
+        layer += _bytes_field(2, feature)
+    for key in keys:
+        layer += _bytes_field(3, key.encode("utf-8"))
+    for _, value in values:
+        layer += _bytes_field(4, _encode_value(value))
+    layer += _key(5, _WIRE_VARINT) + _varint(extent)
+    return bytes(layer)
+
+
+def encode_tile(layers: Dict[str, Sequence[Dict[str, Any]]], extent: int = DEFAULT_EXTENT) -> bytes:
+    """A tile of named line layers; layers without features are left out (an empty tile is b"")."""
+    return b"".join(
+        _bytes_field(3, encode_layer(name, features, extent))
+        for name, features in layers.items() if features
+    )
+
+
+# ---------------------------------------------------------------- decoding
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _fields(data: bytes) -> Iterable[Tuple[int, Any]]:
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == _WIRE_VARINT:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == _WIRE_64BIT:
+            value, pos = data[pos:pos + 8], pos + 8
+        elif wire_type == _WIRE_BYTES:
+            length, pos = _read_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        elif wire_type == 5:
+            value, pos = data[pos:pos + 4], pos + 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type}")
+        yield field, value
+
+
+def _unpack(data: bytes) -> List[int]:
+    values, pos = [], 0
+    while pos < len(data):
+        value, pos = _read_varint(data, pos)
+        values.append(value)
+    return values
+
+
+def _unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def _decode_value(data: bytes) -> Any:
+    for field, value in _fields(data):
+        if field == 1:
+            return value.decode("utf-8")
+        if field == 2:
+            return struct.unpack("<f", value)[0]
+        if field == 3:
+            return struct.unpack("<d", value)[0]
+        if field in (4, 5):
+            return value
+        if field == 6:
+            return _unzigzag(value)
+        if field == 7:
+            return bool(value)
+    return None
+
+
+def _decode_lines(commands: List[int]) -> List[List[Tuple[int, int]]]:
+    lines: List[List[Tuple[int, int]]] = []
+    x = y = i = 0
+    while i < len(commands):
+        command, count = commands[i] & 7, commands[i] >> 3
+        i += 1
+        if command == _CMD_MOVE_TO:
+            lines.append([])
+        for _ in range(count if command in (_CMD_MOVE_TO, _CMD_LINE_TO) else 0):
+            x += _unzigzag(commands[i])
+            y += _unzigzag(commands[i + 1])
+            i += 2
+            lines[-1].append((x, y))
+    return lines
+
+
+def decode_tile(data: bytes) -> Dict[str, Dict[str, Any]]:
+    """{layer name: {"extent", "features": [{"id", "properties", "lines"}]}}"""
+    layers = {}
+    for field, layer_bytes in _fields(data):
+        if field != 3:
+            continue
+        name, extent, keys, values, raw_features = "", DEFAULT_EXTENT, [], [], []
+        for layer_field, value in _fields(layer_bytes):
+            if layer_field == 1:
+                name = value.decode("utf-8")
+            elif layer_field == 2:
+                raw_features.append(value)
+            elif layer_field == 3:
+                keys.append(value.decode("utf-8"))
+            elif layer_field == 4:
+                values.append(_decode_value(value))
+            elif layer_field == 5:
+                extent = value
+        features = []
+        for raw in raw_features:
+            feature = {"id": None, "properties": {}, "lines": []}
+            for feature_field, value in _fields(raw):
+                if feature_field == 1:
+                    feature["id"] = value
+                elif feature_field == 2:
+                    tags = _unpack(value)
+                    feature["properties"] = {keys[k]: values[v] for k, v in zip(tags[::2], tags[1::2])}
+                elif feature_field == 4:
+                    feature["lines"] = _decode_lines(_unpack(value))
+            features.append(feature)
+        layers[name] = {"extent": extent, "features": features}
+    return layers
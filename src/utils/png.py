@@ -0,0 +1,69 @@
+"""Minimal PNG encoding for rendered raster tiles.
+
+Terrain tiles are 8-bit greyscale-with-alpha or RGBA images, so the chunks are
+written directly with zlib rather than through an imaging library::
+
+    signature, IHDR (width, height, bit depth 8, colour type, 0, 0, 0),
+    IDAT (zlib stream of scanlines, each prefixed by filter type 0), IEND
+
+``decode_png`` reads back what ``encode_png`` writes, for tests and tooling.
+"""
+
+import struct
+import zlib
+from typing import Dict
+
+import numpy as np
+
+PNG_MEDIA_TYPE = "image/png"
+
+_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Channels -> PNG colour type
+_COLOUR_TYPES: Dict[int, int] = {1: 0, 2: 4, 3: 2, 4: 6}
+_CHANNELS = {colour_type: channels for channels, colour_type in _COLOUR_TYPES.items()}
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def encode_png(pixels: np.ndarray, compression_level: int = 6) -> bytes:
+    """PNG of a uint8 (height, width) or (height, width, channels) array with 1-4 channels."""
+    if pixels.dtype != np.uint8:
+        raise ValueError("PNG pixels must be uint8")
+    if pixels.ndim == 2:
+        pixels = pixels[:, :, np.newaxis]
+    height, width, channels = pixels.shape
+    if channels not in _COLOUR_TYPES:
+        raise ValueError(f"PNG pixels need 1 to 4 channels, got {channels}")
+
+    # Filter type 0 (None) at the start of every scanline
+    scanlines = np.zeros((height, width * channels + 1), dtype=np.uint8)
+    scanlines[:, 1:] = pixels.reshape(height, width * channels)
+    header = struct.pack(">IIBBBBB", width, height, 8, _COLOUR_TYPES[channels], 0, 0, 0)
+    return (_SIGNATURE + _chunk(b"IHDR", header)
+            + _chunk(b"IDAT", zlib.compress(scanlines.tobytes(), compression_level)) + _chunk(b"IEND", b""))
+
+
+def decode_png(data: bytes) -> np.ndarray:
+    """(height, width, channels) uint8 pixels of an unfiltered 8-bit PNG written by encode_png."""
+    if not data.startswith(_SIGNATURE):
+        raise ValueError("Not a PNG")
+    offset, header, idat = len(_SIGNATURE), None, b""
+    while offset < len(data):
+        (length,) = struct.unpack_from(">I", data, offset)
+        kind = data[offset + 4:offset + 8]
+        body = data[offset + 8:offset + 8 + length]
+        offset += length + 12
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"IDAT":
+            idat += body
+    if header is None:
+        raise ValueError("PNG has no IHDR chunk")
+    width, height, _, colour_type = header[:4]
+    channels = _CHANNELS[colour_type]
+    scanlines = np.frombuffer(zlib.decompress(idat), dtype=np.uint8).reshape(height, width * channels + 1)
+    if scanlines[:, 0].any():
+        raise ValueError("Only unfiltered scanlines are supported")
+    return scanlines[:, 1:].reshape(height, width, channels)
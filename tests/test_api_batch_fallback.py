@@ -0,0 +1,216 @@
+"""Tests for batched GPXZ/Google fallback and per-point quota accounting."""
+from types import SimpleNamespace
+
+import pytest
+
+from src.enhanced_source_selector import EnhancedSourceSelector, api_fallback_deferred
+from src.error_handling import NonRetryableError
+from src.google_elevation_client import GoogleElevationClient
+from src.gpxz_client import GPXZClient, GPXZConfig
+from src.redis_state_manager import RedisRateLimiter
+from src.unified_elevation_service import ElevationResult, UnifiedElevationService
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+class FakeLimiter:
+    def __init__(self, remaining):
+        self._remaining = remaining
+        self.costs = []
+
+    def remaining(self):
+        return self._remaining
+
+    async def wait_if_needed(self, cost=1):
+        self.costs.append(cost)
+        self._remaining -= cost
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+
+class FakeHTTP:
+    def __init__(self):
+        self.requests = []
+
+    async def post(self, url, json):
+        self.requests.append(json["locations"])
+        return FakeResponse({"results": [{"elevation": loc["lat"] + 100} for loc in json["locations"]]})
+
+    async def get(self, url, params):
+        locations = params["locations"].split("|")
+        self.requests.append(locations)
+        return FakeResponse({"status": "OK", "results": [{"elevation": 5.0} for _ in locations]})
+
+
+def make_gpxz(remaining):
+    client = GPXZClient(GPXZConfig(api_key="k"), redis_manager=SimpleNamespace(), response_cache=None)
+    client.response_cache = None
+    client.rate_limiter = FakeLimiter(remaining)
+    client._client = FakeHTTP()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_gpxz_batch_uses_maximal_chunks_within_quota():
+    points = [(float(i) / 1000, 150.0) for i in range(1100)]
+
+    client = make_gpxz(remaining=10_000)
+    results = await client.get_elevation_batch(points)
+    assert [len(r) for r in client._client.requests] == [512, 512, 76]
+    assert client.rate_limiter.costs == [512, 512, 76]
+    assert results[1099] == pytest.approx(1.099 + 100)
+
+    # Chunks shrink to the remaining quota and stop when it is spent
+    client = make_gpxz(remaining=600)
+    results = await client.get_elevation_batch(points)
+    assert client.rate_limiter.costs == [512, 88]
+    assert results[599] is not None and results[600] is None
+
+
+@pytest.mark.asyncio
+async def test_google_batch_sends_multi_location_requests():
+    client = GoogleElevationClient(api_key="k", redis_manager=SimpleNamespace(), response_cache=None)
+    client.response_cache = None
+    client.rate_limiter = FakeLimiter(2500)
+    client._client = FakeHTTP()
+
+    results = await client.get_elevation_batch([(-27.5 + i * 1e-4, 153.0) for i in range(600)])
+    assert [len(r) for r in client._client.requests] == [512, 88]
+    assert client._client.requests[0][0] == "-27.500000,153.000000"
+    assert results == [5.0] * 600 and client.rate_limiter.costs == [512, 88]
+
+
+class FakeBreaker:
+    def __init__(self):
+        self.successes = 0
+
+    def is_available(self):
+        return True
+
+    def record_success(self):
+        self.successes += 1
+
+    def record_failure(self):
+        pass
+
+
+def make_selector(gpxz_answers):
+    calls = {"gpxz": [], "google": []}
+
+    async def gpxz_batch(points):
+        calls["gpxz"].append(points)
+        return [10.0 if gpxz_answers(p) else None for p in points]
+
+    async def google_batch(points):
+        calls["google"].append(points)
+        return [20.0] * len(points)
+
+    selector = object.__new__(EnhancedSourceSelector)
+    selector.use_apis = True
+    selector.gpxz_client = SimpleNamespace(get_elevation_batch=gpxz_batch)
+    selector.google_client = SimpleNamespace(get_elevation_batch=google_batch)
+    selector.circuit_breakers = {"gpxz_api": FakeBreaker(), "google_api": FakeBreaker()}
+    return selector, calls
+
+
+@pytest.mark.asyncio
+async def test_selector_sends_only_gpxz_misses_to_google():
+    selector, calls = make_selector(lambda p: p[0] < 2)
+    results = await selector.get_api_elevations_batch([(float(i), 0.0) for i in range(5)])
+
+    assert results == [(10.0, "gpxz_api"), (10.0, "gpxz_api"), (20.0, "google_api"),
+                       (20.0, "google_api"), (20.0, "google_api")]
+    assert len(calls["gpxz"]) == 1 and len(calls["gpxz"][0]) == 5
+    assert calls["google"] == [[(2.0, 0.0), (3.0, 0.0), (4.0, 0.0)]]
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_defers_api_fallback_until_s3_misses_are_known():
+    selector, calls = make_selector(lambda p: True)
+    service = object.__new__(UnifiedElevationService)
+    service._enhanced_selector = selector
+    service.source_selector = None
+    service._cache_put = lambda key, value: None
+    service._get_cache_key = lambda lat, lon, source: (lat, lon, source)
+    deferred_flags = []
+
+    async def get_elevation(lat, lon, dem_source_id=None):
+        deferred_flags.append(api_fallback_deferred.get())
+        if lat < 50:
+            return ElevationResult(elevation_m=1.0, dem_source_used="Brisbane2009LGA", message=None)
+        return ElevationResult(elevation_m=None, dem_source_used="s3_sources", message="No S3 coverage")
+
+    service.get_elevation = get_elevation
+    points = [(float(lat), 0.0) for lat in range(0, 100, 10)]
+    results = await service.get_elevations_batch(points)
+
+    assert all(deferred_flags) and not api_fallback_deferred.get()
+    # One batched API call for the five rural points instead of five single calls
+    assert len(calls["gpxz"]) == 1 and len(calls["gpxz"][0]) == 5
+    assert [r.dem_source_used for r in results[4:6]] == ["Brisbane2009LGA", "gpxz_api"]
+    assert results[-1].elevation_m == 10.0
+
+    # An explicit source is never deferred
+    deferred_flags.clear()
+    await service.get_elevations_batch(points[:2], dem_source_id="Brisbane2009LGA")
+    assert deferred_flags == [False, False]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def pipeline(self):
+        redis = self
+
+        class Pipe:
+            def __init__(self):
+                self.results = []
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def incr(self, key):
+                self.incrby(key, 1)
+
+            def incrby(self, key, n):
+                redis.values[key] = int(redis.values.get(key, 0)) + n
+                self.results.append(redis.values[key])
+
+            def expire(self, key, seconds):
+                self.results.append(True)
+
+            def execute(self):
+                return self.results
+
+        return Pipe()
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_charges_daily_quota_per_point():
+    redis = FakeRedis()
+    limiter = RedisRateLimiter(SimpleNamespace(_get_redis_client=lambda: redis), "gpxz",
+                               requests_per_second=10, daily_limit=1000)
+
+    await limiter.wait_if_needed(cost=512)
+    await limiter.wait_if_needed()
+    assert limiter.remaining() == 1000 - 513
+
+    with pytest.raises(NonRetryableError):
+        await limiter.wait_if_needed(cost=488)
+    assert limiter.remaining() == 487
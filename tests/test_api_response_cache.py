@@ -0,0 +1,64 @@
+"""Tests for the persistent GPXZ/Google API response cache."""
+import pytest
+from unittest.mock import AsyncMock
+
+from src.gpxz_client import GPXZClient, GPXZConfig
+from src.services.api_response_cache import PersistentAPIResponseCache
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PersistentAPIResponseCache(str(tmp_path / "api_cache.sqlite3"), precision=5)
+    yield cache
+    cache.close()
+
+
+def test_roundtrip_uses_quantized_key(cache):
+    cache.put("gpxz", -43.500001, 172.600001, 12.5)
+    assert cache.get("gpxz", -43.500002, 172.600002) == 12.5
+    assert cache.get("google", -43.500002, 172.600002) is None
+    assert cache.get("gpxz", -43.6, 172.6) is None
+
+    stats = cache.get_stats()
+    assert stats["entries"] == 1
+    assert stats["providers"]["gpxz"]["hits"] == 1
+    assert stats["providers"]["gpxz"]["misses"] == 1
+
+
+def test_failures_are_not_cached(cache):
+    assert cache.put_many("gpxz", [(1.0, 2.0), (3.0, 4.0)], [None, 7.0]) == 1
+    assert cache.get_many("gpxz", [(1.0, 2.0), (3.0, 4.0)]) == [None, 7.0]
+
+
+def test_survives_reopen_like_another_worker(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    PersistentAPIResponseCache(path).put("google", 51.5, -0.12, 11.0)
+    assert PersistentAPIResponseCache(path).get("google", 51.5, -0.12) == 11.0
+
+
+def test_compaction_trims_least_recently_hit(tmp_path):
+    cache = PersistentAPIResponseCache(str(tmp_path / "c.sqlite3"), max_entries=2)
+    cache.put_many("gpxz", [(0.0, 0.0), (1.0, 1.0), (2.0, 2.0)], [1.0, 2.0, 3.0])
+    cache.get("gpxz", 2.0, 2.0)
+
+    result = cache.compact()
+
+    assert result["trimmed_removed"] == 1
+    assert cache.get_stats()["entries"] == 2
+    assert cache.get("gpxz", 2.0, 2.0) == 3.0
+
+
+@pytest.mark.asyncio
+async def test_gpxz_client_checks_cache_before_api(cache):
+    client = GPXZClient(GPXZConfig(api_key="test_key"), response_cache=cache)
+    client._fetch_elevation_batch = AsyncMock(return_value=[20.0])
+    cache.put("gpxz", -43.5, 172.6, 10.0)
+
+    results = await client.get_elevation_batch([(-43.5, 172.6), (-43.4, 172.6)])
+
+    assert results == [10.0, 20.0]
+    client._fetch_elevation_batch.assert_awaited_once_with([(-43.4, 172.6)])
+    assert cache.get("gpxz", -43.4, 172.6) == 20.0
+    await client.close()
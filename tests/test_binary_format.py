@@ -0,0 +1,91 @@
+"""Tests for the packed columnar format on batch elevation endpoints."""
+import json
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.v1 import endpoints
+from src.dependencies import get_dem_service
+from src.utils.binary_format import (
+    COLUMNAR_MEDIA_TYPE, FLAG_EXTERNAL_API, FLAG_HAS_ELEVATION, NO_SOURCE,
+    decode_points, decode_results, encode_points, encode_results,
+)
+
+
+def test_results_roundtrip_with_source_table():
+    payload = encode_results(
+        [-27.5, -27.6, -27.7], [153.0, 153.1, 153.2],
+        [12.25, None, 3.5], ["Brisbane2009LGA", None, "gpxz_api"],
+    )
+    result = decode_results(payload)
+
+    assert result.lats.tolist() == [-27.5, -27.6, -27.7]
+    assert result.elevations[0] == pytest.approx(12.25)
+    assert np.isnan(result.elevations[1])
+    assert result.source_of(0) == "Brisbane2009LGA"
+    assert result.source_ids[1] == NO_SOURCE
+    assert result.flags[0] == FLAG_HAS_ELEVATION
+    assert result.flags[1] == 0
+    assert result.flags[2] == FLAG_HAS_ELEVATION | FLAG_EXTERNAL_API
+
+
+def test_decode_points_validates_length_and_range():
+    lats, lons = decode_points(encode_points([-27.5, 10.0], [153.0, 20.0]))
+    assert lats.tolist() == [-27.5, 10.0] and lons.tolist() == [153.0, 20.0]
+
+    with pytest.raises(ValueError):
+        decode_points(b"\0" * 15)
+    with pytest.raises(ValueError):
+        decode_points(encode_points([95.0], [0.0]))
+
+
+class FakeDEMService:
+    async def get_elevations_for_path_unified(self, points, dem_source_id=None):
+        return [
+            {"input_latitude": p["latitude"], "input_longitude": p["longitude"], "input_id": p["id"],
+             "elevation_m": p["latitude"] * -1, "sequence": i, "message": None, "dem_source": "tile.tif"}
+            for i, p in enumerate(points)
+        ], "tile.tif", None
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.state.limiter = endpoints.limiter
+    app.include_router(endpoints.router, prefix="/api")
+    app.dependency_overrides[get_dem_service] = lambda: FakeDEMService()
+    return TestClient(app)
+
+
+def test_points_endpoint_negotiates_columnar_in_and_out(client):
+    response = client.post(
+        "/api/v1/elevation/points",
+        content=encode_points([-27.5, -27.25], [153.0, 153.5]),
+        headers={"Content-Type": COLUMNAR_MEDIA_TYPE, "Accept": COLUMNAR_MEDIA_TYPE},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == COLUMNAR_MEDIA_TYPE
+    result = decode_results(response.content)
+    assert result.elevations.tolist() == [27.5, 27.25]
+    assert result.source_of(1) == "tile.tif"
+
+
+def test_points_endpoint_keeps_json_default_and_validation(client):
+    response = client.post("/api/v1/elevation/points", json={"points": [{"lat": -27.5, "lon": 153.0}]})
+    assert response.status_code == 200
+    assert response.json()["results"][0]["elevation"] == 27.5
+
+    invalid = client.post("/api/v1/elevation/points", json={"points": [{"lat": 120, "lon": 153.0}]})
+    assert invalid.status_code == 422
+    # Same error locations as FastAPI's own body validation
+    assert invalid.json()["detail"][0]["loc"] == ["body", "points", 0, "lat"]
+
+
+def test_path_endpoint_returns_columnar_for_json_request(client):
+    body = {"points": [{"latitude": -27.5, "longitude": 153.0}]}
+    response = client.post("/api/v1/elevation/path", content=json.dumps(body),
+                           headers={"Content-Type": "application/json", "Accept": COLUMNAR_MEDIA_TYPE})
+    assert response.status_code == 200
+    assert decode_results(response.content).elevations.tolist() == [27.5]
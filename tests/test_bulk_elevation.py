@@ -0,0 +1,162 @@
+"""Tests for the chunked bulk NDJSON elevation service."""
+import asyncio
+import json
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.redis_state_manager import RedisPointQuota
+from src.services import bulk_elevation_service as bulk_module
+from src.services.bulk_elevation_service import BulkElevationService
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+class LocalOnlyRedis:
+    def _get_redis_client(self):
+        return None
+
+
+class FakeTileCache:
+    """Elevation = lat * 100 for every point sampled from a covered file."""
+
+    def __init__(self):
+        self.calls = []
+
+    def sample_many(self, file_path, lats, lons):
+        self.calls.append((file_path, len(lats)))
+        return np.asarray(lats) * 100
+
+
+class FakeElevationService:
+    """Per-point lookups stop after S3 while deferred; misses go to one batched API call."""
+
+    def __init__(self, source):
+        self.unified_provider = SimpleNamespace(elevation_source=source)
+        self.fallback_calls = 0
+        self.batch_calls = []
+        self.deferred = False
+
+    async def get_elevation(self, lat, lon):
+        self.fallback_calls += 1
+        await asyncio.sleep(0)
+        if self.deferred:
+            return SimpleNamespace(elevation_m=None, dem_source_used=None, message="No S3 coverage")
+        return SimpleNamespace(elevation_m=5.0, dem_source_used="gpxz_api", message=None)
+
+    @contextmanager
+    def deferred_api_fallback(self, enabled=True):
+        self.deferred = True
+        try:
+            yield True
+        finally:
+            self.deferred = False
+
+    async def resolve_api_fallback_batch(self, points):
+        self.batch_calls.append(len(points))
+        return [SimpleNamespace(elevation_m=5.0, dem_source_used="gpxz_api", message=None) for _ in points]
+
+
+def make_service(monkeypatch, daily_units=10_000, chunk_size=3):
+    bounds = SimpleNamespace(min_lat=-28.0, max_lat=-27.0, min_lon=153.0, max_lon=154.0)
+    file_entry = SimpleNamespace(file="s3://b/tile.tif", filename="tile.tif", bounds=bounds,
+                                 size_mb=1.0, coordinate_system="EPSG:7856")
+    collection = SimpleNamespace(id="c1", coverage_bounds_wgs84=bounds, files=[file_entry], resolution_m=1.0)
+    source = SimpleNamespace(unified_index=SimpleNamespace(data_collections=[collection]), handler_registry=None)
+
+    tile_cache = FakeTileCache()
+    monkeypatch.setattr(bulk_module, "get_raster_tile_cache", lambda: tile_cache)
+    elevation_service = FakeElevationService(source)
+    service = BulkElevationService(
+        elevation_service, RedisPointQuota(LocalOnlyRedis(), daily_units=daily_units),
+        chunk_size=chunk_size, s3_point_cost=1, api_point_cost=50,
+    )
+    return service, elevation_service, tile_cache
+
+
+async def collect(service, points, client_id="client"):
+    lines = []
+    async for block in service.stream_ndjson(points, client_id):
+        lines.extend(json.loads(line) for line in block.decode().splitlines())
+    return lines[:-1], lines[-1]["summary"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_streams_in_input_order_with_file_planning(monkeypatch):
+    service, elevation_service, tile_cache = make_service(monkeypatch)
+    points = [(-27.5, 153.5), (-27.25, 153.1), (-30.0, 150.0), (-27.75, 153.9), (-27.1, 153.2)]
+
+    results, summary = await collect(service, points)
+
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+    assert results[0]["elevation"] == pytest.approx(-2750.0)
+    assert results[0]["source"] == "tile.tif"
+    assert results[2]["elevation"] == 5.0 and results[2]["source"] == "gpxz_api"
+    # One sample_many call per file per chunk, never per point
+    assert tile_cache.calls == [("s3://b/tile.tif", 2), ("s3://b/tile.tif", 2)]
+    assert elevation_service.fallback_calls == 1 and elevation_service.batch_calls == [1]
+    assert summary["s3_points"] == 4 and summary["fallback_points"] == 1
+    assert summary["quota_units_charged"] == 5 * 1 + (50 - 1)
+
+
+@pytest.mark.asyncio
+async def test_bulk_marks_points_once_quota_is_exhausted(monkeypatch):
+    service, _, _ = make_service(monkeypatch, daily_units=4, chunk_size=3)
+    points = [(-27.5, 153.5)] * 6
+
+    results, summary = await collect(service, points)
+
+    assert all(r["elevation"] is not None for r in results[:3])
+    assert all(r["error"] == "quota_exceeded" and r["elevation"] is None for r in results[3:])
+    assert summary["quota_exhausted"] is True
+    assert summary["quota_remaining"] == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_fallback_reserves_slots_and_quota_before_awaiting(monkeypatch):
+    # Ten points outside every file, in one chunk
+    service, elevation_service, _ = make_service(monkeypatch, daily_units=10 + 4 * 49, chunk_size=10)
+    service.max_fallback_points = 6
+    points = [(-30.0, 150.0)] * 10
+
+    results, summary = await collect(service, points)
+
+    # The cap allows six lookups, of which the quota covers four; all four go out in one batch
+    assert elevation_service.fallback_calls == 4 and elevation_service.batch_calls == [4]
+    assert [r["error"] for r in results[4:6]] == ["quota_exceeded"] * 2
+    assert [r["error"] for r in results[6:]] == ["fallback_limit_reached"] * 4
+    assert summary["fallback_points"] == 4 and summary["successful_points"] == 4
+    assert summary["quota_remaining"] == 0 and summary["quota_exhausted"] is True
+
+
+@pytest.mark.asyncio
+async def test_bulk_fallback_refunds_points_no_api_served(monkeypatch):
+    service, elevation_service, _ = make_service(monkeypatch, daily_units=1000, chunk_size=10)
+
+    async def nothing(points):
+        return [None] * len(points)
+
+    elevation_service.resolve_api_fallback_batch = nothing
+    results, summary = await collect(service, [(-30.0, 150.0)] * 3)
+
+    assert all(r["error"] == "No S3 coverage" for r in results)
+    assert summary["quota_units_charged"] == 3 and summary["quota_remaining"] == 997
+
+
+def test_point_quota_rolls_back_refused_charges():
+    quota = RedisPointQuota(LocalOnlyRedis(), daily_units=10)
+    assert quota.consume("a", 8)
+    assert not quota.consume("a", 3)
+    assert quota.remaining("a") == 2
+    assert quota.remaining("b") == 10
+    quota.refund("a", 5)
+    assert quota.remaining("a") == 7
+
+
+def test_point_quota_fallback_drops_expired_days():
+    quota = RedisPointQuota(LocalOnlyRedis(), daily_units=10)
+    quota._fallback_usage = {"bulk_quota:a:2000-01-01": 9, "bulk_quota:b:2000-01-01": 4}
+    assert quota.consume("a", 8)
+    assert list(quota._fallback_usage) == [quota._get_daily_key("a")]
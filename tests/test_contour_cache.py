@@ -0,0 +1,136 @@
+"""Tests for the contour result cache and its use by ContourService."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from pyproj import Transformer
+
+from src.contour_service import ContourService
+from src.services.contour_cache import ContourResultCache, polygon_fingerprint
+from src.utils.fast_json import loads
+
+TO_UTM = Transformer.from_crs("EPSG:4326", "EPSG:32756", always_xy=True)
+TO_WGS84 = Transformer.from_crs("EPSG:32756", "EPSG:4326", always_xy=True)
+ORIGIN_X, ORIGIN_Y = 500000.0, 6960000.0
+SITE = [(-27.5, 153.0), (-27.5, 153.01), (-27.51, 153.01), (-27.51, 153.0)]
+
+
+def test_fingerprint_ignores_start_vertex_winding_closure_and_jitter():
+    expected = polygon_fingerprint(SITE)
+    assert polygon_fingerprint(SITE[2:] + SITE[:2]) == expected
+    assert polygon_fingerprint(SITE[::-1]) == expected
+    assert polygon_fingerprint(SITE + [SITE[0]]) == expected
+    assert polygon_fingerprint([(lat + 2e-8, lon - 2e-8) for lat, lon in SITE]) == expected
+    assert polygon_fingerprint([(lat + 1e-5, lon) for lat, lon in SITE]) != expected
+
+
+def test_lru_is_bounded_by_compressed_bytes():
+    cache = ContourResultCache(max_bytes=4000)
+    rng = np.random.default_rng(1)
+    keys = [cache.key("geojson", SITE, "auto", "v1", minor=float(i)) for i in range(5)]
+    for key in keys:
+        cache.put(key, {"values": rng.random(200).tolist()})  # ~1.6 kB each after compression
+
+    stats = cache.get_stats()
+    assert cache.memory_usage_bytes() <= 4000 and stats["evictions"] >= 3
+    assert cache.get(keys[0]) is None and cache.get(keys[-1]) is not None
+    assert stats["compression_ratio"] > 1
+    assert cache.get_stats()["hit_rate"] == "50.00%"
+
+
+def test_results_are_shared_through_redis():
+    published = {}
+    shared = SimpleNamespace(publish=lambda key, payload, ttl: published.__setitem__(key, payload),
+                             fetch_published=published.get)
+    writer = ContourResultCache(shared=shared, share_ttl_seconds=60)
+    reader = ContourResultCache(shared=shared, share_ttl_seconds=60)
+    key = writer.key("points", SITE, None, "v1", max_points=10)
+    writer.put(key, [[{"elevation_m": 1.5}], "Brisbane2009LGA"])
+
+    assert reader.get(key) == [[{"elevation_m": 1.5}], "Brisbane2009LGA"]
+    assert reader.get_stats()["shared_hits"] == 1 and reader.get_stats()["entries"] == 1
+
+
+class RampDataset:
+    """400 x 400 px 1 m grid in WGS 84 / UTM 56S rising 0.1 m per column."""
+
+    def __init__(self):
+        self.data = np.tile(np.arange(400, dtype=np.float32) * 0.1, (400, 1))
+        self.transform = (1.0, 0.0, ORIGIN_X, 0.0, -1.0, ORIGIN_Y)
+        self.width = self.height = 400
+        self.res = (1.0, 1.0)
+        self.nodata = None
+        self.reads = 0
+
+    def read(self, band, window, out_shape=None, resampling=None):
+        self.reads += 1
+        (row_start, row_end), (col_start, col_end) = window
+        return self.data[row_start:row_end, col_start:col_end]
+
+
+def test_contour_service_serves_repeat_requests_from_the_cache():
+    dataset = RampDataset()
+    manager = SimpleNamespace(get_dataset=lambda source_id: dataset, get_transformer=lambda source_id: TO_UTM)
+    service = ContourService(manager, result_cache=ContourResultCache())
+    corners = [(ORIGIN_X + 20, ORIGIN_Y - 20), (ORIGIN_X + 120, ORIGIN_Y - 20),
+               (ORIGIN_X + 120, ORIGIN_Y - 120), (ORIGIN_X + 20, ORIGIN_Y - 120)]
+    polygon = [TO_WGS84.transform(x, y)[::-1] for x, y in corners]
+
+    first = service.generate_geojson_contours(polygon, "local", max_points=100_000, simplify_tolerance=0)
+    # Same site drawn from another corner in the other direction
+    again = service.generate_geojson_contours(polygon[::-1], "local", max_points=100_000, simplify_tolerance=0)
+    assert dataset.reads == 1 and again[3] is None
+    assert again[0]["features"][0]["geometry"]["coordinates"] == [
+        list(point) for point in first[0]["features"][0]["geometry"]["coordinates"]
+    ]
+    assert again[1] == first[1]
+
+    # Different intervals and point extraction are separate entries
+    service.generate_geojson_contours(polygon, "local", max_points=100_000, minor_contour_interval_m=2.0,
+                                      simplify_tolerance=0)
+    points, _, _ = service.get_dem_points_in_polygon(polygon, "local", 500)
+    assert service.get_dem_points_in_polygon(polygon, "local", 500)[0] == points
+    assert dataset.reads == 3
+    stats = service.result_cache.get_stats()
+    assert (stats["hits"], stats["misses"]) == (2, 3)
+
+
+def test_streamed_contours_match_the_buffered_result_and_fill_the_cache():
+    dataset = RampDataset()
+    manager = SimpleNamespace(get_dataset=lambda source_id: dataset, get_transformer=lambda source_id: TO_UTM)
+    service = ContourService(manager, result_cache=ContourResultCache())
+    corners = [(ORIGIN_X + 20, ORIGIN_Y - 20), (ORIGIN_X + 120, ORIGIN_Y - 20),
+               (ORIGIN_X + 120, ORIGIN_Y - 120), (ORIGIN_X + 20, ORIGIN_Y - 120)]
+    polygon = [TO_WGS84.transform(x, y)[::-1] for x, y in corners]
+    kwargs = dict(max_points=100_000, simplify_tolerance=0)
+
+    chunks, statistics, source, error = service.stream_geojson_contours(polygon, "local", **kwargs)
+    assert error is None and statistics["contour_count"] == 0  # Nothing traced until consumed
+    first = next(chunks)
+    assert loads(b"[" + first + b"]")[0]["properties"]["elevation"] == 2.0
+    streamed = loads(b"[" + b",".join([first, *chunks]) + b"]")
+    assert statistics["contour_count"] == len(streamed) == 10
+
+    # The finished stream was cached in the generate_geojson_contours layout
+    geojson, cached_statistics, cached_source, _ = service.generate_geojson_contours(polygon, "local", **kwargs)
+    assert dataset.reads == 1 and cached_source == source and cached_statistics == statistics
+    assert geojson["features"] == streamed
+
+    chunks, _, _, _ = service.stream_geojson_contours(polygon, "local", **kwargs)
+    assert loads(b"[" + b",".join(chunks) + b"]") == streamed and dataset.reads == 1
+
+
+def test_results_from_an_incomplete_mosaic_are_not_cached():
+    dataset = RampDataset()
+    dataset.grid = SimpleNamespace(complete=False)  # A covering file failed to read
+    manager = SimpleNamespace(get_dataset=lambda source_id: dataset, get_transformer=lambda source_id: TO_UTM)
+    service = ContourService(manager, result_cache=ContourResultCache())
+    corners = [(ORIGIN_X + 20, ORIGIN_Y - 20), (ORIGIN_X + 120, ORIGIN_Y - 20), (ORIGIN_X + 120, ORIGIN_Y - 120)]
+    polygon = [TO_WGS84.transform(x, y)[::-1] for x, y in corners]
+
+    for _ in range(2):
+        service.generate_geojson_contours(polygon, "local", max_points=100_000)
+        service.get_dem_points_in_polygon(polygon, "local", 500)
+        chunks, _, _, _ = service.stream_geojson_contours(polygon, "local", max_points=100_000)
+        list(chunks)
+    assert dataset.reads == 6 and service.result_cache.get_stats()["entries"] == 0
@@ -0,0 +1,210 @@
+"""Tests for windowed polygon sampling and native-grid contours in ContourService."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from pyproj import Transformer
+from shapely.geometry import LineString, Point, Polygon
+
+from src.contour_service import ContourService
+from src.services import raster_export_service as export_module
+from src.services.coverage_service import CoveringFile
+from src.services.raster_export_service import RasterExportService
+from src.services.tile_cache import RasterHeader
+
+# 400 x 400 px, 1 m grid in WGS 84 / UTM zone 56S; each pixel holds row * 1000 + col
+ORIGIN_X, ORIGIN_Y = 500000.0, 6960000.0
+TO_UTM = Transformer.from_crs("EPSG:4326", "EPSG:32756", always_xy=True)
+TO_WGS84 = Transformer.from_crs("EPSG:32756", "EPSG:4326", always_xy=True)
+
+
+class FakeDataset:
+    def __init__(self):
+        rows, cols = np.mgrid[0:400, 0:400]
+        self.data = (rows * 1000 + cols).astype(np.float32)
+        self.data[:, 300:] = -9999.0
+        self.transform = (1.0, 0.0, ORIGIN_X, 0.0, -1.0, ORIGIN_Y)
+        self.width = self.height = 400
+        self.res = (1.0, 1.0)
+        self.nodata = -9999.0
+        self.reads = []
+
+    def read(self, band, window, out_shape=None, resampling=None):
+        (row_start, row_end), (col_start, col_end) = window
+        self.reads.append((window, out_shape))
+        data = self.data[row_start:row_end, col_start:col_end]
+        if out_shape is None:
+            return data
+        # Nearest decimation: the source pixel under each output pixel centre
+        rows = row_start + ((np.arange(out_shape[0]) + 0.5) * (row_end - row_start) / out_shape[0]).astype(int)
+        cols = col_start + ((np.arange(out_shape[1]) + 0.5) * (col_end - col_start) / out_shape[1]).astype(int)
+        return self.data[np.ix_(rows, cols)]
+
+
+def latlon(x, y):
+    lon, lat = TO_WGS84.transform(x, y)
+    return lat, lon
+
+
+@pytest.fixture
+def dataset():
+    return FakeDataset()
+
+
+@pytest.fixture
+def service(dataset):
+    manager = SimpleNamespace(get_dataset=lambda source_id: dataset, get_transformer=lambda source_id: TO_UTM)
+    return ContourService(manager)
+
+
+# Right triangle with 200 m legs; its eastern part runs into the NODATA columns
+TRIANGLE = [(ORIGIN_X + 150, ORIGIN_Y - 50), (ORIGIN_X + 150, ORIGIN_Y - 250), (ORIGIN_X + 350, ORIGIN_Y - 250)]
+
+
+def assert_points_match_pixels(points):
+    # The service masks with the polygon after a WGS84 round trip, so allow for round-off
+    polygon = Polygon(TRIANGLE).buffer(1e-6)
+    for point in points:
+        x, y = point["x_crs"], point["y_crs"]
+        assert polygon.contains(Point(x, y))
+        assert point["elevation_m"] == (ORIGIN_Y - y) // 1 * 1000 + (x - ORIGIN_X) // 1
+        lat, lon = latlon(x, y)
+        assert (point["latitude"], point["longitude"]) == pytest.approx((lat, lon), abs=1e-9)
+
+
+def test_polygon_is_sampled_from_one_windowed_read(service, dataset):
+    points, source, error = service.get_dem_points_in_polygon([latlon(*v) for v in TRIANGLE], "local", 1000)
+
+    assert error is None and source == "local"
+    # One read of the polygon's bounding window, no per-point reads
+    assert len(dataset.reads) == 1
+    (rows, cols), out_shape = dataset.reads[0]
+    assert rows[0] <= 50 and rows[1] >= 250 and cols[0] <= 150 and cols[1] >= 350 and out_shape is None
+    assert 0 < len(points) <= 1000
+    assert all(point["elevation_m"] != -9999.0 and point["x_crs"] < ORIGIN_X + 300 for point in points)
+    assert_points_match_pixels(points)
+
+
+def test_large_windows_are_decimated_in_the_read(service, dataset, monkeypatch):
+    monkeypatch.setattr(ContourService, "FULL_READ_MAX_PIXELS", 100)
+    points, _, error = service.get_dem_points_in_polygon([latlon(*v) for v in TRIANGLE], "local", 500)
+
+    assert error is None and len(dataset.reads) == 1
+    assert dataset.reads[0][1] is not None
+    assert 0 < len(points) <= 500
+    assert_points_match_pixels(points)
+
+
+def test_polygon_outside_the_dataset_has_no_points(service, dataset):
+    outside = [(ORIGIN_X - 500, ORIGIN_Y + 500), (ORIGIN_X - 400, ORIGIN_Y + 500), (ORIGIN_X - 400, ORIGIN_Y + 400)]
+    points, _, error = service.get_dem_points_in_polygon([latlon(*v) for v in outside], "local", 1000)
+    assert points == [] and error == "No valid elevation points found within polygon"
+    assert dataset.reads == []
+
+
+@pytest.mark.parametrize("max_points", [1_000_000, 2_000])
+def test_contours_are_traced_on_the_dem_grid_with_subpixel_vertices(service, dataset, max_points):
+    # West-east ramp: 0.1 m per column, so the 5 m contour runs through column centre 50 (x = 50.5 m)
+    dataset.data = np.tile(np.arange(400, dtype=np.float32) * 0.1, (400, 1))
+    square = [(ORIGIN_X + 20, ORIGIN_Y - 20), (ORIGIN_X + 120, ORIGIN_Y - 20),
+              (ORIGIN_X + 120, ORIGIN_Y - 120), (ORIGIN_X + 20, ORIGIN_Y - 120)]
+    geojson, statistics, _, error = service.generate_geojson_contours(
+        [latlon(*v) for v in square], "local", max_points=max_points,
+        minor_contour_interval_m=1.0, major_contour_interval_m=5.0, simplify_tolerance=0)
+
+    assert error is None and len(dataset.reads) == 1
+    assert 5.0 in statistics["elevation_intervals"] and statistics["max_elevation"] < 12.0
+    assert statistics["grid_resolution"] == (1.0 if max_points > 10_000 else 3.0)
+    five = [f for f in geojson["features"] if f["properties"]["elevation"] == 5.0]
+    assert len(five) == 1 and five[0]["properties"]["type"] == "major"
+    lons, lats = np.array(five[0]["geometry"]["coordinates"]).T
+    xs, ys = TO_UTM.transform(lons, lats)
+    assert np.allclose(xs, ORIGIN_X + 50.5, atol=1e-3)
+    # The line stays inside the polygon
+    assert ys.min() > ORIGIN_Y - 120 and ys.max() < ORIGIN_Y - 20
+
+
+def test_automatic_contours_use_a_priority_mosaic_of_the_unified_index(monkeypatch):
+    header = RasterHeader(crs_wkt=TO_UTM.target_crs.to_wkt(), transform=(2.0, 0.0, ORIGIN_X, 0.0, -2.0, ORIGIN_Y),
+                          width=1000, height=1000, nodata=-9999.0, dtype="float32")
+    files = [CoveringFile(collection_id="c1", file_path=f"s3://b/{name}", filename=name, priority=priority,
+                          size_mb=1.0, coordinate_system="EPSG:32756", resolution_m=2.0)
+             for name, priority in (("fine.tif", 2), ("coarse.tif", 1))]
+    monkeypatch.setattr(export_module, "find_unified_source", lambda service: object())
+    monkeypatch.setattr(export_module, "CoverageService", lambda source: SimpleNamespace(find_files_for_geometry=lambda g: files))
+    monkeypatch.setattr(export_module, "get_raster_tile_cache", lambda: SimpleNamespace(get_header=lambda path: header))
+    warped = []
+
+    def fake_warp(file_path, spec, resampling):
+        # The same west-east ramp in both files (0.1 m per m); the fine file only covers x < 50 m
+        warped.append((file_path, resampling, spec.transform[0]))
+        a, _, c, _, _, _ = spec.transform
+        xs = c + (np.arange(spec.width) + 0.5) * a - ORIGIN_X
+        data = np.tile(xs * 0.1, (spec.height, 1)).astype(np.float32)
+        if file_path.endswith("fine.tif"):
+            data[:, xs >= 50] = np.nan
+        return data
+
+    manager = SimpleNamespace(dem_sources={}, get_dataset=lambda source_id: pytest.fail("configured source read"))
+    service = ContourService(manager, RasterExportService(elevation_service=None, warp=fake_warp))
+    square = [(ORIGIN_X, ORIGIN_Y), (ORIGIN_X + 100, ORIGIN_Y), (ORIGIN_X + 100, ORIGIN_Y - 100), (ORIGIN_X, ORIGIN_Y - 100)]
+    geojson, statistics, source_used, error = service.generate_geojson_contours(
+        [latlon(*v) for v in square], "auto", max_points=1000, simplify_tolerance=0)
+
+    assert error is None and source_used == "fine.tif,coarse.tif"
+    # 50 x 50 native pixels over a 1,000 cell budget: one 4 m mosaic, each file warped once
+    assert warped == [("s3://b/fine.tif", "bilinear", 4.0), ("s3://b/coarse.tif", "bilinear", 4.0)]
+    assert statistics["grid_resolution"] == 4.0
+    five = [f for f in geojson["features"] if f["properties"]["elevation"] == 5.0]
+    lons, lats = np.array(five[0]["geometry"]["coordinates"]).T
+    assert np.allclose(TO_UTM.transform(lons, lats)[0], ORIGIN_X + 50, atol=1e-3)
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_chunked_contours_are_stitched_across_seams(dataset, use_processes):
+    # Concentric rings around the window centre: every level crosses several chunk seams
+    rows, cols = np.mgrid[0:400, 0:400]
+    dataset.data = (100.0 - 0.1 * np.hypot(rows - 150.5, cols - 150.5)).astype(np.float32)
+    manager = SimpleNamespace(get_dataset=lambda source_id: dataset, get_transformer=lambda source_id: TO_UTM)
+    square = [(ORIGIN_X + 30, ORIGIN_Y - 30), (ORIGIN_X + 270, ORIGIN_Y - 30),
+              (ORIGIN_X + 270, ORIGIN_Y - 270), (ORIGIN_X + 30, ORIGIN_Y - 270)]
+    kwargs = dict(dem_source_id="local", max_points=1_000_000, minor_contour_interval_m=1.0,
+                  major_contour_interval_m=5.0, simplify_tolerance=0)
+
+    whole, whole_stats, _, _ = ContourService(manager).generate_geojson_contours([latlon(*v) for v in square], **kwargs)
+    chunked_service = ContourService(manager, chunk_size=64, workers=2 if use_processes else 0)
+    try:
+        chunked, stats, _, error = chunked_service.generate_geojson_contours([latlon(*v) for v in square], **kwargs)
+    finally:
+        chunked_service.close()
+
+    assert error is None and whole_stats["chunks"] == 1 and stats["chunks"] > 9
+    assert stats["area_km2"] == pytest.approx(0.0576, rel=1e-2) and stats["processing_time_ms"] > 0
+
+    def rings(geojson):
+        return sorted((f["properties"]["elevation"], round(LineString(f["geometry"]["coordinates"]).length, 9),
+                       f["geometry"]["coordinates"][0] == f["geometry"]["coordinates"][-1])
+                      for f in geojson["features"])
+
+    # The same lines as traced on the whole grid; rings inside the square stay single closed lines
+    assert rings(chunked) == rings(whole)
+    assert all(closed for level, _, closed in rings(chunked) if level >= 89)
+
+
+def test_chunked_levels_are_traced_in_batches_as_they_are_consumed(monkeypatch):
+    from src import contour_service as contour_module
+
+    traced = []
+    original = contour_module._trace_chunk
+    monkeypatch.setattr(contour_module, "_trace_chunk",
+                        lambda grid, mask, levels, r0, c0: traced.append(len(levels)) or original(grid, mask, levels, r0, c0))
+    rows, cols = np.mgrid[0:200, 0:200]
+    grid = (0.1 * np.hypot(rows - 100.5, cols - 100.5)).astype(np.float64)
+    service = ContourService(dataset_manager=None, chunk_size=64, workers=0)
+    levels = np.arange(1.0, 13.0)  # 12 levels: two batches
+    chunks = service._chunk_windows(grid.shape)
+
+    iterator = service._traced_levels(grid, np.ones(grid.shape, dtype=bool), levels, chunks)
+    assert next(iterator)[0] == 1.0 and traced == [8] * len(chunks)
+    assert [level for level, _ in iterator] == levels[1:].tolist()
+    assert traced == [8] * len(chunks) + [4] * len(chunks)
@@ -0,0 +1,152 @@
+"""Tests for MVT encoding and the cached contour vector tile endpoint."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pyproj import CRS, Transformer
+
+from src.api.v1 import endpoints
+from src.contour_service import ContourService
+from src.dependencies import get_contour_tile_service
+from src.services.contour_tile_service import ContourTileService, mercator_bounds
+from src.services.raster_export_service import GridSpec, RasterGrid
+from src.utils.mvt import MVT_MEDIA_TYPE, decode_tile, encode_tile, line_geometry
+
+Z, X, Y = 14, 15155, 9427
+TO_MERCATOR = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
+
+
+def test_mvt_round_trip():
+    features = [
+        {"lines": [[(0, 0), (10, 0), (10, 0), (10, -5)], [(3, 3)]], "properties": {"elevation": 12.5, "type": "major"}},
+        {"lines": [[(-64, 4100), (4160, 2)]], "properties": {"elevation": 10.0, "type": "minor", "count": -3}},
+    ]
+    layers = decode_tile(encode_tile({"contours": features, "empty": []}, extent=4096))
+
+    assert list(layers) == ["contours"] and layers["contours"]["extent"] == 4096
+    decoded = layers["contours"]["features"]
+    # The duplicate vertex and the single-point line are dropped; each line is one feature
+    assert [f["lines"] for f in decoded] == [[[(0, 0), (10, 0), (10, -5)]], [[(-64, 4100), (4160, 2)]]]
+    assert decoded[0]["properties"] == {"elevation": 12.5, "type": "major"}
+    assert decoded[1]["properties"] == {"elevation": 10.0, "type": "minor", "count": -3}
+    assert line_geometry([(1, 1), (1, 1)]) == [] and encode_tile({"contours": []}) == b""
+
+
+class FakeExportService:
+    """A west-east ramp (0.01 m per web-mercator metre from the tile's west edge) on a 10 m grid."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def polygon_grid(self, polygon_coords, max_pixels):
+        self.calls += 1
+        lats, lons = zip(*polygon_coords)
+        xs, ys = TO_MERCATOR.transform(lons, lats)
+        min_x, max_y = np.floor(min(xs) / 10) * 10, np.ceil(max(ys) / 10) * 10
+        width, height = int(np.ceil((max(xs) - min_x) / 10)), int(np.ceil((max_y - min(ys)) / 10))
+        spec = GridSpec(CRS("EPSG:3857").to_wkt(), (10.0, 0.0, min_x, 0.0, -10.0, max_y), width, height)
+        cell_x = min_x + (np.arange(width) + 0.5) * 10
+        data = np.tile((cell_x - mercator_bounds(Z, X, Y)[0]) * 0.01, (height, 1)).astype(np.float32)
+        return RasterGrid(spec, data, ["ramp.tif"])
+
+
+def elevation_service(version):
+    index = SimpleNamespace(version=version, generated_at="2026-01-01T00:00:00Z")
+    return SimpleNamespace(
+        unified_provider=SimpleNamespace(elevation_source=SimpleNamespace(unified_index=index)),
+        settings=SimpleNamespace(HTTP_CACHE_ENABLED=True, HTTP_CACHE_ELEVATION_MAX_AGE=60),
+    )
+
+
+def make_service(tmp_path, export, version="1"):
+    return ContourTileService(ContourService(dataset_manager=None), export, elevation_service(version),
+                              cache_dir=str(tmp_path), max_cells=300 * 300)
+
+
+@pytest.mark.asyncio
+async def test_tile_contours_follow_the_zoom_interval_and_are_cached(tmp_path):
+    export = FakeExportService()
+    service = make_service(tmp_path, export)
+    tile, status = await service.get_tile(Z, X, Y)
+    assert status == "rendered"
+
+    features = decode_tile(tile)["contours"]["features"]
+    levels = {f["properties"]["elevation"] for f in features}
+    # z14: 2 m minor / 10 m major across the 0-24 m ramp, with lines reaching into the buffer
+    assert {2.0, 10.0, 20.0} <= levels and all(level % 2 == 0 for level in levels)
+    ten = [f for f in features if f["properties"]["elevation"] == 10.0]
+    assert ten[0]["properties"] == {"elevation": 10.0, "type": "major", "interval": 10.0}
+    min_x, _, max_x, _ = mercator_bounds(Z, X, Y)
+    expected_x = 1000.0 / ((max_x - min_x) / 4096)
+    points = np.array([p for f in ten for line in f["lines"] for p in line])
+    assert np.abs(points[:, 0] - expected_x).max() <= 2
+    assert points[:, 1].min() >= -64 and points[:, 1].max() <= 4096 + 64
+
+    # Memory, then disk in a fresh process, then a re-render once the index changes
+    assert await service.get_tile(Z, X, Y) == (tile, "memory") and export.calls == 1
+    assert await make_service(tmp_path, export).get_tile(Z, X, Y) == (tile, "disk") and export.calls == 1
+    assert await make_service(tmp_path, export, version="2").get_tile(Z, X, Y) == (tile, "rendered")
+    assert export.calls == 2
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+@pytest.mark.asyncio
+async def test_partial_and_uncovered_tiles_are_not_persisted(tmp_path):
+    export = FakeExportService()
+    complete_grid = export.polygon_grid
+    export.polygon_grid = lambda coords, max_pixels: RasterGrid(
+        **dict(vars(complete_grid(coords, max_pixels)), failed=["timeout.tif"]))
+    service = make_service(tmp_path, export)
+
+    # A mosaic missing a file is served but neither remembered nor written
+    tile, status = await service.get_tile(Z, X, Y)
+    assert "contours" in decode_tile(tile) and status == "partial"
+    assert (await service.get_tile(Z, X, Y))[1] == "partial" and export.calls == 2
+    assert not list(tmp_path.rglob("*.mvt")) and service.get_stats()["partial"] == 2
+
+    # Uncovered tiles stay in memory only
+    def uncovered(coords, max_pixels):
+        raise ValueError("No DEM files cover this polygon")
+    export.polygon_grid = uncovered
+    assert await service.get_tile(Z, X + 1, Y) == (b"", "uncovered")
+    assert await service.get_tile(Z, X + 1, Y) == (b"", "memory") and service.get_stats()["uncovered"] == 1
+    assert not list(tmp_path.rglob("*.mvt"))
+
+
+@pytest.fixture
+def client(tmp_path):
+    service = make_service(tmp_path, FakeExportService())
+    app = FastAPI()
+    app.state.limiter = endpoints.limiter
+    app.include_router(endpoints.router, prefix="/api")
+    app.dependency_overrides[get_contour_tile_service] = lambda: service
+    return TestClient(app), service
+
+
+def test_tile_endpoint(client):
+    client, service = client
+    response = client.get(f"/api/v1/elevation/contours/{Z}/{X}/{Y}.mvt")
+    assert response.status_code == 200 and response.headers["content-type"] == MVT_MEDIA_TYPE
+    assert "contours" in decode_tile(response.content)
+
+    etag = response.headers["etag"]
+    assert client.get(f"/api/v1/elevation/contours/{Z}/{X}/{Y}.mvt", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/v1/elevation/contours/5/1/1.mvt").status_code == 400
+    assert client.get(f"/api/v1/elevation/contours/{Z}/{1 << Z}/{Y}.mvt").status_code == 400
+    # Validated before the conditional GET, so a matching tag cannot turn a bad tile into a 304
+    assert client.get("/api/v1/elevation/contours/5/1/1.mvt", headers={"If-None-Match": "*"}).status_code == 400
+
+    # Tiles missing an unreadable file are not cacheable downstream
+    export = service.raster_export_service
+    complete_grid = export.polygon_grid
+    export.polygon_grid = lambda coords, max_pixels: RasterGrid(
+        **dict(vars(complete_grid(coords, max_pixels)), failed=["timeout.tif"]))
+    response = client.get(f"/api/v1/elevation/contours/{Z}/{X}/{Y + 1}.mvt")
+    assert response.status_code == 200 and response.headers["cache-control"] == "no-store"
+    assert "etag" not in response.headers and "last-modified" not in response.headers
+
+    service.elevation_service.unified_provider = None
+    service.elevation_service.settings.HTTP_CACHE_ENABLED = False
+    assert client.get(f"/api/v1/elevation/contours/{Z}/{X}/{Y}.mvt").status_code == 503
@@ -0,0 +1,138 @@
+"""Tests for vectorized cross-section planning and batched sampling."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from pyproj import CRS, Transformer
+
+from src.services import cross_section_service as section_module
+from src.services.coverage_service import CoveringFile
+from src.services.cross_section_service import CrossSectionService, plan_cross_sections, section_offsets
+from src.services.tile_cache import RasterHeader, RasterTileCache, to_vsi_path
+
+FINE = "s3://test-bucket/site/dem_1m.tif"
+COARSE = "s3://test-bucket/site/dem_5m.tif"
+
+# 1000 x 1000 px, 1 m grid in WGS 84 / UTM zone 56S (the planner's local CRS here)
+ORIGIN_X, ORIGIN_Y = 500000.0, 6960000.0
+HEADER = RasterHeader(
+    crs_wkt=CRS.from_epsg(32756).to_wkt(),
+    transform=(1.0, 0.0, ORIGIN_X, 0.0, -1.0, ORIGIN_Y),
+    width=1000, height=1000, nodata=-9999.0, dtype="float32",
+)
+TO_WGS84 = Transformer.from_crs("EPSG:32756", "EPSG:4326", always_xy=True)
+TO_UTM = Transformer.from_crs("EPSG:4326", "EPSG:32756", always_xy=True)
+
+
+def latlon(x, y):
+    lon, lat = TO_WGS84.transform(x, y)
+    return lat, lon
+
+
+class PlaneTileCache(RasterTileCache):
+    """FINE holds its column index as elevation (NODATA right of x=600 m); COARSE is flat 7 m."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fetches = []
+
+    def fetch_tile(self, file_path, row, col):
+        self.fetches.append((file_path, row, col))
+        col_off, _, width, height = self.tile_window(HEADER, row, col)
+        if file_path == COARSE:
+            tile = np.full((height, width), 7.0, dtype=np.float32)
+        else:
+            columns = np.arange(col_off, col_off + width, dtype=np.float32)
+            tile = np.where(columns < 600, columns, -9999.0).astype(np.float32)[None, :].repeat(height, axis=0)
+        return tile, int(tile.nbytes)
+
+
+def covering(file_path, priority):
+    lat_min, lon_min = latlon(ORIGIN_X, ORIGIN_Y - 1000)
+    lat_max, lon_max = latlon(ORIGIN_X + 1000, ORIGIN_Y)
+    return CoveringFile(collection_id="c1", file_path=file_path, filename=file_path.rsplit("/", 1)[-1],
+                        priority=priority, size_mb=1.0, coordinate_system="EPSG:32756", resolution_m=1.0,
+                        bounds=(lon_min, lat_min, lon_max, lat_max))
+
+
+def test_offsets_are_symmetric_and_include_edges():
+    assert section_offsets(width_m=10, spacing_m=2).tolist() == [-5, -4, -2, 0, 2, 4, 5]
+    assert section_offsets(offsets_m=[5, -3, 0, 5]).tolist() == [-3, 0, 5]
+    with pytest.raises(ValueError):
+        section_offsets(width_m=10)
+
+
+def test_sections_are_perpendicular_to_each_segment():
+    # East for 100 m, then north for 50 m
+    alignment = [latlon(ORIGIN_X + 100, ORIGIN_Y - 500), latlon(ORIGIN_X + 200, ORIGIN_Y - 500),
+                 latlon(ORIGIN_X + 200, ORIGIN_Y - 450)]
+    sections = plan_cross_sections(alignment, 40.0, np.array([-10.0, 0.0, 10.0]))
+
+    assert sections.projected_crs == "EPSG:32756"
+    assert sections.chainage_m.tolist() == pytest.approx([0, 40, 80, 120, 150], abs=1e-6)
+    assert sections.lats.shape == (5, 3)
+    xs, ys = TO_UTM.transform(sections.lons, sections.lats)
+    # Travelling east, right is south; travelling north, right is east
+    assert xs[1].tolist() == pytest.approx([ORIGIN_X + 140] * 3, abs=1e-3)
+    assert ys[1].tolist() == pytest.approx([ORIGIN_Y - 490, ORIGIN_Y - 500, ORIGIN_Y - 510], abs=1e-3)
+    assert xs[3].tolist() == pytest.approx([ORIGIN_X + 190, ORIGIN_X + 200, ORIGIN_X + 210], abs=1e-3)
+    assert ys[3].tolist() == pytest.approx([ORIGIN_Y - 480] * 3, abs=1e-3)
+    assert sections.bearings_deg[[0, 3]].tolist() == pytest.approx([90, 0], abs=1e-6)
+
+
+def test_oversized_plans_are_rejected_before_they_are_built():
+    alignment = [latlon(ORIGIN_X + 100, ORIGIN_Y - 500), latlon(ORIGIN_X + 250, ORIGIN_Y - 500)]
+    offsets = np.array([-10.0, 0.0, 10.0])
+    assert plan_cross_sections(alignment, 40.0, offsets, max_points=15).num_points == 15
+    with pytest.raises(ValueError, match="5 sections x 3 offsets = 15 points exceeds the limit of 14"):
+        plan_cross_sections(alignment, 40.0, offsets, max_points=14)
+    # 150 million sections would be allocated if this were checked after planning
+    with pytest.raises(ValueError, match="exceeds the limit"):
+        plan_cross_sections(alignment, 1e-6, np.linspace(-1000, 1000, 1001), max_points=100_000)
+
+
+def test_job_requests_share_the_offset_checks():
+    from pydantic import ValidationError
+    from src.models.job_models import CrossSectionJobRequest
+
+    alignment = [{"lat": -27.5, "lon": 153.0}, {"lat": -27.51, "lon": 153.0}]
+    with pytest.raises(ValidationError, match="within 1000 m"):
+        CrossSectionJobRequest(kind="cross_sections", alignment=alignment, offsets_m=[0, 1500])
+    job = CrossSectionJobRequest(kind="cross_sections", alignment=alignment, width_m=20, spacing_m=5, priority="low")
+    assert job.priority == "low" and job.interval_m == 20.0
+
+    # Tiny spacings are refused by validation, before any offsets are built
+    with pytest.raises(ValidationError, match="greater than or equal to 0.1"):
+        CrossSectionJobRequest(kind="cross_sections", alignment=alignment, width_m=2000, spacing_m=1e-6)
+    with pytest.raises(ValidationError, match="more than 1001 offsets"):
+        CrossSectionJobRequest(kind="cross_sections", alignment=alignment, width_m=2000, spacing_m=1)
+    job = CrossSectionJobRequest(kind="cross_sections", alignment=alignment, width_m=1000, spacing_m=1)
+    assert len(section_offsets(job.width_m, job.spacing_m)) == 1001
+
+
+def test_sampling_reads_each_tile_once_and_falls_through(tmp_path, monkeypatch):
+    cache = PlaneTileCache(str(tmp_path / "tiles"), tile_size=256, read_through=True)
+    for file_path in (FINE, COARSE):
+        cache._headers[to_vsi_path(file_path)] = HEADER
+    monkeypatch.setattr(section_module, "get_raster_tile_cache", lambda: cache)
+    coverage = SimpleNamespace(find_files_for_geometry=lambda geom: [covering(FINE, 2), covering(COARSE, 1)])
+
+    alignment = [latlon(ORIGIN_X + 100.5, ORIGIN_Y - 500.5), latlon(ORIGIN_X + 700.5, ORIGIN_Y - 500.5)]
+    sections = plan_cross_sections(alignment, 10.0, section_offsets(width_m=40, spacing_m=1))
+    CrossSectionService(elevation_service=None).sample(coverage, sections)
+
+    assert sections.elevations.shape == (61, 41)
+    assert sections.elevations[0].tolist() == pytest.approx([100.0] * 41)
+    assert sections.elevations[30, 20] == pytest.approx(400.0)
+    assert sections.elevations[-1].tolist() == pytest.approx([7.0] * 41)
+    assert sections.sources == ["dem_1m.tif", "dem_5m.tif"]
+    assert set(sections.source_index[-1].tolist()) == {1}
+
+    # 2,501 points, one read per tile touched (the band spans tile rows 1-2); COARSE only where FINE is NODATA
+    fine = [(r, c) for f, r, c in cache.fetches if f == FINE]
+    assert sorted(fine) == [(r, c) for r in (1, 2) for c in range(3)]
+    assert sorted((r, c) for f, r, c in cache.fetches if f == COARSE) == [(1, 2), (2, 2)]
+
+    result = sections.to_dict()
+    assert result["offsets_m"][0] == -20.0 and len(result["sections"]) == 61
+    assert result["sections"][0]["elevations"][0] == 100.0
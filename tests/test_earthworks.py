@@ -0,0 +1,211 @@
+"""Tests for tiled cut/fill volumes against flat, TIN and grid design surfaces."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+from pyproj import CRS, Transformer
+from shapely.geometry import Polygon
+
+from src.models.earthworks_models import EarthworksRequest
+from src.services import raster_export_service as export_module
+from src.services.coverage_service import CoveringFile
+from src.services.earthworks_service import (
+    EarthworksService, FlatDesign, GridDesign, TINDesign, cell_areas,
+)
+from src.services.raster_export_service import GridSpec, RasterExportService
+from src.services.tile_cache import RasterHeader
+
+UTM56S = CRS.from_epsg(32756).to_wkt()
+ORIGIN_X, ORIGIN_Y = 500000.0, 6960000.0
+HEADER = RasterHeader(crs_wkt=UTM56S, transform=(2.0, 0.0, ORIGIN_X, 0.0, -2.0, ORIGIN_Y),
+                      width=500, height=500, nodata=-9999.0, dtype="float32")
+TO_WGS84 = Transformer.from_crs("EPSG:32756", "EPSG:4326", always_xy=True)
+
+
+def latlon(x, y):
+    lon, lat = TO_WGS84.transform(x, y)
+    return lat, lon
+
+
+def ramp_warp(file_path, spec, resampling):
+    """Ground rising 0.1 m per metre east of ORIGIN_X."""
+    a, _, c, _, _, _ = spec.transform
+    xs = c + (np.arange(spec.width) + 0.5) * a - ORIGIN_X
+    return np.tile(xs * 0.1, (spec.height, 1)).astype(np.float32)
+
+
+# 100 m square: 50 x 50 native 2 m cells, ground 0.1 to 9.9 m at the cell centres
+SQUARE = [(ORIGIN_X, ORIGIN_Y), (ORIGIN_X + 100, ORIGIN_Y), (ORIGIN_X + 100, ORIGIN_Y - 100), (ORIGIN_X, ORIGIN_Y - 100)]
+
+
+@pytest.fixture
+def compute(monkeypatch):
+    monkeypatch.setattr(export_module, "get_raster_tile_cache", lambda: SimpleNamespace(get_header=lambda path: HEADER))
+    coverage = SimpleNamespace(find_files_for_geometry=lambda geom: [CoveringFile(
+        collection_id="c1", file_path="s3://b/ramp.tif", filename="ramp.tif", priority=1, size_mb=1.0,
+        coordinate_system="EPSG:32756", resolution_m=2.0)])
+
+    def run(design, corners=SQUARE, tile_size=16, difference_raster=False):
+        service = EarthworksService(RasterExportService(elevation_service=None, warp=ramp_warp),
+                                    elevation_service=None, tile_size=tile_size)
+        polygon = Polygon([latlon(x, y)[::-1] for x, y in corners])
+        return service.compute_polygon(coverage, polygon, design, difference_raster)
+
+    return run
+
+
+def test_flat_platform_balances_cut_and_fill_across_tiles(compute):
+    result = compute(FlatDesign(5.0), difference_raster=True)
+    totals = result.totals
+
+    # Cut and fill wedges of 50 x 100 m averaging 2.5 m, over 16 tiles of up to 16 x 16 cells
+    assert totals["tiles"] == 16 and totals["cells_compared"] == 2500
+    assert totals["cut_volume_m3"] == pytest.approx(12500) and totals["fill_volume_m3"] == pytest.approx(12500)
+    assert totals["net_volume_m3"] == pytest.approx(0, abs=1e-6)
+    assert totals["cut_area_m2"] == totals["fill_area_m2"] == 5000 and totals["compared_area_m2"] == 10000
+    assert totals["max_cut_m"] == totals["max_fill_m"] == pytest.approx(4.9)
+    assert totals["crs"] == "EPSG:32756" and totals["sources"] == ["ramp.tif"]
+    assert totals["complete"] is True and totals["failed_files"] == []
+    assert result.headers()["X-Volumes-Complete"] == "true"
+
+    difference = result.difference.data
+    assert difference.shape == (50, 50) and np.allclose(difference[7], 5.0 - (np.arange(50) * 2 + 1) * 0.1)
+    assert result.headers()["X-Cut-Volume-M3"] == "12500.0"
+    # The same totals in one tile
+    assert compute(FlatDesign(5.0), tile_size=4096).totals == dict(totals, tiles=1)
+
+
+def test_unreadable_files_mark_volumes_incomplete_and_distant_files_are_not_opened(monkeypatch):
+    monkeypatch.setattr(export_module, "get_raster_tile_cache", lambda: SimpleNamespace(get_header=lambda path: HEADER))
+    lat, lon = latlon(ORIGIN_X, ORIGIN_Y)
+    here = (lon - 0.01, lat - 0.01, lon + 0.01, lat + 0.01)
+    files = [
+        CoveringFile("c1", "s3://b/ramp.tif", "ramp.tif", 1, 1.0, "EPSG:32756", 2.0, bounds=here),
+        CoveringFile("c1", "s3://b/timeout.tif", "timeout.tif", 2, 1.0, "EPSG:32756", 2.0, bounds=here),
+        CoveringFile("c2", "s3://b/far.tif", "far.tif", 3, 1.0, "EPSG:32756", 2.0, bounds=(140.0, -35.0, 141.0, -34.0)),
+    ]
+    warped = []
+
+    def warp(file_path, spec, resampling):
+        warped.append(file_path)
+        if file_path == "s3://b/timeout.tif":
+            raise TimeoutError("read timed out")
+        # The ramp only covers the western half, so lower-priority files are needed
+        values = ramp_warp(file_path, spec, resampling)
+        a, _, c, _, _, _ = spec.transform
+        values[:, c + (np.arange(spec.width) + 0.5) * a > ORIGIN_X + 50] = np.nan
+        return values
+
+    service = EarthworksService(RasterExportService(elevation_service=None, warp=warp), elevation_service=None,
+                                tile_size=16)
+    polygon = Polygon([latlon(x, y)[::-1] for x, y in SQUARE])
+    result = service.compute_polygon(SimpleNamespace(find_files_for_geometry=lambda geom: files), polygon,
+                                     FlatDesign(5.0), difference_raster=True)
+
+    assert "s3://b/far.tif" not in warped
+    assert result.totals["complete"] is False and result.totals["failed_files"] == ["timeout.tif"]
+    assert result.totals["cells_without_dem"] == 1250
+    assert result.headers()["X-Volumes-Complete"] == "false"
+    assert result.difference.headers()["X-Raster-Failed-Files"] == "timeout.tif"
+
+
+def test_tin_design_only_counts_cells_it_covers(compute):
+    # A plane 1 m above the ground over the western half of the square
+    corners = [(ORIGIN_X, ORIGIN_Y), (ORIGIN_X + 50, ORIGIN_Y), (ORIGIN_X + 50, ORIGIN_Y - 100), (ORIGIN_X, ORIGIN_Y - 100)]
+    vertices = [(*latlon(x, y), 0.1 * (x - ORIGIN_X) + 1.0) for x, y in corners]
+    totals = compute(TINDesign(vertices, [(0, 1, 2), (0, 2, 3)])).totals
+
+    assert totals["cells_compared"] == 1250 and totals["cells_without_design"] == 1250
+    assert totals["fill_volume_m3"] == pytest.approx(5000, rel=1e-3) and totals["cut_volume_m3"] < 1
+    assert compute(TINDesign(vertices)).totals["fill_volume_m3"] == pytest.approx(5000, rel=1e-3)
+
+    with pytest.raises(ValueError, match="do not exist"):
+        compute(TINDesign(vertices, [(0, 1, 7)]))
+
+
+def test_tin_samplers_interpolate_planes_and_leave_gaps_outside():
+    from src.services.earthworks_service import DesignSurface
+
+    with pytest.raises(TypeError):
+        DesignSurface()
+    corners = [(ORIGIN_X, ORIGIN_Y), (ORIGIN_X + 50, ORIGIN_Y), (ORIGIN_X + 50, ORIGIN_Y - 50), (ORIGIN_X, ORIGIN_Y - 50)]
+    vertices = [(*latlon(x, y), 2.0 + 0.1 * (x - ORIGIN_X) - 0.05 * (y - ORIGIN_Y)) for x, y in corners]
+    xs = np.array([ORIGIN_X + 10, ORIGIN_X + 40, ORIGIN_X + 25, ORIGIN_X + 60])
+    ys = np.array([ORIGIN_Y - 5, ORIGIN_Y - 45, ORIGIN_Y - 25, ORIGIN_Y - 25])
+    expected = 2.0 + 0.1 * (xs - ORIGIN_X) - 0.05 * (ys - ORIGIN_Y)
+
+    for design in (TINDesign(vertices, [(0, 1, 2), (0, 2, 3)]), TINDesign(vertices)):
+        levels = design.sampler(UTM56S)(xs, ys)
+        assert levels[:3] == pytest.approx(expected[:3], abs=1e-3) and np.isnan(levels[3])
+
+
+def test_grid_design_is_sampled_between_cell_centres(compute):
+    # 10 m design cells 2 m over the ground, reaching past the square, with one cell left undesigned
+    levels = [[0.1 * (10 * col - 5) + 2.0 for col in range(12)] for _ in range(12)]
+    levels[1][1] = None
+    design = GridDesign("EPSG:32756", (ORIGIN_X - 10, 10.0, 0.0, ORIGIN_Y + 10, 0.0, -10.0), levels)
+    totals = compute(design).totals
+
+    # The undesigned cell blanks its neighbourhood for bilinear sampling
+    assert 25 <= totals["cells_without_design"] <= 100
+    assert totals["fill_volume_m3"] == pytest.approx(2.0 * totals["compared_area_m2"], rel=1e-6)
+
+
+def test_cell_areas_shrink_with_latitude_on_geographic_grids():
+    arc_second = 1 / 3600
+    spec = GridSpec(CRS.from_epsg(4326).to_wkt(), (arc_second, 0.0, 153.0, 0.0, -arc_second, 0.0), 10, 2)
+    equator = cell_areas(spec)
+    assert equator[0] == pytest.approx(30.887 ** 2, rel=1e-3)
+    spec.transform = (arc_second, 0.0, 153.0, 0.0, -arc_second, -60.0)
+    assert cell_areas(spec)[0] == pytest.approx(equator[0] / 2, rel=1e-3)
+    assert cell_areas(GridSpec(UTM56S, HEADER.transform, 3, 3)).tolist() == [4.0, 4.0, 4.0]
+
+
+def test_request_needs_exactly_one_design():
+    polygon = [{"lat": -27.5, "lon": 153.0}, {"lat": -27.5, "lon": 153.01}, {"lat": -27.51, "lon": 153.0}]
+    with pytest.raises(ValidationError, match="exactly one"):
+        EarthworksRequest(polygon_coordinates=polygon)
+    with pytest.raises(ValidationError, match="exactly one"):
+        EarthworksRequest(polygon_coordinates=polygon, design_level_m=1.0,
+                          design_grid={"crs": "EPSG:7856", "geotransform": [0, 1, 0, 0, 0, -1], "levels": [[1.0]]})
+    with pytest.raises(ValidationError, match="north-up"):
+        EarthworksRequest(polygon_coordinates=polygon,
+                          design_grid={"crs": "EPSG:7856", "geotransform": [0, 1, 0, 0, 0, 1], "levels": [[1.0]]})
+
+
+def test_endpoint_returns_totals_or_the_difference_raster():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from src.api.v1 import endpoints
+    from src.dependencies import get_earthworks_service
+    from src.services.earthworks_service import EarthworksResult
+    from src.services.raster_export_service import RasterGrid
+
+    totals = dict(cut_volume_m3=10.0, fill_volume_m3=4.0, net_volume_m3=-6.0, cut_area_m2=8.0, fill_area_m2=4.0,
+                  compared_area_m2=12.0, max_cut_m=2.0, max_fill_m=1.0, cells_compared=3, cells_without_dem=0,
+                  cells_without_design=1, cell_size_m=[2.0, 2.0], crs="EPSG:32756", sources=["ramp.tif"], tiles=1)
+    calls = []
+
+    async def compute(polygon_coords, design, difference_raster=False):
+        calls.append(design)
+        grid = RasterGrid(GridSpec(UTM56S, HEADER.transform, 2, 2), np.array([[1, -2], [-3, np.nan]], dtype=np.float32))
+        return EarthworksResult(totals, grid if difference_raster else None)
+
+    app = FastAPI()
+    app.state.limiter = endpoints.limiter
+    app.include_router(endpoints.router, prefix="/api")
+    app.dependency_overrides[get_earthworks_service] = lambda: SimpleNamespace(compute=compute)
+    client = TestClient(app)
+    polygon = [{"lat": lat, "lon": lon} for lat, lon in (latlon(x, y) for x, y in SQUARE)]
+
+    response = client.post("/api/v1/elevation/earthworks", json={"polygon_coordinates": polygon, "design_level_m": 5})
+    assert response.status_code == 200 and response.json()["net_volume_m3"] == -6.0
+    assert calls[-1] == FlatDesign(5.0)
+
+    grid = {"crs": "EPSG:32756", "geotransform": [ORIGIN_X, 10, 0, ORIGIN_Y, 0, -10], "levels": [[1.0, None]]}
+    response = client.post("/api/v1/elevation/earthworks",
+                           json={"polygon_coordinates": polygon, "design_grid": grid, "format": "npy"})
+    assert response.status_code == 200 and response.headers["x-cut-volume-m3"] == "10.0"
+    assert response.headers["x-raster-width"] == "2" and np.isnan(calls[-1].levels[0, 1])
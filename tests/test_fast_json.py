@@ -0,0 +1,84 @@
+"""Tests for the fast JSON rendering path on point-array endpoints."""
+import json
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.v1 import endpoints
+from src.dependencies import get_dem_service
+from src.models import EnhancedLineResponse, FrontendContourDataResponse, StandardResponse
+from src.utils import fast_json
+
+
+class FakeDEMService:
+    async def get_elevations_for_path_unified(self, points, dem_source_id=None):
+        return [
+            {"input_latitude": p["latitude"], "input_longitude": p["longitude"], "input_id": p["id"],
+             "elevation_m": None if i else 12.5, "sequence": i, "message": None, "dem_source": "tile.tif"}
+            for i, p in enumerate(points)
+        ], "tile.tif", None
+
+    async def get_elevations_for_line_unified(self, *args, **kwargs):
+        return [
+            {"latitude": -27.5, "longitude": 153.0, "elevation_m": 10.0, "message": None, "chainage_m": 0.0,
+             "source": "tile.tif"},
+            {"latitude": -27.6, "longitude": 153.1, "elevation_m": None, "message": "no data"},
+        ], "tile.tif", "2 points"
+
+    def get_dem_points_in_polygon(self, polygon_coords, source, max_points):
+        return [{"latitude": -27.5, "longitude": 153.0, "elevation_m": 4.25},
+                {"lat": -27.51, "lon": 153.01, "elevation": 5}], "Brisbane2009LGA", None
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.state.limiter = endpoints.limiter
+    app.include_router(endpoints.router, prefix="/api")
+    app.dependency_overrides[get_dem_service] = lambda: FakeDEMService()
+    return TestClient(app)
+
+
+def test_points_match_the_documented_models(client):
+    response = client.post("/api/v1/elevation/points",
+                           json={"points": [{"lat": -27.5, "lon": 153.0}, {"lat": -27.25, "lon": 153.5}]})
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    assert StandardResponse.model_validate(body).model_dump() == body
+    assert body["results"][1] == {"lat": -27.25, "lon": 153.5, "elevation": None, "data_source": "tile.tif"}
+
+    line = client.post("/api/v1/elevation/line", json={
+        "start_point": {"latitude": -27.5, "longitude": 153.0},
+        "end_point": {"latitude": -27.6, "longitude": 153.1}, "num_points": 2,
+    }).json()
+    assert EnhancedLineResponse.model_validate(line).model_dump() == line
+    assert line["points"][0]["chainage_m"] == 0.0 and line["points"][1]["resolution"] is None
+
+
+def test_contour_data_renders_dem_points(client):
+    polygon = [{"latitude": -27.5, "longitude": 153.0}, {"latitude": -27.5, "longitude": 153.1},
+               {"latitude": -27.6, "longitude": 153.1}]
+    response = client.post("/api/v1/elevation/contour-data", json={"area_bounds": {"polygon_coordinates": polygon}})
+    assert response.status_code == 200
+    body = response.json()
+    assert FrontendContourDataResponse.model_validate(body).model_dump() == body
+    assert body["total_points"] == 2
+    assert body["dem_points"][1] == {"lat": -27.51, "lon": 153.01, "elevation": 5.0, "data_source": "Brisbane2009LGA"}
+
+
+def test_openapi_keeps_response_models(client):
+    schema = client.get("/openapi.json").json()
+    responses = schema["paths"]["/api/v1/elevation/contour-data"]["post"]["responses"]["200"]
+    assert responses["content"]["application/json"]["schema"]["$ref"].endswith("/FrontendContourDataResponse")
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_handles_numpy_and_nan(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(fast_json, "orjson", None)
+    elif fast_json.orjson is None:
+        pytest.skip("orjson not installed")
+    payload = {"values": np.array([1.5, np.nan], dtype=np.float32), "count": np.int64(2), "missing": float("nan")}
+    assert json.loads(fast_json.dumps(payload)) == {"values": [1.5, None], "count": 2, "missing": None}
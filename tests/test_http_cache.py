@@ -0,0 +1,75 @@
+"""Tests for conditional GET support on read-only endpoints."""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+from starlette.requests import Request
+
+from src.utils.http_cache import build_cache_validators, get_index_version
+
+
+def make_request(path="/api/v1/elevation", query="lat=-27.4698&lon=153.0251", headers=None):
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query.encode(),
+        "headers": raw_headers,
+    })
+
+
+def make_service(generated_at="2025-08-01T10:00:00", total_files=100):
+    index = SimpleNamespace(
+        version="2.0",
+        schema_metadata=SimpleNamespace(generated_at=generated_at, total_collections=3, total_files=total_files),
+    )
+    return SimpleNamespace(unified_provider=SimpleNamespace(elevation_source=SimpleNamespace(unified_index=index)))
+
+
+def test_etag_stable_for_same_request_and_index():
+    first = build_cache_validators(make_request(), make_service(), max_age=60)
+    second = build_cache_validators(make_request(query="lon=153.0251&lat=-27.4698"), make_service(), max_age=60)
+    assert first.etag == second.etag
+    assert first.headers()["Cache-Control"] == "public, max-age=60"
+
+
+def test_etag_changes_with_index_version_and_query():
+    base = build_cache_validators(make_request(), make_service(), max_age=60)
+    reloaded = build_cache_validators(make_request(), make_service(total_files=101), max_age=60)
+    other_point = build_cache_validators(make_request(query="lat=-33.8&lon=151.2"), make_service(), max_age=60)
+    assert base.etag != reloaded.etag
+    assert base.etag != other_point.etag
+
+
+def test_if_none_match_returns_not_modified():
+    validators = build_cache_validators(make_request(), make_service(), max_age=60)
+    request = make_request(headers={"If-None-Match": f'"other", {validators.etag}'})
+    assert validators.is_not_modified(request)
+
+    response = validators.not_modified_response()
+    assert response.status_code == 304
+    assert response.headers["etag"] == validators.etag
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    validators = build_cache_validators(make_request(), make_service(), max_age=60)
+    future = format_datetime(datetime.now(timezone.utc) + timedelta(days=1), usegmt=True)
+    request = make_request(headers={"If-None-Match": '"stale"', "If-Modified-Since": future})
+    assert not validators.is_not_modified(request)
+
+
+def test_if_modified_since_uses_index_generation_time():
+    validators = build_cache_validators(make_request(), make_service(), max_age=60)
+    assert validators.last_modified == datetime(2025, 8, 1, 10, 0, tzinfo=timezone.utc)
+
+    newer = make_request(headers={"If-Modified-Since": "Fri, 01 Aug 2025 10:00:00 GMT"})
+    older = make_request(headers={"If-Modified-Since": "Thu, 31 Jul 2025 10:00:00 GMT"})
+    assert validators.is_not_modified(newer)
+    assert not validators.is_not_modified(older)
+
+
+def test_missing_index_falls_back_to_process_token():
+    token, last_modified = get_index_version(None)
+    assert token.startswith("process-")
+    assert last_modified.tzinfo is not None
@@ -0,0 +1,289 @@
+"""Tests for the asynchronous job queue, registry and built-in job kinds."""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.redis_state_manager import RedisJobRegistry
+from src.services.job_handlers import ElevationJobHandlers
+from src.services.job_service import JobLimitError, JobService
+from src.services.profile_service import LineProfile
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+def make_service(tmp_path, **kwargs):
+    # Redis unavailable: the registry keeps records in-process
+    registry = RedisJobRegistry(SimpleNamespace(_get_redis_client=lambda: None))
+    return JobService(registry, result_dir=str(tmp_path / "results"), **kwargs)
+
+
+async def wait_for_state(service, job_id, *states):
+    for _ in range(200):
+        record = service.get(job_id)
+        if record["state"] in states:
+            return record
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} stuck in {service.get(job_id)['state']}")
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_in_priority_order_and_results_download(tmp_path):
+    service = make_service(tmp_path, workers=1)
+    release = asyncio.Event()
+    order = []
+
+    async def blocker(context):
+        await release.wait()
+
+    async def echo(context):
+        order.append(context.params["name"])
+        context.report(1, 2, "half way")
+        with open(context.result_path, "w") as output:
+            json.dump(context.params, output)
+        return {"name": context.params["name"]}
+
+    service.register_kind("blocker", blocker)
+    service.register_kind("echo", echo)
+
+    first = service.submit("blocker", {}, client_id="a")
+    await wait_for_state(service, first.id, "running")
+    low = service.submit("echo", {"name": "low"}, client_id="a", priority="low")
+    high = service.submit("echo", {"name": "high"}, client_id="b", priority="high")
+    assert service.get(low.id)["state"] == "queued"
+
+    release.set()
+    record = await wait_for_state(service, low.id, "completed")
+    assert order == ["high", "low"]
+    assert record["summary"] == {"name": "low"} and record["progress_percent"] == 100.0
+    assert record["result_available"] and record["result_media_type"] == "application/json"
+
+    path, media_type = service.result_file(high.id)
+    assert json.load(open(path)) == {"name": "high"}
+    # Another worker sharing the registry and result directory serves it from the record
+    other = JobService(service.registry, result_dir=service.result_dir)
+    assert other.result_file(high.id) == (path, "application/json")
+    assert other.result_file(first.id) is None
+    # Records are visible through the registry and listed per client
+    assert service.registry.get(high.id)["state"] == "completed"
+    assert [r["job_id"] for r in service.list("a")][0] in (first.id, low.id)
+    assert len(service.list("a")) == 2
+    service.close()
+
+
+@pytest.mark.asyncio
+async def test_limits_cancellation_and_timeout(tmp_path):
+    service = make_service(tmp_path, workers=1, max_active_per_client=2, timeout_seconds=0.05)
+    started = asyncio.Event()
+
+    async def forever(context):
+        started.set()
+        await asyncio.sleep(60)
+
+    service.register_kind("forever", forever)
+
+    with pytest.raises(ValueError):
+        service.submit("unknown", {}, client_id="a")
+
+    running = service.submit("forever", {}, client_id="a")
+    queued = service.submit("forever", {}, client_id="a")
+    with pytest.raises(JobLimitError):
+        service.submit("forever", {}, client_id="a")
+
+    await started.wait()
+    assert service.cancel(queued.id)["state"] == "cancelled"
+    # The running job hits its time limit; the cancelled one never starts
+    record = await wait_for_state(service, running.id, "failed")
+    assert "time limit" in record["error"] and service.result_file(running.id) is None
+
+    started.clear()
+    job = service.submit("forever", {}, client_id="a")
+    service.timeout_seconds = 60
+    await started.wait()
+    service.cancel(job.id)
+    assert (await wait_for_state(service, job.id, "cancelled"))["finished_at"] is not None
+    assert service.get_stats()["failed"] == 1
+    service.close()
+
+
+class FakeRedis:
+    """The strings, sets and sorted sets the job registry uses; pipelines run each call at once."""
+
+    def __init__(self):
+        self.values, self.sets = {}, {}
+
+    def pipeline(self):
+        redis, results = self, []
+
+        class Pipeline:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: results.append(getattr(redis, name)(*args, **kwargs))
+
+            def execute(self):
+                return list(results)
+
+        return Pipeline()
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def zadd(self, key, mapping):
+        self.sets.setdefault(key, set()).update(mapping)
+
+    def expire(self, key, seconds):
+        return True
+
+    def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member)
+
+    def srem(self, key, member):
+        self.sets.get(key, set()).discard(member)
+
+    def scard(self, key):
+        return len(self.sets.get(key, ()))
+
+    def smembers(self, key):
+        return set(self.sets.get(key, ()))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("shared_redis", [False, True])
+async def test_limits_are_shared_by_workers(tmp_path, shared_redis):
+    redis = FakeRedis()
+    registry = RedisJobRegistry(SimpleNamespace(_get_redis_client=lambda: redis if shared_redis else None))
+    first, second = (JobService(registry, result_dir=str(tmp_path), max_queued=3, max_active_per_client=2)
+                     for _ in range(2))
+    release = asyncio.Event()
+
+    async def blocker(context):
+        await release.wait()
+
+    for service in (first, second):
+        service.register_kind("blocker", blocker)
+
+    one = first.submit("blocker", {}, client_id="a")
+    second.submit("blocker", {}, client_id="a")
+    with pytest.raises(JobLimitError, match="per client"):
+        first.submit("blocker", {}, client_id="a")
+    second.submit("blocker", {}, client_id="b")
+    with pytest.raises(JobLimitError, match="queue is full"):
+        first.submit("blocker", {}, client_id="c")
+
+    # Finished jobs free their places for every worker
+    assert first.cancel(one.id)["state"] == "cancelled"
+    second.submit("blocker", {}, client_id="a")
+    if shared_redis:
+        # A place held by a job whose record says it already ended is reclaimed
+        registry.save(dict(registry.get(one.id), state="failed"))
+        redis.sadd("jobs:queued", one.id)
+        with pytest.raises(JobLimitError):
+            first.submit("blocker", {}, client_id="c")
+        assert one.id not in redis.smembers("jobs:queued")
+    release.set()
+    first.close()
+    second.close()
+
+
+@pytest.mark.asyncio
+async def test_alignment_profile_joins_segments_by_chainage(tmp_path):
+    calls = []
+
+    async def get_line_profile(start_lat, start_lon, end_lat, end_lon, num_points):
+        calls.append(num_points)
+        n = 3
+        return LineProfile(
+            lats=np.linspace(start_lat, end_lat, n), lons=np.linspace(start_lon, end_lon, n),
+            chainage_m=np.linspace(0.0, 100.0, n), elevations=np.array([1.0, np.nan, 3.0]),
+            sources=["a.tif", None, "a.tif"], length_m=100.0, native_samples=n,
+            native_spacing_m=50.0, files_used=["a.tif"],
+        )
+
+    service = make_service(tmp_path)
+    handlers = ElevationJobHandlers(None, SimpleNamespace(get_line_profile=get_line_profile), None)
+    handlers.register(service)
+    job = service.submit("alignment_profile", {"coordinates": [(-27.0, 153.0), (-27.0, 153.001), (-27.001, 153.001)],
+                                               "interval_m": None}, client_id="a")
+
+    record = await wait_for_state(service, job.id, "completed", "failed")
+    assert record["state"] == "completed"
+    assert record["summary"] == {"length_m": 200.0, "samples": 5, "missing_samples": 2}
+    document = json.load(open(service.result_file(job.id)[0]))
+    assert document["chainage_m"] == [0.0, 50.0, 100.0, 150.0, 200.0]
+    assert document["elevation_m"] == [1.0, None, 3.0, None, 3.0]
+    assert document["files_used"] == ["a.tif"] and calls == [None, None]
+    service.close()
+
+
+def test_job_endpoints_only_expose_the_callers_own_jobs(tmp_path):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from src.api.v1 import job_endpoints
+    from src.auth import get_current_user
+    from src.dependencies import get_job_service
+
+    result = tmp_path / "job1.json"
+    result.write_text("{}")
+    record = {"job_id": "job1", "kind": "echo", "priority": "normal", "state": "completed",
+              "created_at": "2026-01-01T00:00:00Z", "client_id": "alice"}
+    cancelled = []
+    service = SimpleNamespace(
+        get=lambda job_id: dict(record) if job_id == "job1" else None,
+        result_file=lambda job_id: (str(result), "application/json"),
+        cancel=lambda job_id: cancelled.append(job_id) or dict(record),
+    )
+    caller = {"user_id": "mallory"}
+    app = FastAPI()
+    app.include_router(job_endpoints.router, prefix="/api")
+    app.dependency_overrides[get_job_service] = lambda: service
+    app.dependency_overrides[get_current_user] = lambda: caller
+    client = TestClient(app)
+
+    for method, path in (("get", "/api/v1/elevation/jobs/job1"), ("get", "/api/v1/elevation/jobs/job1/result"),
+                         ("delete", "/api/v1/elevation/jobs/job1")):
+        assert getattr(client, method)(path).status_code == 404
+    assert not cancelled
+
+    caller["user_id"] = "alice"
+    assert client.get("/api/v1/elevation/jobs/job1").json()["state"] == "completed"
+    assert client.get("/api/v1/elevation/jobs/job1/result").status_code == 200
+    assert client.delete("/api/v1/elevation/jobs/job1").status_code == 200 and cancelled == ["job1"]
+
+
+def test_job_submission_is_rate_limited(tmp_path):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from slowapi import _rate_limit_exceeded_handler
+    from slowapi.errors import RateLimitExceeded
+
+    from src.api.v1 import endpoints, job_endpoints
+    from src.dependencies import get_job_service
+
+    service = make_service(tmp_path, max_queued=100, max_active_per_client=100)
+
+    async def idle(context):
+        await asyncio.sleep(60)
+
+    service.register_kind("bulk_points", idle)
+    app = FastAPI()
+    app.state.limiter = endpoints.limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    app.include_router(job_endpoints.router, prefix="/api")
+    app.dependency_overrides[get_job_service] = lambda: service
+    client = TestClient(app)
+
+    body = {"kind": "bulk_points", "points": [{"lat": -27.0, "lon": 153.0}]}
+    statuses = [client.post("/api/v1/elevation/jobs", json=body).status_code for _ in range(11)]
+    assert statuses == [202] * 10 + [429]
+    service.close()
@@ -0,0 +1,140 @@
+"""Tests for native-resolution line profiles behind /elevation/line."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from pyproj import CRS, Transformer
+
+from src.dem_service import DEMService
+from src.services import profile_service as profile_module
+from src.services.coverage_service import CoveringFile
+from src.services.profile_service import LineProfile, LineProfileService
+from src.services.tile_cache import RasterHeader, RasterTileCache, to_vsi_path
+
+pytest_plugins = ('pytest_asyncio',)
+
+FINE = "s3://test-bucket/site/dem_1m.tif"
+COARSE = "s3://test-bucket/site/dem_5m.tif"
+
+# 1000 x 1000 px, 1 m grid in GDA2020 / MGA zone 56
+ORIGIN_X, ORIGIN_Y = 500000.0, 6960000.0
+HEADER = RasterHeader(
+    crs_wkt=CRS.from_epsg(7856).to_wkt(),
+    transform=(1.0, 0.0, ORIGIN_X, 0.0, -1.0, ORIGIN_Y),
+    width=1000, height=1000, nodata=-9999.0, dtype="float32",
+)
+
+
+def to_wgs84(x, y):
+    lon, lat = Transformer.from_crs(HEADER.crs_wkt, "EPSG:4326", always_xy=True).transform(x, y)
+    return lat, lon
+
+
+class PlaneTileCache(RasterTileCache):
+    """FINE holds its column index as elevation (NODATA right of x=600 m); COARSE is flat 7 m."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fetches = []
+
+    def fetch_tile(self, file_path, row, col):
+        self.fetches.append((file_path, row, col))
+        col_off, _, width, height = self.tile_window(HEADER, row, col)
+        if file_path == COARSE:
+            tile = np.full((height, width), 7.0, dtype=np.float32)
+        else:
+            columns = np.arange(col_off, col_off + width, dtype=np.float32)
+            tile = np.where(columns < 600, columns, -9999.0).astype(np.float32)[None, :].repeat(height, axis=0)
+        return tile, int(tile.nbytes)
+
+
+def covering(file_path, priority):
+    return CoveringFile(collection_id="c1", file_path=file_path, filename=file_path.rsplit("/", 1)[-1],
+                        priority=priority, size_mb=1.0, coordinate_system="EPSG:7856", resolution_m=1.0)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = PlaneTileCache(str(tmp_path / "tiles"), tile_size=256, read_through=True)
+    for file_path in (FINE, COARSE):
+        cache._headers[to_vsi_path(file_path)] = HEADER
+    monkeypatch.setattr(profile_module, "get_raster_tile_cache", lambda: cache)
+    return cache
+
+
+def test_native_profile_reads_each_tile_once_and_falls_through(cache):
+    coverage = SimpleNamespace(find_files_for_geometry=lambda geom: [covering(FINE, 2), covering(COARSE, 1)])
+    start, end = to_wgs84(ORIGIN_X + 100.5, ORIGIN_Y - 500.5), to_wgs84(ORIGIN_X + 900.5, ORIGIN_Y - 500.5)
+
+    profile = LineProfileService(elevation_service=None).profile(coverage, *start, *end)
+
+    # One sample per pixel crossed: 800 steps along the row
+    assert profile.native_samples == 801
+    assert profile.chainage_m[-1] == pytest.approx(800, abs=1)
+    assert profile.native_spacing_m == pytest.approx(1.0, abs=0.01)
+
+    # Tiles crossed on FINE (tile row 1, cols 0-3) read once each; COARSE only where FINE is NODATA
+    fine_reads = [f for f in cache.fetches if f[0] == FINE]
+    assert sorted(fine_reads) == [(FINE, 1, c) for c in range(4)]
+    assert {(r, c) for f, r, c in cache.fetches if f == COARSE} == {(1, 2), (1, 3)}
+
+    assert profile.elevations[0] == pytest.approx(100)
+    assert profile.elevations[400] == pytest.approx(500)
+    assert profile.sources[400] == "dem_1m.tif"
+    assert profile.elevations[-1] == pytest.approx(7.0)
+    assert profile.sources[-1] == "dem_5m.tif"
+    assert profile.files_used == ["dem_1m.tif", "dem_5m.tif"]
+
+
+def test_resample_interpolates_by_chainage_without_bridging_gaps():
+    native = LineProfile(
+        lats=np.zeros(5), lons=np.zeros(5), chainage_m=np.array([0.0, 10.0, 20.0, 30.0, 40.0]),
+        elevations=np.array([0.0, 10.0, 20.0, np.nan, 40.0]), sources=["a", "a", "a", None, "b"],
+        length_m=40.0, native_samples=5, native_spacing_m=10.0, files_used=["a", "b"],
+    )
+    start, end = to_wgs84(ORIGIN_X, ORIGIN_Y), to_wgs84(ORIGIN_X + 40, ORIGIN_Y)
+
+    resampled = LineProfileService.resample(native, *start, *end, num_points=9)
+
+    assert resampled.chainage_m.tolist() == [0, 5, 10, 15, 20, 25, 30, 35, 40]
+    assert resampled.elevations[:5].tolist() == pytest.approx([0, 5, 10, 15, 20])
+    assert np.isnan(resampled.elevations[6])
+    assert resampled.elevations[-1] == 40.0 and resampled.sources[-1] == "b"
+
+
+@pytest.mark.asyncio
+async def test_line_endpoint_service_uses_profile_and_falls_back_without_coverage():
+    profile = LineProfile(
+        lats=np.array([-27.0, -27.001]), lons=np.array([153.0, 153.0]), chainage_m=np.array([0.0, 110.6]),
+        elevations=np.array([12.5, np.nan]), sources=["dem_1m.tif", None],
+        length_m=110.6, native_samples=111, native_spacing_m=1.0, files_used=["dem_1m.tif"],
+    )
+    calls = []
+
+    async def get_line_profile(*args):
+        calls.append(args)
+        return profile
+
+    service = object.__new__(DEMService)
+    service.profile_service = SimpleNamespace(get_line_profile=get_line_profile)
+
+    points, source, message = await service.get_elevations_for_line_unified(-27.0, 153.0, -27.001, 153.0, 2)
+    assert calls[-1][-1] == 2
+    assert source == "dem_1m.tif" and "111 samples" in message
+    assert points[0]["chainage_m"] == 0.0 and points[0]["elevation_m"] == 12.5
+    assert points[1]["elevation_m"] is None and points[1]["sequence"] == 1
+
+    await service.get_elevations_for_line_unified(-27.0, 153.0, -27.001, 153.0, 2, native_resolution=True)
+    assert calls[-1][-1] is None
+
+    # No unified coverage: the per-point pipeline answers instead
+    async def no_profile(*args):
+        return None
+
+    async def per_point(lat, lon, dem_source_id=None):
+        return 3.0, "gpxz_api", None
+
+    service.profile_service = SimpleNamespace(get_line_profile=no_profile)
+    service.get_elevation_unified = per_point
+    points, source, _ = await service.get_elevations_for_line_unified(-27.0, 153.0, -27.001, 153.0, 3)
+    assert source == "gpxz_api" and [p["elevation_m"] for p in points] == [3.0, 3.0, 3.0]
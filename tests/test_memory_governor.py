@@ -0,0 +1,86 @@
+"""Tests for the process-wide cache memory governor."""
+from src.services.memory_governor import MemoryGovernor
+
+MB = 1024 * 1024
+
+
+class FakeCache:
+    def __init__(self, entries, entry_bytes, hit_rate=None):
+        self.entries = entries
+        self.entry_bytes = entry_bytes
+        self.hit_rate = hit_rate
+
+    def memory_usage_bytes(self):
+        return self.entries * self.entry_bytes
+
+    def evict_bytes(self, target_bytes):
+        freed = 0
+        while freed < target_bytes and self.entries:
+            self.entries -= 1
+            freed += self.entry_bytes
+        return freed
+
+    def cache_hit_rate(self):
+        return self.hit_rate
+
+
+def make_governor(budget_mb=100):
+    governor = MemoryGovernor(budget_bytes=budget_mb * MB, check_interval_seconds=0)
+    governor.resident_bytes = lambda: 0  # isolate from the test process RSS
+    return governor
+
+
+def test_no_eviction_under_budget():
+    governor = make_governor()
+    cache = FakeCache(entries=10, entry_bytes=MB)
+    governor.register("small", cache)
+    assert governor.rebalance() == 0
+    assert cache.entries == 10
+
+
+def test_evicts_lowest_value_per_byte_first():
+    governor = make_governor(budget_mb=100)
+    hot = FakeCache(entries=40, entry_bytes=MB, hit_rate=0.9)
+    cold = FakeCache(entries=40, entry_bytes=MB, hit_rate=0.05)
+    governor.register("hot", hot, rebuild_cost=1.0)
+    governor.register("cold", cold, rebuild_cost=1.0)
+
+    freed = governor.rebalance()
+
+    assert freed > 0
+    assert cold.entries < 40
+    assert hot.entries == 40
+    assert hot.memory_usage_bytes() + cold.memory_usage_bytes() <= 60 * MB
+
+
+def test_metrics_breakdown_and_duplicate_names():
+    governor = make_governor()
+    first, second = FakeCache(2, MB), FakeCache(3, MB, hit_rate=0.25)
+    assert governor.register("dataset_cache", first) == "dataset_cache"
+    assert governor.register("dataset_cache", second) == "dataset_cache#2"
+
+    metrics = governor.get_metrics()
+    assert metrics["budget_mb"] == 100
+    assert metrics["caches"]["dataset_cache"]["resident_mb"] == 2
+    assert metrics["caches"]["dataset_cache#2"]["hit_rate"] == 0.25
+    assert metrics["tracked_cache_mb"] == 5
+
+
+def test_dead_owners_are_pruned():
+    governor = make_governor()
+    cache = FakeCache(1, MB)
+    governor.register("transient", cache)
+    del cache
+    assert "transient" not in governor.get_metrics()["caches"]
+
+
+def test_low_watermark_must_be_below_high():
+    import pytest
+    from pydantic import ValidationError
+    from src.config import Settings
+
+    with pytest.raises(ValidationError, match="must be below MEMORY_HIGH_WATERMARK"):
+        Settings(MEMORY_HIGH_WATERMARK=0.7, MEMORY_LOW_WATERMARK=0.8)
+    assert Settings(MEMORY_HIGH_WATERMARK=0.8, MEMORY_LOW_WATERMARK=0.6).MEMORY_LOW_WATERMARK == 0.6
+    with pytest.raises(ValueError, match="watermarks"):
+        MemoryGovernor(budget_bytes=MB, high_watermark=0.5, low_watermark=0.5)
@@ -0,0 +1,99 @@
+"""Tests for the bounded, file-grouped /path scheduler."""
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.services import path_scheduler as scheduler_module
+from src.services.path_scheduler import PathScheduler
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+class FakeCoverage:
+    """Points with lon < 153.5 map to a.tif, lon < 154 to b.tif, the rest are uncovered."""
+
+    def __init__(self, source):
+        pass
+
+    def assign_points(self, lats, lons):
+        assignment = np.where(lons < 153.5, 0, np.where(lons < 154.0, 1, -1))
+        files = [SimpleNamespace(file_path="s3://b/a.tif", filename="a.tif"),
+                 SimpleNamespace(file_path="s3://b/b.tif", filename="b.tif")]
+        return assignment, files
+
+
+class FakeTileCache:
+    def __init__(self):
+        self.calls = []
+
+    def sample_many(self, file_path, lats, lons):
+        self.calls.append((file_path, len(lats)))
+        values = lons * 100
+        # NODATA in b.tif east of 153.8
+        if file_path.endswith("b.tif"):
+            values = np.where(lons > 153.8, np.nan, values)
+        return values
+
+
+@pytest.mark.asyncio
+async def test_groups_by_file_preserves_order_and_falls_back(monkeypatch):
+    cache = FakeTileCache()
+    monkeypatch.setattr(scheduler_module, "CoverageService", FakeCoverage)
+    monkeypatch.setattr(scheduler_module, "get_raster_tile_cache", lambda: cache)
+    looked_up = []
+
+    async def lookup(lat, lon):
+        looked_up.append(lon)
+        return 1.5, "gpxz_api", "api"
+
+    lons = [153.1, 153.6, 154.5, 153.2, 153.9, 153.3]
+    scheduler = PathScheduler(global_concurrency=2, per_request_concurrency=2, max_group_points=2)
+    results = await scheduler.run([-27.0] * len(lons), lons, lookup, unified_source=object())
+
+    assert [r.dem_source for r in results] == ["a.tif", "b.tif", "gpxz_api", "a.tif", "gpxz_api", "a.tif"]
+    assert results[0].elevation_m == pytest.approx(15310)
+    assert sorted(looked_up) == [153.9, 154.5]
+    # a.tif's three points split at max_group_points; one read per group
+    assert sorted(cache.calls) == [("s3://b/a.tif", 1), ("s3://b/a.tif", 2), ("s3://b/b.tif", 2)]
+
+    stats = scheduler.get_stats()
+    assert stats["file_groups"]["units"] == 3 and stats["file_groups"]["points"] == 5
+    assert stats["single_points"]["units"] == 2
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+
+    # An explicit source skips grouping entirely
+    looked_up.clear()
+    await scheduler.run([-27.0] * 2, [153.1, 153.2], lookup, unified_source=None)
+    assert looked_up == [153.1, 153.2]
+
+
+@pytest.mark.asyncio
+async def test_per_request_and_global_limits_bound_concurrency():
+    active = 0
+    peak = 0
+
+    async def lookup(lat, lon):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return float(lon), "s", None
+
+    single = PathScheduler(global_concurrency=8, per_request_concurrency=2)
+    results = await single.run([0.0] * 10, list(range(10)), lookup)
+    assert peak == 2
+    assert [r.elevation_m for r in results] == [float(i) for i in range(10)]
+
+    peak = 0
+    shared = PathScheduler(global_concurrency=3, per_request_concurrency=3)
+    await asyncio.gather(*(shared.run([0.0] * 6, list(range(6)), lookup) for _ in range(3)))
+    assert peak == 3
+
+    stats = shared.get_stats()["single_points"]
+    assert stats["units"] == 18
+    # Work beyond the global limit waited for a slot; waiting is not counted as service time
+    assert stats["max_queue_ms"] >= 10
+    assert stats["avg_service_ms"] < 50
@@ -0,0 +1,140 @@
+"""Tests for polygon raster clips mosaicked across covering files."""
+import io
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from pyproj import CRS, Transformer
+from shapely.geometry import Polygon, box
+
+from src.services import raster_export_service as export_module
+from src.services.coverage_service import CoveringFile
+from src.services.raster_export_service import RasterExportService, projected_crs_wkt, snap_grid
+from src.services.tile_cache import RasterHeader
+
+UTM56S = CRS.from_epsg(32756).to_wkt()
+ORIGIN_X, ORIGIN_Y = 500000.0, 6960000.0
+HEADER = RasterHeader(crs_wkt=UTM56S, transform=(2.0, 0.0, ORIGIN_X, 0.0, -2.0, ORIGIN_Y),
+                      width=500, height=500, nodata=-9999.0, dtype="float32")
+TO_WGS84 = Transformer.from_crs("EPSG:32756", "EPSG:4326", always_xy=True)
+
+
+def latlon(x, y):
+    lon, lat = TO_WGS84.transform(x, y)
+    return lat, lon
+
+
+def covering(name, priority):
+    return CoveringFile(collection_id="c1", file_path=f"s3://b/{name}", filename=name, priority=priority,
+                        size_mb=1.0, coordinate_system="EPSG:32756", resolution_m=2.0)
+
+
+def test_snap_grid_aligns_to_native_pixels():
+    spec = snap_grid(UTM56S, HEADER.transform, (ORIGIN_X + 10.5, ORIGIN_Y - 51.0, ORIGIN_X + 31.0, ORIGIN_Y - 20.2))
+    assert spec.transform == (2.0, 0.0, ORIGIN_X + 10, 0.0, -2.0, ORIGIN_Y - 20)
+    assert (spec.width, spec.height) == (11, 16)
+    assert spec.geotransform == (ORIGIN_X + 10, 2.0, 0.0, ORIGIN_Y - 20, 0.0, -2.0)
+
+
+def test_clip_mosaics_by_priority_and_masks_to_polygon(monkeypatch):
+    monkeypatch.setattr(export_module, "get_raster_tile_cache", lambda: SimpleNamespace(get_header=lambda path: HEADER))
+    warped = []
+
+    def fake_warp(file_path, spec, resampling):
+        warped.append((file_path, resampling))
+        data = np.full((spec.height, spec.width), 5.0 if file_path.endswith("fine.tif") else 1.0, dtype=np.float32)
+        if file_path.endswith("fine.tif"):
+            # The high-priority campaign only covers the western half
+            data[:, spec.width // 2:] = np.nan
+        return data
+
+    # Right triangle: west edge, south edge and a hypotenuse, 100 m legs
+    polygon = [latlon(ORIGIN_X + 100, ORIGIN_Y - 100), latlon(ORIGIN_X + 100, ORIGIN_Y - 200),
+               latlon(ORIGIN_X + 200, ORIGIN_Y - 200)]
+    coverage = SimpleNamespace(find_files_for_geometry=lambda geom: [covering("fine.tif", 2), covering("coarse.tif", 1),
+                                                                     covering("unused.tif", 0)])
+    service = RasterExportService(elevation_service=None, warp=fake_warp)
+    grid = service.clip_polygon(coverage, Polygon([(lon, lat) for lat, lon in polygon]))
+
+    assert (grid.spec.width, grid.spec.height) == (50, 50)
+    assert grid.sources == ["fine.tif", "coarse.tif"]
+    # The lowest-priority file was never read: every pixel was filled already
+    assert [w[0] for w in warped] == ["s3://b/fine.tif", "s3://b/coarse.tif"]
+    # Below the diagonal is inside; above it is masked
+    assert grid.data[-1, 0] == 5.0 and grid.data[-1, -1] == 1.0
+    assert np.isnan(grid.data[0, -1])
+    assert np.isnan(grid.data).sum() == pytest.approx(50 * 50 / 2, abs=50)
+
+    array = np.load(io.BytesIO(grid.to_npy()))
+    assert array.dtype == np.float32 and array.shape == (50, 50)
+    headers = grid.headers()
+    assert headers["X-Raster-CRS"] == "EPSG:32756" and headers["X-Raster-Sources"] == "fine.tif,coarse.tif"
+    assert [float(v) for v in headers["X-Geotransform"].split(",")] == [ORIGIN_X + 100, 2.0, 0.0, ORIGIN_Y - 100, 0.0, -2.0]
+
+
+def test_clip_only_reads_lower_priority_files_for_gaps_inside_the_polygon(monkeypatch):
+    monkeypatch.setattr(export_module, "get_raster_tile_cache", lambda: SimpleNamespace(get_header=lambda path: HEADER))
+    warped = []
+
+    def fake_warp(file_path, spec, resampling):
+        warped.append(file_path)
+        # The campaign covers the triangle but not the rest of its bounding box
+        rows, cols = np.indices((spec.height, spec.width))
+        return np.where(rows >= cols, 5.0, np.nan).astype(np.float32)
+
+    polygon = [latlon(ORIGIN_X + 100, ORIGIN_Y - 100), latlon(ORIGIN_X + 100, ORIGIN_Y - 200),
+               latlon(ORIGIN_X + 200, ORIGIN_Y - 200)]
+    coverage = SimpleNamespace(find_files_for_geometry=lambda geom: [covering("fine.tif", 2), covering("coarse.tif", 1)])
+    grid = RasterExportService(elevation_service=None, warp=fake_warp).clip_polygon(
+        coverage, Polygon([(lon, lat) for lat, lon in polygon]))
+
+    assert warped == ["s3://b/fine.tif"] and grid.sources == ["fine.tif"]
+    assert grid.data[-1, 0] == 5.0 and np.isnan(grid.data[0, -1])
+
+
+def test_mosaic_reports_files_it_could_not_read():
+    def flaky_warp(file_path, spec, resampling):
+        if file_path.endswith("timeout.tif"):
+            raise OSError("Read timed out")
+        return np.ones((spec.height, spec.width), dtype=np.float32)
+
+    spec = snap_grid(UTM56S, HEADER.transform, (ORIGIN_X, ORIGIN_Y - 10, ORIGIN_X + 10, ORIGIN_Y))
+    service = RasterExportService(elevation_service=None, warp=flaky_warp)
+    grid = service.mosaic([covering("timeout.tif", 2), covering("coarse.tif", 1)], spec, "nearest")
+    assert grid.sources == ["coarse.tif"] and grid.failed == ["timeout.tif"] and not grid.complete
+    assert service.mosaic([covering("coarse.tif", 1)], spec, "nearest").complete
+
+
+def test_clip_rejects_oversized_windows(monkeypatch):
+    monkeypatch.setattr(export_module, "get_raster_tile_cache", lambda: SimpleNamespace(get_header=lambda path: HEADER))
+    coverage = SimpleNamespace(find_files_for_geometry=lambda geom: [covering("fine.tif", 1)])
+    service = RasterExportService(elevation_service=None, max_pixels=100, warp=lambda *a: pytest.fail("read"))
+    polygon = [latlon(ORIGIN_X, ORIGIN_Y), latlon(ORIGIN_X + 100, ORIGIN_Y), latlon(ORIGIN_X + 100, ORIGIN_Y - 100)]
+    with pytest.raises(ValueError, match="over the limit"):
+        service.clip_polygon(coverage, Polygon([(lon, lat) for lat, lon in polygon]))
+
+
+def test_grid_aligns_to_resolution_in_target_crs_and_passes_resampling():
+    warped = []
+
+    def fake_warp(file_path, spec, resampling):
+        warped.append((file_path, resampling, spec))
+        return np.full((spec.height, spec.width), 3.0, dtype=np.float32)
+
+    requested = []
+    coverage = SimpleNamespace(find_files_for_geometry=lambda geom: requested.append(geom.bounds) or [covering("a.tif", 1)])
+    service = RasterExportService(elevation_service=None, warp=fake_warp)
+    crs_wkt = projected_crs_wkt("EPSG:7856")
+    grid = service.grid_area(coverage, crs_wkt, 2.0, "cubic", box(500001.0, 6959000.5, 501000.0, 6960000.0))
+
+    assert grid.spec.transform == (2.0, 0.0, 500000.0, 0.0, -2.0, 6960000.0)
+    assert (grid.spec.width, grid.spec.height) == (500, 500)
+    assert warped[0][1] == "cubic" and grid.sources == ["a.tif"]
+    # Files are looked up with the area in WGS84
+    assert -28 < requested[0][1] < -27 and 153 < requested[0][0] < 154
+
+    with pytest.raises(ValueError, match="projected"):
+        projected_crs_wkt("EPSG:4326")
+    with pytest.raises(ValueError, match="over the limit"):
+        RasterExportService(None, max_pixels=1000, warp=fake_warp).grid_area(
+            coverage, crs_wkt, 0.5, "nearest", box(500000, 6959000, 501000, 6960000))
@@ -0,0 +1,146 @@
+"""Tests for cumulative-max sight distance along joined alignment profiles."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.services.profile_service import LineProfile
+from src.services.sight_distance_service import SightDistanceService, sight_distances
+
+# 1 km at 2 m spacing over a 12 m high parabolic crest centred at 500 m
+CHAINAGE = np.arange(0.0, 1000.0 + 1, 2.0)
+CREST = 12.0 - 12.0 * ((CHAINAGE - 500.0) / 300.0) ** 2
+CREST = np.where(np.abs(CHAINAGE - 500.0) < 300.0, CREST, 0.0)
+
+
+def brute_force(chainage, elevations, station, eye_height, object_height, max_distance):
+    """Sight distance by checking every sample between eye and object."""
+    eye = elevations[station] + eye_height
+    visible = 0.0
+    for j in range(station + 1, len(chainage)):
+        if chainage[j] - chainage[station] > max_distance:
+            break
+        d = chainage[j] - chainage[station]
+        target = (elevations[j] + object_height - eye) / d
+        between = [(elevations[k] - eye) / (chainage[k] - chainage[station]) for k in range(station + 1, j)]
+        if between and target < max(between):
+            break
+        visible = d
+    return visible
+
+
+def test_vectorised_distances_match_a_brute_force_walk(monkeypatch):
+    from src.services import sight_distance_service
+
+    # Small blocks so several are evaluated
+    monkeypatch.setattr(sight_distance_service, "_BLOCK_CELLS", 2000)
+    stations = np.arange(0, len(CHAINAGE), 10)
+    result = sight_distances(CHAINAGE, CREST, stations, 1.1, 0.2, 400.0)
+
+    expected = [brute_force(CHAINAGE, CREST, s, 1.1, 0.2, 400.0) for s in stations]
+    assert result.distance_m.tolist() == pytest.approx(expected)
+    # Approaching the crest the terrain limits sight; on the far side it runs out of road
+    assert result.limited_by[list(stations).index(150)] == "terrain"
+    assert result.distance_m[list(stations).index(150)] < 300
+    assert result.limited_by[0] == "max_distance" and result.distance_m[0] == 400.0
+    assert result.limited_by[-1] == "end_of_alignment" and result.distance_m[-1] == 0.0
+
+
+def test_flat_alignment_sees_to_the_cap_or_the_end():
+    flat = np.zeros_like(CHAINAGE)
+    result = sight_distances(CHAINAGE, flat, np.array([0, 400]), 1.1, 0.2, 500.0)
+    assert result.distance_m.tolist() == [500.0, 200.0]
+    assert result.limited_by == ["max_distance", "end_of_alignment"]
+
+
+def fake_profile_service(segments):
+    """Profiles for consecutive segments cut from the crest."""
+    calls = []
+
+    async def get_line_profile(start_lat, start_lon, end_lat, end_lon):
+        calls.append((start_lat, end_lat))
+        lo, hi = segments[len(calls) - 1]
+        if lo is None:
+            return None
+        chainage = CHAINAGE[lo:hi + 1] - CHAINAGE[lo]
+        elevations = CREST[lo:hi + 1].copy()
+        elevations[len(elevations) // 2] = np.nan
+        return LineProfile(
+            lats=np.linspace(start_lat, end_lat, len(chainage)), lons=np.full(len(chainage), start_lon),
+            chainage_m=chainage, elevations=elevations, sources=["crest.tif"] * len(chainage),
+            length_m=float(chainage[-1]), native_samples=len(chainage), native_spacing_m=2.0,
+            files_used=["crest.tif"],
+        )
+
+    elevation_service = SimpleNamespace(
+        unified_provider=SimpleNamespace(elevation_source=SimpleNamespace(unified_index={"collections": []}))
+    )
+    return SimpleNamespace(elevation_service=elevation_service, get_line_profile=get_line_profile), calls
+
+
+@pytest.mark.asyncio
+async def test_analyse_joins_segments_and_checks_both_directions():
+    # Two segments meeting at the crest, 500 m each (about 0.0045 degrees of latitude)
+    profile_service, calls = fake_profile_service([(0, 250), (250, 500)])
+    service = SightDistanceService(profile_service)
+    vertices = [(-27.0, 153.0), (-27.0 + 500 / 111195, 153.0), (-27.0 + 1000 / 111195, 153.0)]
+    result = await service.analyse(vertices, 100.0, max_distance_m=400.0)
+
+    assert len(calls) == 2 and result.files_used == ["crest.tif"]
+    assert len(result.chainage_m) == 501 and result.missing_samples == 2
+    assert np.allclose(result.elevations, CREST, atol=0.1)
+    stations = result.stations(required_m=250.0)
+    assert [s["chainage_m"] for s in stations] == [0, 100, 200, 300, 400, 500, 600, 700, 800, 900, 1000]
+
+    # The crest is symmetric, so reverse sight distance mirrors forward
+    forward = [s["forward_m"] for s in stations]
+    reverse = [s["reverse_m"] for s in stations]
+    assert forward == pytest.approx(reverse[::-1], abs=4.0)
+    assert stations[-1]["forward_limited_by"] == "end_of_alignment" and stations[-1]["meets_requirement"] is True
+    assert any(s["meets_requirement"] is False for s in stations)
+
+
+@pytest.mark.asyncio
+async def test_analyse_rejects_uncovered_segments_and_long_alignments():
+    profile_service, _ = fake_profile_service([(0, 250), (None, None)])
+    vertices = [(-27.0, 153.0), (-26.995, 153.0), (-26.99, 153.0)]
+    with pytest.raises(ValueError, match="Segment 1"):
+        await SightDistanceService(profile_service).analyse(vertices, 20.0)
+    with pytest.raises(ValueError, match="over the limit"):
+        await SightDistanceService(profile_service, max_length_m=100).analyse(vertices, 20.0)
+
+    profile_service.elevation_service.unified_provider = None
+    assert await SightDistanceService(profile_service).analyse(vertices, 20.0) is None
+
+
+def test_endpoint_reports_deficient_stations():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from src.api.v1 import endpoints
+    from src.dependencies import get_sight_distance_service
+
+    service = SightDistanceService(SimpleNamespace(elevation_service=None))
+
+    async def analyse(vertices, station_interval_m, eye_height_m, object_height_m, max_distance_m):
+        if station_interval_m == 999:
+            return None
+        return service.evaluate(CHAINAGE, np.zeros_like(CHAINAGE), np.zeros_like(CHAINAGE), CREST.copy(),
+                                ["crest.tif"], station_interval_m, eye_height_m, object_height_m, max_distance_m)
+
+    app = FastAPI()
+    app.state.limiter = endpoints.limiter
+    app.include_router(endpoints.router, prefix="/api")
+    app.dependency_overrides[get_sight_distance_service] = lambda: SimpleNamespace(analyse=analyse)
+    client = TestClient(app)
+    alignment = [{"lat": -27.0, "lon": 153.0}, {"lat": -26.99, "lon": 153.0}]
+
+    response = client.post("/api/v1/elevation/sight-distance",
+                           json={"alignment": alignment, "station_interval_m": 250, "required_sight_distance_m": 250})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["profile_samples"] == 501 and len(body["stations"]) == 5
+    assert body["deficient_stations"] == sum(not s["meets_requirement"] for s in body["stations"]) > 0
+
+    response = client.post("/api/v1/elevation/sight-distance", json={"alignment": alignment, "station_interval_m": 999})
+    assert response.status_code == 503
@@ -0,0 +1,168 @@
+"""Tests for slope, aspect and hillshade grids and tiles."""
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from pyproj import CRS, Transformer
+from shapely.geometry import Polygon
+
+from src.services.coverage_service import CoveringFile
+from src.services.raster_export_service import RasterExportService
+from src.services.terrain_service import TerrainOptions, TerrainService, derive
+from src.utils.png import decode_png
+
+UTM56S = CRS.from_epsg(32756).to_wkt()
+ORIGIN_X, ORIGIN_Y = 500000.0, 6960000.0
+TO_MERCATOR = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
+
+# Plane rising 0.1 m per metre east and 0.2 m per metre north
+EAST, NORTH = 0.1, 0.2
+
+
+def plane(spec):
+    a, _, c, _, e, f = spec.transform
+    xs = c + (np.arange(spec.width) + 0.5) * a
+    ys = f + (np.arange(spec.height) + 0.5) * e
+    return (EAST * xs[np.newaxis, :] + NORTH * ys[:, np.newaxis] - NORTH * ORIGIN_Y - EAST * ORIGIN_X).astype(np.float32)
+
+
+def covering(name):
+    return CoveringFile(collection_id="c1", file_path=f"s3://b/{name}", filename=name, priority=1,
+                        size_mb=1.0, coordinate_system="EPSG:32756", resolution_m=2.0)
+
+
+def test_derivatives_of_a_plane():
+    rows, cols = np.mgrid[0:6, 0:5]
+    data = EAST * cols * 2.0 - NORTH * rows * 2.0  # 2 m cells, row 0 north
+    data[0, 0] = np.nan
+
+    gradient = math.hypot(EAST, NORTH)
+    slope = derive("slope", data, 2.0, 2.0)
+    assert slope.shape == (4, 3) and np.isnan(slope[0, 0])
+    assert np.allclose(slope[1:], math.degrees(math.atan(gradient)))
+    assert np.allclose(derive("slope", data, 2.0, 2.0, TerrainOptions(slope_units="percent"))[1:], 100 * gradient)
+    # Rising north-east, so it faces south-west
+    facing = math.degrees(math.atan2(-EAST, -NORTH)) % 360
+    assert np.allclose(derive("aspect", data, 2.0, 2.0)[1:], facing)
+    assert np.isnan(derive("aspect", np.zeros((3, 3)), 1.0, 1.0)).all()
+
+    # Lit head-on by a sun square to the slope; flat ground under a 45 degree sun
+    square_on = TerrainOptions(azimuth_deg=facing, altitude_deg=90 - math.degrees(math.atan(gradient)))
+    assert np.allclose(derive("hillshade", data, 2.0, 2.0, square_on)[1:], 255.0)
+    assert np.allclose(derive("hillshade", np.zeros((3, 3)), 1.0, 1.0), 255 * math.cos(math.radians(45)))
+
+
+def test_grid_derivatives_read_a_margin_and_cache_the_window():
+    reads = []
+
+    def fake_warp(file_path, spec, resampling):
+        reads.append((spec.width, spec.height))
+        return plane(spec)
+
+    coverage = SimpleNamespace(find_files_for_geometry=lambda geom: [covering("ramp.tif")])
+    service = TerrainService(RasterExportService(elevation_service=None, warp=fake_warp), elevation_service=None)
+    area = Polygon([(ORIGIN_X + 10, ORIGIN_Y - 10), (ORIGIN_X + 50, ORIGIN_Y - 10), (ORIGIN_X + 10, ORIGIN_Y - 50)])
+
+    grid = service.derive_area(coverage, "slope", UTM56S, 2.0, "bilinear", area)
+    # A 20 x 20 window, read as 22 x 22 so its edge cells have all their neighbours
+    assert reads == [(22, 22)] and grid.data.shape == (20, 20)
+    assert grid.spec.transform == (2.0, 0.0, ORIGIN_X + 10, 0.0, -2.0, ORIGIN_Y - 10)
+    assert np.allclose(grid.data, math.degrees(math.atan(math.hypot(EAST, NORTH))))
+
+    masked = service.derive_area(coverage, "slope", UTM56S, 2.0, "bilinear", area, mask_to_polygon=True)
+    assert len(reads) == 1 and service.get_stats()["hits"] == 1
+    assert np.isnan(masked.data[-1, -1]) and not np.isnan(masked.data[0, 0])
+    assert not np.isnan(grid.data).any()  # The cached window is not masked
+    service.derive_area(coverage, "aspect", UTM56S, 2.0, "bilinear", area)
+    assert len(reads) == 2 and service.memory_usage_bytes() == 2 * 20 * 20 * 4
+
+
+def test_windows_missing_an_unreadable_file_are_not_cached():
+    attempts = []
+
+    def flaky_warp(file_path, spec, resampling):
+        attempts.append(file_path)
+        if len(attempts) == 1:
+            raise TimeoutError("read timed out")
+        return plane(spec)
+
+    coverage = SimpleNamespace(find_files_for_geometry=lambda geom: [covering("ramp.tif")])
+    service = TerrainService(RasterExportService(elevation_service=None, warp=flaky_warp), elevation_service=None,
+                             tile_size=64)
+    area = Polygon([(ORIGIN_X + 10, ORIGIN_Y - 10), (ORIGIN_X + 50, ORIGIN_Y - 10), (ORIGIN_X + 10, ORIGIN_Y - 50)])
+
+    partial = service.derive_area(coverage, "slope", UTM56S, 2.0, "bilinear", area, mask_to_polygon=True)
+    assert partial.failed == ["ramp.tif"] and np.isnan(partial.data).all()
+    retried = service.derive_area(coverage, "slope", UTM56S, 2.0, "bilinear", area)
+    assert retried.complete and not np.isnan(retried.data).any()
+    assert service.get_stats()["hits"] == 0 and service.memory_usage_bytes() == 20 * 20 * 4
+
+    attempts.clear()
+    assert service.render_tile(coverage, "hillshade", 14, 15155, 9427)[1] is False
+    assert service.render_tile(coverage, "hillshade", 14, 15155, 9427)[1] is True
+    assert len(attempts) == 2 and service.get_stats()["windows"] == 2
+
+
+def test_tiles_are_coloured_pngs_transparent_outside_coverage():
+    mercator = CRS.from_epsg(3857).to_wkt()
+    warped = []
+
+    def flat_warp(file_path, spec, resampling):
+        warped.append(spec.crs_wkt == mercator)
+        return np.full((spec.height, spec.width), 12.0, dtype=np.float32)
+
+    service = TerrainService(RasterExportService(elevation_service=None, warp=flat_warp), elevation_service=None,
+                             tile_size=64)
+    covered = SimpleNamespace(find_files_for_geometry=lambda geom: [covering("flat.tif")])
+    pixels = decode_png(service.render_tile(covered, "hillshade", 14, 15155, 9427)[0])
+    assert pixels.shape == (64, 64, 2) and warped == [True]
+    assert (pixels[..., 0] == round(255 * math.cos(math.radians(45)))).all() and (pixels[..., 1] == 255).all()
+
+    slope = decode_png(service.render_tile(covered, "slope", 14, 15155, 9427)[0])
+    assert slope.shape == (64, 64, 4) and (slope[0, 0] == (26, 150, 65, 255)).all()
+
+    uncovered = SimpleNamespace(find_files_for_geometry=lambda geom: [])
+    assert (decode_png(service.render_tile(uncovered, "aspect", 14, 0, 0)[0])[..., 3] == 0).all()
+
+
+@pytest.mark.asyncio
+async def test_tiles_reject_unknown_products_and_zooms():
+    service = TerrainService(RasterExportService(elevation_service=None), elevation_service=None)
+    with pytest.raises(ValueError, match="Terrain product"):
+        await service.get_tile("curvature", 14, 0, 0)
+    with pytest.raises(ValueError, match="zoom 10 to 18"):
+        await service.get_tile("slope", 4, 0, 0)
+
+
+def test_tile_endpoint_does_not_let_incomplete_tiles_be_cached():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from src.api.v1 import endpoints
+    from src.dependencies import get_terrain_service
+
+    complete = [True]
+    settings = SimpleNamespace(HTTP_CACHE_ENABLED=True, HTTP_CACHE_ELEVATION_MAX_AGE=3600)
+
+    async def get_tile(product, z, x, y):
+        return b"png", complete[0]
+
+    app = FastAPI()
+    app.state.limiter = endpoints.limiter
+    app.include_router(endpoints.router, prefix="/api")
+    app.dependency_overrides[get_terrain_service] = lambda: SimpleNamespace(
+        get_tile=get_tile, elevation_service=SimpleNamespace(settings=settings))
+    client = TestClient(app)
+    url = "/api/v1/elevation/terrain/slope/14/15155/9427.png"
+
+    response = client.get(url)
+    assert response.status_code == 200 and response.headers["cache-control"] == "public, max-age=3600"
+    assert "etag" in response.headers
+    # Invalid tiles are rejected before the conditional GET is evaluated
+    assert client.get("/api/v1/elevation/terrain/slope/4/0/0.png", headers={"If-None-Match": "*"}).status_code == 400
+
+    complete[0] = False
+    response = client.get(url)
+    assert response.status_code == 200 and response.headers["cache-control"] == "no-store"
+    assert "etag" not in response.headers
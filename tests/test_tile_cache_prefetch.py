@@ -0,0 +1,349 @@
+"""Tests for the raster tile cache and project-area prefetch."""
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from pyproj import CRS, Transformer
+
+from src.services.coverage_service import CoverageService, build_geometry
+from src.services.prefetch_service import ProjectPrefetchService
+from src.services.tile_cache import RasterHeader, RasterTileCache, to_vsi_path
+
+pytest_plugins = ('pytest_asyncio',)
+
+FILE = "s3://test-bucket/site/dem_1m.tif"
+
+# 1000 x 1000 px, 1 m grid in GDA2020 / MGA zone 56, origin near Brisbane
+ORIGIN_X, ORIGIN_Y = 500000.0, 6960000.0
+HEADER = RasterHeader(
+    crs_wkt=CRS.from_epsg(7856).to_wkt(),
+    transform=(1.0, 0.0, ORIGIN_X, 0.0, -1.0, ORIGIN_Y),
+    width=1000, height=1000, nodata=-9999.0, dtype="float32",
+)
+
+
+def to_wgs84(x, y):
+    lon, lat = Transformer.from_crs(HEADER.crs_wkt, "EPSG:4326", always_xy=True).transform(x, y)
+    return lat, lon
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = RasterTileCache(str(tmp_path / "tiles"), tile_size=256)
+    cache._headers[to_vsi_path(FILE)] = HEADER
+    return cache
+
+
+def test_tile_selection_covers_bounds_and_clips_to_raster(cache):
+    tiles = cache.tiles_for_native_bounds(HEADER, ORIGIN_X + 10, ORIGIN_Y - 300, ORIGIN_X + 300, ORIGIN_Y - 10)
+    assert tiles == [(0, 0), (0, 1), (1, 0), (1, 1)]
+
+    # Edge tiles are clipped to the raster size
+    assert cache.tile_window(HEADER, 3, 3) == (768, 768, 232, 232)
+    assert cache.tile_bounds_native(HEADER, 0, 0) == (ORIGIN_X, ORIGIN_Y - 256, ORIGIN_X + 256, ORIGIN_Y)
+
+
+def test_sample_cached_reads_stored_tile_only(cache):
+    lat, lon = to_wgs84(ORIGIN_X + 300.5, ORIGIN_Y - 10.5)  # pixel (col 300, row 10) -> tile (0, 1)
+    assert cache.sample_cached(FILE, lat, lon) is None
+
+    tile = np.zeros((256, 256), dtype=np.float32)
+    tile[10, 300 - 256] = 42.5
+    cache.store_tile(FILE, 0, 1, tile)
+
+    assert cache.has_tile(FILE, 0, 1)
+    assert cache.sample_cached(FILE, lat, lon) == pytest.approx(42.5)
+    stats = cache.get_stats()
+    assert stats["tile_hits"] == 1 and stats["tile_misses"] == 1
+
+
+def test_sample_cached_treats_nodata_as_miss(cache):
+    cache.store_tile(FILE, 0, 0, np.full((256, 256), -9999.0, dtype=np.float32))
+    lat, lon = to_wgs84(ORIGIN_X + 5.5, ORIGIN_Y - 5.5)
+    assert cache.sample_cached(FILE, lat, lon) is None
+
+
+def test_writes_prune_the_cache_back_to_its_budget(tmp_path):
+    tile = np.zeros((256, 256), dtype=np.float32)  # 256 KiB each
+    cache = RasterTileCache(str(tmp_path / "tiles"), tile_size=256, max_bytes=3 * tile.nbytes + 1024,
+                            prune_every_bytes=2 * tile.nbytes)
+    for col in range(10):
+        cache.store_tile(FILE, 0, col, tile)
+        assert cache.disk_usage_bytes() <= 5 * tile.nbytes + 1024
+    assert cache.disk_usage_bytes() <= cache.max_bytes + tile.nbytes + 1024
+
+
+def test_build_geometry_buffers_polyline_in_metres():
+    start, end = to_wgs84(ORIGIN_X + 100, ORIGIN_Y - 500), to_wgs84(ORIGIN_X + 900, ORIGIN_Y - 500)
+    corridor = build_geometry([start, end], "polyline", buffer_m=50)
+    native = Transformer.from_crs("EPSG:4326", HEADER.crs_wkt, always_xy=True)
+    xmin, ymin = native.transform(corridor.bounds[0], corridor.bounds[1])
+    assert ymin == pytest.approx(ORIGIN_Y - 550, abs=2)
+    assert xmin == pytest.approx(ORIGIN_X + 50, abs=2)
+
+    with pytest.raises(ValueError):
+        build_geometry([start, end], "polyline", buffer_m=0)
+
+
+def test_coverage_service_finds_intersecting_files():
+    def bounds(min_lat, max_lat, min_lon, max_lon):
+        return SimpleNamespace(min_lat=min_lat, max_lat=max_lat, min_lon=min_lon, max_lon=max_lon)
+
+    inside = SimpleNamespace(file="s3://b/a.tif", filename="a.tif", bounds=bounds(-28, -27, 153, 154),
+                             size_mb=1.0, coordinate_system="EPSG:28356")
+    outside = SimpleNamespace(file="s3://b/c.tif", filename="c.tif", bounds=bounds(-30, -29, 150, 151),
+                              size_mb=1.0, coordinate_system="EPSG:28356")
+    collection = SimpleNamespace(id="c1", coverage_bounds_wgs84=bounds(-31, -26, 149, 155),
+                                 files=[inside, outside], resolution_m=1.0)
+    source = SimpleNamespace(unified_index=SimpleNamespace(data_collections=[collection]), handler_registry=None)
+
+    geometry = build_geometry([(-27.5, 153.2), (-27.5, 153.4), (-27.3, 153.4)], "polygon")
+    files = CoverageService(source).find_files_for_geometry(geometry)
+    assert [f.filename for f in files] == ["a.tif"]
+
+
+class FetchingTileCache(RasterTileCache):
+    """Tile cache whose remote reads are served from a local array."""
+
+    def fetch_tile(self, file_path, row, col):
+        _, _, width, height = self.tile_window(HEADER, row, col)
+        tile = np.ones((height, width), dtype=np.float32)
+        self.store_tile(file_path, row, col, tile)
+        return tile, int(tile.nbytes)
+
+
+@pytest.mark.asyncio
+async def test_prefetch_job_warms_intersecting_tiles(tmp_path):
+    cache = FetchingTileCache(str(tmp_path / "tiles"), tile_size=256)
+    cache._headers[to_vsi_path(FILE)] = HEADER
+    cache.store_tile(FILE, 0, 0, np.zeros((256, 256), dtype=np.float32))
+
+    service = ProjectPrefetchService(elevation_service=None, tile_cache=cache, max_concurrency=1)
+    service.resolve_files = lambda geometry: [SimpleNamespace(file_path=FILE, filename="dem_1m.tif")]
+
+    corner = [to_wgs84(ORIGIN_X + x, ORIGIN_Y - y) for x, y in ((10, 10), (400, 10), (400, 400), (10, 400))]
+    job = service.register(build_geometry(corner, "polygon"), name="corridor")
+    await asyncio.wait_for(service._tasks[job.id], timeout=10)
+
+    assert job.state == "completed"
+    assert job.tiles_total == 4
+    assert job.tiles_cached == 1 and job.tiles_fetched == 3
+    assert job.bytes_fetched == 3 * 256 * 256 * 4
+    assert job.progress_percent == 100.0
+    assert service.list()[0]["project_id"] == job.id
+    service.close()
+
+
+def test_prefetch_tile_budget_is_shared_safely_between_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    from src.services.prefetch_service import PrefetchJob
+
+    job = PrefetchJob(id="p1", name=None, geometry=None)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        granted = list(pool.map(lambda _: job.reserve_tiles(7, 1000), range(200)))
+        list(pool.map(job.record_tile, [0, 4096] * 500))
+    assert sum(granted) == job.tiles_total == 1000 and job.truncated
+    assert (job.tiles_cached, job.tiles_fetched, job.bytes_fetched) == (500, 500, 500 * 4096)
+
+
+class LocalOnlyRedis:
+    """RedisStateManager stand-in with Redis unavailable (in-process leases)."""
+
+    def _get_redis_client(self):
+        return None
+
+
+def make_single_flight_cache(tmp_path, wait_seconds=2.0):
+    from src.redis_state_manager import RedisFetchLease
+
+    cache = FetchingTileCache(str(tmp_path / "tiles"), tile_size=256,
+                              lease=RedisFetchLease(LocalOnlyRedis(), lease_ms=5000), wait_seconds=wait_seconds)
+    cache._headers[to_vsi_path(FILE)] = HEADER
+    return cache
+
+
+def test_single_flight_waits_for_lease_holder(tmp_path):
+    import threading
+
+    cache = make_single_flight_cache(tmp_path)
+    key = cache._tile_key(to_vsi_path(FILE), 1, 1)
+    token = cache.lease.acquire(key)  # another worker is fetching this tile
+    assert token is not None
+    assert cache.lease.acquire(key) is None
+
+    def leader_publishes():
+        cache.store_tile(FILE, 1, 1, np.full((256, 256), 7.0, dtype=np.float32))
+        cache.lease.release(key, token)
+
+    timer = threading.Timer(0.1, leader_publishes)
+    timer.start()
+    tile, fetched = cache.ensure_tile(FILE, 1, 1)
+    timer.join()
+
+    assert fetched == 0
+    assert tile[0, 0] == 7.0
+    stats = cache.get_stats()
+    assert stats["tiles_fetched"] == 0 and stats["single_flight_waits"] == 1
+
+
+def test_single_flight_fetches_itself_when_leader_stalls(tmp_path):
+    cache = make_single_flight_cache(tmp_path, wait_seconds=0.1)
+    cache.lease.acquire(cache._tile_key(to_vsi_path(FILE), 0, 0))
+
+    tile, fetched = cache.ensure_tile(FILE, 0, 0)
+    assert fetched == tile.nbytes
+    assert cache.get_stats()["single_flight_timeouts"] == 1
+
+    # The lease holder path fetches once, then everyone reads the shared copy
+    assert cache.ensure_tile(FILE, 0, 0)[1] == 0
+
+
+def test_read_through_sample_fetches_missing_tile(tmp_path):
+    cache = make_single_flight_cache(tmp_path)
+    cache.read_through = True
+    lat, lon = to_wgs84(ORIGIN_X + 600.5, ORIGIN_Y - 600.5)
+
+    assert cache.sample(FILE, lat, lon) == pytest.approx(1.0)
+    assert cache.has_tile(FILE, 2, 2)
+    assert cache.get_stats()["tile_misses"] == 1
+
+
+def test_fetch_lease_uses_redis_set_nx_and_owner_release():
+    from unittest.mock import MagicMock
+    from src.redis_state_manager import RedisFetchLease
+
+    client = MagicMock()
+    client.set.side_effect = [True, None]
+    manager = SimpleNamespace(_get_redis_client=lambda: client)
+    lease = RedisFetchLease(manager, namespace="tile_fetch", lease_ms=1000)
+
+    token = lease.acquire("abc:0_0")
+    assert token is not None
+    client.set.assert_called_with("tile_fetch:abc:0_0", token, nx=True, px=1000)
+    assert lease.acquire("abc:0_0") is None
+
+    lease.release("abc:0_0", token)
+    assert client.eval.call_args[0][2:] == ("tile_fetch:abc:0_0", token)
+
+
+def test_fetch_lease_backs_off_when_redis_is_not_configured():
+    from src.redis_state_manager import RedisFetchLease
+
+    connects = []
+    manager = SimpleNamespace(_get_redis_client=lambda: connects.append(1))
+    lease = RedisFetchLease(manager, lease_ms=1000, retry_after_seconds=30)
+    token = lease.acquire("abc:0_0")
+    lease.release("abc:0_0", token)
+    assert lease.acquire("abc:0_1") is not None and not lease.publish("abc:0_1", b"x", 60)
+    assert len(connects) == 1
+
+
+def test_cold_sample_opens_the_remote_file_once(tmp_path, monkeypatch):
+    import rasterio
+    from contextlib import nullcontext
+    from src.services import tile_cache as tile_cache_module
+
+    opened = []
+
+    class Dataset:
+        crs = CRS.from_wkt(HEADER.crs_wkt)
+        transform = HEADER.transform
+        width, height, nodata, dtypes = HEADER.width, HEADER.height, HEADER.nodata, ["float32"]
+
+        def read(self, band, window):
+            return np.full((int(window.height), int(window.width)), 3.0, dtype=np.float32)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            opened.append("closed")
+
+    def fake_open(path):
+        opened.append(path)
+        return Dataset()
+
+    monkeypatch.setattr(rasterio, "open", fake_open)
+    monkeypatch.setattr(tile_cache_module, "raster_env", lambda path: nullcontext())
+    cache = RasterTileCache(str(tmp_path / "tiles"), tile_size=256, read_through=True)
+    lat, lon = to_wgs84(ORIGIN_X + 600.5, ORIGIN_Y - 600.5)
+
+    assert cache.sample(FILE, lat, lon) == pytest.approx(3.0)
+    assert opened == [to_vsi_path(FILE), "closed"]
+    assert cache.get_stats()["header_fetches"] == 1 and cache.has_tile(FILE, 2, 2)
+
+
+def test_direct_reader_unwinds_envs_and_datasets_in_reverse(monkeypatch):
+    import rasterio
+    from contextlib import contextmanager
+    from src.services import tile_cache as tile_cache_module
+    from src.services.tile_cache import DirectTileReader
+
+    events = []
+
+    @contextmanager
+    def tracked(name):
+        events.append(f"enter {name}")
+        yield SimpleNamespace(name=name)
+        events.append(f"exit {name}")
+
+    monkeypatch.setattr(tile_cache_module, "raster_env", lambda path: tracked(f"env {path[-5:]}"))
+    monkeypatch.setattr(rasterio, "open", lambda path: tracked(f"ds {path[-5:]}"))
+    with DirectTileReader() as reader:
+        reader._open("s3://b/a.tif")
+        reader._open("s3://b/b.tif")
+        reader._open("s3://b/a.tif")
+    assert events == ["enter env a.tif", "enter ds a.tif", "enter env b.tif", "enter ds b.tif",
+                      "exit ds b.tif", "exit env b.tif", "exit ds a.tif", "exit env a.tif"]
+
+
+def test_prefetch_endpoints_scope_projects_to_their_client_across_workers(tmp_path):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from src.api.v1 import endpoints, prefetch_endpoints
+    from src.auth import get_current_user
+    from src.dependencies import get_prefetch_service
+    from src.redis_state_manager import RedisJobRegistry
+
+    registry = RedisJobRegistry(LocalOnlyRedis(), namespace="prefetch", id_key="project_id")
+    cache = FetchingTileCache(str(tmp_path / "tiles"), tile_size=256)
+    # Two workers sharing the registry; requests alternate between them
+    workers = [ProjectPrefetchService(elevation_service=None, tile_cache=cache, registry=registry) for _ in range(2)]
+    for service in workers:
+        service._run = lambda job: asyncio.sleep(60)
+    turn = iter(workers * 10)
+    caller = {"user_id": "alice"}
+
+    app = FastAPI()
+    app.state.limiter = endpoints.limiter
+    app.include_router(prefetch_endpoints.router, prefix="/api")
+    app.dependency_overrides[get_prefetch_service] = lambda: next(turn)
+    app.dependency_overrides[get_current_user] = lambda: caller
+    client = TestClient(app)
+
+    body = {"coordinates": [{"lat": -27.5, "lon": 153.2}, {"lat": -27.5, "lon": 153.4}, {"lat": -27.3, "lon": 153.4}],
+            "geometry_type": "polygon"}
+    response = client.post("/api/v1/elevation/prefetch", json=body)
+    assert response.status_code == 202
+    project_id = response.json()["project_id"]
+
+    # The other worker answers from the registry
+    assert client.get(f"/api/v1/elevation/prefetch/{project_id}").json()["state"] == "pending"
+    caller["user_id"] = "mallory"
+    assert client.get(f"/api/v1/elevation/prefetch/{project_id}").status_code == 404
+    assert client.delete(f"/api/v1/elevation/prefetch/{project_id}").status_code == 404
+    assert client.get("/api/v1/elevation/prefetch").json()["total_projects"] == 0
+
+    caller["user_id"] = "alice"
+    assert client.get("/api/v1/elevation/prefetch").json()["projects"][0]["project_id"] == project_id
+    assert client.get(f"/api/v1/elevation/prefetch/{project_id}").status_code == 200
+    # A cancel reaching the other worker is passed on to the owner through the registry
+    assert client.delete(f"/api/v1/elevation/prefetch/{project_id}").status_code == 200
+    job = workers[0]._jobs[project_id]
+    assert registry.cancel_requested(project_id) and not job.cancel_requested
+    workers[0]._save(job)
+    assert job.cancel_requested
+    for service in workers:
+        service.close()